@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Benchmark Script para Motick Data Scraper
+Mide las rutas criticas con datos sinteticos (sin red ni credenciales)
+"""
+
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Agregar scr al path ANTES de cualquier import
+script_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.join(script_dir, 'scr')
+if src_path not in sys.path:
+    sys.path.append(src_path)
+
+def print_benchmark_header(nombre):
+    """Imprime header de benchmark"""
+    print(f"\n{'='*60}")
+    print(f"BENCHMARK: {nombre}")
+    print('='*60)
+
+def medir(funcion, *args, **kwargs):
+    """
+    Ejecuta funcion y devuelve (resultado, segundos, pico_memoria_mb)
+    El pico suma la memoria Python/numpy (tracemalloc) y la del pool de pyarrow
+    """
+    pool_original = pool_medido = None
+    if pa is not None:
+        pool_original = pa.default_memory_pool()
+        pool_medido = pa.proxy_memory_pool(pool_original)
+        pa.set_memory_pool(pool_medido)
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        resultado = funcion(*args, **kwargs)
+    finally:
+        duracion = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if pool_medido is not None:
+            pico += pool_medido.max_memory()
+            pa.set_memory_pool(pool_original)
+
+    return resultado, duracion, pico / (1024 * 1024)
+
+def generar_historico_sintetico(n_motos=20000, n_dias=200, semilla=42):
+    """
+    Genera un Data_Historico sintetico con el mismo esquema que el real:
+    columnas basicas + Visitas_dd/mm/yyyy y Likes_dd/mm/yyyy por dia (2 x n_dias)
+    Las motos detectadas tarde tienen NaN en los dias anteriores
+    """
+    rng = np.random.default_rng(semilla)
+    fecha_inicio = datetime(2025, 1, 1)
+    fechas = [(fecha_inicio + timedelta(days=d)).strftime("%d/%m/%Y") for d in range(n_dias)]
+
+    dia_alta = rng.integers(0, n_dias, size=n_motos)
+    estado = np.where(rng.random(n_motos) < 0.3, 'vendida', 'activa')
+
+    datos = {
+        'ID_Unico_Real': [f"{i:012x}" for i in range(n_motos)],
+        'Cuenta': rng.choice(['MOTICK.MA M.', 'MOTICK.SE S.', 'MOTICK.VA V.'], size=n_motos),
+        'Titulo': [f"Honda CBR {i}" for i in range(n_motos)],
+        'Precio': [f"{p:,} €".replace(',', '.') for p in rng.integers(500, 20000, size=n_motos)],
+        'Kilometraje': [f"{k:,} km".replace(',', '.') for k in rng.integers(0, 90000, size=n_motos)],
+        'Primera_Deteccion': [fechas[d] for d in dia_alta],
+        'Estado': estado,
+        'Fecha_Venta': [fechas[-1] if e == 'vendida' else pd.NA for e in estado],
+        'URL': [f"https://es.wallapop.com/item/moto-{i}" for i in range(n_motos)],
+    }
+
+    visitas = np.cumsum(rng.integers(0, 20, size=(n_motos, n_dias)), axis=1).astype(float)
+    likes = np.cumsum(rng.integers(0, 2, size=(n_motos, n_dias)), axis=1).astype(float)
+    sin_datos = np.arange(n_dias)[None, :] < dia_alta[:, None]
+    visitas[sin_datos] = np.nan
+    likes[sin_datos] = np.nan
+
+    datos['Visitas_Totales'] = np.nan_to_num(visitas[:, -1]).astype(int)
+    datos['Likes_Totales'] = np.nan_to_num(likes[:, -1]).astype(int)
+    for d, fecha in enumerate(fechas):
+        datos[f"Visitas_{fecha}"] = visitas[:, d]
+        datos[f"Likes_{fecha}"] = likes[:, d]
+    datos['Variacion_Likes'] = np.zeros(n_motos, dtype=int)
+
+    return pd.DataFrame(datos)
+
+def limpieza_legacy(df):
+    """Referencia: limpieza anterior (copy + fillna + replace + astype(str) por columna)"""
+    df_clean = df.copy()
+    df_clean = df_clean.fillna('')
+    df_clean = df_clean.replace({pd.NA: ''})
+    df_clean = df_clean.replace({None: ''})
+    for col in df_clean.columns:
+        df_clean[col] = df_clean[col].astype(str)
+        df_clean[col] = df_clean[col].replace({'nan': '', '<NA>': '', 'None': ''})
+    return [df_clean.columns.values.tolist()] + df_clean.values.tolist()
+
+def benchmark_serializacion_sheets(n_motos=20000, n_dias=200):
+    """Benchmark 1: Serializacion para Sheets (20k filas x 400 columnas por defecto)"""
+    print_benchmark_header(f"Serializacion Sheets ({n_motos} filas x {2 * n_dias} columnas de fechas)")
+
+    from google_sheets_motick import serializar_dataframe_para_sheets
+
+    df = generar_historico_sintetico(n_motos, n_dias)
+
+    datos_legacy, t_legacy, mem_legacy = medir(limpieza_legacy, df)
+    datos_nuevos, t_nuevo, mem_nuevo = medir(serializar_dataframe_para_sheets, df)
+
+    assert len(datos_legacy) == len(datos_nuevos)
+    assert isinstance(datos_nuevos[1][df.columns.get_loc('Visitas_Totales')], int)
+
+    print(f"Legacy (astype str):  {t_legacy:7.2f}s | pico {mem_legacy:8.1f} MB")
+    print(f"Serializador nuevo:   {t_nuevo:7.2f}s | pico {mem_nuevo:8.1f} MB")
+    print(f"Mejora: x{t_legacy / max(t_nuevo, 1e-9):.1f} tiempo, x{mem_legacy / max(mem_nuevo, 1e-9):.1f} memoria")
+
+    return t_nuevo < t_legacy
+
+def lectura_legacy(json_valores):
+    """Referencia: get_all_values() (JSON de strings) + DataFrame + to_numeric por columna"""
+    data = json.loads(json_valores)
+    df = pd.DataFrame(data[1:], columns=data[0])
+    columnas_visitas = [col for col in df.columns if col.startswith('Visitas_')]
+    columnas_likes = [col for col in df.columns if col.startswith('Likes_')]
+    for col in columnas_visitas + columnas_likes + ['Variacion_Likes']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+    return df
+
+def benchmark_lectura_historico(n_motos=20000, n_dias=200):
+    """Benchmark 2: Lectura del historico (get_all_values vs export CSV tipado)"""
+    print_benchmark_header(f"Lectura historico ({n_motos} filas x {2 * n_dias} columnas de fechas)")
+
+    from google_sheets_motick import serializar_dataframe_para_sheets, leer_csv_tipado
+
+    # Mismo contenido en los dos formatos que devuelve Google (todo como texto formateado)
+    valores = serializar_dataframe_para_sheets(generar_historico_sintetico(n_motos, n_dias))
+    valores_texto = [[str(v) for v in fila] for fila in valores]
+    json_valores = json.dumps(valores_texto)
+    df_csv = pd.DataFrame(valores_texto[1:], columns=valores_texto[0])
+    contenido_csv = df_csv.to_csv(index=False).encode('utf-8')
+    del valores, valores_texto, df_csv
+
+    df_legacy, t_legacy, mem_legacy = medir(lectura_legacy, json_valores)
+    df_nuevo, t_nuevo, mem_nuevo = medir(leer_csv_tipado, contenido_csv)
+
+    columnas_fecha = [col for col in df_nuevo.columns if col.startswith('Likes_')]
+    assert (df_legacy[columnas_fecha].to_numpy() == df_nuevo[columnas_fecha].to_numpy()).all()
+
+    print(f"Legacy (JSON + to_numeric):  {t_legacy:7.2f}s | pico {mem_legacy:8.1f} MB")
+    print(f"CSV tipado (pyarrow/C):     {t_nuevo:7.2f}s | pico {mem_nuevo:8.1f} MB")
+    print(f"Mejora: x{t_legacy / max(t_nuevo, 1e-9):.1f} tiempo, x{mem_legacy / max(mem_nuevo, 1e-9):.1f} memoria")
+
+    return t_nuevo < t_legacy and mem_nuevo < mem_legacy
+
+def generar_scrape_sintetico(df_historico, fraccion_existentes=0.7, n_nuevas=100, semilla=7):
+    """Scrape del dia siguiente: parte de las URLs del historico + n_nuevas URLs nuevas"""
+    rng = np.random.default_rng(semilla)
+    existentes = df_historico.sample(frac=fraccion_existentes, random_state=semilla)
+    urls = list(existentes['URL']) + [f"https://es.wallapop.com/item/nueva-{i}" for i in range(n_nuevas)]
+    return pd.DataFrame({
+        'ID_Unico_Real': [f"n{i:011x}" for i in range(len(urls))],
+        'Cuenta': 'MOTICK.MA M.',
+        'Titulo': [f"Yamaha MT {i}" for i in range(len(urls))],
+        'Precio': '6.500 €',
+        'Kilometraje': '12.000 km',
+        'Visitas': rng.integers(0, 500, size=len(urls)),
+        'Likes': rng.integers(0, 40, size=len(urls)),
+        'URL': urls,
+    })
+
+def preparar_entrada_merge(n_motos, n_dias, n_nuevas, df_historico=None):
+    """Historico + scrape sinteticos con el esquema tipado y las etiquetas que aplica el analizador al leer"""
+    from esquema_motick import tipar_dataframe
+    from catalogo_motick import asegurar_etiquetas
+
+    if df_historico is None:
+        df_historico = tipar_dataframe(generar_historico_sintetico(n_motos, n_dias).fillna(0))
+    df_nuevo = asegurar_etiquetas(tipar_dataframe(generar_scrape_sintetico(df_historico, n_nuevas=n_nuevas)))
+    return df_nuevo, df_historico
+
+def ejecutar_merge(df_nuevo, df_historico):
+    """procesar_motos_nuevas_y_existentes sin almacenamiento ni salida por consola"""
+    import contextlib
+    from analisis_motick import AnalizadorHistoricoMotick
+
+    analizador = AnalizadorHistoricoMotick(almacenamiento=object(), estado=False, verificador=False)
+    analizador.fecha_display = "01/03/2025"
+    with contextlib.redirect_stdout(io.StringIO()):
+        return analizador.procesar_motos_nuevas_y_existentes(df_nuevo, df_historico)
+
+def benchmark_merge_historico(tamanos=(5000, 50000), n_dias=30):
+    """Benchmark 3: Merge diario (existentes/vendidas) - escalado casi lineal con el historico"""
+    print_benchmark_header(f"Merge historico ({' -> '.join(str(n) for n in tamanos)} filas)")
+
+    tiempos = []
+    for n_motos in tamanos:
+        df_nuevo, df_historico = preparar_entrada_merge(n_motos, n_dias, n_motos // 100)
+        df_final, duracion, memoria = medir(ejecutar_merge, df_nuevo, df_historico)
+        assert len(df_final) == n_motos + n_motos // 100
+        tiempos.append(duracion)
+        print(f"{n_motos:>7} filas: {duracion:7.2f}s | pico {memoria:8.1f} MB")
+
+    factor_filas = tamanos[-1] / tamanos[0]
+    factor_tiempo = tiempos[-1] / max(tiempos[0], 1e-9)
+    print(f"Filas x{factor_filas:.0f} -> tiempo x{factor_tiempo:.1f}")
+
+    # Casi lineal: el tiempo no crece mas del doble de lo que crecen las filas
+    return factor_tiempo < 2 * factor_filas
+
+def benchmark_motos_nuevas(n_motos=20000, n_dias=30, nuevas=(100, 10000)):
+    """Benchmark 4: Alta de motos nuevas - el coste no depende de cuantas son nuevas"""
+    print_benchmark_header(f"Motos nuevas ({' -> '.join(str(n) for n in nuevas)} sobre {n_motos} filas)")
+
+    df_historico = None
+
+    tiempos = []
+    for n_nuevas in nuevas:
+        df_nuevo, df_historico = preparar_entrada_merge(n_motos, n_dias, n_nuevas, df_historico)
+        df_final, duracion, memoria = medir(ejecutar_merge, df_nuevo, df_historico)
+        assert len(df_final) == n_motos + n_nuevas
+        tiempos.append(duracion)
+        print(f"{n_nuevas:>7} nuevas: {duracion:7.2f}s | pico {memoria:8.1f} MB")
+
+    factor_tiempo = tiempos[-1] / max(tiempos[0], 1e-9)
+    print(f"Nuevas x{nuevas[-1] / nuevas[0]:.0f} -> tiempo x{factor_tiempo:.1f}")
+
+    # Con concat por fila 100x mas nuevas eran ~100 copias mas del historico
+    return factor_tiempo < 3
+
+def ids_legacy(fila):
+    """ID por fila como antes (apply axis=1 + regex + md5 por fila)"""
+    import hashlib
+    import re
+    url = str(fila.get('URL', '')).strip()
+    cuenta = str(fila.get('Cuenta', '')).strip()
+    titulo = re.sub(r'[^\w\s]', '', str(fila.get('Titulo', '')).strip().lower())[:30]
+    km = re.sub(r'[^\d]', '', str(fila.get('Kilometraje', '')).strip())
+    return hashlib.md5(f"{url}_{cuenta}_{titulo}_{km}".encode()).hexdigest()[:12]
+
+def benchmark_ids(n_motos=50000):
+    """Benchmark 6: ID_Unico_Real vectorizado frente a df.apply por fila"""
+    print_benchmark_header(f"IDs de motos ({n_motos} filas)")
+
+    from ids_motick import crear_ids_motos
+
+    df = generar_historico_sintetico(n_motos, n_dias=1)
+    _, t_legacy, mem_legacy = medir(df.apply, ids_legacy, axis=1)
+    ids, t_nuevo, mem_nuevo = medir(crear_ids_motos, df)
+    assert ids.is_unique
+
+    print(f"apply por fila:  {t_legacy:7.2f}s | pico {mem_legacy:8.1f} MB")
+    print(f"vectorizado:     {t_nuevo:7.2f}s | pico {mem_nuevo:8.1f} MB")
+    print(f"Aceleracion: x{t_legacy / max(t_nuevo, 1e-9):.1f}")
+
+    return t_nuevo < t_legacy
+
+def benchmark_matriz_series(n_motos=5000, n_dias=1095):
+    """Benchmark 5: Matriz memory-mapped uint32/uint16 frente a columnas int64 por fecha"""
+    print_benchmark_header(f"Matriz series ({n_dias} dias x {n_motos} motos)")
+
+    import tempfile
+    from matriz_motick import MatrizSeriesMotick
+    from metricas_motick import bases_matriz, PERIODOS_DELTA
+
+    rng = np.random.default_rng(3)
+    url_ids = np.array([f"{i:012x}" for i in range(n_motos)], dtype=object)
+    fechas = pd.date_range('2023-01-01', periods=n_dias).strftime('%Y-%m-%d')
+
+    with tempfile.TemporaryDirectory() as directorio:
+        matriz = MatrizSeriesMotick(directorio)
+
+        def cargar_dias():
+            for fecha in fechas:
+                matriz.actualizar(pd.DataFrame({
+                    'URL_ID': url_ids, 'Fecha': fecha,
+                    'Visitas': rng.integers(0, 5000, n_motos), 'Likes': rng.integers(0, 200, n_motos)
+                }))
+
+        _, duracion_carga, _ = medir(cargar_dias)
+        _, duracion_ventana, _ = medir(matriz.a_observaciones, list(fechas[-31:]))
+        # Valores base de los deltas 1/7/30 dias leidos de las filas (sin formato largo)
+        hoy = datetime.strptime(fechas[-1], "%Y-%m-%d") + timedelta(days=1)
+        _, duracion_deltas, _ = medir(bases_matriz, matriz, pd.Series(url_ids), hoy, PERIODOS_DELTA)
+        mb_matriz = matriz.memoria_bytes() / (1024 * 1024)
+
+    # Mismos datos como columnas Visitas_/Likes_ int64 de Data_Historico
+    mb_wide = n_motos * n_dias * 2 * 8 / (1024 * 1024)
+
+    por_dia = duracion_carga / n_dias
+    print(f"Alta de un dia:      {por_dia * 1000:7.2f} ms")
+    print(f"Ventana metricas 31d:{duracion_ventana * 1000:7.2f} ms")
+    print(f"Deltas 1/7/30 (filas):{duracion_deltas * 1000:6.2f} ms")
+    print(f"Matriz en disco:     {mb_matriz:7.1f} MB (reservado) | columnas int64: {mb_wide:7.1f} MB")
+
+    return mb_matriz < mb_wide / 2 and por_dia < 0.05
+
+def metricas_legacy(df_historico, fecha_display, periodos=(1, 7, 30)):
+    """Deltas fila a fila sobre las columnas por fecha (como una formula por celda)"""
+    hoy = datetime.strptime(fecha_display, "%d/%m/%Y")
+
+    def deltas_fila(fila):
+        hoy_likes = fila.get(f"Likes_{fecha_display}")
+        resultado = {}
+        for dias in periodos:
+            base = None
+            for d in range(dias, 0, -1):
+                valor = fila.get(f"Likes_{(hoy - timedelta(days=d)).strftime('%d/%m/%Y')}")
+                if valor is not None and not pd.isna(valor):
+                    base = valor
+                    break
+            resultado[f"Likes_Delta_{dias}d"] = None if base is None or pd.isna(hoy_likes) else hoy_likes - base
+        return pd.Series(resultado)
+
+    metricas = df_historico.apply(deltas_fila, axis=1)
+    return metricas.sort_values('Likes_Delta_7d', ascending=False).head(20)
+
+def benchmark_metricas(n_motos=20000, n_dias=31):
+    """Benchmark 7: Metricas de engagement en una pasada vectorizada frente a fila a fila"""
+    print_benchmark_header(f"Metricas engagement ({n_motos} motos, {n_dias} dias)")
+
+    from esquema_motick import tipar_dataframe
+    from series_motick import wide_a_largo
+    from metricas_motick import calcular_metricas
+
+    df_historico = generar_historico_sintetico(n_motos, n_dias)
+    fecha_display = (datetime(2025, 1, 1) + timedelta(days=n_dias - 1)).strftime("%d/%m/%Y")
+    df_obs = wide_a_largo(df_historico)
+    df_tipado = tipar_dataframe(df_historico)
+
+    _, t_legacy, mem_legacy = medir(metricas_legacy, df_historico, fecha_display)
+    metricas, t_nuevo, mem_nuevo = medir(calcular_metricas, df_tipado, df_obs, fecha_display)
+    assert metricas['Rank_Crecimiento'].notna().sum() == 20
+
+    print(f"fila a fila:     {t_legacy:7.2f}s | pico {mem_legacy:8.1f} MB")
+    print(f"vectorizado:     {t_nuevo:7.2f}s | pico {mem_nuevo:8.1f} MB ({len(df_obs):,} observaciones)")
+    print(f"Aceleracion: x{t_legacy / max(t_nuevo, 1e-9):.1f}")
+
+    return t_nuevo < t_legacy
+
+def resumen_legacy(df_historico):
+    """Filtro por cada cuenta x estado sobre los textos (como los filtros a mano de las hojas)"""
+    filas = []
+    for cuenta in df_historico['Cuenta'].unique():
+        for estado in ('activa', 'vendida'):
+            grupo = df_historico[(df_historico['Cuenta'] == cuenta) & (df_historico['Estado'] == estado)]
+            for marca in grupo['Titulo'].str.split().str[0].str.upper().unique():
+                motos = grupo[grupo['Titulo'].str.split().str[0].str.upper() == marca]
+                precios = motos['Precio'].str.replace(r'[^\d]', '', regex=True).astype(float)
+                filas.append((cuenta, marca, estado, len(motos), precios.mean()))
+    return pd.DataFrame(filas, columns=['Cuenta', 'Marca', 'Estado', 'Motos', 'Precio_Medio'])
+
+def benchmark_resumen(n_motos=20000, n_dias=30):
+    """Benchmark 8: Cubo cuenta x marca x estado x semana con un groupby frente a filtros"""
+    print_benchmark_header(f"Resumen por cuenta ({n_motos} motos)")
+
+    from esquema_motick import tipar_dataframe
+    from resumen_motick import calcular_resumen
+
+    df_historico = generar_historico_sintetico(n_motos, n_dias)
+    marcas = np.array(['Honda', 'Yamaha', 'Kawasaki', 'Suzuki', 'BMW', 'KTM', 'Ducati', 'Piaggio'])
+    df_historico['Titulo'] = [f"{marcas[i % len(marcas)]} modelo {i}" for i in range(n_motos)]
+    df_tipado = tipar_dataframe(df_historico)
+
+    _, t_legacy, mem_legacy = medir(resumen_legacy, df_historico)
+    resumen, t_nuevo, mem_nuevo = medir(calcular_resumen, df_tipado)
+    assert resumen['Motos'].sum() == n_motos
+
+    print(f"filtros:         {t_legacy:7.2f}s | pico {mem_legacy:8.1f} MB")
+    print(f"groupby:         {t_nuevo:7.2f}s | pico {mem_nuevo:8.1f} MB ({len(resumen):,} filas)")
+    print(f"Aceleracion: x{t_legacy / max(t_nuevo, 1e-9):.1f}")
+
+    return t_nuevo < t_legacy
+
+def main():
+    """Funcion principal de benchmarks"""
+    print("="*60)
+    print("MOTICK DATA SCRAPER - BENCHMARKS")
+    print(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("="*60)
+
+    benchmarks = [
+        ("Serializacion Sheets", benchmark_serializacion_sheets),
+        ("Lectura historico", benchmark_lectura_historico),
+        ("Merge historico", benchmark_merge_historico),
+        ("Motos nuevas", benchmark_motos_nuevas),
+        ("Matriz series", benchmark_matriz_series),
+        ("IDs de motos", benchmark_ids),
+        ("Metricas engagement", benchmark_metricas),
+        ("Resumen por cuenta", benchmark_resumen),
+    ]
+
+    resultados = []
+    for nombre, funcion in benchmarks:
+        inicio = time.time()
+        mejora = funcion()
+        resultados.append((nombre, mejora, time.time() - inicio))
+
+    print("\n" + "="*60)
+    print("RESUMEN DE BENCHMARKS")
+    print("="*60)
+    for nombre, mejora, duracion in resultados:
+        status = "MEJORA" if mejora else "REGRESION"
+        print(f"[{status}] {nombre:<30} ({duracion:.2f}s)")
+
+    return 0 if all(mejora for _, mejora, _ in resultados) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
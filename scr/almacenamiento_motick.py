@@ -0,0 +1,574 @@
+"""
+Almacenamiento Motick - Interfaz comun de backends
+- AlmacenamientoMotick: interfaz que usan scraper y analizador
+- AlmacenamientoLocalMotick: SQLite (estado/catalogo) + Parquet (snapshots e historico)
+  Todo a velocidad de disco local, sin red ni cuotas de la API
+- GoogleSheetsMotick (google_sheets_motick.py) implementa la misma interfaz
+
+Con backend local, publicador_motick.py empuja despues los resultados a Sheets
+"""
+
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+import pandas as pd
+from datetime import datetime
+
+from config import TIPO_ALMACENAMIENTO, ALMACEN_LOCAL_DIR
+from esquema_motick import tipar_dataframe
+from ids_motick import asegurar_ids
+from precios_motick import COLUMNAS_CAMBIOS_PRECIO
+from series_motick import COLUMNAS_OBSERVACIONES, fecha_display_a_iso, fecha_iso_a_display
+
+class AlmacenamientoMotick(ABC):
+    """
+    Interfaz de almacenamiento del sistema Motick
+    Los metodos mantienen los nombres y contratos originales de GoogleSheetsMotick
+    Clase abstracta: un backend al que le falte un metodo falla al crearlo, no a mitad de ejecucion
+    """
+
+    @abstractmethod
+    def test_connection(self):
+        """Comprueba que el backend esta accesible"""
+        pass
+
+    @abstractmethod
+    def subir_datos_scraper(self, df_motos, fecha_extraccion=None):
+        """Guarda el snapshot diario del scraper. Devuelve (exito, nombre_snapshot)"""
+        pass
+
+    @abstractmethod
+    def leer_datos_scraper_reciente(self):
+        """Devuelve (DataFrame, fecha_str dd/mm/yyyy) del snapshot mas reciente"""
+        pass
+
+    @abstractmethod
+    def leer_snapshots_posteriores(self, fecha_display=None):
+        """Lista [(fecha dd/mm/yyyy, DataFrame)] de snapshots posteriores a la fecha, en orden (None si falla)"""
+        pass
+
+    @abstractmethod
+    def leer_datos_historico(self, sheet_name="Data_Historico"):
+        """Devuelve el historico como DataFrame o None si no existe"""
+        pass
+
+    @abstractmethod
+    def guardar_historico_con_hojas_originales(self, df_historico, fecha_procesamiento):
+        """Guarda el historico completo (y vistas activas/vendidas). Devuelve bool"""
+        pass
+
+    @abstractmethod
+    def leer_observaciones(self):
+        """
+        Devuelve la serie larga (URL_ID, Fecha yyyy-mm-dd, Visitas, Likes), None si no existe
+        o False si no se pudo leer (el analizador no debe migrar: duplicaria la serie)
+        """
+        pass
+
+    @abstractmethod
+    def guardar_observaciones(self, df_observaciones):
+        """Anade observaciones (una por URL_ID y Fecha; la ultima gana). Devuelve bool"""
+        pass
+
+    @abstractmethod
+    def leer_cambios_precio(self):
+        """Registro de cambios de precio (URL_ID, Fecha, Precio_Anterior, Precio_Nuevo) o None"""
+        pass
+
+    @abstractmethod
+    def guardar_cambios_precio(self, df_cambios):
+        """Anade cambios de precio (uno por URL_ID y Fecha; el ultimo gana). Devuelve bool"""
+        pass
+
+    @abstractmethod
+    def leer_vendidas_archivadas(self):
+        """Archivo frio de motos vendidas (esquema COLUMNAS_ARCHIVO_VENDIDAS) o None"""
+        pass
+
+    @abstractmethod
+    def archivar_vendidas(self, df_archivo):
+        """Anade filas al archivo frio de vendidas. Devuelve bool"""
+        pass
+
+    @abstractmethod
+    def guardar_metricas(self, df_metricas):
+        """Guarda la tabla de metricas por moto (reemplaza la anterior). Devuelve bool"""
+        pass
+
+    @abstractmethod
+    def guardar_resumen(self, df_resumen, fecha_display):
+        """Guarda el cubo cuenta x marca x estado x semana (reemplaza el anterior). Devuelve bool"""
+        pass
+
+    @abstractmethod
+    def leer_marca_analisis(self):
+        """Marca de la ultima escritura del analizador ('' si no hay o se invalido)"""
+        pass
+
+    @abstractmethod
+    def guardar_marca_analisis(self, marca):
+        """Guarda la marca que valida el estado local del analizador. Devuelve bool"""
+        pass
+
+class AlmacenamientoLocalMotick(AlmacenamientoMotick):
+    """
+    Backend local:
+    - motick.sqlite: catalogo de snapshots, cola de publicaciones pendientes a Sheets,
+      observaciones diarias en formato largo y registro de cambios de precio
+    - snapshots/SCR_yyyy-mm-dd.parquet: datos diarios del scraper
+    - historico.parquet: Data_Historico (vista con ventana de columnas por fecha)
+    - vendidas_archivo.parquet: archivo frio de motos vendidas hace tiempo
+    - metricas.parquet: metricas de engagement por moto (hoja Metricas al publicar)
+    - resumen_cuentas.parquet: cubo cuenta x marca x estado x semana (hoja Resumen_Cuentas)
+    - tabla meta: marca de la ultima escritura del analizador (estado_motick.py)
+    """
+
+    def __init__(self, directorio=ALMACEN_LOCAL_DIR):
+        self.directorio = directorio
+        self.directorio_snapshots = os.path.join(directorio, 'snapshots')
+        self.ruta_db = os.path.join(directorio, 'motick.sqlite')
+        self.ruta_historico = os.path.join(directorio, 'historico.parquet')
+        self.ruta_vendidas = os.path.join(directorio, 'vendidas_archivo.parquet')
+        self.ruta_metricas = os.path.join(directorio, 'metricas.parquet')
+        self.ruta_resumen = os.path.join(directorio, 'resumen_cuentas.parquet')
+
+        os.makedirs(self.directorio_snapshots, exist_ok=True)
+        self.inicializar_db()
+
+        print(f"ALMACEN LOCAL: {os.path.abspath(directorio)}")
+
+    def conectar(self):
+        """Conexion SQLite (una por operacion, el volumen es minimo)"""
+        return sqlite3.connect(self.ruta_db)
+
+    def inicializar_db(self):
+        """Crea las tablas de estado si no existen"""
+        with self.conectar() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    fecha TEXT PRIMARY KEY,          -- yyyy-mm-dd (ordenable)
+                    nombre TEXT NOT NULL,            -- 'SCR dd/mm/yy' como en Sheets
+                    archivo TEXT NOT NULL,
+                    filas INTEGER NOT NULL,
+                    guardado_en TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS publicaciones (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    tipo TEXT NOT NULL,              -- 'scr' | 'historico' | 'metricas' | 'resumen' |
+                                                     -- 'observaciones' | 'cambios_precio' | 'vendidas'
+                    fecha TEXT NOT NULL,             -- dd/mm/yyyy
+                    creado_en TEXT NOT NULL,
+                    publicado_en TEXT
+                );
+                CREATE TABLE IF NOT EXISTS observaciones (
+                    url_id TEXT NOT NULL,
+                    fecha TEXT NOT NULL,             -- yyyy-mm-dd
+                    visitas INTEGER NOT NULL,
+                    likes INTEGER NOT NULL,
+                    PRIMARY KEY (url_id, fecha)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS cambios_precio (
+                    url_id TEXT NOT NULL,
+                    fecha TEXT NOT NULL,             -- yyyy-mm-dd
+                    precio_anterior INTEGER NOT NULL,
+                    precio_nuevo INTEGER NOT NULL,
+                    PRIMARY KEY (url_id, fecha)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS meta (
+                    clave TEXT PRIMARY KEY,
+                    valor TEXT NOT NULL
+                );
+            """)
+
+    def registrar_publicacion(self, conn, tipo, fecha_display):
+        """Anade un pendiente a la cola que consume el publicador de Sheets"""
+        conn.execute(
+            "INSERT INTO publicaciones (tipo, fecha, creado_en) VALUES (?, ?, ?)",
+            (tipo, fecha_display, datetime.now().isoformat(timespec='seconds'))
+        )
+
+    def registrar_publicaciones_por_fecha(self, conn, tipo, fechas_iso):
+        """
+        Hojas de solo anadir (Observaciones, Cambios_Precio): un pendiente por dia escrito,
+        el publicador anade las filas de esos dias
+        """
+        for fecha_iso in sorted(set(fechas_iso)):
+            self.registrar_publicacion(conn, tipo, fecha_iso_a_display(fecha_iso))
+
+    def leer_tabla_de_fechas(self, consulta, fechas_display):
+        """Filas de una tabla por fecha (yyyy-mm-dd) para los dias pedidos (publicador)"""
+        fechas_iso = sorted(fecha_display_a_iso(fecha) for fecha in fechas_display)
+        with self.conectar() as conn:
+            df = pd.read_sql_query(consulta + " WHERE fecha BETWEEN ? AND ? ORDER BY fecha", conn,
+                                   params=(fechas_iso[0], fechas_iso[-1]))
+        return df[df['Fecha'].isin(fechas_iso)].reset_index(drop=True)
+
+    def escribir_parquet(self, df, ruta):
+        """Escritura atomica: tmp + replace (un fallo nunca deja el archivo a medias)"""
+        ruta_tmp = ruta + '.tmp'
+        df.to_parquet(ruta_tmp, index=False)
+        os.replace(ruta_tmp, ruta)
+
+    def test_connection(self):
+        """El backend local siempre esta disponible si la DB se puede abrir"""
+        try:
+            with self.conectar() as conn:
+                conn.execute("SELECT 1")
+            print(f"CONEXION: Almacen local disponible")
+            return True
+        except Exception as e:
+            print(f"ERROR CONEXION: Almacen local no disponible: {str(e)}")
+            return False
+
+    def subir_datos_scraper(self, df_motos, fecha_extraccion=None):
+        """
+        Guarda el snapshot del scraper en Parquet y lo registra en SQLite
+        """
+        try:
+            if fecha_extraccion is None:
+                fecha_extraccion = datetime.now().strftime("%d/%m/%Y")
+
+            fecha_obj = datetime.strptime(fecha_extraccion, "%d/%m/%Y")
+            nombre_snapshot = f"SCR {fecha_obj.strftime('%d/%m/%y')}"
+
+            df_motos['ID_Unico_Real'] = asegurar_ids(df_motos)
+
+            ruta = os.path.join(self.directorio_snapshots, f"SCR_{fecha_obj.strftime('%Y-%m-%d')}.parquet")
+            self.escribir_parquet(df_motos, ruta)
+
+            with self.conectar() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO snapshots (fecha, nombre, archivo, filas, guardado_en) VALUES (?, ?, ?, ?, ?)",
+                    (fecha_obj.strftime('%Y-%m-%d'), nombre_snapshot, ruta, len(df_motos),
+                     datetime.now().isoformat(timespec='seconds'))
+                )
+                self.registrar_publicacion(conn, 'scr', fecha_extraccion)
+
+            print(f"GUARDADO LOCAL: {nombre_snapshot} ({len(df_motos)} filas)")
+            return True, nombre_snapshot
+
+        except Exception as e:
+            print(f"ERROR GUARDADO LOCAL SCR: {str(e)}")
+            return False, None
+
+    def leer_snapshot(self, fecha_display):
+        """Lee el snapshot de una fecha dd/mm/yyyy (o None si no existe)"""
+        fecha_iso = datetime.strptime(fecha_display, "%d/%m/%Y").strftime('%Y-%m-%d')
+        with self.conectar() as conn:
+            fila = conn.execute("SELECT archivo FROM snapshots WHERE fecha = ?", (fecha_iso,)).fetchone()
+        if fila is None:
+            return None
+        return pd.read_parquet(fila[0])
+
+    def leer_datos_scraper_reciente(self):
+        """
+        Snapshot mas reciente: una consulta por clave primaria, sin listar nada
+        """
+        try:
+            with self.conectar() as conn:
+                fila = conn.execute(
+                    "SELECT fecha, nombre, archivo FROM snapshots ORDER BY fecha DESC LIMIT 1"
+                ).fetchone()
+
+            if fila is None:
+                print("ERROR: No hay snapshots SCR en el almacen local")
+                return None, None
+
+            fecha_iso, nombre, archivo = fila
+            df = pd.read_parquet(archivo)
+            fecha_str = datetime.strptime(fecha_iso, '%Y-%m-%d').strftime("%d/%m/%Y")
+
+            print(f"EXITO: {len(df)} motos leidas desde {nombre} (almacen local)")
+            return df, fecha_str
+
+        except Exception as e:
+            print(f"ERROR CRITICO en leer_datos_scraper_reciente (local): {str(e)}")
+            return None, None
+
+    def leer_snapshots_posteriores(self, fecha_display=None):
+        """Snapshots con fecha posterior a fecha_display (todos si None), en orden de fecha"""
+        fecha_iso = datetime.strptime(fecha_display, "%d/%m/%Y").strftime('%Y-%m-%d') if fecha_display else ''
+        with self.conectar() as conn:
+            filas = conn.execute(
+                "SELECT fecha, archivo FROM snapshots WHERE fecha > ? ORDER BY fecha", (fecha_iso,)
+            ).fetchall()
+
+        return [
+            (datetime.strptime(fecha, '%Y-%m-%d').strftime("%d/%m/%Y"), pd.read_parquet(archivo))
+            for fecha, archivo in filas
+        ]
+
+    def leer_datos_historico(self, sheet_name="Data_Historico"):
+        """Lee historico.parquet (None si es la primera ejecucion)"""
+        try:
+            if not os.path.exists(self.ruta_historico):
+                print(f"AVISO: Historico local no existe - sera creado en primera ejecucion")
+                return None
+
+            df = pd.read_parquet(self.ruta_historico)
+            if df.empty:
+                print(f"AVISO: Historico local vacio")
+                return None
+
+            print(f"LEIDO: {len(df)} motos del historico local")
+            return df
+
+        except Exception as e:
+            print(f"ERROR LECTURA HISTORICO LOCAL: {str(e)}")
+            return None
+
+    def guardar_historico_con_hojas_originales(self, df_historico, fecha_procesamiento):
+        """
+        Guarda el historico en Parquet y deja pendiente su publicacion a Sheets
+        (Motos_Activas/Motos_Vendidas se generan al publicar)
+        """
+        try:
+            self.escribir_parquet(df_historico, self.ruta_historico)
+
+            with self.conectar() as conn:
+                self.registrar_publicacion(conn, 'historico', fecha_procesamiento)
+
+            print(f"GUARDADO LOCAL: Historico con {len(df_historico)} motos")
+            return True
+
+        except Exception as e:
+            print(f"ERROR GUARDANDO HISTORICO LOCAL: {str(e)}")
+            return False
+
+    def leer_observaciones(self):
+        """Serie larga completa desde SQLite (None si aun no hay observaciones, False si falla la lectura)"""
+        try:
+            with self.conectar() as conn:
+                df = pd.read_sql_query(
+                    "SELECT url_id AS URL_ID, fecha AS Fecha, visitas AS Visitas, likes AS Likes "
+                    "FROM observaciones", conn
+                )
+            if df.empty:
+                return None
+            print(f"LEIDO: {len(df):,} observaciones del almacen local")
+            return df
+
+        except Exception as e:
+            print(f"ERROR LECTURA OBSERVACIONES LOCAL: {str(e)}")
+            return False
+
+    def guardar_observaciones(self, df_observaciones):
+        """INSERT OR REPLACE por (url_id, fecha): reejecutar un dia no duplica filas"""
+        try:
+            filas = df_observaciones[['URL_ID', 'Fecha', 'Visitas', 'Likes']].astype(
+                {'Visitas': 'int64', 'Likes': 'int64'}
+            ).itertuples(index=False, name=None)
+            with self.conectar() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO observaciones (url_id, fecha, visitas, likes) VALUES (?, ?, ?, ?)",
+                    ((url_id, fecha, int(visitas), int(likes)) for url_id, fecha, visitas, likes in filas)
+                )
+                self.registrar_publicaciones_por_fecha(conn, 'observaciones', df_observaciones['Fecha'])
+            print(f"GUARDADO LOCAL: {len(df_observaciones):,} observaciones")
+            return True
+
+        except Exception as e:
+            print(f"ERROR GUARDANDO OBSERVACIONES LOCAL: {str(e)}")
+            return False
+
+    def leer_cambios_precio(self):
+        """Registro de cambios de precio desde SQLite (None si aun no hay cambios)"""
+        try:
+            with self.conectar() as conn:
+                df = pd.read_sql_query(
+                    "SELECT url_id AS URL_ID, fecha AS Fecha, precio_anterior AS Precio_Anterior, "
+                    "precio_nuevo AS Precio_Nuevo FROM cambios_precio ORDER BY fecha", conn
+                )
+            if df.empty:
+                return None
+            print(f"LEIDO: {len(df):,} cambios de precio del almacen local")
+            return df
+
+        except Exception as e:
+            print(f"ERROR LECTURA CAMBIOS PRECIO LOCAL: {str(e)}")
+            return None
+
+    def guardar_cambios_precio(self, df_cambios):
+        """INSERT OR REPLACE por (url_id, fecha): reejecutar un dia no duplica cambios"""
+        try:
+            filas = df_cambios[COLUMNAS_CAMBIOS_PRECIO].itertuples(index=False, name=None)
+            with self.conectar() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cambios_precio (url_id, fecha, precio_anterior, precio_nuevo) "
+                    "VALUES (?, ?, ?, ?)",
+                    ((url_id, fecha, int(anterior), int(nuevo)) for url_id, fecha, anterior, nuevo in filas)
+                )
+                self.registrar_publicaciones_por_fecha(conn, 'cambios_precio', df_cambios['Fecha'])
+            print(f"GUARDADO LOCAL: {len(df_cambios):,} cambios de precio")
+            return True
+
+        except Exception as e:
+            print(f"ERROR GUARDANDO CAMBIOS PRECIO LOCAL: {str(e)}")
+            return False
+
+    def leer_vendidas_archivadas(self):
+        """Lee vendidas_archivo.parquet (None si aun no se ha compactado nada)"""
+        try:
+            if not os.path.exists(self.ruta_vendidas):
+                return None
+            return pd.read_parquet(self.ruta_vendidas)
+
+        except Exception as e:
+            print(f"ERROR LECTURA ARCHIVO VENDIDAS LOCAL: {str(e)}")
+            return None
+
+    def archivar_vendidas(self, df_archivo):
+        """
+        Anade las filas al Parquet del archivo frio (reescritura atomica) y deja pendiente
+        su publicacion a Sheets (un pendiente por Fecha_Archivado)
+        """
+        try:
+            fechas_archivado = sorted(set(df_archivo['Fecha_Archivado']), key=fecha_display_a_iso)
+            df_existente = self.leer_vendidas_archivadas()
+            if df_existente is not None:
+                # Filas archivadas antes del esquema tipado: mismos dtypes antes de unir
+                df_archivo = pd.concat([tipar_dataframe(df_existente), tipar_dataframe(df_archivo)], ignore_index=True)
+            self.escribir_parquet(df_archivo, self.ruta_vendidas)
+            with self.conectar() as conn:
+                for fecha in fechas_archivado:
+                    self.registrar_publicacion(conn, 'vendidas', fecha)
+
+            print(f"GUARDADO LOCAL: Archivo de vendidas con {len(df_archivo)} motos")
+            return True
+
+        except Exception as e:
+            print(f"ERROR GUARDANDO ARCHIVO VENDIDAS LOCAL: {str(e)}")
+            return False
+
+    def leer_observaciones_de_fechas(self, fechas_display):
+        """Observaciones de los dias pedidos (publicador); None si falla la lectura"""
+        try:
+            return self.leer_tabla_de_fechas(
+                "SELECT url_id AS URL_ID, fecha AS Fecha, visitas AS Visitas, likes AS Likes FROM observaciones",
+                fechas_display
+            )[COLUMNAS_OBSERVACIONES]
+
+        except Exception as e:
+            print(f"ERROR LECTURA OBSERVACIONES LOCAL: {str(e)}")
+            return None
+
+    def leer_cambios_precio_de_fechas(self, fechas_display):
+        """Cambios de precio de los dias pedidos (publicador); None si falla la lectura"""
+        try:
+            return self.leer_tabla_de_fechas(
+                "SELECT url_id AS URL_ID, fecha AS Fecha, precio_anterior AS Precio_Anterior, "
+                "precio_nuevo AS Precio_Nuevo FROM cambios_precio", fechas_display
+            )[COLUMNAS_CAMBIOS_PRECIO]
+
+        except Exception as e:
+            print(f"ERROR LECTURA CAMBIOS PRECIO LOCAL: {str(e)}")
+            return None
+
+    def leer_vendidas_archivadas_de_fechas(self, fechas_display):
+        """Filas del archivo frio con Fecha_Archivado en los dias pedidos (publicador); None si falla"""
+        try:
+            if not os.path.exists(self.ruta_vendidas):
+                return pd.DataFrame()
+            df_archivo = pd.read_parquet(self.ruta_vendidas)
+            return df_archivo[df_archivo['Fecha_Archivado'].isin(set(fechas_display))].reset_index(drop=True)
+
+        except Exception as e:
+            print(f"ERROR LECTURA ARCHIVO VENDIDAS LOCAL: {str(e)}")
+            return None
+
+    def guardar_metricas(self, df_metricas):
+        """Escribe metricas.parquet y deja pendiente su publicacion a Sheets"""
+        try:
+            fecha = df_metricas['Fecha_Metricas'].iloc[0] if len(df_metricas) else ''
+            self.escribir_parquet(df_metricas, self.ruta_metricas)
+            with self.conectar() as conn:
+                self.registrar_publicacion(conn, 'metricas', fecha)
+            print(f"GUARDADO LOCAL: Metricas de {len(df_metricas)} motos")
+            return True
+
+        except Exception as e:
+            print(f"ERROR GUARDANDO METRICAS LOCAL: {str(e)}")
+            return False
+
+    def leer_metricas(self):
+        """Lee metricas.parquet (None si aun no se han calculado)"""
+        if not os.path.exists(self.ruta_metricas):
+            return None
+        return pd.read_parquet(self.ruta_metricas)
+
+    def guardar_resumen(self, df_resumen, fecha_display):
+        """Escribe resumen_cuentas.parquet y deja pendiente su publicacion a Sheets"""
+        try:
+            self.escribir_parquet(df_resumen, self.ruta_resumen)
+            with self.conectar() as conn:
+                self.registrar_publicacion(conn, 'resumen', fecha_display)
+            print(f"GUARDADO LOCAL: Resumen de {len(df_resumen)} filas (cuenta x marca x estado x semana)")
+            return True
+
+        except Exception as e:
+            print(f"ERROR GUARDANDO RESUMEN LOCAL: {str(e)}")
+            return False
+
+    def leer_resumen(self):
+        """Lee resumen_cuentas.parquet (None si aun no se ha calculado)"""
+        if not os.path.exists(self.ruta_resumen):
+            return None
+        return pd.read_parquet(self.ruta_resumen)
+
+    def leer_marca_analisis(self):
+        """Marca guardada en la tabla meta ('' si no hay)"""
+        try:
+            with self.conectar() as conn:
+                fila = conn.execute("SELECT valor FROM meta WHERE clave = 'marca_analisis'").fetchone()
+            return fila[0] if fila else ''
+
+        except Exception as e:
+            print(f"ERROR LECTURA MARCA LOCAL: {str(e)}")
+            return ''
+
+    def guardar_marca_analisis(self, marca):
+        """INSERT OR REPLACE de la marca en la tabla meta"""
+        try:
+            with self.conectar() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (clave, valor) VALUES ('marca_analisis', ?)", (marca,)
+                )
+            return True
+
+        except Exception as e:
+            print(f"ERROR GUARDANDO MARCA LOCAL: {str(e)}")
+            return False
+
+    def publicaciones_pendientes(self):
+        """Lista de (id, tipo, fecha) pendientes de publicar, en orden de creacion"""
+        with self.conectar() as conn:
+            return conn.execute(
+                "SELECT id, tipo, fecha FROM publicaciones WHERE publicado_en IS NULL ORDER BY id"
+            ).fetchall()
+
+    def marcar_publicadas(self, ids):
+        """Marca publicaciones como completadas"""
+        if not ids:
+            return
+        ahora = datetime.now().isoformat(timespec='seconds')
+        with self.conectar() as conn:
+            conn.executemany(
+                "UPDATE publicaciones SET publicado_en = ? WHERE id = ?",
+                [(ahora, id_pub) for id_pub in ids]
+            )
+
+def crear_almacenamiento(tipo=None):
+    """
+    Crea el backend segun MOTICK_STORAGE ('sheets' por defecto o 'local')
+    Para 'sheets' usa GOOGLE_CREDENTIALS_JSON o el archivo local de credenciales
+    """
+    tipo = (tipo or TIPO_ALMACENAMIENTO).lower()
+
+    if tipo == 'local':
+        return AlmacenamientoLocalMotick()
+
+    if tipo != 'sheets':
+        raise ValueError(f"MOTICK_STORAGE desconocido: {tipo} (usar 'sheets' o 'local')")
+
+    from google_sheets_motick import crear_handler_google_sheets
+    return crear_handler_google_sheets()
@@ -12,20 +12,32 @@ CORRECCIONES VERSION 8.2:
 
 import sys
 import os
-import time
+import argparse
 import pandas as pd
-import re
-import hashlib
 from datetime import datetime, timedelta
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 # Importar modulos locales
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from config import GOOGLE_SHEET_ID_MOTICK
-from google_sheets_motick import GoogleSheetsMotick
+from config import (VENTANA_DIAS_HISTORICO, DIAS_COMPACTAR_VENDIDAS, USAR_ESTADO_ANALISIS, ESCRITURAS_PARALELAS,
+                    VERIFICAR_VENDIDAS)
+from almacenamiento_motick import crear_almacenamiento
+from series_motick import (observaciones_del_dia, unir_observaciones, wide_a_largo,
+                           completar_fecha_anterior, aplicar_ventana, ultima_fecha_procesada)
+from compactacion_motick import separar_vendidas_antiguas
+from estado_motick import EstadoAnalisisMotick
+from esquema_motick import tipar_dataframe, parsear_entero
+from ids_motick import asegurar_ids, crear_url_id
+from catalogo_motick import asegurar_etiquetas
+from metricas_motick import calcular_metricas, top_crecimiento
+from resumen_motick import calcular_resumen
+from precios_motick import detectar_cambios_precio, unir_cambios_precio
+from stream_motick import leer_stream_scraper
+from verificacion_motick import VerificadorVentasMotick, RETIRADA, ACTIVA
 
 class AnalizadorHistoricoMotick:
-    def __init__(self):
+    def __init__(self, almacenamiento=None, estado=None, verificador=None):
         self.tiempo_inicio = datetime.now()
         
         # Variables de fecha (se establecen despues)
@@ -40,6 +52,13 @@ class AnalizadorHistoricoMotick:
             'motos_nuevas': 0,
             'motos_actualizadas': 0,
             'motos_vendidas': 0,
+            'ventas_no_confirmadas': 0,
+            'observaciones_guardadas': 0,
+            'vendidas_archivadas': 0,
+            'motos_con_metricas': 0,
+            'filas_resumen': 0,
+            'cambios_precio': 0,
+            'bajadas_precio': 0,
             'errores': 0,
             'tiempo_ejecucion': 0
         }
@@ -48,70 +67,56 @@ class AnalizadorHistoricoMotick:
         self.motos_nuevas_lista = []
         self.motos_vendidas_lista = []
         self.top_likes_crecimiento = []
+        self.top_crecimiento = None
         
-        # Google Sheets handler
-        self.gs_handler = None
+        # Cambios de precio detectados en esta ejecucion (se guardan en guardar_resultados)
+        self.cambios_precio_pendientes = []
         
-    def inicializar_google_sheets(self):
-        """Inicializa la conexion a Google Sheets"""
+        # Snapshot SCR recibido en memoria (modo pipeline) que aun no esta guardado
+        self.snapshot_pendiente = None
+        
+        # Backend de almacenamiento (Google Sheets o local, ver almacenamiento_motick)
+        self.almacenamiento = almacenamiento
+        
+        # Dias de columnas por fecha publicadas en Data_Historico (None = todas)
+        self.ventana_dias = VENTANA_DIAS_HISTORICO
+        
+        # Vendidas hace mas de N dias pasan al archivo frio (0 = nunca)
+        self.dias_compactar_vendidas = DIAS_COMPACTAR_VENDIDAS
+        
+        # Estado local incremental (estado=False: leer siempre el historico completo)
+        if estado is None and USAR_ESTADO_ANALISIS:
+            estado = EstadoAnalisisMotick()
+        self.estado = estado or None
+        self.usando_estado = False
+        
+        # Verificacion HTTP de las posibles ventas (verificador=False: marcar todas como antes)
+        if verificador is None and VERIFICAR_VENDIDAS:
+            verificador = VerificadorVentasMotick()
+        self.verificador = verificador or None
+        
+        # Backfill: en los dias intermedios las posibles ventas no se verifican, se anota
+        # el primer dia que falto cada URL y se comprueban una vez en el ultimo dia
+        self.aplazar_ventas = False
+        self.primera_ausencia = {}
+        
+    def inicializar_almacenamiento(self):
+        """Inicializa el backend de almacenamiento (MOTICK_STORAGE: sheets | local)"""
         try:
-            credentials_json = os.getenv('GOOGLE_CREDENTIALS_JSON')
-            sheet_id = os.getenv('GOOGLE_SHEET_ID') or GOOGLE_SHEET_ID_MOTICK
-            
-            if not credentials_json:
-                # Para testing local
-                credentials_file = "../credentials/service-account.json"
-                if os.path.exists(credentials_file):
-                    self.gs_handler = GoogleSheetsMotick(
-                        credentials_file=credentials_file,
-                        sheet_id=sheet_id
-                    )
-                else:
-                    raise Exception("No se encontraron credenciales locales")
-            else:
-                # Para GitHub Actions
-                self.gs_handler = GoogleSheetsMotick(
-                    credentials_json_string=credentials_json,
-                    sheet_id=sheet_id
-                )
+            if self.almacenamiento is None:
+                self.almacenamiento = crear_almacenamiento()
             
             # Probar conexion
-            if not self.gs_handler.test_connection():
-                raise Exception("No se pudo conectar a Google Sheets")
+            if not self.almacenamiento.test_connection():
+                raise Exception("No se pudo conectar al almacenamiento")
             
-            print("CONEXION: Google Sheets inicializada correctamente")
+            print("CONEXION: Almacenamiento inicializado correctamente")
             return True
             
         except Exception as e:
             print(f"ERROR INICIALIZACION: {str(e)}")
             return False
     
-    def crear_id_unico_real(self, fila):
-        """
-        Crea ID unico basado SOLO en: URL + cuenta + titulo + km
-        CORRECCION CRITICA V8.2: NO INCLUYE PRECIO (puede cambiar)
-        """
-        try:
-            url = str(fila.get('URL', '')).strip()
-            cuenta = str(fila.get('Cuenta', '')).strip()
-            titulo = str(fila.get('Titulo', '')).strip()
-            km = str(fila.get('Kilometraje', '')).strip()
-            
-            # Normalizar titulo (quitar caracteres especiales)
-            titulo_limpio = re.sub(r'[^\w\s]', '', titulo.lower())[:30]
-            km_limpio = re.sub(r'[^\d]', '', km)
-            
-            # Crear clave unica SIN PRECIO
-            clave_unica = f"{url}_{cuenta}_{titulo_limpio}_{km_limpio}"
-            
-            # Hash para ID manejable
-            return hashlib.md5(clave_unica.encode()).hexdigest()[:12]
-            
-        except Exception as e:
-            # Fallback con URL + timestamp
-            url_safe = str(fila.get('URL', str(time.time())))
-            return hashlib.md5(f"{url_safe}_{time.time()}".encode()).hexdigest()[:12]
-    
     def extraer_fecha_de_datos(self, df_nuevo):
         """Extrae la fecha de los datos del scraper"""
         try:
@@ -133,6 +138,10 @@ class AnalizadorHistoricoMotick:
             fecha_actual = datetime.now()
             return fecha_actual, fecha_actual.strftime("%d/%m/%Y")
     
+    def fecha_dia(self):
+        """Fecha procesada como Timestamp (Primera_Deteccion / Fecha_Venta tipadas)"""
+        return pd.Timestamp(datetime.strptime(self.fecha_display, "%d/%m/%Y"))
+    
     def mostrar_header(self):
         """Muestra el header del sistema"""
         print("="*80)
@@ -140,7 +149,7 @@ class AnalizadorHistoricoMotick:
         print("="*80)
         print(f"Fecha procesamiento: {self.fecha_display}")
         print("Logica: URL como identificador unico principal (SIN PRECIO)")
-        print("Fuente: Google Sheets")
+        print(f"Fuente: {type(self.almacenamiento).__name__}")
         print("Hojas: Data_Historico (principal), SCR (datos diarios)")
         print()
         
@@ -214,11 +223,32 @@ class AnalizadorHistoricoMotick:
         
         return df
         
+    def preparar_datos_scraper(self, df_nuevo):
+        """
+        Valida estructura, crea ID_Unico_Real, etiqueta marca/modelo/cilindrada y aplica
+        el esquema tipado de un snapshot SCR
+        El ID_Unico_Real y las etiquetas calculados por el scraper se reutilizan
+        """
+        df_nuevo = self.validar_estructura_archivo(df_nuevo)
+        
+        # ID_Unico_Real (SIN PRECIO): solo se calcula para filas que no lo traen
+        df_nuevo['ID_Unico_Real'] = asegurar_ids(df_nuevo)
+        df_nuevo = asegurar_etiquetas(tipar_dataframe(df_nuevo))
+        
+        # Limpiar columnas numericas
+        df_nuevo['Visitas'] = pd.to_numeric(df_nuevo['Visitas'], errors='coerce').fillna(0).astype(int)
+        df_nuevo['Likes'] = pd.to_numeric(df_nuevo['Likes'], errors='coerce').fillna(0).astype(int)
+        
+        self.stats['total_archivo_nuevo'] += len(df_nuevo)
+        print(f"Motos en datos del scraper: {len(df_nuevo):,}")
+        
+        return df_nuevo
+    
     def leer_datos_scraper(self):
-        """CORREGIDO: Lee los datos mas recientes del scraper desde Google Sheets"""
+        """CORREGIDO: Lee los datos mas recientes del scraper desde el almacenamiento"""
         try:
             # ARREGLO CRITICO: Verificar que el método devuelve DataFrame, no tupla
-            result = self.gs_handler.leer_datos_scraper_reciente()
+            result = self.almacenamiento.leer_datos_scraper_reciente()
             
             # VALIDACION: Verificar que result es una tupla de (DataFrame, fecha_str)
             if isinstance(result, tuple) and len(result) == 2:
@@ -233,19 +263,9 @@ class AnalizadorHistoricoMotick:
                 raise Exception(f"df_nuevo no es DataFrame, es: {type(df_nuevo)}")
             
             if df_nuevo is None or df_nuevo.empty:
-                raise Exception("No se encontraron datos del scraper en Google Sheets")
-            
-            df_nuevo = self.validar_estructura_archivo(df_nuevo)
-            
-            # Crear ID_Unico_Real para cada moto (SIN PRECIO)
-            df_nuevo['ID_Unico_Real'] = df_nuevo.apply(self.crear_id_unico_real, axis=1)
+                raise Exception("No se encontraron datos del scraper en el almacenamiento")
             
-            # Limpiar columnas numericas
-            df_nuevo['Visitas'] = pd.to_numeric(df_nuevo['Visitas'], errors='coerce').fillna(0).astype(int)
-            df_nuevo['Likes'] = pd.to_numeric(df_nuevo['Likes'], errors='coerce').fillna(0).astype(int)
-            
-            self.stats['total_archivo_nuevo'] = len(df_nuevo)
-            print(f"Motos en datos del scraper: {self.stats['total_archivo_nuevo']:,}")
+            df_nuevo = self.preparar_datos_scraper(df_nuevo)
             
             # Extraer fecha
             self.fecha_actual, self.fecha_display = self.extraer_fecha_de_datos(df_nuevo)
@@ -259,6 +279,26 @@ class AnalizadorHistoricoMotick:
             traceback.print_exc()
             raise
             
+    def recibir_datos_scraper(self, df_scraper, fecha_extraccion=None, guardar_snapshot=True):
+        """
+        Modo pipeline/stream: prepara el DataFrame del scraper sin pasar por el almacenamiento
+        Con guardar_snapshot el snapshot queda pendiente y se guarda en guardar_resultados
+        (con --stream lo guarda el propio proceso del scraper)
+        """
+        if df_scraper.empty:
+            raise Exception("El scraper no devolvio anuncios")
+        
+        df_nuevo = self.preparar_datos_scraper(df_scraper.copy())
+        
+        # Misma fecha que si se leyera la SCR guardada (Fecha_Extraccion de los datos)
+        self.fecha_actual, self.fecha_display = self.extraer_fecha_de_datos(df_nuevo)
+        self.fecha_str = self.fecha_actual.strftime("%Y%m%d")
+        if guardar_snapshot:
+            self.snapshot_pendiente = (df_scraper.copy(), fecha_extraccion or self.fecha_display)
+        
+        print(f"LEIDO: {len(df_nuevo)} motos del scraper en memoria ({self.fecha_display})")
+        return df_nuevo
+            
     def obtener_columnas_fechas(self, df):
         """Obtiene las columnas de visitas y likes por fecha del historico"""
         columnas_visitas = [col for col in df.columns if col.startswith('Visitas_') and not col.endswith('_Totales')]
@@ -327,9 +367,9 @@ class AnalizadorHistoricoMotick:
         
         df_historico = df_nuevo.copy()
         
-        df_historico['Primera_Deteccion'] = self.fecha_display
+        df_historico['Primera_Deteccion'] = self.fecha_dia()
         df_historico['Estado'] = 'activa'
-        df_historico['Fecha_Venta'] = pd.NA
+        df_historico['Fecha_Venta'] = pd.NaT
         
         col_visitas_hoy = f"Visitas_{self.fecha_display}"
         col_likes_hoy = f"Likes_{self.fecha_display}"
@@ -346,7 +386,7 @@ class AnalizadorHistoricoMotick:
         
         # Ordenar columnas correctamente
         columnas_orden = [
-            'ID_Unico_Real', 'Cuenta', 'Titulo', 'Precio', 'Kilometraje',
+            'ID_Unico_Real', 'Cuenta', 'Titulo', 'Marca', 'Modelo', 'Cilindrada', 'Precio', 'Kilometraje',
             'Primera_Deteccion', 'Estado', 'Fecha_Venta', 'URL',
             'Visitas_Totales', 'Likes_Totales',
             col_visitas_hoy, col_likes_hoy, 'Variacion_Likes'
@@ -363,9 +403,9 @@ class AnalizadorHistoricoMotick:
         return df_historico
         
     def leer_historico_existente(self):
-        """Lee el historico existente desde Google Sheets"""
+        """Lee el historico existente desde el almacenamiento"""
         try:
-            df_historico = self.gs_handler.leer_datos_historico()
+            df_historico = self.almacenamiento.leer_datos_historico()
             
             if df_historico is None:
                 print("AVISO: No existe historico previo - sera creado en primera ejecucion")
@@ -380,8 +420,9 @@ class AnalizadorHistoricoMotick:
             self.stats['total_historico'] = len(df_historico)
             print(f"Motos en historico: {self.stats['total_historico']:,}")
             
-            # Limpiar columnas numericas
-            df_historico = self.limpiar_columnas_numericas(df_historico)
+            # Limpiar columnas numericas, aplicar el esquema tipado (precio, km, fechas)
+            # y etiquetar marca/modelo en historicos anteriores al catalogo
+            df_historico = asegurar_etiquetas(tipar_dataframe(self.limpiar_columnas_numericas(df_historico)))
             
             return df_historico
                 
@@ -389,6 +430,132 @@ class AnalizadorHistoricoMotick:
             print(f"ERROR leyendo historico: {str(e)}")
             raise
             
+    def leer_observaciones(self, df_historico):
+        """
+        Lee la serie larga (URL_ID, Fecha, Visitas, Likes) del almacenamiento
+        MIGRACION: si aun no hay serie larga, se generan desde las columnas por fecha
+        del historico antes de que la ventana las deje de publicar
+        Devuelve (df_observaciones, df_migradas) - df_migradas es None si no hubo migracion
+        Si la lectura falla (False) se aborta: migrar volveria a anadir toda la serie
+        """
+        df_observaciones = self.almacenamiento.leer_observaciones()
+        if df_observaciones is False:
+            raise Exception("No se pudieron leer las observaciones (ejecucion cancelada para no duplicar la serie)")
+        
+        if df_observaciones is None and df_historico is not None:
+            df_migradas = wide_a_largo(df_historico)
+            if not df_migradas.empty:
+                print(f"MIGRACION: {len(df_migradas):,} observaciones desde las columnas por fecha del historico")
+                return df_migradas, df_migradas
+        
+        return df_observaciones, None
+    
+    def leer_estado_o_historico(self):
+        """
+        Historico + observaciones desde el estado local si la marca del almacenamiento
+        coincide (sin descargar Data_Historico ni Observaciones); si no, lectura completa
+        Devuelve (df_historico, df_observaciones, df_migradas)
+        """
+        self.usando_estado = False
+        if self.estado is not None:
+            cargado = self.estado.cargar(self.almacenamiento.leer_marca_analisis())
+            if cargado is not None:
+                df_historico, df_observaciones = cargado
+                self.usando_estado = True
+                self.stats['total_historico'] = len(df_historico)
+                print(f"Motos en historico (estado local): {self.stats['total_historico']:,}")
+                df_historico = asegurar_etiquetas(tipar_dataframe(self.limpiar_columnas_numericas(df_historico)))
+                return df_historico, df_observaciones, None
+        
+        df_historico = self.leer_historico_existente()
+        df_observaciones, df_migradas = self.leer_observaciones(df_historico)
+        return df_historico, df_observaciones, df_migradas
+    
+    def confirmar_vendidas(self, candidatas):
+        """
+        Posibles ventas -> URLs que se marcan vendidas
+        Sin verificador se marcan todas (comportamiento anterior); con verificador solo
+        las confirmadas y el resto siguen activas (sin datos de hoy). Si no se pudo
+        comprobar ninguna (p.ej. sin red o limitado) siguen todas activas: se vuelven
+        a comprobar en la proxima ejecucion
+        """
+        if self.verificador is None or not candidatas:
+            return candidatas
+        
+        if self.aplazar_ventas:
+            for url in candidatas:
+                self.primera_ausencia.setdefault(url, self.fecha_dia())
+            print(f"VERIFICACION: {len(candidatas)} posibles ventas se comprueban en el ultimo dia del backfill")
+            return set()
+        
+        estados = self.verificador.verificar(sorted(candidatas))
+        confirmadas = {url for url, estado in estados.items() if estado == RETIRADA}
+        publicadas = sum(estado == ACTIVA for estado in estados.values())
+        sin_verificar = len(estados) - len(confirmadas) - publicadas
+        
+        if sin_verificar == len(estados):
+            print(f"AVISO: No se pudo verificar ninguna de las {len(estados)} posibles ventas (sin red o limitado), "
+                  f"siguen activas")
+        
+        print(f"VERIFICACION: {len(confirmadas)} ventas confirmadas, {publicadas} siguen publicadas, "
+              f"{sin_verificar} sin verificar (siguen activas)")
+        self.stats['ventas_no_confirmadas'] += len(estados) - len(confirmadas)
+        return confirmadas
+    
+    def construir_filas_nuevas(self, df_nuevas_por_url, col_visitas_hoy, col_likes_hoy):
+        """
+        Filas del historico para las motos nuevas (indice = URL), construidas columna a columna
+        Las columnas de fechas anteriores no se incluyen: el concat las deja vacias
+        """
+        def texto_o_defecto(col):
+            serie = df_nuevas_por_url[col]
+            return np.where(serie.notna(), serie.astype(str), 'No especificado')
+        
+        def entero(col):
+            return parsear_entero(df_nuevas_por_url[col]).array
+        
+        visitas = pd.to_numeric(df_nuevas_por_url['Visitas'], errors='coerce').fillna(0).astype(int).to_numpy()
+        likes = pd.to_numeric(df_nuevas_por_url['Likes'], errors='coerce').fillna(0).astype(int).to_numpy()
+        
+        return pd.DataFrame({
+            'ID_Unico_Real': df_nuevas_por_url['ID_Unico_Real'].to_numpy(),
+            'Cuenta': texto_o_defecto('Cuenta'),
+            'Titulo': texto_o_defecto('Titulo'),
+            'Marca': df_nuevas_por_url['Marca'].to_numpy(),
+            'Modelo': df_nuevas_por_url['Modelo'].to_numpy(),
+            'Cilindrada': entero('Cilindrada'),
+            'Precio': entero('Precio'),
+            'Kilometraje': entero('Kilometraje'),
+            'Primera_Deteccion': self.fecha_dia(),
+            'Estado': 'activa',
+            'URL': df_nuevas_por_url.index.astype(str),
+            'Variacion_Likes': 0,
+            'Visitas_Totales': visitas,
+            'Likes_Totales': likes,
+            col_visitas_hoy: visitas,
+            col_likes_hoy: likes,
+        })
+    
+    def unir_filas_nuevas(self, df_actualizado, df_nuevas):
+        """
+        Un unico concat del historico con las filas nuevas: esquema del historico y detras
+        las columnas que solo traen las nuevas (mismo orden que antes); las columnas de
+        fechas anteriores quedan vacias en las nuevas
+        """
+        columnas = list(df_actualizado.columns) + [col for col in df_nuevas.columns if col not in df_actualizado.columns]
+        return pd.concat([df_actualizado, df_nuevas], ignore_index=True)[columnas]
+    
+    def likes_de_fecha(self, urls, historico_por_url, fecha_display):
+        """
+        Likes de cada fila en fecha_display: de la fila de la matriz del estado local si
+        la tiene (0 = sin dato, como las columnas reconstruidas); si no, de su columna
+        """
+        fecha_iso = datetime.strptime(fecha_display, "%d/%m/%Y").strftime("%Y-%m-%d")
+        if self.usando_estado and fecha_iso in self.estado.matriz.fechas:
+            likes = self.estado.matriz.bloque('likes', [fecha_iso], crear_url_id(urls).to_numpy())[:, 0]
+            return pd.Series(likes.astype('int64'), index=urls.index)
+        return pd.to_numeric(urls.map(historico_por_url[f"Likes_{fecha_display}"]), errors='coerce')
+    
     def procesar_motos_nuevas_y_existentes(self, df_nuevo, df_historico):
         """
         LOGICA CORREGIDA V8.2: USA URLs como identificador principal
@@ -436,143 +603,108 @@ class AnalizadorHistoricoMotick:
             df_actualizado[col_visitas_hoy] = pd.NA
             df_actualizado[col_likes_hoy] = pd.NA
             
-            # PROCESAR MOTOS EXISTENTES (USAR URL)
-            for url_moto in motos_existentes_urls:
-                try:
-                    fila_nueva = df_nuevo[df_nuevo['URL'] == url_moto].iloc[0]
-                    visitas_nuevas = int(fila_nueva['Visitas']) if pd.notna(fila_nueva['Visitas']) else 0
-                    likes_nuevos = int(fila_nueva['Likes']) if pd.notna(fila_nueva['Likes']) else 0
-                    
-                    mask = df_actualizado['URL'] == url_moto
-                    df_actualizado.loc[mask, col_visitas_hoy] = visitas_nuevas
-                    df_actualizado.loc[mask, col_likes_hoy] = likes_nuevos
-                    df_actualizado.loc[mask, 'Estado'] = 'activa'
-                    
-                    # Actualizar totales
-                    if 'Visitas_Totales' in df_actualizado.columns:
-                        df_actualizado.loc[mask, 'Visitas_Totales'] = visitas_nuevas
-                    if 'Likes_Totales' in df_actualizado.columns:
-                        df_actualizado.loc[mask, 'Likes_Totales'] = likes_nuevos
-                    
-                    self.stats['motos_actualizadas'] += 1
-                    
-                    # Calcular variacion de likes respecto a fecha anterior
-                    if fecha_anterior:
-                        col_likes_anterior = f"Likes_{fecha_anterior}"
-                        if col_likes_anterior in df_actualizado.columns:
-                            try:
-                                likes_anteriores = df_actualizado.loc[mask, col_likes_anterior].iloc[0]
-                                if pd.notna(likes_anteriores):
-                                    likes_anteriores = int(likes_anteriores)
-                                    variacion_likes = likes_nuevos - likes_anteriores
-                                    df_actualizado.loc[mask, 'Variacion_Likes'] = variacion_likes
-                                    
-                                    if variacion_likes > 3:
-                                        self.top_likes_crecimiento.append({
-                                            'Titulo': fila_nueva['Titulo'],
-                                            'Cuenta': fila_nueva['Cuenta'],
-                                            'Variacion': variacion_likes,
-                                            'Likes_Anteriores': likes_anteriores,
-                                            'Likes_Nuevos': likes_nuevos
-                                        })
-                            except:
-                                df_actualizado.loc[mask, 'Variacion_Likes'] = 0
-                        
-                except Exception as e:
-                    self.stats['errores'] += 1
-                    print(f"Error procesando moto existente: {str(e)}")
-                    continue
-            
-            # PROCESAR MOTOS VENDIDAS (USAR URL)
-            for url_moto in motos_vendidas_urls:
-                try:
-                    mask = df_actualizado['URL'] == url_moto
-                    if mask.any():
-                        estado_actual = df_actualizado.loc[mask, 'Estado'].iloc[0]
-                        
-                        if estado_actual == 'activa':
-                            df_actualizado.loc[mask, 'Estado'] = 'vendida'
-                            df_actualizado.loc[mask, 'Fecha_Venta'] = self.fecha_display
-                            
-                            fila_vendida = df_actualizado.loc[mask].iloc[0]
-                            
-                            # Obtener visitas y likes de la fecha anterior para el reporte
-                            visitas_anteriores = 0
-                            likes_anteriores = 0
-                            if fecha_anterior:
-                                col_visitas_anterior = f"Visitas_{fecha_anterior}"
-                                col_likes_anterior = f"Likes_{fecha_anterior}"
-                                if col_visitas_anterior in df_actualizado.columns:
-                                    visitas_anteriores = df_actualizado.loc[mask, col_visitas_anterior].iloc[0]
-                                    if pd.isna(visitas_anteriores):
-                                        visitas_anteriores = 0
-                                if col_likes_anterior in df_actualizado.columns:
-                                    likes_anteriores = df_actualizado.loc[mask, col_likes_anterior].iloc[0]
-                                    if pd.isna(likes_anteriores):
-                                        likes_anteriores = 0
-                            
-                            self.motos_vendidas_lista.append({
-                                'Titulo': fila_vendida['Titulo'],
-                                'Cuenta': fila_vendida['Cuenta'],
-                                'Precio': fila_vendida['Precio'],
-                                'Visitas': int(visitas_anteriores),
-                                'Likes': int(likes_anteriores)
-                            })
-                            
-                            self.stats['motos_vendidas'] += 1
-                        
-                except Exception as e:
-                    print(f"Error procesando moto vendida: {str(e)}")
-                    continue
-            
-            # PROCESAR MOTOS NUEVAS (USAR URL)
-            for url_nueva in motos_nuevas_urls:
-                try:
-                    fila_nueva = df_nuevo[df_nuevo['URL'] == url_nueva].iloc[0]
-                    
-                    nueva_fila = {
-                        'ID_Unico_Real': fila_nueva['ID_Unico_Real'],
-                        'Cuenta': str(fila_nueva['Cuenta']) if pd.notna(fila_nueva['Cuenta']) else 'No especificado',
-                        'Titulo': str(fila_nueva['Titulo']) if pd.notna(fila_nueva['Titulo']) else 'No especificado',
-                        'Precio': str(fila_nueva['Precio']) if pd.notna(fila_nueva['Precio']) else 'No especificado',
-                        'Kilometraje': str(fila_nueva['Kilometraje']) if pd.notna(fila_nueva['Kilometraje']) else 'No especificado',
-                        'Primera_Deteccion': self.fecha_display,
-                        'Estado': 'activa',
-                        'Fecha_Venta': pd.NA,
-                        'URL': str(fila_nueva['URL']),
-                        'Variacion_Likes': 0
-                    }
-                    
-                    # Valores iniciales para totales
-                    visitas_iniciales = int(fila_nueva['Visitas']) if pd.notna(fila_nueva['Visitas']) else 0
-                    likes_iniciales = int(fila_nueva['Likes']) if pd.notna(fila_nueva['Likes']) else 0
-                    
-                    nueva_fila['Visitas_Totales'] = visitas_iniciales
-                    nueva_fila['Likes_Totales'] = likes_iniciales
-                    
-                    # Inicializar todas las columnas de fechas anteriores con NA
-                    for col_visitas in columnas_visitas:
-                        nueva_fila[col_visitas] = pd.NA
-                    for col_likes in columnas_likes:
-                        nueva_fila[col_likes] = pd.NA
-                    
-                    # Anadir datos para la fecha actual
-                    nueva_fila[col_visitas_hoy] = visitas_iniciales
-                    nueva_fila[col_likes_hoy] = likes_iniciales
-                    
-                    df_actualizado = pd.concat([df_actualizado, pd.DataFrame([nueva_fila])], ignore_index=True)
-                    
-                    self.stats['motos_nuevas'] += 1
-                    self.motos_nuevas_lista.append({
-                        'Titulo': nueva_fila['Titulo'],
-                        'Cuenta': nueva_fila['Cuenta'],
-                        'Precio': nueva_fila['Precio']
-                    })
-                    
-                except Exception as e:
-                    self.stats['errores'] += 1
-                    print(f"Error procesando moto nueva: {str(e)}")
-                    continue
+            # Indices por URL: primera fila del scraper y primera fila del historico
+            # (las mismas filas que antes devolvia .iloc[0] sobre cada mascara)
+            nuevo_por_url = df_nuevo.drop_duplicates('URL').set_index('URL')
+            historico_por_url = df_actualizado.drop_duplicates('URL').set_index('URL')
+            urls = df_actualizado['URL']
+            primera_de_url = ~urls.duplicated()
+            
+            # PROCESAR MOTOS EXISTENTES (join por URL + asignacion por columnas)
+            mask_existentes = urls.isin(motos_existentes_urls)
+            visitas_hoy = pd.to_numeric(urls.map(nuevo_por_url['Visitas']), errors='coerce').fillna(0).astype(int)
+            likes_hoy = pd.to_numeric(urls.map(nuevo_por_url['Likes']), errors='coerce').fillna(0).astype(int)
+            
+            df_actualizado.loc[mask_existentes, col_visitas_hoy] = visitas_hoy[mask_existentes]
+            df_actualizado.loc[mask_existentes, col_likes_hoy] = likes_hoy[mask_existentes]
+            df_actualizado.loc[mask_existentes, 'Estado'] = 'activa'
+            
+            # Actualizar totales
+            if 'Visitas_Totales' in df_actualizado.columns:
+                df_actualizado.loc[mask_existentes, 'Visitas_Totales'] = visitas_hoy[mask_existentes]
+            if 'Likes_Totales' in df_actualizado.columns:
+                df_actualizado.loc[mask_existentes, 'Likes_Totales'] = likes_hoy[mask_existentes]
+            
+            self.stats['motos_actualizadas'] += len(motos_existentes_urls)
+            
+            # Precio actual = el de hoy; el anterior queda en el registro de cambios
+            precio_hoy = urls.map(nuevo_por_url['Precio']).astype('Int64')
+            mask_precio, df_cambios = detectar_cambios_precio(
+                urls, df_actualizado['Precio'].where(mask_existentes), precio_hoy, self.fecha_display
+            )
+            df_actualizado.loc[mask_precio, 'Precio'] = precio_hoy[mask_precio]
+            self.cambios_precio_pendientes.append(df_cambios)
+            self.stats['cambios_precio'] += len(df_cambios)
+            self.stats['bajadas_precio'] += int((df_cambios['Precio_Nuevo'] < df_cambios['Precio_Anterior']).sum())
+            
+            # Calcular variacion de likes respecto a fecha anterior
+            if fecha_anterior and f"Likes_{fecha_anterior}" in df_actualizado.columns:
+                likes_anteriores = self.likes_de_fecha(urls, historico_por_url, fecha_anterior)
+                mask_variacion = mask_existentes & likes_anteriores.notna()
+                variacion_likes = likes_hoy - likes_anteriores
+                df_actualizado.loc[mask_variacion, 'Variacion_Likes'] = variacion_likes[mask_variacion].astype(int)
+                
+                # Destacados: una entrada por URL, mayor crecimiento primero
+                mask_destacadas = mask_variacion & primera_de_url & (variacion_likes > 3)
+                destacadas = pd.DataFrame({
+                    'Titulo': urls[mask_destacadas].map(nuevo_por_url['Titulo']),
+                    'Cuenta': urls[mask_destacadas].map(nuevo_por_url['Cuenta']),
+                    'Variacion': variacion_likes[mask_destacadas].astype(int),
+                    'Likes_Anteriores': likes_anteriores[mask_destacadas].astype(int),
+                    'Likes_Nuevos': likes_hoy[mask_destacadas]
+                }).sort_values('Variacion', ascending=False, kind='stable')
+                self.top_likes_crecimiento.extend(destacadas.to_dict('records'))
+            
+            # PROCESAR MOTOS VENDIDAS (el estado de la primera fila de la URL decide)
+            # Solo las activas que faltan hoy son candidatas, y solo las confirmadas se marcan
+            estado_primera_fila = urls.map(historico_por_url['Estado'])
+            mask_candidatas = urls.isin(motos_vendidas_urls) & (estado_primera_fila == 'activa')
+            # Cuentas sin ningun anuncio hoy (ttl del registro de cuentas, perfil caido):
+            # no hay con que comparar, sus motos siguen activas
+            sin_scrape = mask_candidatas & ~df_actualizado['Cuenta'].isin(set(df_nuevo['Cuenta']))
+            if sin_scrape.any():
+                cuentas_sin_scrape = sorted(df_actualizado.loc[sin_scrape, 'Cuenta'].astype(str).unique())
+                print(f"AVISO: {int((sin_scrape & primera_de_url).sum())} motos de cuentas sin anuncios hoy "
+                      f"({', '.join(cuentas_sin_scrape)}) no se marcan vendidas")
+                mask_candidatas &= ~sin_scrape
+            confirmadas = self.confirmar_vendidas(set(urls[mask_candidatas]))
+            mask_vendidas = mask_candidatas & urls.isin(confirmadas)
+            
+            df_actualizado.loc[mask_vendidas, 'Estado'] = 'vendida'
+            # Fecha de venta: el primer dia que falto (backfill con verificacion aplazada)
+            df_actualizado.loc[mask_vendidas, 'Fecha_Venta'] = (
+                urls[mask_vendidas].map(self.primera_ausencia).fillna(self.fecha_dia())
+                if self.primera_ausencia else self.fecha_dia()
+            )
+            
+            # Reporte con visitas y likes de la fecha anterior (0 si no hay dato)
+            filas_vendidas = df_actualizado[mask_vendidas & primera_de_url]
+            visitas_anteriores = pd.Series(0, index=filas_vendidas.index)
+            likes_anteriores_venta = pd.Series(0, index=filas_vendidas.index)
+            if fecha_anterior:
+                if f"Visitas_{fecha_anterior}" in filas_vendidas.columns:
+                    visitas_anteriores = pd.to_numeric(filas_vendidas[f"Visitas_{fecha_anterior}"], errors='coerce').fillna(0)
+                if f"Likes_{fecha_anterior}" in filas_vendidas.columns:
+                    likes_anteriores_venta = pd.to_numeric(filas_vendidas[f"Likes_{fecha_anterior}"], errors='coerce').fillna(0)
+            
+            self.motos_vendidas_lista.extend(pd.DataFrame({
+                'Titulo': filas_vendidas['Titulo'],
+                'Cuenta': filas_vendidas['Cuenta'],
+                'Precio': filas_vendidas['Precio'],
+                'Visitas': visitas_anteriores.astype(int),
+                'Likes': likes_anteriores_venta.astype(int)
+            }).to_dict('records'))
+            self.stats['motos_vendidas'] += len(filas_vendidas)
+            
+            # PROCESAR MOTOS NUEVAS (USAR URL): un bloque y un unico concat
+            df_nuevas = self.construir_filas_nuevas(
+                nuevo_por_url[nuevo_por_url.index.isin(motos_nuevas_urls)], col_visitas_hoy, col_likes_hoy
+            )
+            if not df_nuevas.empty:
+                df_actualizado = self.unir_filas_nuevas(df_actualizado, df_nuevas)
+                
+                self.stats['motos_nuevas'] += len(df_nuevas)
+                self.motos_nuevas_lista.extend(df_nuevas[['Titulo', 'Cuenta', 'Precio']].to_dict('records'))
             
             # LIMPIEZA FINAL
             print("Limpieza final de datos...")
@@ -617,15 +749,31 @@ class AnalizadorHistoricoMotick:
         print(f"Motos nuevas detectadas: {self.stats['motos_nuevas']:,}")
         print(f"Motos actualizadas: {self.stats['motos_actualizadas']:,}")
         print(f"Motos vendidas: {self.stats['motos_vendidas']:,}")
+        if self.stats['ventas_no_confirmadas']:
+            print(f"Posibles ventas no confirmadas (siguen activas): {self.stats['ventas_no_confirmadas']:,}")
         print(f"Errores procesamiento: {self.stats['errores']:,}")
         print(f"Tiempo ejecucion: {tiempo_total:.2f} segundos")
         print(f"Nuevas columnas: Visitas_{self.fecha_display}, Likes_{self.fecha_display}")
+        print(f"Observaciones guardadas (formato largo): {self.stats['observaciones_guardadas']:,}")
+        if self.ventana_dias:
+            print(f"Ventana publicada: ultimos {self.ventana_dias} dias")
+        if self.stats['vendidas_archivadas']:
+            print(f"Vendidas movidas al archivo frio: {self.stats['vendidas_archivadas']:,}")
+        if self.stats['cambios_precio']:
+            print(f"Cambios de precio: {self.stats['cambios_precio']:,} ({self.stats['bajadas_precio']:,} bajadas)")
+        if self.stats['filas_resumen']:
+            print(f"Resumen cuenta x marca x estado x semana: {self.stats['filas_resumen']:,} filas")
         
         if self.top_likes_crecimiento:
             print(f"\nDESTACADOS DEL DIA:")
             top_likes = self.top_likes_crecimiento[0]
             print(f"Mayor crecimiento likes: +{top_likes['Variacion']} | {top_likes['Titulo'][:40]}")
         
+        if self.top_crecimiento is not None and not self.top_crecimiento.empty:
+            print(f"\nTOP CRECIMIENTO 7 DIAS ({self.stats['motos_con_metricas']:,} motos con metricas):")
+            for _, moto in self.top_crecimiento.iterrows():
+                print(f"  {moto['Rank_Crecimiento']}. +{moto['Likes_Delta_7d']} likes | {str(moto['Titulo'])[:40]}")
+        
         if self.stats['errores'] > 0:
             print(f"\nADVERTENCIAS:")
             print(f"Se produjeron {self.stats['errores']} errores durante el procesamiento")
@@ -635,40 +783,236 @@ class AnalizadorHistoricoMotick:
         print("LOGICA CORREGIDA V8.2: URL como identificador unico (SIN PRECIO)")
         print("Hojas: Data_Historico (principal)")
         
-    def ejecutar(self):
-        """Funcion principal que ejecuta todo el proceso - CORREGIDA"""
+    def escribir_en_paralelo(self, escrituras):
+        """
+        Lanza a la vez escrituras independientes {nombre: funcion sin argumentos -> bool}
+        (hasta ESCRITURAS_PARALELAS). Devuelve {nombre: exito}; una excepcion cuenta como fallo
+        """
+        if not escrituras:
+            return {}
+        
+        def escribir(nombre):
+            try:
+                return bool(escrituras[nombre]())
+            except Exception as e:
+                print(f"ERROR: Escritura '{nombre}' fallida: {str(e)}")
+                return False
+        
+        with ThreadPoolExecutor(max_workers=min(ESCRITURAS_PARALELAS, len(escrituras))) as pool:
+            return dict(zip(escrituras, pool.map(escribir, escrituras)))
+    
+    def guardar_resultados(self, df_historico_final, df_observaciones_pendientes, df_observaciones=None):
+        """
+        Escritura final (una sola vez por ejecucion, tambien en backfill), por fases:
+        1. En paralelo: snapshot SCR pendiente (modo pipeline), archivo de vendidas,
+           observaciones y cambios de precio
+        2. Historico con ventana -> estado local
+        3. En paralelo: metricas y resumen
+        Cada fase solo empieza si la anterior se guardo: el historico solo quita datos
+        cuando ya estan guardados en otro sitio
+        df_observaciones: serie ya conocida (para el estado local)
+        """
+        # La marca se invalida antes de escribir: si algo falla a medias, la proxima
+        # ejecucion no confia en el estado local y lee el historico completo
+        if self.estado is not None:
+            self.almacenamiento.guardar_marca_analisis('')
+        
+        # Compactacion: vendidas antiguas al archivo frio ANTES de quitarlas del historico
+        df_historico_final, df_vendidas_frias = separar_vendidas_antiguas(
+            df_historico_final, self.dias_compactar_vendidas, self.fecha_display
+        )
+        # Cambios de precio ANTES del historico: el historico ya solo guarda el precio actual
+        df_cambios_precio = unir_cambios_precio(self.cambios_precio_pendientes)
+        
+        # Fase 1: observaciones ANTES del historico, la ventana quita columnas por fecha
+        # y solo es seguro cuando ya estan en la serie larga
+        escrituras = {}
+        if self.snapshot_pendiente is not None:
+            df_scr, fecha_scr = self.snapshot_pendiente
+            escrituras['snapshot SCR'] = lambda: self.almacenamiento.subir_datos_scraper(df_scr, fecha_scr)[0]
+        if df_vendidas_frias is not None:
+            escrituras['archivo de vendidas'] = lambda: self.almacenamiento.archivar_vendidas(df_vendidas_frias)
+        escrituras['observaciones diarias'] = lambda: self.almacenamiento.guardar_observaciones(df_observaciones_pendientes)
+        if not df_cambios_precio.empty:
+            escrituras['cambios de precio'] = lambda: self.almacenamiento.guardar_cambios_precio(df_cambios_precio)
+        
+        fallidas = [nombre for nombre, exito in self.escribir_en_paralelo(escrituras).items() if not exito]
+        if fallidas:
+            print(f"ERROR: No se pudieron guardar: {', '.join(fallidas)}")
+            return False
+        
+        self.snapshot_pendiente = None
+        if df_vendidas_frias is not None:
+            self.stats['vendidas_archivadas'] = len(df_vendidas_frias)
+        self.stats['observaciones_guardadas'] = len(df_observaciones_pendientes)
+        self.stats['total_historico'] = len(df_historico_final)
+        
+        # Fase 2: historico actualizado (columnas por fecha solo de la ventana)
+        print("\nGuardando historico actualizado...")
+        df_historico_final = aplicar_ventana(df_historico_final, self.ventana_dias, self.fecha_display)
+        if not self.almacenamiento.guardar_historico_con_hojas_originales(df_historico_final, self.fecha_display):
+            print("ERROR: No se pudo guardar el historico")
+            return False
+        
+        # Con el estado guardado la matriz ya tiene la serie completa hasta hoy
+        matriz = None
+        if self.estado is not None:
+            marca = self.estado.nueva_marca(self.fecha_display)
+            df_observaciones = unir_observaciones([df_observaciones, df_observaciones_pendientes])
+            if self.estado.guardar(df_historico_final, df_observaciones, self.fecha_display, marca):
+                self.almacenamiento.guardar_marca_analisis(marca)
+                matriz = self.estado.matriz
+        
+        # Fase 3: metricas y resumen, derivados del historico y la serie ya guardados,
+        # un fallo no invalida la ejecucion
+        df_metricas = self.calcular_metricas_dia(df_historico_final, df_observaciones, df_observaciones_pendientes,
+                                                 matriz)
+        df_resumen = self.calcular_resumen_dia(df_historico_final, df_metricas)
+        
+        escrituras = {}
+        if df_metricas is not None:
+            escrituras['metricas'] = lambda: self.almacenamiento.guardar_metricas(df_metricas)
+        if df_resumen is not None:
+            escrituras['resumen por cuenta'] = lambda: self.almacenamiento.guardar_resumen(df_resumen, self.fecha_display)
+        for nombre, exito in self.escribir_en_paralelo(escrituras).items():
+            if not exito:
+                print(f"AVISO: No se pudo guardar {nombre} (el historico si se guardo)")
+        
+        return True
+    
+    def calcular_metricas_dia(self, df_historico_final, df_observaciones, df_observaciones_pendientes, matriz=None):
+        """
+        Calcula las metricas de engagement (deltas 1/7/30 dias, velocidad, dias en
+        mercado, ranking) en una pasada para la hoja/tabla Metricas
+        Con la matriz del estado local los valores de los dias anteriores se leen de sus
+        filas; de la serie larga solo hacen falta las observaciones de hoy
+        Devuelve las metricas calculadas (None si no se pudieron calcular)
+        """
         try:
-            # 1. Inicializar Google Sheets
-            if not self.inicializar_google_sheets():
+            if matriz is None:
+                df_serie = unir_observaciones([df_observaciones, df_observaciones_pendientes])
+            else:
+                df_serie = df_observaciones_pendientes
+            df_cambios_precio = self.almacenamiento.leer_cambios_precio()
+            df_metricas = calcular_metricas(df_historico_final, df_serie, self.fecha_display,
+                                            df_cambios_precio=unir_cambios_precio([df_cambios_precio]),
+                                            matriz=matriz)
+            
+            self.stats['motos_con_metricas'] = int(df_metricas['Likes_Hoy'].notna().sum())
+            self.top_crecimiento = top_crecimiento(df_metricas)
+            return df_metricas
+            
+        except Exception as e:
+            print(f"AVISO: Error calculando metricas: {str(e)}")
+            return None
+    
+    def calcular_resumen_dia(self, df_historico_final, df_metricas=None):
+        """Cubo cuenta x marca x estado x semana (hoja/tabla Resumen_Cuentas) en un solo groupby"""
+        try:
+            df_resumen = calcular_resumen(df_historico_final, df_metricas)
+            self.stats['filas_resumen'] = len(df_resumen)
+            return df_resumen
+            
+        except Exception as e:
+            print(f"AVISO: Error calculando el resumen por cuenta: {str(e)}")
+            return None
+    
+    def ejecutar_backfill(self):
+        """
+        BACKFILL: aplica en orden de fecha todas las SCR posteriores a la ultima fecha
+        procesada (dias que el analizador no llego a ejecutar) y guarda una sola vez al final
+        Las posibles ventas se verifican una sola vez, contra el ultimo dia
+        """
+        try:
+            if not self.inicializar_almacenamiento():
+                return False
+            
+            df_historico, df_observaciones, df_migradas = self.leer_estado_o_historico()
+            
+            fecha_ultima = ultima_fecha_procesada(df_historico, df_observaciones)
+            print(f"BACKFILL: Ultima fecha procesada: {fecha_ultima or 'ninguna'}")
+            
+            snapshots = self.almacenamiento.leer_snapshots_posteriores(fecha_ultima)
+            if snapshots is None:
+                print("ERROR: No se pudieron leer los snapshots SCR pendientes")
+                return False
+            if not snapshots:
+                print("BACKFILL: No hay snapshots SCR pendientes")
+                return True
+            print(f"BACKFILL: {len(snapshots)} snapshots pendientes: {', '.join(fecha for fecha, _ in snapshots)}")
+            
+            observaciones_pendientes = [df_migradas]
+            for numero, (fecha_display, df_snapshot) in enumerate(snapshots, 1):
+                self.aplazar_ventas = numero < len(snapshots)
+                self.fecha_actual = datetime.strptime(fecha_display, "%d/%m/%Y")
+                self.fecha_display = fecha_display
+                self.fecha_str = self.fecha_actual.strftime("%Y%m%d")
+                print(f"\nBACKFILL: Procesando {fecha_display}")
+                
+                df_nuevo = self.preparar_datos_scraper(df_snapshot)
+                if df_historico is None:
+                    df_historico = self.primera_ejecucion(df_nuevo)
+                else:
+                    df_historico = completar_fecha_anterior(df_historico, df_observaciones, fecha_display)
+                    df_historico = self.procesar_motos_nuevas_y_existentes(df_nuevo, df_historico)
+                # Las que vuelven a aparecer ya no son posibles ventas
+                for url in df_nuevo['URL']:
+                    self.primera_ausencia.pop(url, None)
+                observaciones_pendientes.append(observaciones_del_dia(df_nuevo, fecha_display))
+            
+            if not self.guardar_resultados(df_historico, unir_observaciones(observaciones_pendientes),
+                                           df_observaciones):
+                return False
+            
+            self.mostrar_resumen_final()
+            print(f"BACKFILL: {len(snapshots)} dias aplicados con una sola escritura")
+            return True
+            
+        except Exception as e:
+            print(f"\nERROR CRITICO EN BACKFILL: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            self.stats['errores'] = 1
+            return False
+    
+    def ejecutar(self, df_scraper=None, fecha_extraccion=None, guardar_snapshot=True):
+        """
+        Funcion principal que ejecuta todo el proceso - CORREGIDA
+        df_scraper (modo pipeline/stream): DataFrame recien scrapeado; se usa directamente en
+        lugar de leer la SCR y (con guardar_snapshot) se guarda como SCR junto al resto de
+        escrituras finales
+        """
+        try:
+            # 1. Inicializar almacenamiento (Google Sheets o local)
+            if not self.inicializar_almacenamiento():
                 return False
             
-            # 2. Leer datos del scraper mas reciente - ARREGLO CRITICO
-            df_nuevo = self.leer_datos_scraper()
+            # 2. Datos del scraper: en memoria (pipeline) o la SCR mas reciente - ARREGLO CRITICO
+            if df_scraper is not None:
+                df_nuevo = self.recibir_datos_scraper(df_scraper, fecha_extraccion, guardar_snapshot)
+            else:
+                df_nuevo = self.leer_datos_scraper()
             
             # 3. Mostrar header con fecha correcta
             self.mostrar_header()
             
-            # 4. Procesar segun si es primera vez o no
-            df_historico_existente = self.leer_historico_existente()
+            # 4. Procesar segun si es primera vez o no (estado local si es valido)
+            df_historico_existente, df_observaciones, df_migradas = self.leer_estado_o_historico()
             
             if df_historico_existente is None:
                 # Primera ejecucion
                 df_historico_final = self.primera_ejecucion(df_nuevo)
             else:
+                # La fecha anterior puede haber salido de la ventana publicada
+                df_historico_existente = completar_fecha_anterior(
+                    df_historico_existente, df_observaciones, self.fecha_display
+                )
                 # Actualizar historico existente - ARREGLO CRITICO
                 df_historico_final = self.procesar_motos_nuevas_y_existentes(df_nuevo, df_historico_existente)
-                
-            self.stats['total_historico'] = len(df_historico_final)
             
-            # 5. Guardar historico actualizado en Google Sheets
-            print("\nGuardando historico actualizado en Google Sheets...")
-            success = self.gs_handler.guardar_historico_con_hojas_originales(
-                df_historico_final, 
-                self.fecha_display
-            )
-            
-            if not success:
-                print("ERROR: No se pudo guardar el historico en Google Sheets")
+            # 5. Guardar archivo de vendidas, observaciones e historico
+            df_observaciones_hoy = unir_observaciones([df_migradas, observaciones_del_dia(df_nuevo, self.fecha_display)])
+            if not self.guardar_resultados(df_historico_final, df_observaciones_hoy, df_observaciones):
                 return False
             
             # 6. Mostrar resumen final
@@ -695,6 +1039,14 @@ class AnalizadorHistoricoMotick:
 
 def main():
     """Funcion principal del analizador - CORREGIDA"""
+    parser = argparse.ArgumentParser(description="Analizador historico Motick")
+    parser.add_argument('--backfill', action='store_true',
+                        help="Procesa todas las SCR posteriores a la ultima fecha del historico")
+    parser.add_argument('--stream', metavar='ORIGEN',
+                        help="Lee los anuncios del stream NDJSON del scraper (ruta/FIFO, unix:/ruta o "
+                             "tcp:host:puerto) en lugar de la SCR guardada")
+    args = parser.parse_args()
+    
     print("Iniciando Analizador Historico MOTICK V8.2 - Version Google Sheets CORREGIDA FINAL...")
     print("VERSION AUTOMATIZADA V8.2:")
     print("   • Lee datos del scraper desde Google Sheets (hojas SCR)")
@@ -702,14 +1054,28 @@ def main():
     print("   • USA URL como identificador unico principal (SIN PRECIO)")
     print("   • Mantiene hojas originales: Data_Historico")
     print("   • Cada ejecucion anade: Visitas_FECHA y Likes_FECHA")
+    print("   • Serie diaria completa en formato largo (Observaciones), Data_Historico con ventana de dias")
     print("   • Anade Visitas_Totales y Likes_Totales")
     print("   • ARREGLO CRITICO: Manejo correcto de DataFrame vs tupla")
     print("   • Primera vez: Crea historico completo")
     print("   • Siguientes: Anade columnas por fecha")
+    print("   • --backfill: recupera todos los dias SCR sin procesar en una pasada")
+    print("   • --stream: lee el stream NDJSON del scraper (cada cuenta se prepara al cerrarse, un merge al final)")
     print()
     
     analizador = AnalizadorHistoricoMotick()
-    exito = analizador.ejecutar()
+    if args.backfill:
+        exito = analizador.ejecutar_backfill()
+    elif args.stream:
+        # El scraper guarda su propia SCR: aqui solo se analiza. El merge es uno con el
+        # dia completo: las posibles ventas solo se conocen cuando han llegado todas las cuentas
+        df_stream = leer_stream_scraper(args.stream)
+        if df_stream is None:
+            print("ERROR: El stream del scraper no trajo anuncios")
+            return False
+        exito = analizador.ejecutar(df_scraper=df_stream, guardar_snapshot=False)
+    else:
+        exito = analizador.ejecutar()
     
     if exito:
         print("\nPROCESO COMPLETADO EXITOSAMENTE V8.2")
@@ -0,0 +1,199 @@
+"""
+Archivo de snapshots SCR Motick
+Mueve las hojas 'SCR dd/mm/yy' con mas de N dias del Google Sheet a Parquet
+comprimido (zstd) particionado por fecha:
+    <ARCHIVO_SCR_DIR>/fecha=yyyy-mm-dd/SCR.parquet
+    <ARCHIVO_SCR_DIR>/manifest.json   (indice de fechas + ultima fecha archivada)
+El Sheet solo conserva los ultimos dias y los snapshots antiguos siguen
+consultables en local
+
+Uso: cd scr && python archivo_scr_motick.py [--dias N] [--sin-borrar]
+"""
+
+import os
+import sys
+import json
+import argparse
+import pandas as pd
+from datetime import datetime, timedelta
+
+# Importar modulos locales
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config import ARCHIVO_SCR_DIR, DIAS_RETENCION_SCR
+
+class ArchivoSCRMotick:
+    def __init__(self, directorio=ARCHIVO_SCR_DIR):
+        """
+        El manifest guarda {'snapshots': {yyyy-mm-dd: {...}}, 'ultima': yyyy-mm-dd}
+        'ultima' permite obtener el snapshot mas reciente sin recorrer nada
+        """
+        self.directorio = directorio
+        self.ruta_manifest = os.path.join(directorio, 'manifest.json')
+        os.makedirs(directorio, exist_ok=True)
+        self.manifest = self.cargar_manifest()
+
+    def cargar_manifest(self):
+        """Carga el manifest o devuelve uno vacio si no existe o esta corrupto"""
+        try:
+            with open(self.ruta_manifest, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            manifest.setdefault('snapshots', {})
+            manifest.setdefault('ultima', None)
+            return manifest
+        except (OSError, ValueError):
+            return {'snapshots': {}, 'ultima': None}
+
+    def guardar_manifest(self):
+        """Escritura atomica del manifest (tmp + replace)"""
+        ruta_tmp = self.ruta_manifest + '.tmp'
+        with open(ruta_tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(ruta_tmp, self.ruta_manifest)
+
+    def ruta_particion(self, fecha_iso):
+        """yyyy-mm-dd -> <directorio>/fecha=yyyy-mm-dd/SCR.parquet"""
+        return os.path.join(self.directorio, f"fecha={fecha_iso}", 'SCR.parquet')
+
+    def archivar(self, nombre_hoja, fecha_obj, df):
+        """
+        Escribe el snapshot en su particion (zstd) y lo registra en el manifest
+        Devuelve True solo si el archivo se relee con el mismo numero de filas
+        """
+        fecha_iso = fecha_obj.strftime('%Y-%m-%d')
+        ruta = self.ruta_particion(fecha_iso)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+
+        ruta_tmp = ruta + '.tmp'
+        df.to_parquet(ruta_tmp, index=False, compression='zstd')
+        os.replace(ruta_tmp, ruta)
+
+        if len(pd.read_parquet(ruta, columns=[df.columns[0]])) != len(df):
+            print(f"ERROR ARCHIVO: Verificacion fallida para {nombre_hoja}")
+            return False
+
+        self.manifest['snapshots'][fecha_iso] = {
+            'hoja': nombre_hoja,
+            'archivo': ruta,
+            'filas': len(df),
+            'columnas': len(df.columns),
+            'archivado_en': datetime.now().isoformat(timespec='seconds')
+        }
+        if self.manifest['ultima'] is None or fecha_iso > self.manifest['ultima']:
+            self.manifest['ultima'] = fecha_iso
+        self.guardar_manifest()
+
+        print(f"ARCHIVADO: {nombre_hoja} -> {ruta} ({len(df)} filas)")
+        return True
+
+    def fechas(self):
+        """Fechas archivadas (yyyy-mm-dd) en orden"""
+        return sorted(self.manifest['snapshots'])
+
+    def ultima_fecha(self):
+        """Fecha del snapshot archivado mas reciente (yyyy-mm-dd) o None"""
+        return self.manifest['ultima']
+
+    def leer(self, fecha_display):
+        """Snapshot archivado de una fecha dd/mm/yyyy (o None si no esta archivado)"""
+        fecha_iso = datetime.strptime(fecha_display, "%d/%m/%Y").strftime('%Y-%m-%d')
+        entrada = self.manifest['snapshots'].get(fecha_iso)
+        if entrada is None:
+            return None
+        return pd.read_parquet(entrada['archivo'])
+
+    def consultar(self, desde=None, hasta=None, columnas=None):
+        """
+        Une los snapshots archivados entre dos fechas dd/mm/yyyy (incluidas)
+        Anade la columna Fecha_Snapshot (dd/mm/yyyy). None si no hay ninguno
+        """
+        desde_iso = datetime.strptime(desde, "%d/%m/%Y").strftime('%Y-%m-%d') if desde else None
+        hasta_iso = datetime.strptime(hasta, "%d/%m/%Y").strftime('%Y-%m-%d') if hasta else None
+
+        partes = []
+        for fecha_iso in self.fechas():
+            if (desde_iso and fecha_iso < desde_iso) or (hasta_iso and fecha_iso > hasta_iso):
+                continue
+            df = pd.read_parquet(self.manifest['snapshots'][fecha_iso]['archivo'], columns=columnas)
+            df['Fecha_Snapshot'] = datetime.strptime(fecha_iso, '%Y-%m-%d').strftime("%d/%m/%Y")
+            partes.append(df)
+
+        if not partes:
+            return None
+        return pd.concat(partes, ignore_index=True)
+
+def archivar_hojas_scr(gs_handler, archivo, dias_retencion=DIAS_RETENCION_SCR, borrar=True, hoy=None):
+    """
+    Archiva las hojas SCR con mas de dias_retencion dias y (si borrar) las elimina del Sheet
+    Una hoja solo se borra despues de verificar su Parquet. Devuelve nº de hojas archivadas
+    """
+    from google_sheets_motick import parsear_fecha_hoja_scr
+
+    hoy = hoy or datetime.now()
+    limite = (hoy - timedelta(days=dias_retencion)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    spreadsheet = gs_handler.client.open_by_key(gs_handler.sheet_id)
+    candidatas = []
+    for worksheet in spreadsheet.worksheets():
+        fecha_obj = parsear_fecha_hoja_scr(worksheet.title)
+        if fecha_obj is not None and fecha_obj < limite:
+            candidatas.append((fecha_obj, worksheet))
+    candidatas.sort(key=lambda x: x[0])
+
+    print(f"ARCHIVO SCR: {len(candidatas)} hojas anteriores a {limite.strftime('%d/%m/%Y')}")
+
+    archivadas = 0
+    for fecha_obj, worksheet in candidatas:
+        try:
+            df = gs_handler.leer_hoja_como_dataframe(worksheet)
+            if df is None or df.empty:
+                print(f"AVISO: {worksheet.title} vacia, no se archiva")
+                continue
+
+            if not archivo.archivar(worksheet.title, fecha_obj, df):
+                continue
+            archivadas += 1
+
+            if borrar:
+                spreadsheet.del_worksheet(worksheet)
+                print(f"ELIMINADA: Hoja {worksheet.title} del Sheet")
+
+        except Exception as e:
+            print(f"ERROR ARCHIVANDO {worksheet.title}: {str(e)}")
+            continue
+
+    print(f"ARCHIVO SCR: {archivadas} hojas archivadas en {os.path.abspath(archivo.directorio)}")
+    return archivadas
+
+def main():
+    """Funcion principal del archivador"""
+    parser = argparse.ArgumentParser(description="Archiva hojas SCR antiguas en Parquet/zstd")
+    parser.add_argument('--dias', type=int, default=DIAS_RETENCION_SCR,
+                        help=f"Dias de hojas SCR que se quedan en el Sheet (por defecto {DIAS_RETENCION_SCR})")
+    parser.add_argument('--sin-borrar', action='store_true',
+                        help="Archiva pero no elimina las hojas del Sheet")
+    args = parser.parse_args()
+
+    print("="*80)
+    print(f"ARCHIVADOR SCR MOTICK - Hojas con mas de {args.dias} dias -> Parquet/zstd")
+    print("="*80)
+
+    try:
+        from google_sheets_motick import crear_handler_google_sheets
+        gs_handler = crear_handler_google_sheets()
+
+        if not gs_handler.test_connection():
+            print("ERROR: No se pudo conectar a Google Sheets")
+            return False
+
+        archivar_hojas_scr(gs_handler, ArchivoSCRMotick(), args.dias, borrar=not args.sin_borrar)
+        return True
+
+    except Exception as e:
+        print(f"ERROR CRITICO ARCHIVANDO: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
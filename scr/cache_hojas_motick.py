@@ -0,0 +1,102 @@
+"""
+Cache local de hojas de Google Sheets para Motick
+Guarda cada hoja leida como Parquet etiquetada con la revision del Sheet
+(modifiedTime de Drive). Si la revision no cambia, se sirve desde disco
+sin volver a descargar (p.ej. reejecuciones del analizador tras un fallo)
+"""
+
+import os
+import re
+import json
+import pandas as pd
+
+from config import CACHE_HOJAS_DIR
+
+class CacheHojasMotick:
+    def __init__(self, directorio=CACHE_HOJAS_DIR):
+        """
+        Inicializa la cache en el directorio indicado
+        El manifest.json guarda revision + archivo de cada hoja cacheada
+        """
+        self.directorio = directorio
+        self.ruta_manifest = os.path.join(directorio, 'manifest.json')
+        os.makedirs(directorio, exist_ok=True)
+        self.manifest = self.cargar_manifest()
+
+    def cargar_manifest(self):
+        """Carga el manifest o devuelve uno vacio si no existe o esta corrupto"""
+        try:
+            with open(self.ruta_manifest, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            manifest.setdefault('hojas', {})
+            return manifest
+        except (OSError, ValueError):
+            return {'hojas': {}, 'titulos': None}
+
+    def guardar_manifest(self):
+        """Escritura atomica del manifest (tmp + replace)"""
+        ruta_tmp = self.ruta_manifest + '.tmp'
+        with open(ruta_tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(ruta_tmp, self.ruta_manifest)
+
+    def ruta_hoja(self, nombre_hoja):
+        """'SCR 05/09/25' -> <directorio>/SCR_05_09_25.parquet"""
+        nombre_archivo = re.sub(r'[^\w\-]', '_', nombre_hoja)
+        return os.path.join(self.directorio, f"{nombre_archivo}.parquet")
+
+    def leer(self, nombre_hoja, revision):
+        """
+        Devuelve el DataFrame cacheado si la revision coincide, si no None
+        """
+        if not revision:
+            return None
+
+        entrada = self.manifest['hojas'].get(nombre_hoja)
+        if not entrada or entrada.get('revision') != revision:
+            return None
+
+        try:
+            df = pd.read_parquet(entrada['archivo'])
+            print(f"CACHE: {nombre_hoja} servida desde disco (revision {revision})")
+            return df
+        except Exception as e:
+            print(f"AVISO CACHE: No se pudo leer {nombre_hoja}: {str(e)}")
+            return None
+
+    def guardar(self, nombre_hoja, revision, df):
+        """Guarda la hoja en Parquet y la registra con su revision"""
+        if not revision or df is None:
+            return False
+
+        try:
+            ruta = self.ruta_hoja(nombre_hoja)
+            df.to_parquet(ruta, index=False)
+            self.manifest['hojas'][nombre_hoja] = {
+                'revision': revision,
+                'archivo': ruta,
+                'filas': len(df),
+                'columnas': len(df.columns)
+            }
+            self.guardar_manifest()
+            return True
+        except Exception as e:
+            print(f"AVISO CACHE: No se pudo guardar {nombre_hoja}: {str(e)}")
+            return False
+
+    def leer_titulos(self, revision):
+        """Lista de titulos de hojas cacheada para esa revision (o None)"""
+        titulos = self.manifest.get('titulos')
+        if revision and titulos and titulos.get('revision') == revision:
+            return titulos['lista']
+        return None
+
+    def guardar_titulos(self, revision, lista_titulos):
+        """Cachea la lista de titulos de hojas para esa revision"""
+        if not revision:
+            return
+        try:
+            self.manifest['titulos'] = {'revision': revision, 'lista': list(lista_titulos)}
+            self.guardar_manifest()
+        except Exception as e:
+            print(f"AVISO CACHE: No se pudo guardar lista de hojas: {str(e)}")
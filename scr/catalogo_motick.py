@@ -0,0 +1,255 @@
+"""
+Catalogo Motick - Marca, modelo y cilindrada normalizados a partir del titulo
+El catalogo (marca -> alias y modelos) se compila UNA vez en dos expresiones
+regulares con alternativas ordenadas de mas larga a mas corta:
+- PATRON_MARCAS: cualquier alias de marca como palabra completa
+- PATRON_MODELOS: cualquier modelo (separadores '-'/' ' opcionales, tambien entre
+  letras y numeros: 'CB 500X' ~ 'CB500X') seguido opcionalmente de un numero con
+  sufijo de letras (cilindrada: 'CBR 600', 'PCX125', 'CBR600RR')
+Cada titulo distinto se resuelve con una busqueda de marca y un recorrido de
+los modelos encontrados, y un diccionario alias -> valor normalizado. Un modelo
+de una marca distinta a la detectada se descarta; sin marca, la marca sale del
+modelo si solo existe en una marca
+Cilindrada: 'NNN cc' explicito > valor del catalogo > numero pegado al modelo >
+numero suelto junto al modelo o la marca ('KTM 390 Duke'), nunca un ano ni unos km
+"""
+
+import re
+import pandas as pd
+
+# marca normalizada -> (alias, {modelo: cilindrada del catalogo o None})
+CATALOGO_MOTOS = {
+    'HONDA': (['honda'], {
+        'CBR': None, 'CB': None, 'CBF': None, 'CB500X': 471, 'CB650R': 649, 'CB1000R': 998,
+        'PCX': None, 'SH': None, 'FORZA': None, 'NC750X': 745, 'AFRICA TWIN': 1084,
+        'X-ADV': 745, 'CRF': None, 'HORNET': None, 'TRANSALP': None, 'GOLDWING': 1833,
+        'DEAUVILLE': None, 'INTEGRA': 745, 'REBEL': None, 'VFR': None, 'SCOOPY': None,
+        'VARADERO': None, 'MSX': 125,
+    }),
+    'YAMAHA': (['yamaha'], {
+        'MT-01': 1670, 'MT-03': 321, 'MT-07': 689, 'MT-09': 890, 'MT-10': 998, 'MT-125': 125,
+        'TRACER': None, 'TENERE': None, 'XMAX': None, 'TMAX': None, 'NMAX': None,
+        'FAZER': None, 'YZF-R1': 998, 'YZF-R6': 599, 'YZF-R125': 125, 'XSR': None,
+        'XJ6': 600, 'DRAG STAR': None, 'VIRAGO': None, 'AEROX': 50, 'NIKEN': 847, 'WR': None,
+    }),
+    'KAWASAKI': (['kawasaki'], {
+        'Z': None, 'NINJA': None, 'VERSYS': None, 'VULCAN': None, 'ER-6N': 649, 'ER-6F': 649,
+        'ZZR': None, 'KLR': None, 'KLX': None, 'Z900RS': 948, 'ZX-6R': 636, 'ZX-10R': 998,
+    }),
+    'SUZUKI': (['suzuki'], {
+        'GSX-R': None, 'GSX-S': None, 'GSX': None, 'V-STROM': None, 'SV': None,
+        'BURGMAN': None, 'BANDIT': None, 'HAYABUSA': 1340, 'GLADIUS': 645, 'INTRUDER': None,
+        'DR': None, 'ADDRESS': 110,
+    }),
+    'BMW': (['bmw'], {
+        'R 1250 GS': 1254, 'R 1200 GS': 1170, 'GS': None, 'RT': None, 'S 1000 RR': 999,
+        'S 1000 XR': 999, 'F 800 GS': 798, 'F 750 GS': 853, 'F 850 GS': 853, 'F 900 R': 895,
+        'G 310 R': 313, 'G 310 GS': 313, 'C 400 X': 350, 'C 400 GT': 350, 'C 650 GT': 647,
+        'R NINET': 1170, 'K 1600': 1649,
+    }),
+    'KTM': (['ktm'], {
+        'DUKE': None, 'ADVENTURE': None, 'EXC': None, 'SMC': None, 'RC': None, 'SX': None,
+        'SUPER DUKE': None,
+    }),
+    'DUCATI': (['ducati'], {
+        'MONSTER': None, 'PANIGALE': None, 'MULTISTRADA': None, 'SCRAMBLER': None,
+        'DIAVEL': None, 'HYPERMOTARD': None, 'SUPERSPORT': None, 'STREETFIGHTER': None,
+    }),
+    'PIAGGIO': (['piaggio'], {
+        'MP3': None, 'BEVERLY': None, 'LIBERTY': None, 'MEDLEY': None, 'ZIP': None, 'X9': None,
+        'X10': None, 'TYPHOON': None,
+    }),
+    'VESPA': (['vespa'], {
+        'PRIMAVERA': None, 'SPRINT': None, 'GTS': None, 'GTV': None, 'LX': None, 'ELETTRICA': None,
+    }),
+    'APRILIA': (['aprilia'], {
+        'RS': None, 'RSV4': 1099, 'TUONO': None, 'SHIVER': 900, 'DORSODURO': None, 'SR': None,
+        'SPORTCITY': None, 'SX': None, 'TUAREG': 659,
+    }),
+    'TRIUMPH': (['triumph'], {
+        'STREET TRIPLE': None, 'SPEED TRIPLE': None, 'TIGER': None, 'BONNEVILLE': None,
+        'TRIDENT': 660, 'SCRAMBLER': None, 'THRUXTON': None, 'STREET TWIN': 900, 'ROCKET': None,
+    }),
+    'HARLEY-DAVIDSON': (['harley-davidson', 'harley davidson', 'harley'], {
+        'SPORTSTER': None, 'IRON': None, 'FAT BOY': None, 'STREET GLIDE': None, 'ROAD KING': None,
+        'SOFTAIL': None, 'DYNA': None, 'FORTY-EIGHT': 1202, 'STREET BOB': None,
+    }),
+    'MV AGUSTA': (['mv agusta', 'mv'], {'BRUTALE': None, 'F3': None, 'F4': None, 'DRAGSTER': None}),
+    'MOTO GUZZI': (['moto guzzi', 'guzzi'], {'V7': None, 'V85': 853, 'V9': 853, 'STELVIO': None}),
+    'ROYAL ENFIELD': (['royal enfield'], {
+        'HIMALAYAN': 411, 'INTERCEPTOR': 648, 'CONTINENTAL GT': None, 'CLASSIC': None, 'METEOR': 349,
+    }),
+    'HUSQVARNA': (['husqvarna'], {'VITPILEN': None, 'SVARTPILEN': None, 'TE': None, 'FE': None}),
+    'KYMCO': (['kymco'], {
+        'AGILITY': None, 'PEOPLE': None, 'XCITING': None, 'AK 550': 550, 'SUPER DINK': None,
+        'DOWNTOWN': None,
+    }),
+    'SYM': (['sym'], {'SYMPHONY': None, 'JOYMAX': None, 'MAXSYM': None, 'CRUISYM': None, 'FIDDLE': None}),
+    'PEUGEOT': (['peugeot'], {'TWEET': None, 'METROPOLIS': None, 'DJANGO': None, 'SPEEDFIGHT': None}),
+    'BENELLI': (['benelli'], {'TRK': None, 'LEONCINO': None, 'TNT': None, 'BN': None}),
+    'CFMOTO': (['cfmoto', 'cf moto'], {'NK': None, 'MT': None}),
+    'VOGE': (['voge'], {'VALICO': None}),
+    'ZONTES': (['zontes'], {}),
+    'MACBOR': (['macbor'], {'MONTANA': None, 'EIGHT MILE': None}),
+    'GASGAS': (['gas gas', 'gasgas'], {'EC': None, 'TXT': None}),
+    'BETA': (['beta'], {'RR': None, 'EVO': None}),
+    'SHERCO': (['sherco'], {}),
+    'DERBI': (['derbi'], {'SENDA': None, 'GPR': None}),
+    'RIEJU': (['rieju'], {'MRT': None, 'TANGO': None}),
+    'MONTESA': (['montesa'], {'COTA': None}),
+    'HYOSUNG': (['hyosung'], {'GT': None, 'AQUILA': None}),
+    'INDIAN': (['indian'], {'SCOUT': None, 'CHIEF': None}),
+    'KEEWAY': (['keeway'], {}),
+    'SILENCE': (['silence'], {'S01': None, 'S02': None}),
+    'NIU': (['niu'], {}),
+    'SUPER SOCO': (['super soco'], {}),
+    'DAELIM': (['daelim'], {'DAYSTAR': None}),
+}
+
+# Nombres habituales de un modelo del catalogo (marca -> {alias: modelo})
+ALIAS_MODELOS = {
+    'YAMAHA': {'R1': 'YZF-R1', 'R6': 'YZF-R6', 'R125': 'YZF-R125'},
+}
+
+CILINDRADA_MIN = 49
+CILINDRADA_MAX = 2500
+ANO_MIN = 1950
+ANO_MAX = 2050
+
+def normalizar_alias(texto):
+    """Clave de busqueda: minusculas sin separadores ('X-ADV', 'x adv' -> 'xadv')"""
+    return re.sub(r'[\s\-]', '', texto.lower())
+
+def patron_alias(alias):
+    """
+    Alias con separadores opcionales entre sus partes y entre letras y numeros
+    ('MT-07' ~ 'MT07', 'MT 07'; 'CB500X' ~ 'CB 500X')
+    """
+    partes = [
+        trozo
+        for parte in re.split(r'[\s\-]+', alias.lower())
+        for trozo in re.findall(r'\d+|[^\d]+', parte)
+    ]
+    return r'[\s\-]?'.join(re.escape(parte) for parte in partes)
+
+def compilar_catalogo(catalogo, alias_modelos=None):
+    """
+    (patron_marcas, patron_modelos, alias_marca, alias_modelo)
+    alias_modelo: clave normalizada -> [(marca, modelo, cilindrada), ...]
+    alias_modelos: {marca: {alias: modelo del catalogo}} (ver ALIAS_MODELOS)
+    """
+    alias_marca = {}
+    alias_modelo = {}
+    for marca, (alias, modelos) in catalogo.items():
+        for nombre in alias + [marca]:
+            alias_marca[normalizar_alias(nombre)] = (marca, patron_alias(nombre))
+        for modelo, cilindrada in modelos.items():
+            entrada = alias_modelo.setdefault(normalizar_alias(modelo), (patron_alias(modelo), []))
+            entrada[1].append((marca, modelo, cilindrada))
+    for marca, alias in (alias_modelos or {}).items():
+        for nombre, modelo in alias.items():
+            entrada = alias_modelo.setdefault(normalizar_alias(nombre), (patron_alias(nombre), []))
+            entrada[1].append((marca, modelo, catalogo[marca][1][modelo]))
+
+    def alternativas(patrones):
+        return '|'.join(sorted(set(patrones), key=len, reverse=True))
+
+    patron_marcas = re.compile(
+        rf"(?<![\w])({alternativas(p for _, p in alias_marca.values())})(?![\w])", re.IGNORECASE
+    )
+    patron_modelos = re.compile(
+        rf"(?<![\w])({alternativas(p for p, _ in alias_modelo.values())})(?:[\s\-]?(\d{{2,4}})[a-z]{{0,3}})?(?![\w])",
+        re.IGNORECASE
+    )
+    alias_marca = {clave: marca for clave, (marca, _) in alias_marca.items()}
+    alias_modelo = {clave: entradas for clave, (_, entradas) in alias_modelo.items()}
+    return patron_marcas, patron_modelos, alias_marca, alias_modelo
+
+PATRON_MARCAS, PATRON_MODELOS, ALIAS_MARCA, ALIAS_MODELO = compilar_catalogo(CATALOGO_MOTOS, ALIAS_MODELOS)
+PATRON_CILINDRADA = re.compile(r'(\d{2,4})\s*(?:cc|cm3|c\.c\.)(?![\w])', re.IGNORECASE)
+PATRON_NUMERO_ANTES = re.compile(r'(?<![\w.,])(\d{2,4})[\s\-]+$')
+PATRON_NUMERO_DESPUES = re.compile(r'[\s\-]+(\d{2,4})(?![\w.,])(?!\s*(?:km|kms|cv|eur|€))', re.IGNORECASE)
+
+def tiene_marca(texto):
+    """True si el texto menciona alguna marca del catalogo (una sola busqueda)"""
+    return PATRON_MARCAS.search(texto) is not None
+
+def resolver_modelo(clave, marca):
+    """(marca, modelo, cilindrada) del catalogo para la clave de modelo (None si no encaja)"""
+    entradas = ALIAS_MODELO.get(clave, [])
+    if marca:
+        return next((entrada for entrada in entradas if entrada[0] == marca), None)
+    return entradas[0] if len(entradas) == 1 else None
+
+def es_ano(numero):
+    """Numeros tipo ano ('MT-07 2019') no son cilindrada"""
+    return ANO_MIN <= numero <= ANO_MAX
+
+def cilindrada_contigua(titulo, inicio, fin):
+    """Numero suelto justo antes o despues de titulo[inicio:fin] como cilindrada (None si no hay)"""
+    for numero in (PATRON_NUMERO_DESPUES.match(titulo, fin), PATRON_NUMERO_ANTES.search(titulo, 0, inicio)):
+        if numero:
+            valor = int(numero.group(1))
+            if CILINDRADA_MIN <= valor <= CILINDRADA_MAX and not es_ano(valor):
+                return valor
+    return None
+
+def etiquetar_titulo(titulo):
+    """(marca, modelo, cilindrada) de un titulo: una busqueda de marca y una de modelos"""
+    coincidencia = PATRON_MARCAS.search(titulo)
+    marca = ALIAS_MARCA[normalizar_alias(coincidencia.group(1))] if coincidencia else ''
+    explicita = PATRON_CILINDRADA.search(titulo)
+    cilindrada = int(explicita.group(1)) if explicita else None
+
+    for modelo in PATRON_MODELOS.finditer(titulo):
+        entrada = resolver_modelo(normalizar_alias(modelo.group(1)), marca)
+        if entrada is None:
+            continue
+        pegada = int(modelo.group(2)) if modelo.group(2) else 0
+        if cilindrada is None:
+            cilindrada = entrada[2]
+        if cilindrada is None and CILINDRADA_MIN <= pegada <= CILINDRADA_MAX and not es_ano(pegada):
+            cilindrada = pegada
+        if cilindrada is None:
+            cilindrada = cilindrada_contigua(titulo, modelo.start(), modelo.end())
+        if cilindrada is None and coincidencia:
+            cilindrada = cilindrada_contigua(titulo, coincidencia.start(), coincidencia.end())
+        return entrada[0], entrada[1], cilindrada
+
+    if cilindrada is None and coincidencia:
+        cilindrada = cilindrada_contigua(titulo, coincidencia.start(), coincidencia.end())
+    return marca, '', cilindrada
+
+def etiquetar_titulos(titulos):
+    """
+    DataFrame (Marca, Modelo, Cilindrada) alineado con titulos
+    Cada titulo distinto se resuelve una vez. Sin coincidencia: '' y NA
+    """
+    titulos = titulos.fillna('').astype(str)
+    unicos = pd.unique(titulos.to_numpy())
+    etiquetas = pd.DataFrame([etiquetar_titulo(titulo) for titulo in unicos],
+                             columns=['Marca', 'Modelo', 'Cilindrada'], index=unicos)
+    df = etiquetas.reindex(titulos.to_numpy()).set_axis(titulos.index)
+    df['Cilindrada'] = pd.to_numeric(df['Cilindrada'], errors='coerce').astype('Int64')
+    return df
+
+def asegurar_etiquetas(df):
+    """
+    Marca/Modelo/Cilindrada detras de Titulo, etiquetando solo las filas sin marca
+    (historicos anteriores al catalogo o titulos que el catalogo no reconocia)
+    Devuelve copia
+    """
+    df = df.copy()
+    if 'Marca' not in df.columns:
+        posicion = df.columns.get_loc('Titulo') + 1 if 'Titulo' in df.columns else len(df.columns)
+        for desplazamiento, col in enumerate(['Marca', 'Modelo', 'Cilindrada']):
+            if col not in df.columns:
+                df.insert(posicion + desplazamiento, col, pd.NA)
+
+    faltan = df['Marca'].isna() | (df['Marca'].astype(str).str.strip() == '')
+    if faltan.any() and 'Titulo' in df.columns:
+        etiquetas = etiquetar_titulos(df.loc[faltan, 'Titulo'])
+        df[['Marca', 'Modelo']] = df[['Marca', 'Modelo']].astype(object)
+        df['Cilindrada'] = pd.to_numeric(df['Cilindrada'], errors='coerce').astype('Int64')
+        df.loc[faltan, ['Marca', 'Modelo', 'Cilindrada']] = etiquetas
+    return df
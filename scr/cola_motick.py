@@ -0,0 +1,213 @@
+"""
+Cola Motick - Cola de tareas persistente (SQLite) para scrapear con varios trabajadores
+Dos tipos de tarea por dia:
+- 'cuenta': cargar el perfil y encolar una tarea 'anuncio' por cada URL encontrada
+- 'anuncio': extraer un anuncio (el resultado, el ad_data del scraper, se guarda en JSON)
+Cada trabajador (scraper_motick.py --trabajador) reclama la tarea pendiente de mayor
+prioridad con un lease: si el proceso muere, el lease caduca y otro la vuelve a
+reclamar. Cada reclamacion cuenta como intento; al agotar max_intentos queda 'fallida'
+Los perfiles van antes que los anuncios para que el trabajo se reparta cuanto antes
+"""
+
+import os
+import json
+import time
+import sqlite3
+from datetime import datetime
+
+from config import COLA_DB
+
+PRIORIDAD_CUENTA = 10
+PRIORIDAD_ANUNCIO = 0
+LEASE_CUENTA = 600
+LEASE_ANUNCIO = 120
+MAX_INTENTOS = 3
+
+class ColaTareasMotick:
+    def __init__(self, ruta_db=COLA_DB, max_intentos=MAX_INTENTOS):
+        self.ruta_db = ruta_db
+        self.max_intentos = max_intentos
+        directorio = os.path.dirname(ruta_db)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self.inicializar_db()
+
+    def conectar(self):
+        """Conexion SQLite por operacion; varios procesos comparten la DB (WAL + espera)"""
+        conn = sqlite3.connect(self.ruta_db, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def inicializar_db(self):
+        """Crea la tabla de tareas si no existe"""
+        conn = self.conectar()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS tareas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fecha TEXT NOT NULL,              -- yyyy-mm-dd del scrape
+                    tipo TEXT NOT NULL,               -- 'cuenta' | 'anuncio'
+                    cuenta TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    prioridad INTEGER NOT NULL DEFAULT 0,
+                    estado TEXT NOT NULL DEFAULT 'pendiente',  -- pendiente | en_curso | hecha | fallida
+                    intentos INTEGER NOT NULL DEFAULT 0,
+                    trabajador TEXT,
+                    lease_hasta REAL,
+                    resultado TEXT,                   -- JSON (ad_data o resumen de la cuenta)
+                    error TEXT,
+                    actualizada TEXT,
+                    UNIQUE (fecha, tipo, url)
+                );
+                CREATE INDEX IF NOT EXISTS idx_tareas_reclamar ON tareas (fecha, estado, prioridad DESC, id);
+            """)
+        finally:
+            conn.close()
+
+    def encolar(self, fecha, tipo, cuenta, urls, prioridad):
+        """Anade tareas (las que ya existen para ese dia no se duplican). Devuelve cuantas son nuevas"""
+        conn = self.conectar()
+        try:
+            antes = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tareas (fecha, tipo, cuenta, url, prioridad, actualizada) VALUES (?, ?, ?, ?, ?, ?)",
+                [(fecha, tipo, cuenta, url, prioridad, datetime.now().isoformat(timespec='seconds')) for url in urls]
+            )
+            return conn.total_changes - antes
+        finally:
+            conn.close()
+
+    def encolar_cuentas(self, cuentas, fecha, prioridad=PRIORIDAD_CUENTA):
+        """Una tarea 'cuenta' por perfil {cuenta: url}"""
+        nuevas = 0
+        for cuenta, url in cuentas.items():
+            nuevas += self.encolar(fecha, 'cuenta', cuenta, [url], prioridad)
+        return nuevas
+
+    def encolar_anuncios(self, cuenta, urls, fecha, prioridad=PRIORIDAD_ANUNCIO):
+        """Una tarea 'anuncio' por URL de la cuenta"""
+        return self.encolar(fecha, 'anuncio', cuenta, urls, prioridad)
+
+    def reclamar(self, trabajador, fecha, lease_segundos=None):
+        """
+        Reclama la tarea disponible de mayor prioridad del dia: pendiente o en curso con
+        el lease caducado (trabajador caido). Devuelve la tarea (dict) o None
+        """
+        ahora = time.time()
+        conn = self.conectar()
+        try:
+            # BEGIN IMMEDIATE: dos trabajadores nunca reclaman la misma tarea
+            conn.execute("BEGIN IMMEDIATE")
+            # Lease caducado en el ultimo intento: no se puede reclamar mas
+            conn.execute("""
+                UPDATE tareas SET estado = 'fallida', error = 'lease caducado', lease_hasta = NULL
+                WHERE fecha = ? AND estado = 'en_curso' AND lease_hasta < ? AND intentos >= ?
+            """, (fecha, ahora, self.max_intentos))
+            fila = conn.execute("""
+                SELECT * FROM tareas
+                WHERE fecha = ? AND intentos < ?
+                  AND (estado = 'pendiente' OR (estado = 'en_curso' AND lease_hasta < ?))
+                ORDER BY prioridad DESC, id
+                LIMIT 1
+            """, (fecha, self.max_intentos, ahora)).fetchone()
+            if fila is None:
+                conn.execute("COMMIT")
+                return None
+
+            lease = lease_segundos
+            if lease is None:
+                lease = LEASE_CUENTA if fila['tipo'] == 'cuenta' else LEASE_ANUNCIO
+            conn.execute("""
+                UPDATE tareas SET estado = 'en_curso', trabajador = ?, lease_hasta = ?,
+                                  intentos = intentos + 1, actualizada = ?
+                WHERE id = ?
+            """, (trabajador, ahora + lease, datetime.now().isoformat(timespec='seconds'), fila['id']))
+            conn.execute("COMMIT")
+
+            tarea = dict(fila)
+            tarea.update(estado='en_curso', trabajador=trabajador, intentos=fila['intentos'] + 1)
+            return tarea
+        except Exception:
+            # Si fallo el propio BEGIN (DB bloqueada) no hay transaccion que deshacer
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def cerrar_tarea(self, tarea, trabajador, estado, resultado=None, error=None):
+        """Cambia el estado solo si el trabajador sigue teniendo la tarea (su lease no fue reclamado)"""
+        conn = self.conectar()
+        try:
+            cursor = conn.execute("""
+                UPDATE tareas SET estado = ?, resultado = ?, error = ?, lease_hasta = NULL, actualizada = ?
+                WHERE id = ? AND trabajador = ? AND estado = 'en_curso'
+            """, (estado, None if resultado is None else json.dumps(resultado, ensure_ascii=False, default=str),
+                  error, datetime.now().isoformat(timespec='seconds'), tarea['id'], trabajador))
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def completar(self, tarea, trabajador, resultado):
+        """Marca la tarea hecha con su resultado. False si otro trabajador ya la reclamo"""
+        return self.cerrar_tarea(tarea, trabajador, 'hecha', resultado=resultado)
+
+    def fallar(self, tarea, trabajador, error):
+        """Devuelve la tarea a pendiente (o 'fallida' si agoto los intentos)"""
+        estado = 'fallida' if tarea['intentos'] >= self.max_intentos else 'pendiente'
+        return self.cerrar_tarea(tarea, trabajador, estado, error=error)
+
+    def activas(self, fecha):
+        """Tareas del dia que aun pueden terminar (pendientes o en curso)"""
+        conn = self.conectar()
+        try:
+            return conn.execute(
+                "SELECT COUNT(*) FROM tareas WHERE fecha = ? AND estado IN ('pendiente', 'en_curso')",
+                (fecha,)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def resumen(self, fecha):
+        """{(tipo, estado): tareas} del dia"""
+        conn = self.conectar()
+        try:
+            filas = conn.execute(
+                "SELECT tipo, estado, COUNT(*) FROM tareas WHERE fecha = ? GROUP BY tipo, estado", (fecha,)
+            ).fetchall()
+            return {(tipo, estado): total for tipo, estado, total in filas}
+        finally:
+            conn.close()
+
+    def resumen_cuentas(self, fecha):
+        """{cuenta: {'enlaces', 'anuncios', 'fallos'}} del dia (para el registro de cuentas)"""
+        conn = self.conectar()
+        try:
+            por_cuenta = {}
+            for cuenta, resultado in conn.execute(
+                "SELECT cuenta, resultado FROM tareas WHERE fecha = ? AND tipo = 'cuenta' AND estado = 'hecha'", (fecha,)
+            ):
+                por_cuenta[cuenta] = {'enlaces': json.loads(resultado).get('anuncios'), 'anuncios': 0, 'fallos': 0}
+            for cuenta, estado, total in conn.execute("""
+                SELECT cuenta, estado, COUNT(*) FROM tareas
+                WHERE fecha = ? AND tipo = 'anuncio' AND estado IN ('hecha', 'fallida')
+                GROUP BY cuenta, estado
+            """, (fecha,)):
+                medidas = por_cuenta.setdefault(cuenta, {'enlaces': None, 'anuncios': 0, 'fallos': 0})
+                medidas['anuncios' if estado == 'hecha' else 'fallos'] = total
+            return por_cuenta
+        finally:
+            conn.close()
+
+    def resultados(self, fecha):
+        """Lista de ad_data de los anuncios terminados del dia (orden de encolado)"""
+        conn = self.conectar()
+        try:
+            filas = conn.execute(
+                "SELECT resultado FROM tareas WHERE fecha = ? AND tipo = 'anuncio' AND estado = 'hecha' ORDER BY id",
+                (fecha,)
+            ).fetchall()
+            return [json.loads(resultado) for (resultado,) in filas]
+        finally:
+            conn.close()
@@ -0,0 +1,87 @@
+"""
+Compactacion Motick - Archivo frio de motos vendidas
+Las motos vendidas hace mas de N dias no cambian nunca mas: salen de
+Data_Historico (que se lee, limpia, ordena y sube cada dia) a un archivo
+frio con esquema fijo y estadisticas resumen por moto:
+- Sheets: hoja Archivo_Vendidas (solo se anaden filas)
+- Local: vendidas_archivo.parquet
+Sus visitas/likes diarias siguen completas en la serie larga (Observaciones)
+"""
+
+import pandas as pd
+from datetime import datetime, timedelta
+
+from esquema_motick import tipar_dataframe, parsear_fecha
+
+COLUMNAS_ARCHIVO_VENDIDAS = [
+    'ID_Unico_Real', 'Cuenta', 'Titulo', 'Precio', 'Kilometraje',
+    'Primera_Deteccion', 'Fecha_Venta', 'URL',
+    'Visitas_Totales', 'Likes_Totales', 'Dias_En_Venta', 'Fecha_Archivado'
+]
+
+def separar_vendidas_antiguas(df_historico, dias, fecha_display_hoy):
+    """
+    Divide el historico en (df_trabajo, df_archivo)
+    df_archivo: vendidas con Fecha_Venta anterior a hoy - dias, ya resumidas
+    dias=0/None desactiva la compactacion
+    """
+    if not dias or 'Fecha_Venta' not in df_historico.columns:
+        return df_historico, None
+
+    limite = datetime.strptime(fecha_display_hoy, "%d/%m/%Y") - timedelta(days=dias)
+    mask_frias = (df_historico['Estado'] == 'vendida') & (parsear_fecha(df_historico['Fecha_Venta']) < limite)
+
+    if not mask_frias.any():
+        return df_historico, None
+
+    df_archivo = resumir_vendidas(df_historico[mask_frias], fecha_display_hoy)
+    df_trabajo = df_historico[~mask_frias].reset_index(drop=True)
+
+    print(f"COMPACTACION: {len(df_archivo)} motos vendidas antes del {limite.strftime('%d/%m/%Y')} al archivo frio")
+    return df_trabajo, df_archivo
+
+def resumir_vendidas(df_vendidas, fecha_display_hoy):
+    """Esquema fijo del archivo: columnas basicas + totales + Dias_En_Venta"""
+    df = tipar_dataframe(df_vendidas.reindex(columns=COLUMNAS_ARCHIVO_VENDIDAS))
+
+    df['Dias_En_Venta'] = (df['Fecha_Venta'] - df['Primera_Deteccion']).dt.days.astype('Int64')
+    df['Fecha_Archivado'] = fecha_display_hoy
+
+    for col in ['Visitas_Totales', 'Likes_Totales']:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+
+    return df.reset_index(drop=True)
+
+def normalizar_archivo_vendidas(df_archivo):
+    """Tipos del archivo leido y una fila por URL (si una moto se archivo dos veces gana la ultima)"""
+    if df_archivo is None or df_archivo.empty:
+        return None
+    df = tipar_dataframe(df_archivo.drop_duplicates('URL', keep='last').reset_index(drop=True))
+    df['Dias_En_Venta'] = pd.to_numeric(df['Dias_En_Venta'], errors='coerce').astype('Int64')
+    return df
+
+def buscar_vendidas_archivadas(almacenamiento, urls):
+    """
+    API de consulta: filas del archivo frio para las URLs pedidas
+    Devuelve DataFrame (vacio si ninguna esta archivada)
+    """
+    df_archivo = normalizar_archivo_vendidas(almacenamiento.leer_vendidas_archivadas())
+    if df_archivo is None:
+        return pd.DataFrame(columns=COLUMNAS_ARCHIVO_VENDIDAS)
+    return df_archivo[df_archivo['URL'].isin(set(urls))].reset_index(drop=True)
+
+def resumen_vendidas_archivadas(almacenamiento):
+    """
+    Estadisticas por cuenta del archivo frio: motos, dias medianos hasta la venta,
+    visitas y likes medios. None si el archivo esta vacio
+    """
+    df_archivo = normalizar_archivo_vendidas(almacenamiento.leer_vendidas_archivadas())
+    if df_archivo is None:
+        return None
+
+    return df_archivo.groupby('Cuenta').agg(
+        Motos=('URL', 'count'),
+        Dias_Mediana=('Dias_En_Venta', 'median'),
+        Visitas_Media=('Visitas_Totales', 'mean'),
+        Likes_Media=('Likes_Totales', 'mean'),
+    ).sort_values('Motos', ascending=False)
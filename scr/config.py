@@ -14,6 +14,74 @@ GOOGLE_SHEET_ID_MOTICK = os.getenv('GOOGLE_SHEET_ID_MOTICK', '')
 # Para testing local - RUTA CORREGIDA
 LOCAL_CREDENTIALS_FILE = "../credentials/service-account.json"
 
+# Datos locales (cache, almacenamiento, archivos) - relativo a scr/ como las credenciales
+LOCAL_DATA_DIR = os.getenv('MOTICK_DATA_DIR', '../data')
+
+# Backend de almacenamiento: 'sheets' (Google Sheets directo) o 'local' (SQLite + Parquet,
+# publicado despues a Sheets con publicador_motick.py)
+TIPO_ALMACENAMIENTO = os.getenv('MOTICK_STORAGE', 'sheets').lower()
+ALMACEN_LOCAL_DIR = os.path.join(LOCAL_DATA_DIR, 'almacen')
+
+# Cache local de hojas de Google Sheets (Parquet) invalidada por revision del Sheet
+USAR_CACHE_HOJAS = os.getenv('MOTICK_CACHE_HOJAS', 'true').lower() == 'true'
+CACHE_HOJAS_DIR = os.path.join(LOCAL_DATA_DIR, 'cache_hojas')
+
+# Las visitas/likes diarias se guardan en formato largo (hoja/tabla Observaciones).
+# Data_Historico solo publica las columnas Visitas_/Likes_ de los ultimos N dias (0 = todas)
+VENTANA_DIAS_HISTORICO = int(os.getenv('MOTICK_VENTANA_DIAS', '30')) or None
+
+# Archivo de snapshots SCR: las hojas 'SCR dd/mm/yy' con mas de N dias se mueven a
+# Parquet/zstd particionado por fecha (archivo_scr_motick.py)
+ARCHIVO_SCR_DIR = os.path.join(LOCAL_DATA_DIR, 'archivo_scr')
+DIAS_RETENCION_SCR = int(os.getenv('MOTICK_RETENCION_SCR', '14'))
+
+# Compactacion: motos vendidas hace mas de N dias salen de Data_Historico al archivo
+# frio (hoja Archivo_Vendidas o Parquet local). 0 = desactivado
+DIAS_COMPACTAR_VENDIDAS = int(os.getenv('MOTICK_DIAS_VENDIDAS', '30'))
+
+# Estado incremental del analizador: copia local del ultimo historico escrito (columnas
+# basicas + observaciones de la ventana). Si sigue valido no se descarga el historico
+USAR_ESTADO_ANALISIS = os.getenv('MOTICK_ESTADO', 'true').lower() == 'true'
+ESTADO_ANALISIS_DIR = os.path.join(LOCAL_DATA_DIR, 'estado')
+
+# Escrituras independientes del final del analisis (SCR, observaciones, archivo,
+# metricas...) que se lanzan a la vez (1 = en serie como antes)
+ESCRITURAS_PARALELAS = max(1, int(os.getenv('MOTICK_ESCRITURAS_PARALELAS', '4')))
+
+# Stream NDJSON del scraper (stream_motick.py): cada anuncio se emite al extraerlo.
+# Ruta a archivo/FIFO, unix:/ruta/socket o tcp:host:puerto ('' = desactivado)
+STREAM_SCRAPER = os.getenv('MOTICK_STREAM', '')
+
+# Resultados parciales de scraper_motick.py --shard i/N (los une --merge)
+SHARDS_DIR = os.getenv('MOTICK_SHARDS_DIR', os.path.join(LOCAL_DATA_DIR, 'shards'))
+
+# Cola de tareas (cola_motick.py) para scrapear con varios trabajadores:
+# scraper_motick.py --encolar / --trabajador / --recoger
+COLA_DB = os.getenv('MOTICK_COLA_DB', os.path.join(LOCAL_DATA_DIR, 'cola', 'cola_tareas.sqlite'))
+
+# Registro de cuentas (registro_cuentas_motick.py): cuentas, prioridad, ttl y medidas
+# por cuenta que actualiza el scraper. Si no existe se crea con las cuentas de abajo
+REGISTRO_CUENTAS = os.getenv('MOTICK_REGISTRO_CUENTAS', os.path.join(LOCAL_DATA_DIR, 'cuentas_motick.json'))
+
+# Estadisticas de selectores (selectores_motick.py): aciertos de cada selector por campo
+# entre ejecuciones; con ADAPTAR_SELECTORES los extractores prueban primero los mejores
+ESTADISTICAS_SELECTORES = os.getenv('MOTICK_ESTADISTICAS_SELECTORES', os.path.join(LOCAL_DATA_DIR, 'selectores_motick.json'))
+ADAPTAR_SELECTORES = os.getenv('MOTICK_ADAPTAR_SELECTORES', 'true').lower() == 'true'
+
+# Verificacion de ventas (verificacion_motick.py): las URLs que faltan en el scrape
+# solo se marcan vendidas si una peticion HTTP confirma que el anuncio ya no esta
+VERIFICAR_VENDIDAS = os.getenv('MOTICK_VERIFICAR_VENDIDAS', 'true').lower() == 'true'
+HILOS_VERIFICACION = int(os.getenv('MOTICK_HILOS_VERIFICACION', '4'))
+
+# LISTA DE USER AGENTS PARA ROTAR (scraper y verificacion de ventas)
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0"
+]
+
 # Para testing rapido - Solo 2 cuentas
 MOTICK_ACCOUNTS_TEST = {
     "MOTICK.MA M.": "https://es.wallapop.com/user/motick-432763398",
@@ -0,0 +1,76 @@
+"""
+Esquema tipado Motick - Precio, km, ano y fechas como tipos nativos
+El scraper produce textos de presentacion ("5.000 €", "12.500 km", "2020",
+"No especificado", "01/09/2025"). Al entrar en el analizador se convierten
+UNA vez a tipos nativos:
+- Precio, Kilometraje, Ano, Cilindrada: Int64 (pd.NA = no especificado)
+- Primera_Deteccion, Fecha_Venta: datetime64 (NaT = sin fecha)
+Ordenar y filtrar trabaja sobre esos tipos. Los textos de presentacion solo se
+generan al publicar en Google Sheets (formatear_para_publicar)
+Las funciones son idempotentes: tipar un DataFrame ya tipado no cambia nada
+"""
+
+import numpy as np
+import pandas as pd
+
+VALOR_NO_ESPECIFICADO = 'No especificado'
+FORMATO_FECHA = "%d/%m/%Y"
+
+COLUMNAS_ENTERAS = ['Precio', 'Kilometraje', 'Ano', 'Cilindrada']
+COLUMNAS_FECHA = ['Primera_Deteccion', 'Fecha_Venta']
+
+# Primer numero del texto con separador de miles opcional: "12.500 km", "5,000 €", "2020"
+PATRON_NUMERO = r'(\d{1,3}(?:[.,]\d{3})+|\d+)'
+
+def parsear_entero(serie):
+    """Texto de presentacion o numero -> Int64 (pd.NA si no hay numero)"""
+    if pd.api.types.is_integer_dtype(serie.dtype):
+        return serie.astype('Int64')
+    if pd.api.types.is_float_dtype(serie.dtype):
+        return serie.round().astype('Int64')
+
+    texto = serie.astype('string')
+    numeros = texto.str.extract(PATRON_NUMERO, expand=False).str.replace(r'[.,]', '', regex=True)
+    return pd.to_numeric(numeros, errors='coerce').astype('Int64')
+
+def parsear_fecha(serie):
+    """dd/mm/yyyy (o datetime) -> datetime64 (NaT si vacia o invalida)"""
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return serie
+    return pd.to_datetime(serie.astype('string'), format=FORMATO_FECHA, errors='coerce')
+
+def tipar_dataframe(df):
+    """Aplica el esquema a las columnas presentes (devuelve copia)"""
+    df = df.copy()
+    for col in COLUMNAS_ENTERAS:
+        if col in df.columns:
+            df[col] = parsear_entero(df[col])
+    for col in COLUMNAS_FECHA:
+        if col in df.columns:
+            df[col] = parsear_fecha(df[col])
+    return df
+
+def formatear_miles(serie, sufijo):
+    """Int64 -> '12.500 km' / '5.000 €' (sentinela si NA)"""
+    valores = serie.to_numpy(dtype=object, na_value=None)
+    return np.array([
+        VALOR_NO_ESPECIFICADO if v is None else f"{int(v):,}{sufijo}".replace(',', '.')
+        for v in valores
+    ], dtype=object)
+
+def formatear_para_publicar(df):
+    """
+    Textos de presentacion como los que producia el scraper (devuelve copia)
+    Solo convierte columnas ya tipadas; el resto se publica tal cual
+    """
+    df = df.copy()
+    if 'Precio' in df.columns and pd.api.types.is_integer_dtype(df['Precio'].dtype):
+        df['Precio'] = formatear_miles(df['Precio'], ' €')
+    if 'Kilometraje' in df.columns and pd.api.types.is_integer_dtype(df['Kilometraje'].dtype):
+        df['Kilometraje'] = formatear_miles(df['Kilometraje'], ' km')
+    if 'Ano' in df.columns and pd.api.types.is_integer_dtype(df['Ano'].dtype):
+        df['Ano'] = df['Ano'].astype('string').fillna(VALOR_NO_ESPECIFICADO).astype(object)
+    for col in COLUMNAS_FECHA:
+        if col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col].dtype):
+            df[col] = df[col].dt.strftime(FORMATO_FECHA).fillna('').astype(object)
+    return df
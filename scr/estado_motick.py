@@ -0,0 +1,130 @@
+"""
+Estado incremental del analizador Motick
+Copia local compacta del ultimo historico escrito:
+- base.parquet: columnas basicas por moto (URL, Estado, Primera_Deteccion, totales...)
+- matriz/: visitas y likes diarios como matriz numerica memory-mapped (matriz_motick.py),
+  actualizada en su sitio con las observaciones de cada ejecucion
+- estado.json: fecha procesada, orden de columnas y marca de la escritura
+Con el estado valido el diff diario corre con el estado + la SCR nueva y el
+historico solo se toca para escribir
+
+Validez: cada escritura del analizador deja una marca aleatoria en el almacenamiento
+(Estado_Analisis / tabla meta) y la misma marca en estado.json. Si no coinciden
+(otra maquina, cache antigua, escritura a medias) se lee el historico completo
+"""
+
+import os
+import json
+import uuid
+import pandas as pd
+from datetime import datetime
+
+from config import ESTADO_ANALISIS_DIR
+from series_motick import columnas_por_fecha, crear_url_id
+from matriz_motick import MatrizSeriesMotick
+
+class EstadoAnalisisMotick:
+    def __init__(self, directorio=ESTADO_ANALISIS_DIR):
+        self.directorio = directorio
+        self.ruta_base = os.path.join(directorio, 'base.parquet')
+        self.ruta_meta = os.path.join(directorio, 'estado.json')
+        self.matriz = MatrizSeriesMotick(os.path.join(directorio, 'matriz'))
+        self.cargado = False
+
+    @staticmethod
+    def nueva_marca(fecha_display):
+        """Marca unica por escritura: fecha + aleatorio"""
+        return f"{fecha_display} {uuid.uuid4().hex[:12]}"
+
+    def cargar_meta(self):
+        """estado.json o None si no existe o esta corrupto"""
+        try:
+            with open(self.ruta_meta, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def cargar(self, marca_almacen):
+        """
+        Devuelve (df_historico, df_observaciones) si el estado corresponde a la marca
+        del almacenamiento; None si no hay estado o no es valido
+        """
+        self.cargado = False
+        meta = self.cargar_meta()
+        if meta is None:
+            print("ESTADO: No hay estado local - se lee el historico completo")
+            return None
+        if not marca_almacen or meta.get('marca') != marca_almacen:
+            print("ESTADO: Estado local desactualizado respecto al almacenamiento - se lee el historico completo")
+            return None
+
+        try:
+            df_base = pd.read_parquet(self.ruta_base)
+            self.matriz.cargar()
+            fechas = [fecha.strftime("%d/%m/%Y") for fecha in columnas_por_fecha(pd.DataFrame(columns=meta['columnas']))]
+            vista = self.matriz.vista_wide(crear_url_id(df_base['URL']).to_numpy(), fechas, df_base.index)
+            df_historico = pd.concat([df_base, vista], axis=1).reindex(columns=meta['columnas'])
+
+            # Serie de las fechas publicadas + el ultimo dia observado (para completar_fecha_anterior)
+            fechas_iso = {datetime.strptime(fecha, "%d/%m/%Y").strftime("%Y-%m-%d") for fecha in fechas}
+            if len(self.matriz.fechas):
+                fechas_iso.add(self.matriz.fechas.max())
+            df_observaciones = self.matriz.a_observaciones(sorted(fechas_iso))
+
+            self.cargado = True
+            dias, motos = self.matriz.forma
+            print(f"ESTADO: {len(df_historico):,} motos reconstruidas en local (procesado hasta {meta['fecha']}, "
+                  f"matriz {dias}x{motos})")
+            return df_historico, df_observaciones
+
+        except Exception as e:
+            print(f"AVISO ESTADO: No se pudo cargar el estado local: {str(e)}")
+            return None
+
+    def guardar(self, df_historico, df_observaciones, fecha_display, marca):
+        """
+        Guarda el historico escrito como base + matriz de visitas/likes
+        Si el estado no venia de cargar() (lectura completa) la matriz se reconstruye
+        con la serie leida; si no, solo se escriben las observaciones de la ejecucion
+        La meta (con la marca) se escribe la ultima: un fallo deja el estado invalido
+        """
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            fechas = columnas_por_fecha(df_historico)
+            columnas_fecha = [col for par in fechas.values() for col in par if col is not None]
+            df_base = df_historico.drop(columns=columnas_fecha)
+
+            if os.path.exists(self.ruta_meta):
+                os.remove(self.ruta_meta)
+            self.escribir_parquet(df_base, self.ruta_base)
+            if not self.cargado:
+                self.matriz.reiniciar()
+            self.matriz.actualizar(df_observaciones)
+
+            meta = {
+                'marca': marca,
+                'fecha': fecha_display,
+                'columnas': [str(col) for col in df_historico.columns],
+                'motos': len(df_base),
+                'matriz': list(self.matriz.forma),
+                'guardado_en': datetime.now().isoformat(timespec='seconds')
+            }
+            ruta_tmp = self.ruta_meta + '.tmp'
+            with open(ruta_tmp, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+            os.replace(ruta_tmp, self.ruta_meta)
+
+            dias, motos = self.matriz.forma
+            print(f"ESTADO: Guardado ({len(df_base):,} motos, matriz {dias}x{motos}, "
+                  f"{self.matriz.memoria_bytes() / 1e6:.1f} MB)")
+            return True
+
+        except Exception as e:
+            print(f"AVISO ESTADO: No se pudo guardar el estado local: {str(e)}")
+            return False
+
+    def escribir_parquet(self, df, ruta):
+        """Escritura atomica: tmp + replace"""
+        ruta_tmp = ruta + '.tmp'
+        df.to_parquet(ruta_tmp, index=False)
+        os.replace(ruta_tmp, ruta)
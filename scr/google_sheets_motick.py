@@ -6,19 +6,222 @@ ARREGLO DEFINITIVO: Elimina error NAType not JSON serializable
 import gspread
 from google.oauth2.service_account import Credentials
 import pandas as pd
+import numpy as np
+import io
 import json
 import os
-import time
-import hashlib
-import re
 from datetime import datetime
 
-class GoogleSheetsMotick:
-    def __init__(self, credentials_json_string=None, sheet_id=None, credentials_file=None):
+from config import USAR_CACHE_HOJAS, GOOGLE_SHEET_ID_MOTICK, LOCAL_CREDENTIALS_FILE
+from cache_hojas_motick import CacheHojasMotick
+from almacenamiento_motick import AlmacenamientoMotick
+from series_motick import COLUMNAS_OBSERVACIONES
+from compactacion_motick import COLUMNAS_ARCHIVO_VENDIDAS
+from esquema_motick import tipar_dataframe, formatear_para_publicar
+from ids_motick import asegurar_ids
+from precios_motick import COLUMNAS_CAMBIOS_PRECIO
+
+# pyarrow es opcional: si no esta instalado se parsea con el motor C de pandas
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.compute as pa_compute
+except ImportError:
+    pa = None
+
+def serializar_columna_para_sheets(serie):
+    """
+    Convierte una columna a lista de valores JSON-safe para Google Sheets
+    - Enteros (numpy o nullable) se mantienen como numeros
+    - Floats sin decimales se emiten como enteros
+    - pd.NA, NaN, None y NaT se emiten como string vacio
+    """
+    dtype = serie.dtype
+
+    if pd.api.types.is_bool_dtype(dtype) and isinstance(dtype, np.dtype):
+        return serie.to_numpy().tolist()
+
+    if pd.api.types.is_integer_dtype(dtype):
+        if isinstance(dtype, np.dtype):
+            return serie.to_numpy().tolist()
+        # Int64 nullable: enteros python + '' en los huecos
+        nulos = serie.isna().to_numpy()
+        valores = serie.to_numpy(dtype='int64', na_value=0).astype(object)
+        valores[nulos] = ''
+        return valores.tolist()
+
+    if pd.api.types.is_float_dtype(dtype):
+        flotantes = serie.to_numpy(dtype='float64', na_value=np.nan)
+        nulos = ~np.isfinite(flotantes)
+        validos = flotantes[~nulos]
+        if np.all(validos == np.floor(validos)):
+            valores = np.where(nulos, 0, flotantes).astype('int64').astype(object)
+        else:
+            valores = flotantes.astype(object)
+        valores[nulos] = ''
+        return valores.tolist()
+
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return serie.dt.strftime('%d/%m/%Y').fillna('').tolist()
+
+    # Object/string: marcar nulos de una vez y solo convertir escalares numpy si los hay
+    valores = serie.to_numpy(dtype=object, copy=True)
+    valores[pd.isna(valores)] = ''
+    if pd.api.types.infer_dtype(valores, skipna=False) not in ('string', 'empty'):
+        return [v.item() if isinstance(v, np.generic) else v for v in valores]
+    return valores.tolist()
+
+def serializar_dataframe_para_sheets(df):
+    """
+    FUNCION CRITICA: Serializa DataFrame a [headers] + filas para worksheet.update
+    Una sola pasada por columna sobre los arrays, sin DataFrames intermedios
+    Mantiene visitas/likes como numeros (antes todo se subia como texto)
+    """
+    headers = [str(col) for col in df.columns]
+    columnas = [serializar_columna_para_sheets(df[col]) for col in df.columns]
+    filas = [list(fila) for fila in zip(*columnas)]
+
+    print(f"SERIALIZADO: {len(filas)} filas x {len(headers)} columnas para Google Sheets")
+    return [headers] + filas
+
+def es_columna_numerica(nombre_columna):
+    """
+    Esquema de nombres conocido: Visitas/Likes del scraper, Visitas_*/Likes_*
+    del historico (por fecha y totales), Variacion_Likes y los precios de
+    Cambios_Precio son enteros
+    """
+    return (
+        nombre_columna in ('Visitas', 'Likes', 'Variacion_Likes', 'Precio_Anterior', 'Precio_Nuevo')
+        or nombre_columna.startswith('Visitas_')
+        or nombre_columna.startswith('Likes_')
+    )
+
+def coercer_numericas(df, numericas):
+    """
+    Texto -> int64 como valores_a_dataframe: lo que no es numero (celda vacia,
+    '1.2k' editado a mano) queda en 0 y los decimales se truncan
+    """
+    for col in numericas:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int64')
+    return df
+
+def leer_csv_tipado(contenido_csv):
+    """
+    Parsea el CSV exportado de una hoja con pyarrow (o motor C de pandas si no esta)
+    Los dtypes se declaran antes de parsear a partir del nombre de columna:
+    - Numericas: float64 nullable -> int64, celda vacia = 0 (como to_numeric + fillna(0))
+    - Resto: texto tal cual (celda vacia = '', igual que get_all_values)
+    Si una celda numerica no es un numero se reparsea el mismo contenido como
+    texto y se coerce, sin volver a descargar la hoja
+    """
+    columnas = pd.read_csv(io.BytesIO(contenido_csv), nrows=0).columns
+    numericas = [col for col in columnas if es_columna_numerica(col)]
+
+    if pa is not None:
+        try:
+            tabla = pa_csv.read_csv(
+                pa.py_buffer(contenido_csv),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={col: (pa.float64() if col in numericas else pa.string()) for col in columnas},
+                    null_values=[''],
+                    strings_can_be_null=False
+                )
+            )
+        except pa.ArrowInvalid:
+            tabla = pa_csv.read_csv(
+                pa.py_buffer(contenido_csv),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={col: pa.string() for col in columnas},
+                    strings_can_be_null=False
+                )
+            )
+            df = coercer_numericas(tabla.to_pandas(split_blocks=True, self_destruct=True), numericas)
+            del tabla
+            return df.loc[:, df.columns != '']
+
+        # fill_null + cast columna a columna liberando la original para no duplicar el bloque
+        nombres = tabla.column_names
+        arrays = []
+        for i, nombre in enumerate(nombres):
+            columna = tabla.column(i)
+            if nombre in numericas:
+                columna = pa_compute.cast(pa_compute.fill_null(columna, 0), pa.int64(), safe=False)
+            arrays.append(columna)
+        del tabla, columna
+        tabla_tipada = pa.Table.from_arrays(arrays, names=nombres)
+        del arrays
+        df = tabla_tipada.to_pandas(split_blocks=True, self_destruct=True)
+        del tabla_tipada
+        # Columnas sin header (rango exportado mas ancho que los datos)
+        return df.loc[:, df.columns != '']
+
+    df = pd.read_csv(
+        io.BytesIO(contenido_csv),
+        dtype=str,
+        keep_default_na=False
+    )
+
+    # Columnas sin header (rango exportado mas ancho que los datos)
+    df = df.loc[:, ~df.columns.str.startswith('Unnamed: ')]
+
+    return coercer_numericas(df, [col for col in numericas if col in df.columns])
+
+def valores_a_dataframe(valores):
+    """
+    [headers] + filas de texto (get_all_values / values_batch_get) -> DataFrame tipado
+    values_batch_get recorta las celdas vacias al final de cada fila: se rellenan con ''
+    """
+    if not valores:
+        return None
+
+    headers = valores[0]
+    ancho = len(headers)
+    filas = [fila[:ancho] + [''] * (ancho - len(fila)) for fila in valores[1:]]
+
+    df = pd.DataFrame(filas, columns=headers)
+    for col in df.columns:
+        if es_columna_numerica(col):
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+    return df
+
+def parsear_fecha_hoja_scr(titulo):
+    """
+    'SCR 05/09/25' -> datetime(2025, 9, 5). None si el titulo no es una hoja SCR
+    Anos de 2 digitos: 00-30 = 2000-2030, 31-99 = 1931-1999
+    """
+    if not titulo.startswith('SCR '):
+        return None
+    try:
+        dia, mes, ano = titulo[4:].split('/')
+        siglo = '20' if int(ano) <= 30 else '19'
+        return datetime.strptime(f"{dia}/{mes}/{siglo}{ano}", "%d/%m/%Y")
+    except ValueError:
+        return None
+
+def seleccionar_hoja_scr_reciente(titulos):
+    """
+    Una pasada sobre los titulos: (titulo, fecha_obj, 'dd/mm/yyyy') de la SCR mas reciente o None
+    Con el archivador (archivo_scr_motick.py) solo quedan en el Sheet los ultimos dias
+    """
+    reciente = None
+    for titulo in titulos:
+        fecha_obj = parsear_fecha_hoja_scr(titulo)
+        if fecha_obj is not None and (reciente is None or fecha_obj > reciente[1]):
+            reciente = (titulo, fecha_obj)
+    if reciente is None:
+        return None
+    return reciente[0], reciente[1], reciente[1].strftime("%d/%m/%Y")
+
+class GoogleSheetsMotick(AlmacenamientoMotick):
+    def __init__(self, credentials_json_string=None, sheet_id=None, credentials_file=None, client=None, cache=None):
         """
         Inicializar handler con credenciales
+        client: cliente gspread ya autorizado (o stub para tests sin red)
+        cache: CacheHojasMotick a usar (por defecto segun MOTICK_CACHE_HOJAS)
         """
-        if credentials_json_string:
+        if client is not None:
+            self.credentials = None
+        elif credentials_json_string:
             # Para GitHub Actions - desde string JSON
             credentials_dict = json.loads(credentials_json_string)
             self.credentials = Credentials.from_service_account_info(
@@ -40,9 +243,16 @@ class GoogleSheetsMotick:
         else:
             raise Exception("Se necesitan credenciales validas (JSON string o archivo)")
         
-        self.client = gspread.authorize(self.credentials)
+        self.client = client if client is not None else gspread.authorize(self.credentials)
         self.sheet_id = sheet_id
         
+        self.cache = cache
+        if self.cache is None and USAR_CACHE_HOJAS:
+            try:
+                self.cache = CacheHojasMotick()
+            except Exception as e:
+                print(f"AVISO CACHE: Cache local desactivada: {str(e)}")
+        
         print("CONEXION: Google Sheets establecida correctamente")
         
     def test_connection(self):
@@ -57,73 +267,31 @@ class GoogleSheetsMotick:
             print(f"SHEET_ID PROBLEMATICO: {self.sheet_id}")
             return False
     
-    def crear_id_unico_real(self, fila):
+    def obtener_revision(self):
         """
-        Crea ID unico basado en: URL + cuenta + titulo + precio + km
+        Revision actual del Sheet (modifiedTime de los metadatos de Drive)
+        Cualquier escritura en cualquier hoja la cambia. None si no se puede obtener
         """
         try:
-            url = str(fila.get('URL', '')).strip()
-            cuenta = str(fila.get('Cuenta', '')).strip()
-            titulo = str(fila.get('Titulo', '')).strip()
-            precio = str(fila.get('Precio', '')).strip()
-            km = str(fila.get('Kilometraje', '')).strip()
-            
-            titulo_limpio = re.sub(r'[^\w\s]', '', titulo.lower())[:30]
-            km_limpio = re.sub(r'[^\d]', '', km)
-            precio_limpio = re.sub(r'[^\d]', '', precio)
-            
-            clave_unica = f"{url}_{cuenta}_{titulo_limpio}_{precio_limpio}_{km_limpio}"
-            
-            return hashlib.md5(clave_unica.encode()).hexdigest()[:12]
-            
+            metadata = self.client.get_file_drive_metadata(self.sheet_id)
+            return metadata.get('modifiedTime')
         except Exception as e:
-            url_safe = str(fila.get('URL', str(time.time())))
-            return hashlib.md5(f"{url_safe}_{time.time()}".encode()).hexdigest()[:12]
-    
-    def limpiar_dataframe_para_sheets(self, df):
-        """
-        FUNCION CRITICA: Limpia DataFrame para Google Sheets
-        Elimina pd.NA, NaN, None y los convierte a strings vacios
-        """
-        try:
-            # Crear copia para no modificar original
-            df_clean = df.copy()
-            
-            # Reemplazar pd.NA y NaN con strings vacios
-            df_clean = df_clean.fillna('')
-            
-            # Reemplazar cualquier pd.NA que quede
-            df_clean = df_clean.replace({pd.NA: ''})
-            
-            # Convertir None a strings vacios
-            df_clean = df_clean.replace({None: ''})
-            
-            # Asegurar que todo es serializable
-            for col in df_clean.columns:
-                df_clean[col] = df_clean[col].astype(str)
-                # Reemplazar 'nan', '<NA>', 'None' strings
-                df_clean[col] = df_clean[col].replace({'nan': '', '<NA>': '', 'None': ''})
-            
-            print(f"LIMPIEZA: DataFrame limpiado para Google Sheets - {len(df_clean)} filas")
-            return df_clean
-            
-        except Exception as e:
-            print(f"ERROR EN LIMPIEZA: {str(e)}")
-            return df
+            print(f"AVISO: No se pudo obtener revision del Sheet: {str(e)}")
+            return None
     
     def subir_datos_scraper(self, df_motos, fecha_extraccion=None):
         """
-        Sube datos del scraper con limpieza de NA values
+        Sube datos del scraper serializados sin NA values
         """
         try:
             if fecha_extraccion is None:
                 fecha_extraccion = datetime.now().strftime("%d/%m/%Y")
             
             # Crear ID_Unico_Real para cada moto
-            df_motos['ID_Unico_Real'] = df_motos.apply(self.crear_id_unico_real, axis=1)
+            df_motos['ID_Unico_Real'] = asegurar_ids(df_motos)
             
-            # LIMPIAR DATAFRAME ANTES DE SUBIR
-            df_motos_clean = self.limpiar_dataframe_para_sheets(df_motos)
+            # SERIALIZAR DATAFRAME ANTES DE SUBIR (sin NA, numeros como numeros)
+            all_data = serializar_dataframe_para_sheets(df_motos)
             
             # Nombre de hoja basado en fecha
             fecha_para_hoja = datetime.strptime(fecha_extraccion, "%d/%m/%Y").strftime("%d/%m/%y")
@@ -143,21 +311,16 @@ class GoogleSheetsMotick:
             except gspread.WorksheetNotFound:
                 worksheet = spreadsheet.add_worksheet(
                     title=sheet_name,
-                    rows=len(df_motos_clean) + 10,
-                    cols=len(df_motos_clean.columns) + 2
+                    rows=len(df_motos) + 10,
+                    cols=len(df_motos.columns) + 2
                 )
                 print(f"CREANDO: Nueva hoja {sheet_name}")
             
-            # Preparar datos para subir (YA LIMPIADOS)
-            headers = df_motos_clean.columns.values.tolist()
-            data_rows = df_motos_clean.values.tolist()
-            all_data = [headers] + data_rows
-            
-            # Subir datos
+            # Subir datos (YA SERIALIZADOS)
             worksheet.update(all_data)
             
             print(f"SUBIDA EXITOSA: {sheet_name}")
-            print(f"DATOS: {len(df_motos_clean)} filas x {len(df_motos_clean.columns)} columnas")
+            print(f"DATOS: {len(df_motos)} filas x {len(df_motos.columns)} columnas")
             print(f"URL: https://docs.google.com/spreadsheets/d/{self.sheet_id}")
             
             return True, sheet_name
@@ -168,37 +331,62 @@ class GoogleSheetsMotick:
             traceback.print_exc()
             return False, None
     
+    def exportar_hoja_csv(self, worksheet):
+        """
+        Descarga la hoja completa como CSV en una sola peticion (endpoint export)
+        """
+        url_export = f"https://docs.google.com/spreadsheets/d/{self.sheet_id}/export"
+        respuesta = self.client.http_client.request(
+            "get", url_export, params={"format": "csv", "gid": worksheet.id}
+        )
+        return respuesta.content
+    
+    def leer_hoja_como_dataframe(self, worksheet):
+        """
+        Lee una hoja completa como DataFrame con columnas numericas ya tipadas
+        Ruta rapida: export CSV + parseo tipado. Fallback: get_all_values()
+        Devuelve None si la hoja esta vacia
+        """
+        try:
+            contenido_csv = self.exportar_hoja_csv(worksheet)
+            if not contenido_csv.strip():
+                return None
+            df = leer_csv_tipado(contenido_csv)
+            print(f"LEIDO CSV: {worksheet.title} ({len(contenido_csv) / 1024:.0f} KB)")
+            return df
+            
+        except Exception as e:
+            print(f"AVISO: Export CSV fallido para {worksheet.title} ({str(e)}), usando get_all_values")
+        
+        return valores_a_dataframe(worksheet.get_all_values())
+    
     def leer_datos_historico(self, sheet_name="Data_Historico"):
         """
         Lee datos del historico desde Google Sheets
         """
         try:
+            revision = self.obtener_revision() if self.cache else None
+            df = self.cache.leer(sheet_name, revision) if self.cache else None
+            if df is not None and not df.empty:
+                print(f"LEIDO: {len(df)} motos del historico desde cache local")
+                return df
+            
             spreadsheet = self.client.open_by_key(self.sheet_id)
             
             try:
                 worksheet = spreadsheet.worksheet(sheet_name)
-                data = worksheet.get_all_values()
+                df = self.leer_hoja_como_dataframe(worksheet)
                 
-                if not data:
+                if df is None:
                     print(f"AVISO: Hoja {sheet_name} esta vacia")
                     return None
                 
-                headers = data[0]
-                rows = data[1:]
-                
-                if not rows:
+                if df.empty:
                     print(f"AVISO: Hoja {sheet_name} solo tiene headers")
                     return None
                 
-                df = pd.DataFrame(rows, columns=headers)
-                
-                # Limpiar columnas numericas
-                columnas_visitas = [col for col in df.columns if col.startswith('Visitas_')]
-                columnas_likes = [col for col in df.columns if col.startswith('Likes_')]
-                
-                for col in columnas_visitas + columnas_likes + ['Variacion_Likes']:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+                if self.cache:
+                    self.cache.guardar(sheet_name, revision, df)
                 
                 print(f"LEIDO: {len(df)} motos del historico desde {sheet_name}")
                 return df
@@ -211,90 +399,302 @@ class GoogleSheetsMotick:
             print(f"ERROR LECTURA HISTORICO: {str(e)}")
             return None
     
-    def leer_datos_scraper_reciente(self):
+    def leer_observaciones(self, sheet_name="Observaciones"):
         """
-        Lee los datos mas recientes del scraper desde hojas SCR
+        Lee la serie larga (URL_ID, Fecha, Visitas, Likes) de la hoja Observaciones
+        Si un dia se reejecuto hay filas repetidas: gana la ultima anadida
+        None si la hoja no existe o esta vacia; False si la lectura falla (error de la API)
+        """
+        try:
+            revision = self.obtener_revision() if self.cache else None
+            df = self.cache.leer(sheet_name, revision) if self.cache else None
+
+            if df is None:
+                spreadsheet = self.client.open_by_key(self.sheet_id)
+                try:
+                    worksheet = spreadsheet.worksheet(sheet_name)
+                except gspread.WorksheetNotFound:
+                    print(f"AVISO: Hoja {sheet_name} no existe - sera creada al guardar")
+                    return None
+
+                df = self.leer_hoja_como_dataframe(worksheet)
+                if df is None or df.empty:
+                    return None
+
+                if self.cache:
+                    self.cache.guardar(sheet_name, revision, df)
+
+            df = df.drop_duplicates(['URL_ID', 'Fecha'], keep='last').reset_index(drop=True)
+            print(f"LEIDO: {len(df):,} observaciones desde {sheet_name}")
+            return df
+
+        except Exception as e:
+            print(f"ERROR LECTURA OBSERVACIONES: {str(e)}")
+            return False
+
+    def guardar_observaciones(self, df_observaciones, sheet_name="Observaciones"):
+        """
+        Anade las observaciones al final de la hoja (append, sin reescribir lo anterior)
         """
         try:
             spreadsheet = self.client.open_by_key(self.sheet_id)
-            hojas_disponibles = [worksheet.title for worksheet in spreadsheet.worksheets()]
-            
-            print(f"DEBUG: Hojas disponibles: {hojas_disponibles}")
-            
-            # Buscar hojas SCR con manejo robusto de errores
-            hojas_scr = []
-            for hoja in hojas_disponibles:
-                if hoja.startswith('SCR '):
-                    print(f"DEBUG: Procesando hoja: {hoja}")
-                    try:
-                        fecha_parte = hoja[4:]  # "05/09/25"
-                        print(f"DEBUG: Fecha extraida: '{fecha_parte}'")
-                        
-                        partes = fecha_parte.split('/')
-                        print(f"DEBUG: Partes fecha: {partes}")
-                        
-                        if len(partes) == 3:
-                            dia, mes, ano = partes
-                            print(f"DEBUG: Parseando - Dia:{dia} Mes:{mes} Ano:{ano}")
-                            
-                            # Convertir ano de 2 digitos a 4 digitos
-                            ano_int = int(ano)
-                            if ano_int <= 30:  # 00-30 = 2000-2030
-                                ano_completo = f"20{ano}"
-                            else:  # 31-99 = 1931-1999
-                                ano_completo = f"19{ano}"
-                            
-                            fecha_str = f"{dia}/{mes}/{ano_completo}"
-                            print(f"DEBUG: Fecha completa: {fecha_str}")
-                            
-                            fecha_obj = datetime.strptime(fecha_str, "%d/%m/%Y")
-                            hojas_scr.append((hoja, fecha_obj, fecha_str))
-                            print(f"SCR detectada exitosamente: {hoja} -> {fecha_str}")
-                        else:
-                            print(f"DEBUG: Formato incorrecto, partes != 3: {len(partes)}")
-                            
-                    except Exception as e:
-                        print(f"DEBUG: Error procesando {hoja}: {str(e)}")
-                        continue
-                else:
-                    print(f"DEBUG: Ignorando hoja (no es SCR): {hoja}")
-            
-            print(f"DEBUG: Total hojas SCR encontradas: {len(hojas_scr)}")
-            
-            if not hojas_scr:
-                print("ERROR: No se encontraron hojas SCR validas")
-                print(f"DEBUG: Se buscaron hojas que empiecen con 'SCR ' en: {hojas_disponibles}")
-                return None, None
+
+            try:
+                worksheet = spreadsheet.worksheet(sheet_name)
+            except gspread.WorksheetNotFound:
+                worksheet = spreadsheet.add_worksheet(
+                    title=sheet_name,
+                    rows=len(df_observaciones) + 10,
+                    cols=len(COLUMNAS_OBSERVACIONES)
+                )
+                worksheet.update([COLUMNAS_OBSERVACIONES])
+                print(f"CREANDO: Nueva hoja {sheet_name}")
+
+            filas = serializar_dataframe_para_sheets(df_observaciones[COLUMNAS_OBSERVACIONES])[1:]
+            # RAW: fechas ISO y URL_ID se quedan como texto (Sheets no los reinterpreta)
+            worksheet.append_rows(filas, value_input_option='RAW')
+
+            print(f"EXITO: {len(filas):,} observaciones anadidas a {sheet_name}")
+            return True
+
+        except Exception as e:
+            print(f"ERROR GUARDANDO OBSERVACIONES: {str(e)}")
+            return False
+
+    def leer_cambios_precio(self, sheet_name="Cambios_Precio"):
+        """
+        Lee el registro de cambios de precio de la hoja Cambios_Precio
+        Si un dia se reejecuto hay filas repetidas: gana la ultima anadida
+        """
+        try:
+            spreadsheet = self.client.open_by_key(self.sheet_id)
+            try:
+                worksheet = spreadsheet.worksheet(sheet_name)
+            except gspread.WorksheetNotFound:
+                return None
             
-            # Tomar la mas reciente
-            hojas_scr.sort(key=lambda x: x[1], reverse=True)
-            hoja_reciente = hojas_scr[0]
+            df = self.leer_hoja_como_dataframe(worksheet)
+            if df is None or df.empty:
+                return None
             
-            print(f"DEBUG: Hoja mas reciente seleccionada: {hoja_reciente[0]} ({hoja_reciente[2]})")
+            df = df.drop_duplicates(['URL_ID', 'Fecha'], keep='last').reset_index(drop=True)
+            print(f"LEIDO: {len(df):,} cambios de precio desde {sheet_name}")
+            return df
             
-            # Leer datos de la hoja mas reciente
-            worksheet = spreadsheet.worksheet(hoja_reciente[0])
-            data = worksheet.get_all_values()
+        except Exception as e:
+            print(f"ERROR LECTURA CAMBIOS PRECIO: {str(e)}")
+            return None
+    
+    def guardar_cambios_precio(self, df_cambios, sheet_name="Cambios_Precio"):
+        """Anade los cambios de precio al final de la hoja (append, sin reescribir lo anterior)"""
+        try:
+            spreadsheet = self.client.open_by_key(self.sheet_id)
             
-            print(f"DEBUG: Datos brutos obtenidos: {len(data)} filas")
+            try:
+                worksheet = spreadsheet.worksheet(sheet_name)
+            except gspread.WorksheetNotFound:
+                worksheet = spreadsheet.add_worksheet(
+                    title=sheet_name,
+                    rows=len(df_cambios) + 10,
+                    cols=len(COLUMNAS_CAMBIOS_PRECIO)
+                )
+                worksheet.update([COLUMNAS_CAMBIOS_PRECIO])
+                print(f"CREANDO: Nueva hoja {sheet_name}")
+            
+            filas = serializar_dataframe_para_sheets(df_cambios[COLUMNAS_CAMBIOS_PRECIO])[1:]
+            worksheet.append_rows(filas, value_input_option='RAW')
+            
+            print(f"EXITO: {len(filas):,} cambios de precio anadidos a {sheet_name}")
+            return True
+            
+        except Exception as e:
+            print(f"ERROR GUARDANDO CAMBIOS PRECIO: {str(e)}")
+            return False
+    
+    def leer_vendidas_archivadas(self, sheet_name="Archivo_Vendidas"):
+        """Lee el archivo frio de vendidas (None si la hoja no existe o esta vacia)"""
+        try:
+            spreadsheet = self.client.open_by_key(self.sheet_id)
+            try:
+                worksheet = spreadsheet.worksheet(sheet_name)
+            except gspread.WorksheetNotFound:
+                return None
+            
+            df = self.leer_hoja_como_dataframe(worksheet)
+            if df is None or df.empty:
+                return None
             
-            if len(data) < 2:
-                print("ERROR: Hoja sin datos suficientes")
+            print(f"LEIDO: {len(df)} motos del archivo {sheet_name}")
+            return df
+            
+        except Exception as e:
+            print(f"ERROR LECTURA ARCHIVO VENDIDAS: {str(e)}")
+            return None
+    
+    def archivar_vendidas(self, df_archivo, sheet_name="Archivo_Vendidas"):
+        """
+        Anade las vendidas compactadas al final de Archivo_Vendidas (esquema fijo, append)
+        """
+        try:
+            spreadsheet = self.client.open_by_key(self.sheet_id)
+            
+            try:
+                worksheet = spreadsheet.worksheet(sheet_name)
+            except gspread.WorksheetNotFound:
+                worksheet = spreadsheet.add_worksheet(
+                    title=sheet_name,
+                    rows=len(df_archivo) + 10,
+                    cols=len(COLUMNAS_ARCHIVO_VENDIDAS)
+                )
+                worksheet.update([COLUMNAS_ARCHIVO_VENDIDAS])
+                print(f"CREANDO: Nueva hoja {sheet_name}")
+            
+            filas = serializar_dataframe_para_sheets(formatear_para_publicar(df_archivo[COLUMNAS_ARCHIVO_VENDIDAS]))[1:]
+            worksheet.append_rows(filas, value_input_option='RAW')
+            
+            print(f"EXITO: {len(filas)} motos vendidas anadidas a {sheet_name}")
+            return True
+            
+        except Exception as e:
+            print(f"ERROR GUARDANDO ARCHIVO VENDIDAS: {str(e)}")
+            return False
+    
+    def reemplazar_hoja_tabla(self, df, sheet_name):
+        """Reemplaza entera una hoja pequena derivada (Metricas, Resumen_Cuentas)"""
+        try:
+            spreadsheet = self.client.open_by_key(self.sheet_id)
+            try:
+                worksheet = spreadsheet.worksheet(sheet_name)
+                worksheet.clear()
+            except gspread.WorksheetNotFound:
+                worksheet = spreadsheet.add_worksheet(
+                    title=sheet_name,
+                    rows=len(df) + 10,
+                    cols=len(df.columns)
+                )
+                print(f"CREANDO: Nueva hoja {sheet_name}")
+            
+            worksheet.update(serializar_dataframe_para_sheets(formatear_para_publicar(df)))
+            
+            print(f"EXITO: {sheet_name} actualizada con {len(df)} filas")
+            return True
+            
+        except Exception as e:
+            print(f"ERROR GUARDANDO {sheet_name}: {str(e)}")
+            return False
+    
+    def guardar_metricas(self, df_metricas, sheet_name="Metricas"):
+        """Reemplaza la hoja Metricas (una fila por moto, pocas columnas)"""
+        return self.reemplazar_hoja_tabla(df_metricas, sheet_name)
+    
+    def guardar_resumen(self, df_resumen, fecha_display=None, sheet_name="Resumen_Cuentas"):
+        """Reemplaza la hoja Resumen_Cuentas (cuenta x marca x estado x semana)"""
+        return self.reemplazar_hoja_tabla(df_resumen, sheet_name)
+    
+    def leer_marca_analisis(self, sheet_name="Estado_Analisis"):
+        """Marca de la celda A1 de Estado_Analisis ('' si la hoja no existe)"""
+        try:
+            spreadsheet = self.client.open_by_key(self.sheet_id)
+            try:
+                worksheet = spreadsheet.worksheet(sheet_name)
+            except gspread.WorksheetNotFound:
+                return ''
+            return worksheet.acell('A1').value or ''
+            
+        except Exception as e:
+            print(f"ERROR LECTURA MARCA ANALISIS: {str(e)}")
+            return ''
+    
+    def guardar_marca_analisis(self, marca, sheet_name="Estado_Analisis"):
+        """Escribe la marca en A1 de Estado_Analisis (hoja de una celda)"""
+        try:
+            spreadsheet = self.client.open_by_key(self.sheet_id)
+            try:
+                worksheet = spreadsheet.worksheet(sheet_name)
+            except gspread.WorksheetNotFound:
+                worksheet = spreadsheet.add_worksheet(title=sheet_name, rows=1, cols=1)
+                print(f"CREANDO: Nueva hoja {sheet_name}")
+            worksheet.update([[marca]], 'A1', value_input_option='RAW')
+            return True
+            
+        except Exception as e:
+            print(f"ERROR GUARDANDO MARCA ANALISIS: {str(e)}")
+            return False
+    
+    def leer_snapshots_posteriores(self, fecha_display=None):
+        """
+        BACKFILL: todas las hojas SCR posteriores a fecha_display (todas si None)
+        descargadas con UNA peticion values_batch_get, en orden de fecha. None si falla
+        """
+        try:
+            limite = datetime.strptime(fecha_display, "%d/%m/%Y") if fecha_display else None
+            spreadsheet = self.client.open_by_key(self.sheet_id)
+            
+            hojas = []
+            for worksheet in spreadsheet.worksheets():
+                fecha_obj = parsear_fecha_hoja_scr(worksheet.title)
+                if fecha_obj is not None and (limite is None or fecha_obj > limite):
+                    hojas.append((fecha_obj, worksheet.title))
+            hojas.sort()
+            
+            if not hojas:
+                return []
+            
+            print(f"BACKFILL: Descargando {len(hojas)} hojas SCR en una peticion")
+            respuesta = spreadsheet.values_batch_get([f"'{titulo}'" for _, titulo in hojas])
+            
+            snapshots = []
+            for (fecha_obj, titulo), rango in zip(hojas, respuesta.get('valueRanges', [])):
+                df = valores_a_dataframe(rango.get('values', []))
+                if df is None or df.empty:
+                    print(f"AVISO: {titulo} sin datos, se omite")
+                    continue
+                snapshots.append((fecha_obj.strftime("%d/%m/%Y"), df))
+            
+            return snapshots
+            
+        except Exception as e:
+            print(f"ERROR LEYENDO SNAPSHOTS PENDIENTES: {str(e)}")
+            return None
+    
+    def leer_datos_scraper_reciente(self):
+        """
+        Lee los datos mas recientes del scraper desde hojas SCR
+        """
+        try:
+            revision = self.obtener_revision() if self.cache else None
+            hojas_disponibles = self.cache.leer_titulos(revision) if self.cache else None
+            spreadsheet = None
+            
+            if hojas_disponibles is None:
+                spreadsheet = self.client.open_by_key(self.sheet_id)
+                hojas_disponibles = [worksheet.title for worksheet in spreadsheet.worksheets()]
+                if self.cache:
+                    self.cache.guardar_titulos(revision, hojas_disponibles)
+            
+            hoja_reciente = seleccionar_hoja_scr_reciente(hojas_disponibles)
+            
+            if hoja_reciente is None:
+                print(f"ERROR: No se encontraron hojas SCR validas entre {len(hojas_disponibles)} hojas")
                 return None, None
             
-            # Crear DataFrame
-            headers = data[0]
-            rows = data[1:]
-            df = pd.DataFrame(rows, columns=headers)
+            print(f"HOJA SCR MAS RECIENTE: {hoja_reciente[0]} ({hoja_reciente[2]})")
             
-            print(f"DEBUG: DataFrame creado: {len(df)} filas x {len(df.columns)} columnas")
-            print(f"DEBUG: Columnas: {list(df.columns)}")
+            # Leer datos de la hoja mas reciente (Visitas/Likes ya tipados)
+            df = self.cache.leer(hoja_reciente[0], revision) if self.cache else None
             
-            # Limpiar columnas numericas
-            if 'Visitas' in df.columns:
-                df['Visitas'] = pd.to_numeric(df['Visitas'], errors='coerce').fillna(0).astype(int)
-            if 'Likes' in df.columns:
-                df['Likes'] = pd.to_numeric(df['Likes'], errors='coerce').fillna(0).astype(int)
+            if df is None:
+                if spreadsheet is None:
+                    spreadsheet = self.client.open_by_key(self.sheet_id)
+                worksheet = spreadsheet.worksheet(hoja_reciente[0])
+                df = self.leer_hoja_como_dataframe(worksheet)
+                
+                if df is None or df.empty:
+                    print("ERROR: Hoja sin datos suficientes")
+                    return None, None
+                
+                if self.cache:
+                    self.cache.guardar(hoja_reciente[0], revision, df)
             
             print(f"EXITO: {len(df)} motos leidas desde {hoja_reciente[0]}")
             return df, hoja_reciente[2]  # Devolver DataFrame y fecha_str
@@ -307,12 +707,15 @@ class GoogleSheetsMotick:
     
     def guardar_historico_con_hojas_originales(self, df_historico, fecha_procesamiento):
         """
-        CORREGIDO: Guarda historico con limpieza completa de NA values
+        CORREGIDO: Guarda historico serializado sin NA values
         Guarda en 3 hojas: Data_Historico, Motos_Activas, Motos_Vendidas
         """
         try:
             spreadsheet = self.client.open_by_key(self.sheet_id)
             
+            # Ordenacion sobre tipos nativos; los textos "5.000 €" / dd/mm/yyyy solo al subir
+            df_historico = tipar_dataframe(df_historico)
+            
             print(f"INICIANDO GUARDADO: {len(df_historico)} motos total")
             
             # ===============================================
@@ -335,14 +738,9 @@ class GoogleSheetsMotick:
             # Ordenar historico completo
             df_ordenado = self.ordenar_historico_completo(df_historico)
             
-            # LIMPIEZA CRITICA: Eliminar NA values antes de subir
-            print("LIMPIANDO: Datos para Data_Historico")
-            df_ordenado_clean = self.limpiar_dataframe_para_sheets(df_ordenado)
-            
-            # Preparar y subir datos principales
-            headers = df_ordenado_clean.columns.values.tolist()
-            data_rows = df_ordenado_clean.values.tolist()
-            all_data = [headers] + data_rows
+            # SERIALIZACION CRITICA: Eliminar NA values antes de subir
+            print("SERIALIZANDO: Datos para Data_Historico")
+            all_data = serializar_dataframe_para_sheets(formatear_para_publicar(df_ordenado))
             
             print(f"SUBIENDO: {len(all_data)} filas a Data_Historico")
             worksheet_main.update(all_data)
@@ -373,14 +771,9 @@ class GoogleSheetsMotick:
                     )
                     print(f"CREANDO: Nueva hoja Motos_Activas")
                 
-                # LIMPIEZA CRITICA: Eliminar NA values
-                print("LIMPIANDO: Datos para Motos_Activas")
-                motos_activas_clean = self.limpiar_dataframe_para_sheets(motos_activas)
-                
-                # Preparar y subir motos activas
-                headers_activas = motos_activas_clean.columns.values.tolist()
-                data_activas = motos_activas_clean.values.tolist()
-                activas_data = [headers_activas] + data_activas
+                # SERIALIZACION CRITICA: Eliminar NA values
+                print("SERIALIZANDO: Datos para Motos_Activas")
+                activas_data = serializar_dataframe_para_sheets(formatear_para_publicar(motos_activas))
                 
                 print(f"SUBIENDO: {len(activas_data)} filas a Motos_Activas")
                 ws_activas.update(activas_data)
@@ -413,14 +806,9 @@ class GoogleSheetsMotick:
                     )
                     print(f"CREANDO: Nueva hoja Motos_Vendidas")
                 
-                # LIMPIEZA CRITICA: Eliminar NA values
-                print("LIMPIANDO: Datos para Motos_Vendidas")
-                motos_vendidas_clean = self.limpiar_dataframe_para_sheets(motos_vendidas)
-                
-                # Preparar y subir motos vendidas
-                headers_vendidas = motos_vendidas_clean.columns.values.tolist()
-                data_vendidas = motos_vendidas_clean.values.tolist()
-                vendidas_data = [headers_vendidas] + data_vendidas
+                # SERIALIZACION CRITICA: Eliminar NA values
+                print("SERIALIZANDO: Datos para Motos_Vendidas")
+                vendidas_data = serializar_dataframe_para_sheets(formatear_para_publicar(motos_vendidas))
                 
                 print(f"SUBIENDO: {len(vendidas_data)} filas a Motos_Vendidas")
                 ws_vendidas.update(vendidas_data)
@@ -446,7 +834,8 @@ class GoogleSheetsMotick:
             """
             Ordena el historico: 
             - ACTIVAS por Kilometraje DESC, luego Titulo ASC
-            - VENDIDAS por Fecha_Venta DESC (sin cambios)
+            - VENDIDAS por Fecha_Venta DESC
+            Kilometraje (Int64) y Fecha_Venta (datetime64) ya vienen tipados: sin extraer texto
             """
             try:
                 # Separar activas y vendidas
@@ -455,22 +844,16 @@ class GoogleSheetsMotick:
                 
                 # NUEVO: Ordenar activas por Kilometraje DESC, luego Titulo ASC
                 if not df_activas.empty:
-                    # Convertir Kilometraje a numerico para ordenar correctamente
-                    df_activas['KM_Numerico'] = df_activas['Kilometraje'].str.extract(r'(\d+)').fillna(0).astype(int)
-                    
-                    # Ordenar por KM (mas a menos) y luego por Titulo (A-Z)
+                    # Ordenar por KM (mas a menos, sin dato al final) y luego por Titulo (A-Z)
                     df_activas = df_activas.sort_values(
-                        ['KM_Numerico', 'Titulo'], 
+                        ['Kilometraje', 'Titulo'], 
                         ascending=[False, True], 
                         na_position='last'
                     )
                     
-                    # Eliminar columna temporal
-                    df_activas = df_activas.drop('KM_Numerico', axis=1)
-                    
                     print(f"ORDENACION: {len(df_activas)} activas ordenadas por KM DESC, Titulo ASC")
                 
-                # Ordenar vendidas por Fecha_Venta descendente (SIN CAMBIOS)
+                # Ordenar vendidas por Fecha_Venta descendente
                 if not df_vendidas.empty and 'Fecha_Venta' in df_vendidas.columns:
                     df_vendidas = df_vendidas.sort_values('Fecha_Venta', ascending=False, na_position='last')
                     print(f"ORDENACION: {len(df_vendidas)} vendidas ordenadas por Fecha_Venta DESC")
@@ -484,6 +867,22 @@ class GoogleSheetsMotick:
                 print(f"ERROR ORDENANDO: {str(e)}")
                 return df_historico
 
+def crear_handler_google_sheets():
+    """
+    Crea el handler con las credenciales del entorno:
+    GOOGLE_CREDENTIALS_JSON (GitHub Actions) o el archivo local de credenciales
+    """
+    credentials_json = os.getenv('GOOGLE_CREDENTIALS_JSON')
+    sheet_id = os.getenv('GOOGLE_SHEET_ID') or GOOGLE_SHEET_ID_MOTICK
+    
+    if credentials_json:
+        return GoogleSheetsMotick(credentials_json_string=credentials_json, sheet_id=sheet_id)
+    
+    if os.path.exists(LOCAL_CREDENTIALS_FILE):
+        return GoogleSheetsMotick(credentials_file=LOCAL_CREDENTIALS_FILE, sheet_id=sheet_id)
+    
+    raise Exception("No se encontraron credenciales de Google (GOOGLE_CREDENTIALS_JSON o archivo local)")
+
 def test_google_sheets_motick():
     """Funcion de prueba para verificar conexion"""
     print("PROBANDO CONEXION A GOOGLE SHEETS MOTICK")
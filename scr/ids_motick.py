@@ -0,0 +1,61 @@
+"""
+Identificadores Motick - Un solo esquema de IDs para scraper, almacenamiento y analizador
+- ID_Unico_Real: blake2b (6 bytes -> 12 hex) de URL + cuenta + titulo normalizado + km
+  SIN precio (el precio cambia y la moto sigue siendo la misma). Se calcula una vez
+  al guardar el snapshot del scraper y el analizador lo reutiliza
+- URL_ID: md5(URL)[:12], clave de la serie larga (Observaciones / matriz); se mantiene
+  md5 porque es la clave de los datos ya guardados
+La normalizacion se hace por columnas (str vectorizado de pandas) y el hash en una
+sola pasada sobre el array de claves. Sin fallbacks con time.time(): misma fila, mismo ID
+"""
+
+import hashlib
+import numpy as np
+import pandas as pd
+
+def texto_columna(df, col):
+    """Columna como texto (str(valor) como hacia el calculo por fila; '' si no existe)"""
+    if col not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    return df[col].astype(str)
+
+def claves_motos(df):
+    """Clave normalizada por fila: url_cuenta_titulo[:30]_kmdigitos"""
+    url = texto_columna(df, 'URL').str.strip()
+    cuenta = texto_columna(df, 'Cuenta').str.strip()
+    titulo = texto_columna(df, 'Titulo').str.strip().str.lower().str.replace(r'[^\w\s]', '', regex=True).str[:30]
+    km = texto_columna(df, 'Kilometraje').str.replace(r'[^\d]', '', regex=True)
+    return url + '_' + cuenta + '_' + titulo + '_' + km
+
+def hash_claves(claves, digest_size=6):
+    """blake2b de cada clave (hex de 2*digest_size caracteres)"""
+    return np.array(
+        [hashlib.blake2b(clave.encode(), digest_size=digest_size).hexdigest() for clave in claves],
+        dtype=object
+    )
+
+def crear_ids_motos(df):
+    """ID_Unico_Real de todas las filas (Series alineada con df)"""
+    return pd.Series(hash_claves(claves_motos(df).to_numpy()), index=df.index, dtype=object)
+
+def asegurar_ids(df):
+    """
+    ID_Unico_Real reutilizando los ya calculados (scraper/snapshot) y calculando
+    solo las filas sin ID. Devuelve la Series completa
+    """
+    if 'ID_Unico_Real' not in df.columns:
+        return crear_ids_motos(df)
+
+    ids = df['ID_Unico_Real'].astype(object)
+    faltan = ids.isna() | (ids.astype(str).str.strip() == '')
+    if faltan.any():
+        ids = ids.copy()
+        ids[faltan] = crear_ids_motos(df[faltan])
+    return ids
+
+def crear_url_id(urls):
+    """Identificador compacto y estable de cada URL (md5, 12 hex)"""
+    return pd.Series(
+        [hashlib.md5(url.encode()).hexdigest()[:12] for url in urls.astype(str)],
+        index=urls.index, dtype=object
+    )
@@ -0,0 +1,173 @@
+"""
+Matriz de series Motick - Visitas y likes diarios como matriz numerica compacta
+Dos .npy memory-mapped con forma (dias x motos):
+    visitas.npy  uint32   (hasta 4.294.967.295 visitas por anuncio)
+    likes.npy    uint16   (hasta 65.535 likes; los valores mayores se saturan)
+    indice.json  {'fechas': [yyyy-mm-dd por fila], 'url_ids': [URL_ID por columna]}
+Un dia es una fila contigua: anadir un dia o leer las observaciones de una ventana
+(metricas) son operaciones vectorizadas sobre el mapa en disco, sin convertir columnas de texto.
+Los huecos (moto sin dato ese dia) valen 0, igual que en Data_Historico.
+Los archivos se reservan con capacidad extra (bloques de dias, +25% de motos) para
+que las filas y columnas nuevas no obliguen a reescribirlos cada dia
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from series_motick import COLUMNAS_OBSERVACIONES
+
+TIPOS_SERIE = {'visitas': np.uint32, 'likes': np.uint16}
+BLOQUE_DIAS = 64
+BLOQUE_MOTOS = 1024
+
+class MatrizSeriesMotick:
+    def __init__(self, directorio):
+        self.directorio = directorio
+        self.ruta_indice = os.path.join(directorio, 'indice.json')
+        self.rutas = {serie: os.path.join(directorio, f"{serie}.npy") for serie in TIPOS_SERIE}
+        self.cargar()
+
+    def cargar(self):
+        """Abre los .npy en modo r+ (o deja la matriz vacia si no existen o no cuadran)"""
+        try:
+            with open(self.ruta_indice, 'r', encoding='utf-8') as f:
+                indice = json.load(f)
+            self.series = {serie: np.load(ruta, mmap_mode='r+') for serie, ruta in self.rutas.items()}
+            self.fechas = pd.Index(indice['fechas'], dtype=object)
+            self.url_ids = pd.Index(indice['url_ids'], dtype=object)
+            if any(m.shape[0] < len(self.fechas) or m.shape[1] < len(self.url_ids) for m in self.series.values()):
+                raise ValueError("indice mayor que la matriz")
+        except (OSError, ValueError, KeyError):
+            self.series = {}
+            self.fechas = pd.Index([], dtype=object)
+            self.url_ids = pd.Index([], dtype=object)
+
+    def reiniciar(self):
+        """Vacia la matriz (se reconstruye con la siguiente actualizacion)"""
+        self.series = {}
+        self.fechas = pd.Index([], dtype=object)
+        self.url_ids = pd.Index([], dtype=object)
+        for ruta in list(self.rutas.values()) + [self.ruta_indice]:
+            if os.path.exists(ruta):
+                os.remove(ruta)
+
+    @property
+    def forma(self):
+        """(dias, motos) con datos"""
+        return len(self.fechas), len(self.url_ids)
+
+    def asegurar_capacidad(self, n_dias, n_motos):
+        """
+        Reserva si los .npy no tienen sitio para n_dias x n_motos: los dias crecen por
+        bloques (uno nuevo cada ~2 meses) y las motos al menos un 25% cada vez
+        """
+        cap_dias, cap_motos = next(iter(self.series.values())).shape if self.series else (0, 0)
+        if self.series and n_dias <= cap_dias and n_motos <= cap_motos:
+            return
+
+        if n_dias > cap_dias:
+            cap_dias = -(-n_dias // BLOQUE_DIAS) * BLOQUE_DIAS
+        if n_motos > cap_motos:
+            cap_motos = -(-max(n_motos, int(cap_motos * 1.25)) // BLOQUE_MOTOS) * BLOQUE_MOTOS
+
+        os.makedirs(self.directorio, exist_ok=True)
+        dias, motos = self.forma
+        for serie, tipo in TIPOS_SERIE.items():
+            ruta_tmp = self.rutas[serie] + '.tmp'
+            nueva = np.lib.format.open_memmap(ruta_tmp, mode='w+', dtype=tipo, shape=(cap_dias, cap_motos))
+            if serie in self.series:
+                nueva[:dias, :motos] = self.series[serie][:dias, :motos]
+            nueva.flush()
+            del nueva
+            self.series.pop(serie, None)
+            os.replace(ruta_tmp, self.rutas[serie])
+            self.series[serie] = np.load(self.rutas[serie], mmap_mode='r+')
+
+    def actualizar(self, df_observaciones):
+        """
+        Escribe las observaciones largas en la matriz (la ultima gana por URL_ID y Fecha)
+        Fechas y motos nuevas se anaden como filas/columnas al final
+        """
+        if df_observaciones is None or df_observaciones.empty:
+            return 0
+
+        fechas = df_observaciones['Fecha'].to_numpy(dtype=object)
+        url_ids = df_observaciones['URL_ID'].to_numpy(dtype=object)
+
+        fechas_nuevas = pd.unique(fechas[self.fechas.get_indexer(fechas) < 0])
+        urls_nuevas = pd.unique(url_ids[self.url_ids.get_indexer(url_ids) < 0])
+        self.asegurar_capacidad(len(self.fechas) + len(fechas_nuevas), len(self.url_ids) + len(urls_nuevas))
+        self.fechas = self.fechas.append(pd.Index(fechas_nuevas, dtype=object))
+        self.url_ids = self.url_ids.append(pd.Index(urls_nuevas, dtype=object))
+
+        filas = self.fechas.get_indexer(fechas)
+        columnas = self.url_ids.get_indexer(url_ids)
+        for serie, tipo in TIPOS_SERIE.items():
+            valores = pd.to_numeric(df_observaciones[serie.capitalize()], errors='coerce').fillna(0).to_numpy()
+            self.series[serie][filas, columnas] = np.clip(valores, 0, np.iinfo(tipo).max).astype(tipo)
+
+        self.guardar()
+        return len(df_observaciones)
+
+    def guardar(self):
+        """Vuelca los mapas a disco y escribe el indice (tmp + replace)"""
+        for matriz in self.series.values():
+            matriz.flush()
+        ruta_tmp = self.ruta_indice + '.tmp'
+        with open(ruta_tmp, 'w', encoding='utf-8') as f:
+            json.dump({'fechas': list(self.fechas), 'url_ids': list(self.url_ids)}, f)
+        os.replace(ruta_tmp, self.ruta_indice)
+
+    def bloque(self, serie, fechas_iso, url_ids):
+        """
+        Valores (motos x fechas) para las URL_ID y fechas pedidas, en ese orden
+        0 donde la fecha o la moto no estan en la matriz
+        """
+        filas = self.fechas.get_indexer(fechas_iso)
+        columnas = self.url_ids.get_indexer(url_ids)
+        resultado = np.zeros((len(columnas), len(filas)), dtype=TIPOS_SERIE[serie])
+        if self.series:
+            filas_ok, columnas_ok = filas >= 0, columnas >= 0
+            resultado[np.ix_(columnas_ok, filas_ok)] = self.series[serie][np.ix_(filas[filas_ok], columnas[columnas_ok])].T
+        return resultado
+
+    def vista_wide(self, url_ids, fechas_display, indice=None):
+        """Columnas Visitas_/Likes_ dd/mm/yyyy (int64) como las de Data_Historico"""
+        fechas_iso = [datetime.strptime(fecha, "%d/%m/%Y").strftime("%Y-%m-%d") for fecha in fechas_display]
+        visitas = self.bloque('visitas', fechas_iso, url_ids)
+        likes = self.bloque('likes', fechas_iso, url_ids)
+
+        columnas = {}
+        for j, fecha in enumerate(fechas_display):
+            columnas[f"Visitas_{fecha}"] = visitas[:, j].astype('int64')
+            columnas[f"Likes_{fecha}"] = likes[:, j].astype('int64')
+        return pd.DataFrame(columnas, index=indice)
+
+    def a_observaciones(self, fechas_iso=None):
+        """
+        Observaciones largas de las fechas pedidas (todas si None)
+        Solo celdas con visitas o likes: el 0 de la matriz es 'sin dato'
+        """
+        fechas_iso = list(self.fechas) if fechas_iso is None else [f for f in fechas_iso if f in self.fechas]
+        if not fechas_iso or not self.series:
+            return pd.DataFrame(columns=COLUMNAS_OBSERVACIONES)
+
+        filas = self.fechas.get_indexer(fechas_iso)
+        n_motos = len(self.url_ids)
+        visitas = self.series['visitas'][filas, :n_motos]
+        likes = self.series['likes'][filas, :n_motos]
+        dias, motos = np.nonzero((visitas > 0) | (likes > 0))
+
+        return pd.DataFrame({
+            'URL_ID': self.url_ids.to_numpy()[motos],
+            'Fecha': np.asarray(fechas_iso, dtype=object)[dias],
+            'Visitas': visitas[dias, motos].astype('int64'),
+            'Likes': likes[dias, motos].astype('int64'),
+        })
+
+    def memoria_bytes(self):
+        """Bytes reservados en disco por los .npy"""
+        return sum(m.nbytes for m in self.series.values())
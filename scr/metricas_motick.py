@@ -0,0 +1,149 @@
+"""
+Metricas Motick - Engagement por moto precalculado en una pasada vectorizada
+A partir de la serie diaria (observaciones largas) y del historico calcula para
+todas las motos a la vez:
+- Likes/Visitas de hoy y deltas a 1, 7 y 30 dias (con el estado local, los valores
+  anteriores se leen de las filas de la matriz de series, sin pasar a formato largo)
+- Velocidad de likes (likes/dia en los ultimos 7 dias)
+- Dias en el mercado y dias hasta la venta
+- Bajadas de precio y dias desde la ultima (registro de precios_motick)
+- Ranking top-K de crecimiento (argpartition, sin ordenar todo)
+El resultado se guarda en una hoja pequena (Metricas) para no montar formulas
+pesadas sobre Data_Historico
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+from ids_motick import crear_url_id
+from esquema_motick import parsear_fecha
+from precios_motick import metricas_precio
+
+PERIODOS_DELTA = (1, 7, 30)
+DIAS_VELOCIDAD = 7
+TOP_K_CRECIMIENTO = 20
+COLUMNA_RANKING = 'Likes_Delta_7d'
+
+COLUMNAS_BASE_METRICAS = ['ID_Unico_Real', 'Cuenta', 'Titulo', 'Estado', 'URL']
+
+def primera_observacion_desde(obs, desde_iso, hasta_iso):
+    """Primera observacion de cada URL_ID con desde <= Fecha < hasta (indice URL_ID)"""
+    tramo = obs[(obs['Fecha'] >= desde_iso) & (obs['Fecha'] < hasta_iso)]
+    return tramo.drop_duplicates('URL_ID', keep='first').set_index('URL_ID')
+
+def bases_observaciones(obs, url_ids, hoy, periodos):
+    """
+    {k: DataFrame (Visitas, Likes, Fecha) alineado con url_ids}: primera observacion
+    de cada moto en [hoy-k, hoy) (NA sin dato)
+    """
+    hoy_iso = hoy.strftime("%Y-%m-%d")
+    bases = {}
+    for dias in periodos:
+        base = primera_observacion_desde(obs, (hoy - timedelta(days=dias)).strftime("%Y-%m-%d"), hoy_iso)
+        bases[dias] = pd.DataFrame({
+            'Visitas': pd.to_numeric(url_ids.map(base['Visitas']), errors='coerce').astype('Int64'),
+            'Likes': pd.to_numeric(url_ids.map(base['Likes']), errors='coerce').astype('Int64'),
+            'Fecha': pd.to_datetime(url_ids.map(base['Fecha']), format="%Y-%m-%d"),
+        })
+    return bases
+
+def bases_matriz(matriz, url_ids, hoy, periodos):
+    """
+    Lo mismo que bases_observaciones leido de las filas de la matriz (0 = sin dato, como
+    a_observaciones): un bloque motos x dias de max(periodos) dias y argmax por fila
+    """
+    fechas_iso = [(hoy - timedelta(days=d)).strftime("%Y-%m-%d") for d in range(max(periodos), 0, -1)]
+    ids = url_ids.to_numpy()
+    visitas = matriz.bloque('visitas', fechas_iso, ids).astype('int64')
+    likes = matriz.bloque('likes', fechas_iso, ids).astype('int64')
+    con_dato = (visitas > 0) | (likes > 0)
+    filas = np.arange(len(ids))
+    fechas = pd.to_datetime(fechas_iso).to_numpy()
+
+    bases = {}
+    for dias in periodos:
+        tramo = con_dato[:, -dias:]
+        primera = tramo.argmax(axis=1) + (len(fechas_iso) - dias)
+        hay_dato = tramo.any(axis=1)
+        bases[dias] = pd.DataFrame({
+            'Visitas': pd.Series(visitas[filas, primera], index=url_ids.index, dtype='Int64').where(hay_dato),
+            'Likes': pd.Series(likes[filas, primera], index=url_ids.index, dtype='Int64').where(hay_dato),
+            'Fecha': pd.Series(fechas[primera], index=url_ids.index).where(hay_dato),
+        })
+    return bases
+
+def calcular_metricas(df_historico, df_observaciones, fecha_display,
+                      periodos=PERIODOS_DELTA, top_k=TOP_K_CRECIMIENTO, columna_ranking=COLUMNA_RANKING,
+                      df_cambios_precio=None, matriz=None):
+    """
+    Una fila por moto del historico con sus metricas a fecha_display
+    Delta a k dias = valor de hoy - primera observacion en [hoy-k, hoy): si la moto
+    es mas reciente que k dias, el delta cuenta desde su primera observacion.
+    Sin observacion hoy (vendida) o sin observacion anterior -> NA
+    df_cambios_precio: registro de cambios de precio (None = sin columnas de precio)
+    matriz: MatrizSeriesMotick con la serie de los dias anteriores; los valores base de
+    los deltas salen de sus filas y df_observaciones solo tiene que traer los de hoy
+    """
+    hoy = datetime.strptime(fecha_display, "%d/%m/%Y")
+    hoy_iso = hoy.strftime("%Y-%m-%d")
+
+    df = df_historico.reindex(columns=COLUMNAS_BASE_METRICAS).reset_index(drop=True)
+    url_ids = crear_url_id(df['URL'])
+
+    if df_observaciones is None or df_observaciones.empty:
+        obs = pd.DataFrame(columns=['URL_ID', 'Fecha', 'Visitas', 'Likes'])
+    else:
+        desde_iso = (hoy - timedelta(days=max(periodos))).strftime("%Y-%m-%d")
+        obs = df_observaciones[(df_observaciones['Fecha'] >= desde_iso) & (df_observaciones['Fecha'] <= hoy_iso)]
+        obs = obs.sort_values('Fecha', kind='stable')
+
+    obs_hoy = obs[obs['Fecha'] == hoy_iso].drop_duplicates('URL_ID', keep='last').set_index('URL_ID')
+    for serie in ('Likes', 'Visitas'):
+        df[f"{serie}_Hoy"] = pd.to_numeric(url_ids.map(obs_hoy[serie]), errors='coerce').astype('Int64')
+
+    if matriz is None:
+        bases = bases_observaciones(obs, url_ids, hoy, periodos)
+    else:
+        bases = bases_matriz(matriz, url_ids, hoy, periodos)
+
+    for dias in periodos:
+        base = bases[dias]
+        for serie in ('Likes', 'Visitas'):
+            df[f"{serie}_Delta_{dias}d"] = df[f"{serie}_Hoy"] - base[serie]
+        if dias == DIAS_VELOCIDAD:
+            dias_cubiertos = (pd.Timestamp(hoy) - base['Fecha']).dt.days
+            df[f"Velocidad_Likes_{dias}d"] = (df[f"Likes_Delta_{dias}d"] / dias_cubiertos).astype('Float64').round(2)
+
+    primera = parsear_fecha(df_historico['Primera_Deteccion']).reset_index(drop=True) \
+        if 'Primera_Deteccion' in df_historico.columns else pd.Series(pd.NaT, index=df.index)
+    venta = parsear_fecha(df_historico['Fecha_Venta']).reset_index(drop=True) \
+        if 'Fecha_Venta' in df_historico.columns else pd.Series(pd.NaT, index=df.index)
+    df['Dias_En_Mercado'] = (venta.fillna(pd.Timestamp(hoy)) - primera).dt.days.astype('Int64')
+    df['Dias_Hasta_Venta'] = (venta - primera).dt.days.astype('Int64')
+
+    if df_cambios_precio is not None:
+        df = df.join(metricas_precio(url_ids, df_cambios_precio, fecha_display))
+
+    df['Rank_Crecimiento'] = rankear_top_k(df[columna_ranking], top_k)
+    df['Fecha_Metricas'] = fecha_display
+    return df
+
+def rankear_top_k(valores, k):
+    """
+    Rank 1..k de los k mayores valores (NA fuera del ranking) sin ordenar toda la serie:
+    argpartition O(n) + orden de solo k elementos
+    """
+    ranking = np.full(len(valores), -1, dtype=np.int64)
+    datos = valores.to_numpy(dtype='float64', na_value=np.nan)
+    candidatos = np.flatnonzero(~np.isnan(datos))
+    k = min(k, len(candidatos))
+    if k > 0:
+        top = candidatos[np.argpartition(-datos[candidatos], k - 1)[:k]]
+        top = top[np.argsort(-datos[top], kind='stable')]
+        ranking[top] = np.arange(1, k + 1)
+    return pd.Series(ranking, dtype='Int64').mask(ranking < 0).array
+
+def top_crecimiento(df_metricas, k=5):
+    """Las k primeras motos del ranking, en orden"""
+    return df_metricas[df_metricas['Rank_Crecimiento'].notna()].sort_values('Rank_Crecimiento').head(k)
@@ -0,0 +1,59 @@
+"""
+Pipeline Motick - Scraper y analizador en un solo proceso
+El DataFrame del scraper pasa directamente al merge del analizador, sin subir la
+SCR y volver a descargarla (leer_datos_scraper_reciente). La SCR se guarda al final
+junto al resto de escrituras del analizador (en paralelo cuando son independientes)
+El scraper y el analizador siguen pudiendo ejecutarse por separado
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Importar modulos locales
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config import TIPO_ALMACENAMIENTO
+from almacenamiento_motick import crear_almacenamiento
+from scraper_motick import ejecutar_scraper
+from analisis_motick import AnalizadorHistoricoMotick
+
+def main():
+    """Scrapea todas las cuentas y analiza el resultado en memoria"""
+    print("="*80)
+    print(f"PIPELINE MOTICK - Scraper + analizador ({datetime.now().strftime('%d/%m/%Y %H:%M')})")
+    print("="*80)
+
+    try:
+        # El almacenamiento se comprueba antes de scrapear: no tiene sentido
+        # recorrer todas las cuentas si luego no se puede guardar nada
+        almacenamiento = crear_almacenamiento()
+        if TIPO_ALMACENAMIENTO == 'sheets' and not almacenamiento.sheet_id:
+            print("ERROR: ID de Google Sheet no encontrado")
+            return False
+        if not almacenamiento.test_connection():
+            print("ERROR: No se pudo conectar al almacenamiento")
+            return False
+
+        df = ejecutar_scraper()
+        if df is None:
+            print("ERROR: El scraper no devolvio datos, no se analiza nada")
+            return False
+
+        fecha_extraccion = datetime.now().strftime("%d/%m/%Y")
+        analizador = AnalizadorHistoricoMotick(almacenamiento)
+        if not analizador.ejecutar(df_scraper=df, fecha_extraccion=fecha_extraccion):
+            print("\nPipeline completado con errores")
+            return False
+
+        print("\nPIPELINE COMPLETADO EXITOSAMENTE")
+        return True
+
+    except Exception as e:
+        print(f"ERROR CRITICO EN PIPELINE: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,85 @@
+"""
+Precios Motick - Historial de precios como registro de cambios
+Data_Historico guarda solo el precio actual; cada cambio se anade a un registro
+compacto (una fila por URL y dia en que el precio cambia, nunca una columna por dia):
+    URL_ID, Fecha (yyyy-mm-dd), Precio_Anterior, Precio_Nuevo
+- Sheets: hoja Cambios_Precio (solo se anaden filas)
+- Local: tabla cambios_precio de motick.sqlite
+La deteccion compara en bloque los precios tipados (Int64) del historico y del
+scrape; las metricas (bajadas, dias desde la ultima bajada) salen de un groupby
+sobre el registro
+"""
+
+import pandas as pd
+from datetime import datetime
+
+from ids_motick import crear_url_id
+
+COLUMNAS_CAMBIOS_PRECIO = ['URL_ID', 'Fecha', 'Precio_Anterior', 'Precio_Nuevo']
+
+def registro_vacio():
+    """Registro de cambios sin filas (con los tipos del esquema)"""
+    return normalizar_cambios_precio(pd.DataFrame(columns=COLUMNAS_CAMBIOS_PRECIO))
+
+def normalizar_cambios_precio(df_cambios):
+    """Tipos del registro leido, una fila por (URL_ID, Fecha) (gana la ultima) y orden por fecha"""
+    df = df_cambios.reindex(columns=COLUMNAS_CAMBIOS_PRECIO).copy()
+    df['URL_ID'] = df['URL_ID'].astype(str)
+    df['Fecha'] = df['Fecha'].astype(str)
+    for col in ['Precio_Anterior', 'Precio_Nuevo']:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+    df = df.drop_duplicates(['URL_ID', 'Fecha'], keep='last')
+    return df.sort_values('Fecha', kind='stable').reset_index(drop=True)
+
+def unir_cambios_precio(partes):
+    """Une lotes del registro (ignora None/vacios)"""
+    partes = [df for df in partes if df is not None and not df.empty]
+    if not partes:
+        return registro_vacio()
+    return normalizar_cambios_precio(pd.concat(partes, ignore_index=True))
+
+def detectar_cambios_precio(urls, precio_anterior, precio_hoy, fecha_display):
+    """
+    Cambios del dia en bloque: precio conocido antes y hoy, y distinto
+    Las tres series van alineadas (una fila por moto existente)
+    Devuelve (mascara, registro) - la mascara marca las filas cuyo precio cambio
+    """
+    anterior = precio_anterior.astype('Int64')
+    hoy = precio_hoy.astype('Int64')
+    mascara = (anterior.notna() & hoy.notna() & (anterior != hoy)).fillna(False).astype(bool)
+
+    fecha_iso = datetime.strptime(fecha_display, "%d/%m/%Y").strftime("%Y-%m-%d")
+    registro = pd.DataFrame({
+        'URL_ID': crear_url_id(urls[mascara]),
+        'Fecha': fecha_iso,
+        'Precio_Anterior': anterior[mascara],
+        'Precio_Nuevo': hoy[mascara],
+    })
+    return mascara, normalizar_cambios_precio(registro)
+
+def metricas_precio(url_ids, df_cambios, fecha_display):
+    """
+    Por moto (alineado con url_ids): Bajadas_Precio, Bajada_Acumulada (euros),
+    Ultima_Bajada (dd/mm/yyyy) y Dias_Desde_Bajada (NA si nunca ha bajado)
+    """
+    hoy = pd.Timestamp(datetime.strptime(fecha_display, "%d/%m/%Y"))
+    cambios = registro_vacio() if df_cambios is None else normalizar_cambios_precio(df_cambios)
+    bajadas = cambios[(cambios['Precio_Nuevo'] < cambios['Precio_Anterior']).fillna(False)]
+    bajadas = bajadas[bajadas['Fecha'] <= hoy.strftime("%Y-%m-%d")]
+
+    por_moto = bajadas.assign(
+        Importe=bajadas['Precio_Anterior'] - bajadas['Precio_Nuevo'],
+        Fecha=pd.to_datetime(bajadas['Fecha'], format="%Y-%m-%d"),
+    ).groupby('URL_ID').agg(
+        Bajadas_Precio=('Importe', 'count'),
+        Bajada_Acumulada=('Importe', 'sum'),
+        Ultima_Bajada=('Fecha', 'max'),
+    )
+
+    ultima = pd.to_datetime(url_ids.map(por_moto['Ultima_Bajada']))
+    return pd.DataFrame({
+        'Bajadas_Precio': url_ids.map(por_moto['Bajadas_Precio']).fillna(0).astype('int64'),
+        'Bajada_Acumulada': pd.to_numeric(url_ids.map(por_moto['Bajada_Acumulada'])).fillna(0).astype('int64'),
+        'Ultima_Bajada': ultima.dt.strftime("%d/%m/%Y").fillna(''),
+        'Dias_Desde_Bajada': (hoy - ultima).dt.days.astype('Int64'),
+    }, index=url_ids.index)
@@ -0,0 +1,170 @@
+"""
+Publicador Motick - Empuja el almacen local a Google Sheets
+Con MOTICK_STORAGE=local el scraper y el analizador trabajan contra
+SQLite + Parquet; este proceso publica despues lo pendiente:
+- Snapshots SCR -> hojas 'SCR dd/mm/yy'
+- Historico -> Data_Historico, Motos_Activas, Motos_Vendidas (solo la ultima version)
+- Metricas -> Metricas, Resumen -> Resumen_Cuentas (solo la ultima version)
+- Observaciones, cambios de precio y archivo de vendidas -> Observaciones, Cambios_Precio,
+  Archivo_Vendidas (hojas de solo anadir: las filas de los dias pendientes, una subida por hoja)
+El historico se publica despues de esas tres: la compactacion y la ventana quitan de
+Data_Historico vendidas y columnas por fecha que solo se conservan en ellas
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Importar modulos locales
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from almacenamiento_motick import AlmacenamientoLocalMotick
+from google_sheets_motick import crear_handler_google_sheets
+
+class PublicadorSheetsMotick:
+    def __init__(self, almacen_local, gs_handler):
+        self.almacen_local = almacen_local
+        self.gs_handler = gs_handler
+        self.stats = {'snapshots': 0, 'historico': 0, 'metricas': 0, 'resumen': 0,
+                      'observaciones': 0, 'cambios_precio': 0, 'vendidas': 0, 'errores': 0}
+
+    def publicar_snapshots(self, pendientes):
+        """Publica cada snapshot SCR pendiente (en orden de fecha de creacion)"""
+        publicadas = []
+        for id_pub, tipo, fecha in pendientes:
+            df = self.almacen_local.leer_snapshot(fecha)
+            if df is None:
+                print(f"AVISO: Snapshot {fecha} ya no existe en local, se descarta")
+                publicadas.append(id_pub)
+                continue
+
+            exito, nombre_hoja = self.gs_handler.subir_datos_scraper(df, fecha)
+            if exito:
+                publicadas.append(id_pub)
+                self.stats['snapshots'] += 1
+            else:
+                self.stats['errores'] += 1
+        return publicadas
+
+    def publicar_historico(self, pendientes):
+        """
+        Solo importa la ultima version del historico: una unica subida
+        marca todas las versiones pendientes como publicadas
+        """
+        if not pendientes:
+            return []
+
+        df_historico = self.almacen_local.leer_datos_historico()
+        if df_historico is None:
+            return []
+
+        fecha_ultima = pendientes[-1][2]
+        if self.gs_handler.guardar_historico_con_hojas_originales(df_historico, fecha_ultima):
+            self.stats['historico'] += 1
+            return [id_pub for id_pub, _, _ in pendientes]
+
+        self.stats['errores'] += 1
+        return []
+
+    def publicar_tabla(self, pendientes, tipo, leer, guardar):
+        """
+        Tablas derivadas (metricas, resumen): como el historico, solo se sube
+        la ultima version y marca todas las pendientes de ese tipo
+        """
+        if not pendientes:
+            return []
+
+        df = leer()
+        if df is None:
+            return []
+
+        if guardar(df):
+            self.stats[tipo] += 1
+            return [id_pub for id_pub, _, _ in pendientes]
+
+        self.stats['errores'] += 1
+        return []
+
+    def publicar_anadidos(self, pendientes, tipo, leer, guardar):
+        """
+        Hojas de solo anadir (Observaciones, Cambios_Precio, Archivo_Vendidas): las filas
+        de todos los dias pendientes del tipo se anaden con una sola subida
+        """
+        if not pendientes:
+            return []
+
+        df = leer(sorted({fecha for _, _, fecha in pendientes}))
+        if df is None:
+            self.stats['errores'] += 1
+            return []
+
+        if df.empty or guardar(df):
+            self.stats[tipo] += len(df)
+            return [id_pub for id_pub, _, _ in pendientes]
+
+        self.stats['errores'] += 1
+        return []
+
+    def publicar_pendientes(self):
+        """Publica todo lo pendiente. Devuelve True si no hubo errores"""
+        pendientes = self.almacen_local.publicaciones_pendientes()
+        print(f"PENDIENTES: {len(pendientes)} publicaciones")
+
+        snapshots = [p for p in pendientes if p[1] == 'scr']
+        historicos = [p for p in pendientes if p[1] == 'historico']
+        metricas = [p for p in pendientes if p[1] == 'metricas']
+        resumenes = [p for p in pendientes if p[1] == 'resumen']
+
+        publicadas = self.publicar_snapshots(snapshots)
+
+        errores_previos = self.stats['errores']
+        anadidos = [
+            ('observaciones', self.almacen_local.leer_observaciones_de_fechas, self.gs_handler.guardar_observaciones),
+            ('cambios_precio', self.almacen_local.leer_cambios_precio_de_fechas, self.gs_handler.guardar_cambios_precio),
+            ('vendidas', self.almacen_local.leer_vendidas_archivadas_de_fechas, self.gs_handler.archivar_vendidas),
+        ]
+        for tipo, leer, guardar in anadidos:
+            publicadas += self.publicar_anadidos([p for p in pendientes if p[1] == tipo], tipo, leer, guardar)
+
+        # Sin esas filas en Sheets el historico no se publica: quitaria datos que aun no estan alli
+        if self.stats['errores'] > errores_previos:
+            print("AVISO: Historico no publicado (faltan observaciones, cambios de precio o vendidas), "
+                  "queda pendiente")
+        else:
+            publicadas += self.publicar_historico(historicos)
+        publicadas += self.publicar_tabla(metricas, 'metricas',
+                                          self.almacen_local.leer_metricas, self.gs_handler.guardar_metricas)
+        publicadas += self.publicar_tabla(resumenes, 'resumen',
+                                          self.almacen_local.leer_resumen, self.gs_handler.guardar_resumen)
+        self.almacen_local.marcar_publicadas(publicadas)
+
+        print(f"PUBLICADO: {self.stats['snapshots']} snapshots SCR, {self.stats['historico']} historico, "
+              f"{self.stats['metricas']} metricas, {self.stats['resumen']} resumen, "
+              f"{self.stats['observaciones']:,} observaciones, {self.stats['cambios_precio']:,} cambios de precio, "
+              f"{self.stats['vendidas']:,} vendidas archivadas")
+        return self.stats['errores'] == 0
+
+def main():
+    """Funcion principal del publicador"""
+    print("="*80)
+    print(f"PUBLICADOR MOTICK - Almacen local -> Google Sheets ({datetime.now().strftime('%d/%m/%Y %H:%M')})")
+    print("="*80)
+
+    try:
+        almacen_local = AlmacenamientoLocalMotick()
+        gs_handler = crear_handler_google_sheets()
+
+        if not gs_handler.test_connection():
+            print("ERROR: No se pudo conectar a Google Sheets")
+            return False
+
+        return PublicadorSheetsMotick(almacen_local, gs_handler).publicar_pendientes()
+
+    except Exception as e:
+        print(f"ERROR CRITICO PUBLICANDO: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
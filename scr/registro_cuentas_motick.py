@@ -0,0 +1,173 @@
+"""
+Registro de cuentas Motick - Cuentas a scrapear y pistas por cuenta (JSON editable)
+<REGISTRO_CUENTAS> (por defecto data/cuentas_motick.json):
+    {"cuentas": {"MOTICK.MA M.": {
+        "url": "...", "activa": true, "prueba": true,      <- editables a mano
+        "prioridad": 0, "ttl_horas": 0, "pausa_anuncio": [1.5, 3.0],
+        "enlaces_ultimo": 212, "latencia_anuncio": 6.3,    <- los actualiza el scraper
+        "anuncios_ultimo": 208, "fallos_ultimo": 4, "ultimo_scrape": "2025-09-01T08:40:00"}}}
+Si no existe se crea con las cuentas de config.py (MOTICK_ACCOUNTS_FULL / _TEST), y al
+cargarlo se anaden las de config.py que falten (en CI el registro sale de la cache de
+Actions): para dejar de scrapear una cuenta, "activa": false en vez de borrarla
+- prioridad: mayor primero (orden del scraper y prioridad en la cola de tareas)
+- ttl_horas: no se vuelve a scrapear hasta que pase (0 = en cada ejecucion)
+- enlaces_ultimo / latencia_anuncio: objetivo de carga del perfil (expected_count,
+  max_clicks) y presupuesto de tiempo estimado de la cuenta
+"""
+
+import os
+import json
+import math
+from datetime import datetime, timedelta
+
+from config import REGISTRO_CUENTAS, MOTICK_ACCOUNTS_FULL, MOTICK_ACCOUNTS_TEST
+
+ANUNCIOS_ESPERADOS_DEFECTO = 300
+MAX_CLICKS_DEFECTO = 15
+ANUNCIOS_POR_CLIC = 20
+PAUSA_ANUNCIO_DEFECTO = (1.5, 3.0)
+# Campos que escribe el scraper (el resto solo se edita a mano)
+CAMPOS_MEDIDAS = ('enlaces_ultimo', 'latencia_anuncio', 'anuncios_ultimo', 'fallos_ultimo', 'ultimo_scrape')
+# Peso de la ultima medida en la latencia por anuncio (media movil)
+PESO_LATENCIA = 0.5
+
+def cuenta_por_defecto(url, prueba=False):
+    """Entrada de una cuenta nueva (sin medidas todavia)"""
+    return {
+        'url': url,
+        'activa': True,
+        'prueba': prueba,
+        'prioridad': 0,
+        'ttl_horas': 0,
+        'pausa_anuncio': list(PAUSA_ANUNCIO_DEFECTO),
+        'enlaces_ultimo': None,
+        'latencia_anuncio': None,
+        'anuncios_ultimo': None,
+        'fallos_ultimo': None,
+        'ultimo_scrape': None,
+    }
+
+class RegistroCuentasMotick:
+    def __init__(self, ruta=REGISTRO_CUENTAS):
+        self.ruta = ruta
+        self.registro = self.cargar()
+
+    def cargar(self):
+        """
+        Carga el registro (o lo crea si no existe o esta corrupto) y anade las cuentas
+        de config.py que no esten en el
+        """
+        registro = {'cuentas': {}}
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                registro = json.load(f)
+            registro.setdefault('cuentas', {})
+            for nombre, cuenta in registro['cuentas'].items():
+                for clave, valor in cuenta_por_defecto(cuenta.get('url')).items():
+                    cuenta.setdefault(clave, valor)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"AVISO: Registro de cuentas no valido ({str(e)}), se usan las cuentas de config.py")
+            registro = {'cuentas': {}}
+
+        nuevas = [nombre for nombre in MOTICK_ACCOUNTS_FULL if nombre not in registro['cuentas']]
+        for nombre in nuevas:
+            registro['cuentas'][nombre] = cuenta_por_defecto(MOTICK_ACCOUNTS_FULL[nombre],
+                                                             prueba=nombre in MOTICK_ACCOUNTS_TEST)
+        if nuevas and len(nuevas) < len(MOTICK_ACCOUNTS_FULL):
+            print(f"REGISTRO: {len(nuevas)} cuentas nuevas de config.py: {', '.join(nuevas)}")
+        return registro
+
+    def guardar(self):
+        """Escritura atomica (tmp + replace). Devuelve bool"""
+        try:
+            directorio = os.path.dirname(self.ruta)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            with open(self.ruta + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(self.registro, f, ensure_ascii=False, indent=2)
+            os.replace(self.ruta + '.tmp', self.ruta)
+            return True
+        except Exception as e:
+            print(f"AVISO: No se pudo guardar el registro de cuentas: {str(e)}")
+            return False
+
+    def cuenta(self, nombre):
+        """Entrada de una cuenta (por defecto si no esta en el registro)"""
+        return self.registro['cuentas'].get(nombre) or cuenta_por_defecto(None)
+
+    def pendiente(self, nombre, ahora=None):
+        """La cuenta toca hoy: nunca scrapeada o su ttl_horas ya paso"""
+        cuenta = self.cuenta(nombre)
+        if not cuenta['ttl_horas'] or not cuenta['ultimo_scrape']:
+            return True
+        ahora = ahora or datetime.now()
+        return datetime.fromisoformat(cuenta['ultimo_scrape']) + timedelta(hours=cuenta['ttl_horas']) <= ahora
+
+    def pista(self, nombre):
+        """Parametros de scrape de la cuenta: expected_count, max_clicks, pausa y presupuesto (segundos o None)"""
+        cuenta = self.cuenta(nombre)
+        enlaces = cuenta['enlaces_ultimo']
+        if enlaces:
+            # Margen para anuncios nuevos desde la ultima medida
+            esperados = int(math.ceil(enlaces * 1.2)) + 10
+            max_clicks = int(math.ceil(esperados / ANUNCIOS_POR_CLIC)) + 1
+        else:
+            esperados, max_clicks = ANUNCIOS_ESPERADOS_DEFECTO, MAX_CLICKS_DEFECTO
+
+        latencia = cuenta['latencia_anuncio']
+        return {
+            'expected_count': esperados,
+            'max_clicks': max_clicks,
+            'pausa': tuple(cuenta['pausa_anuncio']),
+            'presupuesto': round(enlaces * latencia) if enlaces and latencia else None,
+        }
+
+    def cuentas_a_scrapear(self, test_mode=False, todas=False, ahora=None):
+        """
+        {cuenta: url} activas (solo las de prueba en test_mode) que tocan hoy segun su ttl
+        Orden: prioridad (mayor primero) y despues las que mas tiempo necesitan
+        todas=True ignora el ttl
+        """
+        candidatas = [
+            (nombre, cuenta) for nombre, cuenta in self.registro['cuentas'].items()
+            if cuenta['activa'] and cuenta['url'] and (cuenta['prueba'] or not test_mode)
+        ]
+        al_dia = [nombre for nombre, _ in candidatas if not todas and not self.pendiente(nombre, ahora)]
+        if al_dia:
+            print(f"REGISTRO: {len(al_dia)} cuentas al dia por ttl_horas, no se scrapean: {', '.join(al_dia)}")
+
+        candidatas = [(nombre, cuenta) for nombre, cuenta in candidatas if nombre not in al_dia]
+        candidatas.sort(key=lambda item: (-item[1]['prioridad'], -(self.pista(item[0])['presupuesto'] or 0), item[0]))
+        return {nombre: cuenta['url'] for nombre, cuenta in candidatas}
+
+    def registrar_scrape(self, nombre, enlaces, anuncios, fallos, segundos, ahora=None):
+        """Actualiza las medidas de la cuenta tras scrapearla (no guarda: ver guardar)"""
+        cuenta = self.registro['cuentas'].setdefault(nombre, cuenta_por_defecto(None))
+        if enlaces:
+            cuenta['enlaces_ultimo'] = int(enlaces)
+        procesados = (anuncios or 0) + (fallos or 0)
+        if procesados and segundos:
+            latencia = segundos / procesados
+            anterior = cuenta['latencia_anuncio']
+            cuenta['latencia_anuncio'] = round(
+                latencia if anterior is None else PESO_LATENCIA * latencia + (1 - PESO_LATENCIA) * anterior, 2
+            )
+        cuenta['anuncios_ultimo'] = anuncios
+        cuenta['fallos_ultimo'] = fallos
+        cuenta['ultimo_scrape'] = (ahora or datetime.now()).isoformat(timespec='seconds')
+
+    def incorporar(self, cuentas):
+        """Copia las medidas de {cuenta: entrada} de otro registro (p.ej. el de un shard, ver --merge)"""
+        for nombre, entrada in cuentas.items():
+            cuenta = self.registro['cuentas'].setdefault(nombre, cuenta_por_defecto(entrada.get('url')))
+            for clave in CAMPOS_MEDIDAS:
+                if clave in entrada:
+                    cuenta[clave] = entrada[clave]
+
+    def presupuesto_total(self, cuentas):
+        """Segundos estimados para las cuentas con medidas (None si ninguna tiene)"""
+        presupuestos = [self.pista(nombre)['presupuesto'] for nombre in cuentas]
+        presupuestos = [p for p in presupuestos if p]
+        return sum(presupuestos) if presupuestos else None
@@ -0,0 +1,66 @@
+"""
+Resumen Motick - Cubo agregado cuenta x marca x estado x semana
+Se calcula en el analizador con un unico groupby sobre las columnas tipadas del
+historico (y las metricas del dia) para que los paneles lean cientos de filas en
+lugar de filtrar Motos_Activas/Motos_Vendidas a mano
+- Semana: lunes de la semana de venta (vendidas) o de deteccion (activas)
+- Motos, precio y km medios, dias medios hasta la venta, visitas/likes medios
+  y likes ganados en 7 dias (si hay metricas)
+Cubre lo que esta en el historico: las vendidas ya movidas al archivo frio
+tienen su propio resumen (compactacion_motick.resumen_vendidas_archivadas)
+"""
+
+import pandas as pd
+
+from esquema_motick import tipar_dataframe
+from catalogo_motick import asegurar_etiquetas
+
+DIMENSIONES_RESUMEN = ['Cuenta', 'Marca', 'Estado', 'Semana']
+
+def inicio_semana(fechas):
+    """Lunes (00:00) de la semana de cada fecha (NaT se mantiene)"""
+    fechas = fechas.dt.normalize()
+    return fechas - pd.to_timedelta(fechas.dt.dayofweek, unit='D')
+
+def calcular_resumen(df_historico, df_metricas=None):
+    """
+    Una fila por Cuenta x Marca x Estado x Semana
+    df_metricas (opcional) debe estar alineada por filas con df_historico
+    (la que devuelve metricas_motick.calcular_metricas)
+    """
+    df = asegurar_etiquetas(tipar_dataframe(df_historico.reset_index(drop=True)))
+
+    vendida = df['Estado'] == 'vendida'
+    fecha_evento = df['Fecha_Venta'].where(vendida, df['Primera_Deteccion'])
+
+    base = pd.DataFrame({
+        'Cuenta': df['Cuenta'].fillna(''),
+        'Marca': df['Marca'].fillna(''),
+        'Estado': df['Estado'].fillna(''),
+        'Semana': inicio_semana(fecha_evento),
+        'URL': df['URL'],
+        'Precio': df['Precio'].astype('Float64'),
+        'Kilometraje': df['Kilometraje'].astype('Float64'),
+        'Dias_Hasta_Venta': (df['Fecha_Venta'] - df['Primera_Deteccion']).dt.days.astype('Float64'),
+        'Visitas_Totales': pd.to_numeric(df.get('Visitas_Totales'), errors='coerce'),
+        'Likes_Totales': pd.to_numeric(df.get('Likes_Totales'), errors='coerce'),
+    })
+    agregados = dict(
+        Motos=('URL', 'count'),
+        Precio_Medio=('Precio', 'mean'),
+        Km_Medio=('Kilometraje', 'mean'),
+        Dias_Hasta_Venta_Medio=('Dias_Hasta_Venta', 'mean'),
+        Visitas_Medias=('Visitas_Totales', 'mean'),
+        Likes_Medios=('Likes_Totales', 'mean'),
+    )
+    if df_metricas is not None and 'Likes_Delta_7d' in df_metricas.columns:
+        base['Likes_Delta_7d'] = df_metricas['Likes_Delta_7d'].reset_index(drop=True).astype('Float64')
+        agregados['Likes_Delta_7d'] = ('Likes_Delta_7d', 'sum')
+
+    resumen = base.groupby(DIMENSIONES_RESUMEN, dropna=False, sort=True).agg(**agregados).reset_index()
+
+    medias = [col for col in resumen.columns if col.endswith(('_Medio', '_Medias', '_Medios'))]
+    resumen[medias] = resumen[medias].astype('Float64').round(1)
+    if 'Likes_Delta_7d' in resumen.columns:
+        resumen['Likes_Delta_7d'] = resumen['Likes_Delta_7d'].astype('Int64')
+    return resumen
@@ -17,6 +17,8 @@ import time
 import re
 import os
 import sys
+import argparse
+import socket
 import pandas as pd
 import random
 from datetime import datetime
@@ -29,21 +31,17 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from tqdm import tqdm
 from webdriver_manager.chrome import ChromeDriverManager
-import hashlib
 
 # Importar modulos locales
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from config import get_motick_accounts, GOOGLE_SHEET_ID_MOTICK
-from google_sheets_motick import GoogleSheetsMotick
-
-# LISTA DE USER AGENTS PARA ROTAR
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0"
-]
+from config import TIPO_ALMACENAMIENTO, STREAM_SCRAPER, USER_AGENTS, SHARDS_DIR
+from almacenamiento_motick import crear_almacenamiento
+from catalogo_motick import tiene_marca
+from stream_motick import crear_salida_stream, preparar_anuncios
+from shards_motick import parsear_shard, cuentas_del_shard, guardar_shard, unir_shards, leer_medidas_shards
+from cola_motick import ColaTareasMotick, PRIORIDAD_CUENTA
+from registro_cuentas_motick import RegistroCuentasMotick, PAUSA_ANUNCIO_DEFECTO
+from selectores_motick import EstadisticasSelectoresMotick, ordenar_selectores, anotar_selector
 
 def setup_browser():
     """Configura navegador Chrome con AUTO-UPDATE + User-Agent aleatorio"""
@@ -122,8 +120,8 @@ def accept_cookies(driver):
     except:
         return False
 
-def extract_title_robust(driver):
-    """Extrae titulo"""
+def extract_title_robust(driver, selectores=None):
+    """Extrae titulo (selectores: EstadisticasSelectoresMotick opcional, orden y aciertos)"""
     h1_selectors = [
         "h1",
         "h1[class*='title']",
@@ -132,15 +130,16 @@ def extract_title_robust(driver):
         "[class*='Title'] h1"
     ]
     
-    for selector in h1_selectors:
+    probados = []
+    for selector in ordenar_selectores(selectores, 'titulo', h1_selectors):
+        probados.append(selector)
         try:
             elements = driver.find_elements(By.CSS_SELECTOR, selector)
             for element in elements:
                 text = element.text.strip()
                 if text and len(text) > 3 and len(text) < 100:
-                    if any(word.upper() in text.upper() for word in ['HONDA', 'YAMAHA', 'KAWASAKI', 'SUZUKI', 'BMW', 'KTM', 'DUCATI', 'PIAGGIO', 'VESPA', 'APRILIA', 'TRIUMPH']):
-                        return text
-                    elif len(text) > 10:
+                    if len(text) > 10 or tiene_marca(text):
+                        anotar_selector(selectores, 'titulo', probados, selector)
                         return text
         except:
             continue
@@ -149,6 +148,7 @@ def extract_title_robust(driver):
         title_meta = driver.find_element(By.XPATH, "//meta[@property='og:title']")
         content = title_meta.get_attribute("content")
         if content and len(content) > 5:
+            anotar_selector(selectores, 'titulo', probados, 'meta og:title')
             return content.split(' - ')[0].strip()
     except:
         pass
@@ -168,16 +168,18 @@ def extract_title_robust(driver):
                 if desc_text:
                     first_line = desc_text.split('\n')[0].strip()
                     if len(first_line) > 5 and len(first_line) < 80:
+                        anotar_selector(selectores, 'titulo', probados, f"descripcion {selector}")
                         return first_line
             except:
                 continue
     except:
         pass
     
+    anotar_selector(selectores, 'titulo', probados)
     return "Titulo no encontrado"
 
-def extract_price_robust(driver):
-    """Extrae precio con timeout CORTO"""
+def extract_price_robust(driver, selectores=None):
+    """Extrae precio con timeout CORTO (selectores: EstadisticasSelectoresMotick opcional)"""
     try:
         WebDriverWait(driver, 3).until(  # REDUCIDO de 7 a 3
             EC.presence_of_element_located((By.XPATH, "//*[contains(text(), '€')]"))
@@ -185,6 +187,7 @@ def extract_price_robust(driver):
     except:
         pass
     
+    # Orden de precedencia: el precio al contado gana al financiado (no se reordena, ver ORDEN_FIJO)
     price_selectors = [
         "span.item-detail-price_ItemDetailPrice--standardFinanced__f9ceG",
         ".item-detail-price_ItemDetailPrice--standardFinanced__f9ceG", 
@@ -196,7 +199,9 @@ def extract_price_robust(driver):
         "[class*='financed'] span"
     ]
     
-    for selector in price_selectors:
+    probados = []
+    for selector in ordenar_selectores(selectores, 'precio', price_selectors):
+        probados.append(selector)
         try:
             elements = driver.find_elements(By.CSS_SELECTOR, selector)
             for element in elements:
@@ -204,6 +209,7 @@ def extract_price_robust(driver):
                 if text and '€' in text:
                     price = extract_price_from_text_wallapop(text)
                     if price != "No especificado":
+                        anotar_selector(selectores, 'precio', probados, selector)
                         return price
         except:
             continue
@@ -215,7 +221,10 @@ def extract_price_robust(driver):
         
         if contado_elements:
             raw_price = contado_elements[0].text.strip()
-            return extract_price_from_text_wallapop(raw_price)
+            price = extract_price_from_text_wallapop(raw_price)
+            anotar_selector(selectores, 'precio', probados,
+                            'xpath precio al contado' if price != "No especificado" else None)
+            return price
     except:
         pass
     
@@ -251,11 +260,13 @@ def extract_price_robust(driver):
         
         if valid_prices:
             valid_prices = sorted(set(valid_prices), key=lambda x: x[0], reverse=True)
+            anotar_selector(selectores, 'precio', probados, 'regex texto con €')
             return valid_prices[0][1]
                     
     except:
         pass
     
+    anotar_selector(selectores, 'precio', probados)
     return "No especificado"
 
 def extract_price_from_text_wallapop(text):
@@ -293,8 +304,8 @@ def extract_price_from_text_wallapop(text):
     
     return "No especificado"
 
-def extract_likes_robust(driver):
-    """Extrae likes"""
+def extract_likes_robust(driver, selectores=None):
+    """Extrae likes (selectores: EstadisticasSelectoresMotick opcional)"""
     like_selectors = [
         "button[aria-label*='favorite'] span",
         "button[aria-label*='Favorite'] span", 
@@ -306,12 +317,15 @@ def extract_likes_robust(driver):
         "[class*='heart']"
     ]
     
-    for selector in like_selectors:
+    probados = []
+    for selector in ordenar_selectores(selectores, 'likes', like_selectors):
+        probados.append(selector)
         try:
             elements = driver.find_elements(By.CSS_SELECTOR, selector)
             for element in elements:
                 text = element.text.strip()
                 if text.isdigit() and 0 <= int(text) <= 1000:
+                    anotar_selector(selectores, 'likes', probados, selector)
                     return int(text)
                 
                 aria_label = element.get_attribute('aria-label') or ''
@@ -319,6 +333,7 @@ def extract_likes_robust(driver):
                 if numbers:
                     likes_value = int(numbers[0])
                     if 0 <= likes_value <= 1000:
+                        anotar_selector(selectores, 'likes', probados, selector)
                         return likes_value
         except:
             continue
@@ -339,16 +354,18 @@ def extract_likes_robust(driver):
                 try:
                     likes_value = int(match.group(1))
                     if 0 <= likes_value <= 1000:
+                        anotar_selector(selectores, 'likes', probados, 'regex html')
                         return likes_value
                 except:
                     continue
     except:
         pass
     
+    anotar_selector(selectores, 'likes', probados)
     return 0
 
-def extract_year_and_km_robust(driver):
-    """Extrae año y KM"""
+def extract_year_and_km_robust(driver, selectores=None):
+    """Extrae año y KM (selectores: EstadisticasSelectoresMotick opcional, selector de la descripcion)"""
     year = "No especificado"
     km = "No especificado"
     
@@ -361,14 +378,19 @@ def extract_year_and_km_robust(driver):
         ]
         
         description_text = ""
-        for selector in description_selectors:
+        probados = []
+        fuente = None
+        for selector in ordenar_selectores(selectores, 'descripcion', description_selectors):
+            probados.append(selector)
             try:
                 description_element = driver.find_element(By.CSS_SELECTOR, selector)
                 description_text = description_element.text
                 if description_text:
+                    fuente = selector
                     break
             except:
                 continue
+        anotar_selector(selectores, 'descripcion', probados, fuente)
         
         if description_text:
             km_patterns = [
@@ -466,8 +488,8 @@ def extract_year_and_km_robust(driver):
     
     return year, km
 
-def extract_views_robust(driver):
-    """Extrae visitas"""
+def extract_views_robust(driver, selectores=None):
+    """Extrae visitas (selectores: EstadisticasSelectoresMotick opcional)"""
     view_selectors = [
         'span[aria-label="Views"]',
         '[aria-label*="Views"]',
@@ -476,7 +498,9 @@ def extract_views_robust(driver):
         '[class*="Views"]'
     ]
     
-    for selector in view_selectors:
+    probados = []
+    for selector in ordenar_selectores(selectores, 'visitas', view_selectors):
+        probados.append(selector)
         try:
             elements = driver.find_elements(By.CSS_SELECTOR, selector)
             for element in elements:
@@ -489,6 +513,7 @@ def extract_views_robust(driver):
                             k_value = float(k_match.group(1))
                             views = int(k_value * 1000)
                             if 0 <= views <= 500000:
+                                anotar_selector(selectores, 'visitas', probados, selector)
                                 return views
                     except:
                         pass
@@ -496,6 +521,7 @@ def extract_views_robust(driver):
                 if text.isdigit():
                     views = int(text)
                     if 0 <= views <= 500000:
+                        anotar_selector(selectores, 'visitas', probados, selector)
                         return views
                         
                 aria_label = element.get_attribute('aria-label') or ''
@@ -507,6 +533,7 @@ def extract_views_robust(driver):
                             k_value = float(k_match.group(1))
                             views = int(k_value * 1000)
                             if 0 <= views <= 500000:
+                                anotar_selector(selectores, 'visitas', probados, selector)
                                 return views
                     except:
                         continue
@@ -515,6 +542,7 @@ def extract_views_robust(driver):
                 if numbers:
                     views_value = int(numbers[0])
                     if 0 <= views_value <= 500000:
+                        anotar_selector(selectores, 'visitas', probados, selector)
                         return views_value
         except:
             continue
@@ -535,6 +563,7 @@ def extract_views_robust(driver):
                     k_value = float(match.group(1))
                     views = int(k_value * 1000)
                     if 0 <= views <= 500000:
+                        anotar_selector(selectores, 'visitas', probados, 'regex k html')
                         return views
                 except:
                     continue
@@ -551,24 +580,16 @@ def extract_views_robust(driver):
                 try:
                     views_value = int(match.group(1))
                     if 0 <= views_value <= 500000:
+                        anotar_selector(selectores, 'visitas', probados, 'regex html')
                         return views_value
                 except:
                     continue
     except:
         pass
     
+    anotar_selector(selectores, 'visitas', probados)
     return 0
 
-def create_moto_id(title, price, year, km):
-    """Crea ID unico"""
-    try:
-        normalized_title = re.sub(r'[^\w\s]', '', title.lower().strip())[:20]
-        normalized_price = re.sub(r'[^\d]', '', price)
-        unique_string = f"{normalized_title}_{normalized_price}_{year}_{km}".replace(' ', '_')
-        return hashlib.md5(unique_string.encode()).hexdigest()[:10]
-    except:
-        return hashlib.md5(str(time.time()).encode()).hexdigest()[:10]
-
 def find_and_click_load_more(driver):
     """Busca y hace clic en 'Ver más productos'"""
     selectors = [
@@ -667,8 +688,64 @@ def smart_load_all_ads(driver, expected_count=300, max_clicks=15):
     
     return final_count
 
-def get_user_ads(driver, user_url, account_name):
-    """Procesa todos los anuncios con DELAYS INTELIGENTES Y DETECCIÓN DE BLOQUEOS"""
+def listar_anuncios_cuenta(driver, user_url, pista=None):
+    """
+    Carga el perfil completo y devuelve las URLs unicas de sus anuncios (None si no se pudo acceder)
+    pista: RegistroCuentasMotick.pista (objetivo de anuncios y clics de la cuenta)
+    """
+    if not safe_navigate(driver, user_url):
+        print(f"[ERROR] No se pudo acceder al perfil")
+        return None
+    
+    accept_cookies(driver)
+    
+    pista = pista or {}
+    final_count = smart_load_all_ads(driver, expected_count=pista.get('expected_count', 300),
+                                     max_clicks=pista.get('max_clicks', 15))
+    
+    ad_elements = driver.find_elements(By.XPATH, "//a[contains(@href, '/item/')]")
+    ad_urls = list(set([elem.get_attribute('href') for elem in ad_elements if elem.get_attribute('href')]))
+    
+    print(f"[INFO] Enlaces únicos: {len(ad_urls)}")
+    return ad_urls
+
+def extraer_anuncio(driver, ad_url, account_name, selectores=None):
+    """
+    Navega al anuncio y devuelve su ad_data (None si la navegacion falla o es lenta: posible bloqueo)
+    selectores: EstadisticasSelectoresMotick opcional (orden de los selectores y fuente de cada campo)
+    """
+    if not safe_navigate(driver, ad_url, timeout=10):
+        return None
+    
+    # Pequeña espera para que cargue
+    time.sleep(random.uniform(0.5, 0.8))
+    
+    # EXTRACCION
+    title = extract_title_robust(driver, selectores)
+    price = extract_price_robust(driver, selectores)
+    likes = extract_likes_robust(driver, selectores)
+    year, km = extract_year_and_km_robust(driver, selectores)
+    views = extract_views_robust(driver, selectores)
+    
+    return {
+        'Cuenta': account_name,
+        'Titulo': title,
+        'Precio': price,
+        'Ano': year,
+        'Kilometraje': km,
+        'Visitas': views,
+        'Likes': likes,
+        'URL': ad_url,
+        'Fecha_Extraccion': datetime.now().strftime("%d/%m/%Y %H:%M")
+    }
+
+def get_user_ads(driver, user_url, account_name, stream=None, registro=None, selectores=None):
+    """
+    Procesa todos los anuncios con DELAYS INTELIGENTES Y DETECCIÓN DE BLOQUEOS
+    stream: SalidaStreamMotick opcional (cada anuncio se emite al extraerlo y al final el resumen de la cuenta)
+    registro: RegistroCuentasMotick opcional (pistas de la cuenta; se actualizan sus medidas al terminar)
+    selectores: EstadisticasSelectoresMotick opcional (ver extraer_anuncio)
+    """
     print(f"\n[INFO] === PROCESANDO: {account_name} ===")
     print(f"[INFO] URL: {user_url}")
     
@@ -679,30 +756,27 @@ def get_user_ads(driver, user_url, account_name):
     km_ok = 0
     ejemplos_mostrados = 0
     slow_requests = 0  # Contador de requests lentas
+    account_start = time.time()
+    ad_urls = None
+    pista = registro.pista(account_name) if registro is not None else {}
+    pausa = pista.get('pausa', PAUSA_ANUNCIO_DEFECTO)
+    if pista.get('presupuesto'):
+        print(f"[INFO] Presupuesto estimado: {pista['presupuesto'] / 60:.1f} min")
     
     try:
-        if not safe_navigate(driver, user_url):
-            print(f"[ERROR] No se pudo acceder al perfil")
+        ad_urls = listar_anuncios_cuenta(driver, user_url, pista)
+        if ad_urls is None:
             return all_ads
         
-        accept_cookies(driver)
-        
-        final_count = smart_load_all_ads(driver, expected_count=300, max_clicks=15)
-        
-        ad_elements = driver.find_elements(By.XPATH, "//a[contains(@href, '/item/')]")
-        ad_urls = list(set([elem.get_attribute('href') for elem in ad_elements if elem.get_attribute('href')]))
-        
-        print(f"[INFO] Enlaces únicos: {len(ad_urls)}")
-        
         for idx, ad_url in enumerate(tqdm(ad_urls, desc=f"Extrayendo {account_name}", colour="green")):
             try:
-                # ✅ DELAY ALEATORIO ENTRE ANUNCIOS (1.5-3 segundos) - CRÍTICO
-                delay = random.uniform(1.5, 3.0)
+                # ✅ DELAY ALEATORIO ENTRE ANUNCIOS (1.5-3 segundos por defecto) - CRÍTICO
+                delay = random.uniform(*pausa)
                 time.sleep(delay)
                 
                 # ✅ Navegar con detección de bloqueo
-                nav_start = time.time()
-                if not safe_navigate(driver, ad_url, timeout=10):
+                ad_data = extraer_anuncio(driver, ad_url, account_name, selectores)
+                if ad_data is None:
                     failed_ads += 1
                     slow_requests += 1
                     
@@ -713,21 +787,9 @@ def get_user_ads(driver, user_url, account_name):
                         slow_requests = 0
                     continue
                 
-                nav_time = time.time() - nav_start
-                if nav_time < 5:
-                    slow_requests = 0  # Reset si la navegación fue rápida
-                
-                # Pequeña espera para que cargue
-                time.sleep(random.uniform(0.5, 0.8))
-                
-                # EXTRACCION
-                title = extract_title_robust(driver)
-                price = extract_price_robust(driver)
-                likes = extract_likes_robust(driver)
-                year, km = extract_year_and_km_robust(driver)
-                views = extract_views_robust(driver)
-                moto_id = create_moto_id(title, price, year, km)
+                slow_requests = 0  # Reset: la navegación fue rápida
                 
+                title, price, km, year = ad_data['Titulo'], ad_data['Precio'], ad_data['Kilometraje'], ad_data['Ano']
                 if price != "No especificado":
                     precios_ok += 1
                 if km != "No especificado":
@@ -737,21 +799,10 @@ def get_user_ads(driver, user_url, account_name):
                     print(f"[EJEMPLO {ejemplos_mostrados + 1}] {title[:30]}... | {price} | {km} | {year}")
                     ejemplos_mostrados += 1
                 
-                ad_data = {
-                    'ID_Moto': moto_id,
-                    'Cuenta': account_name,
-                    'Titulo': title,
-                    'Precio': price,
-                    'Ano': year,
-                    'Kilometraje': km,
-                    'Visitas': views,
-                    'Likes': likes,
-                    'URL': ad_url,
-                    'Fecha_Extraccion': datetime.now().strftime("%d/%m/%Y %H:%M")
-                }
-                
                 all_ads.append(ad_data)
                 successful_ads += 1
+                if stream is not None:
+                    stream.emitir_anuncio(ad_data)
                 
                 if successful_ads % 50 == 0:
                     precio_pct = (precios_ok / successful_ads * 100) if successful_ads > 0 else 0
@@ -777,50 +828,46 @@ def get_user_ads(driver, user_url, account_name):
             print(f"[ALERTA] Baja extracción de KM en {account_name}")
     else:
         print(f"[RESUMEN] {account_name}: Sin anuncios procesados")
+    
+    if stream is not None:
+        stream.emitir_resumen_cuenta(account_name, successful_ads, failed_ads, precios_ok, km_ok,
+                                     time.time() - account_start)
+    if registro is not None and ad_urls is not None:
+        registro.registrar_scrape(account_name, len(ad_urls), successful_ads, failed_ads,
+                                  time.time() - account_start)
         
     return all_ads
 
-def main():
-    """Funcion principal - VERSION DEFINITIVA ANTI-BLOQUEO"""
-    print("="*80)
-    print("    MOTICK SCRAPER - VERSION 2.0 DEFINITIVA ANTI-BLOQUEO")
-    print("="*80)
-    print(" ✅ Delays aleatorios 1.5-3s entre anuncios")
-    print(" ✅ Detección automática de ralentización")
-    print(" ✅ Pausa de 30s si detecta bloqueo")
-    print(" ✅ Timeouts cortos (3s)")
-    print(" ✅ User-Agent rotatorio")
-    print(" ✅ Fast-fail si >10s")
-    print(" ⚡ Tiempo estimado: 1.5-2 horas")
-    print()
-    
+def ejecutar_scraper(motick_accounts=None, registro=None, todas=False, selectores=None):
+    """
+    Recorre las cuentas MOTICK (las que tocan hoy segun el registro de cuentas, o las
+    indicadas, p.ej. las de un shard) y devuelve el DataFrame del dia (None si no hay anuncios)
+    Las medidas de cada cuenta (enlaces, latencia) se guardan en el registro al terminar,
+    igual que los aciertos de los selectores (con su informe para podar los muertos)
+    todas: ignora el ttl_horas del registro
+    selectores: EstadisticasSelectoresMotick del llamador (p.ej. un shard); entonces
+    guardarlas le toca a el
+    Incluye ID_Unico_Real, etiquetas del catalogo y estadisticas de calidad; no guarda nada
+    (main lo sube como hoja SCR y pipeline_motick lo pasa directamente al analizador)
+    """
+    driver = None
+    stream = None
     try:
-        credentials_json = os.getenv('GOOGLE_CREDENTIALS_JSON')
-        sheet_id = os.getenv('GOOGLE_SHEET_ID') or GOOGLE_SHEET_ID_MOTICK
+        registro = registro or RegistroCuentasMotick()
+        guardar_selectores = selectores is None
+        if selectores is None:
+            selectores = EstadisticasSelectoresMotick()
+        if motick_accounts is None:
+            test_mode = os.getenv('TEST_MODE', 'false').lower() == 'true'
+            motick_accounts = registro.cuentas_a_scrapear(test_mode, todas)
         
-        if not credentials_json:
-            print("[ERROR] Credenciales de Google no encontradas")
-            return False
-        
-        if not sheet_id:
-            print("[ERROR] ID de Google Sheet no encontrado")
-            return False
-        
-        print("[INFO] Inicializando conexion a Google Sheets...")
-        gs_handler = GoogleSheetsMotick(
-            credentials_json_string=credentials_json,
-            sheet_id=sheet_id
-        )
-        
-        if not gs_handler.test_connection():
-            print("[ERROR] No se pudo conectar a Google Sheets")
-            return False
-        
-        test_mode = os.getenv('TEST_MODE', 'false').lower() == 'true'
-        motick_accounts = get_motick_accounts(test_mode)
+        presupuesto = registro.presupuesto_total(motick_accounts)
+        if presupuesto:
+            print(f"[INFO] Presupuesto estimado: {presupuesto / 60:.1f} minutos")
         
         print(f"[INFO] Inicializando navegador...")
         driver = setup_browser()
+        stream = crear_salida_stream(STREAM_SCRAPER)
         
         all_results = []
         
@@ -834,7 +881,7 @@ def main():
             print(f"{'='*60}")
             
             try:
-                account_ads = get_user_ads(driver, account_url, account_name)
+                account_ads = get_user_ads(driver, account_url, account_name, stream, registro, selectores)
                 all_results.extend(account_ads)
                 
                 print(f"[RESUMEN] {account_name}: {len(account_ads)} anuncios procesados")
@@ -846,75 +893,311 @@ def main():
                 print(f"[ERROR] Error procesando {account_name}: {str(e)}")
                 continue
         
-        if all_results:
-            elapsed_time = (time.time() - start_time) / 60
-            
-            print(f"\n{'='*80}")
-            print(f"✅ PROCESAMIENTO COMPLETADO EN {elapsed_time:.1f} MINUTOS")
-            print(f"{'='*80}")
-            
-            df = pd.DataFrame(all_results)
-            df = df.sort_values(['Likes', 'Visitas'], ascending=[False, False])
-            
-            total_processed = len(df)
-            total_likes = df['Likes'].sum()
-            total_views = df['Visitas'].sum()
-            
-            titles_ok = len(df[df['Titulo'] != 'Titulo no encontrado'])
-            prices_ok = len(df[df['Precio'] != 'No especificado'])
-            km_ok = len(df[df['Kilometraje'] != 'No especificado'])
-            years_ok = len(df[df['Ano'] != 'No especificado'])
-            
-            print(f"\n📊 ESTADISTICAS SCRAPER:")
-            print(f"• Total anuncios procesados: {total_processed:,}")
-            print(f"• Total visitas: {total_views:,}")
-            print(f"• Total likes: {total_likes:,}")
-            print(f"• Tiempo total: {elapsed_time:.1f} minutos")
-            print(f"\n📈 CALIDAD DE EXTRACCIÓN:")
-            print(f"• Titulos: {titles_ok}/{total_processed} ({titles_ok/total_processed*100:.1f}%)")
-            print(f"• Precios: {prices_ok}/{total_processed} ({prices_ok/total_processed*100:.1f}%)")
-            print(f"• Kilometraje: {km_ok}/{total_processed} ({km_ok/total_processed*100:.1f}%)")
-            print(f"• Años: {years_ok}/{total_processed} ({years_ok/total_processed*100:.1f}%)")
-            print(f"\n📊 PROMEDIOS:")
-            print(f"• Media visitas: {df['Visitas'].mean():.1f}")
-            print(f"• Media likes: {df['Likes'].mean():.1f}")
+        registro.guardar()
+        selectores.informe()
+        if guardar_selectores:
+            selectores.guardar()
+        
+        if not all_results:
+            print("[ERROR] No se procesaron anuncios")
+            return None
+        
+        elapsed_time = (time.time() - start_time) / 60
+        
+        print(f"\n{'='*80}")
+        print(f"✅ PROCESAMIENTO COMPLETADO EN {elapsed_time:.1f} MINUTOS")
+        print(f"{'='*80}")
+        
+        # ID_Unico_Real una sola vez aqui (almacenamiento y analizador lo reutilizan) y
+        # Marca/Modelo/Cilindrada del catalogo detras de Titulo, igual que los lectores del stream
+        df = preparar_anuncios(all_results)
+        df = df.sort_values(['Likes', 'Visitas'], ascending=[False, False])
+        
+        total_processed = len(df)
+        total_likes = df['Likes'].sum()
+        total_views = df['Visitas'].sum()
+        
+        titles_ok = len(df[df['Titulo'] != 'Titulo no encontrado'])
+        prices_ok = len(df[df['Precio'] != 'No especificado'])
+        km_ok = len(df[df['Kilometraje'] != 'No especificado'])
+        years_ok = len(df[df['Ano'] != 'No especificado'])
+        brands_ok = len(df[df['Marca'] != ''])
+        
+        print(f"\n📊 ESTADISTICAS SCRAPER:")
+        print(f"• Total anuncios procesados: {total_processed:,}")
+        print(f"• Total visitas: {total_views:,}")
+        print(f"• Total likes: {total_likes:,}")
+        print(f"• Tiempo total: {elapsed_time:.1f} minutos")
+        print(f"\n📈 CALIDAD DE EXTRACCIÓN:")
+        print(f"• Titulos: {titles_ok}/{total_processed} ({titles_ok/total_processed*100:.1f}%)")
+        print(f"• Precios: {prices_ok}/{total_processed} ({prices_ok/total_processed*100:.1f}%)")
+        print(f"• Kilometraje: {km_ok}/{total_processed} ({km_ok/total_processed*100:.1f}%)")
+        print(f"• Años: {years_ok}/{total_processed} ({years_ok/total_processed*100:.1f}%)")
+        print(f"• Marcas (catalogo): {brands_ok}/{total_processed} ({brands_ok/total_processed*100:.1f}%)")
+        print(f"\n📊 PROMEDIOS:")
+        print(f"• Media visitas: {df['Visitas'].mean():.1f}")
+        print(f"• Media likes: {df['Likes'].mean():.1f}")
+        
+        print(f"\n🔍 EJEMPLOS DE DATOS EXTRAÍDOS:")
+        samples = df.head(3)
+        for i, (_, row) in enumerate(samples.iterrows(), 1):
+            print(f"  {i}. {row['Titulo'][:40]}...")
+            print(f"      {row['Precio']} | {row['Kilometraje']} | {row['Ano']} | 👁 {row['Visitas']} | ❤ {row['Likes']}")
+        
+        alertas = []
+        if titles_ok/total_processed < 0.8:
+            alertas.append("Baja extracción de títulos")
+        if prices_ok/total_processed < 0.7:
+            alertas.append("Baja extracción de precios")
+        if km_ok/total_processed < 0.6:
+            alertas.append("Baja extracción de kilometraje")
             
-            print(f"\n🔍 EJEMPLOS DE DATOS EXTRAÍDOS:")
-            samples = df.head(3)
-            for i, (_, row) in enumerate(samples.iterrows(), 1):
-                print(f"  {i}. {row['Titulo'][:40]}...")
-                print(f"      {row['Precio']} | {row['Kilometraje']} | {row['Ano']} | 👁 {row['Visitas']} | ❤ {row['Likes']}")
+        if alertas:
+            print(f"\n⚠️  ALERTAS DE CALIDAD:")
+            for alerta in alertas:
+                print(f"   • {alerta}")
+        else:
+            print(f"\n✅ CALIDAD EXCELENTE: Todos los indicadores están bien")
+        
+        return df
+    
+    finally:
+        if stream is not None:
+            stream.finalizar()
+        if driver is not None:
+            try:
+                driver.quit()
+            except:
+                pass
+
+def ejecutar_shard(shard, todas=False):
+    """Scrapea solo las cuentas del shard i/N y guarda el resultado parcial en local (sin subir nada)"""
+    indice, total = parsear_shard(shard)
+    test_mode = os.getenv('TEST_MODE', 'false').lower() == 'true'
+    registro = RegistroCuentasMotick()
+    cuentas = cuentas_del_shard(registro.cuentas_a_scrapear(test_mode, todas), indice, total)
+    fecha_extraccion = datetime.now().strftime("%d/%m/%Y")
+    print(f"[INFO] Shard {indice}/{total}: {len(cuentas)} cuentas ({', '.join(cuentas) or 'ninguna'})")
+    
+    # Mas shards que cuentas: se guarda vacio para que el merge no lo de por perdido
+    selectores = EstadisticasSelectoresMotick()
+    df = ejecutar_scraper(cuentas, registro, selectores=selectores) if cuentas else pd.DataFrame()
+    if df is None:
+        return False
+    # Las medidas viajan con el shard: el runner se descarta y el merge las incorpora
+    medidas = {'registro': {cuenta: registro.cuenta(cuenta) for cuenta in cuentas},
+               'selectores': selectores.ejecucion}
+    return guardar_shard(df, indice, total, cuentas, fecha_extraccion, medidas=medidas) is not None
+
+def incorporar_medidas_shards(fecha_display, registro=None, selectores=None, directorio=SHARDS_DIR):
+    """Pasa al registro de cuentas y a las estadisticas de selectores las medidas de los shards del dia"""
+    registro = registro or RegistroCuentasMotick()
+    if selectores is None:
+        selectores = EstadisticasSelectoresMotick()
+    medidas = leer_medidas_shards(fecha_display, directorio)
+    for medida in medidas:
+        registro.incorporar(medida.get('registro', {}))
+        selectores.sumar(medida.get('selectores', {}))
+    print(f"[INFO] Medidas de {len(medidas)} shards incorporadas al registro y a los selectores")
+    return registro.guardar() and selectores.guardar()
+
+def encolar_dia(cola, fecha_iso, todas=False):
+    """
+    Encola una tarea por cuenta para el dia (idempotente: reencolar no duplica)
+    La prioridad de cada cuenta del registro se suma a la de la tarea
+    """
+    test_mode = os.getenv('TEST_MODE', 'false').lower() == 'true'
+    registro = RegistroCuentasMotick()
+    cuentas = registro.cuentas_a_scrapear(test_mode, todas)
+    nuevas = sum(
+        cola.encolar(fecha_iso, 'cuenta', cuenta, [url], PRIORIDAD_CUENTA + registro.cuenta(cuenta)['prioridad'])
+        for cuenta, url in cuentas.items()
+    )
+    print(f"[INFO] Cola {fecha_iso}: {nuevas} cuentas nuevas encoladas ({len(cuentas)} en total)")
+    return True
+
+def ejecutar_trabajador(cola, fecha_iso, nombre=None, espera=5):
+    """
+    Trabajador de la cola: reclama tareas (perfiles y anuncios) hasta que no queda ninguna
+    activa del dia. Mismo ritmo anti-bloqueo que get_user_ads
+    Se pueden lanzar tantos procesos como se quiera contra la misma cola
+    """
+    nombre = nombre or f"{socket.gethostname()}-{os.getpid()}"
+    registro = RegistroCuentasMotick()
+    selectores = EstadisticasSelectoresMotick()
+    driver = None
+    stats = {'cuentas': 0, 'anuncios': 0, 'fallos': 0}
+    slow_requests = 0
+    
+    try:
+        print(f"[INFO] Trabajador {nombre}: inicializando navegador...")
+        driver = setup_browser()
+        
+        while True:
+            tarea = cola.reclamar(nombre, fecha_iso)
+            if tarea is None:
+                # Otras tareas en curso pueden volver a la cola si su trabajador cae
+                if cola.activas(fecha_iso) == 0:
+                    break
+                time.sleep(espera)
+                continue
             
-            alertas = []
-            if titles_ok/total_processed < 0.8:
-                alertas.append("Baja extracción de títulos")
-            if prices_ok/total_processed < 0.7:
-                alertas.append("Baja extracción de precios")
-            if km_ok/total_processed < 0.6:
-                alertas.append("Baja extracción de kilometraje")
+            try:
+                if tarea['tipo'] == 'cuenta':
+                    print(f"\n[INFO] === PERFIL: {tarea['cuenta']} (intento {tarea['intentos']}) ===")
+                    ad_urls = listar_anuncios_cuenta(driver, tarea['url'], registro.pista(tarea['cuenta']))
+                    if ad_urls is None:
+                        stats['fallos'] += 1
+                        cola.fallar(tarea, nombre, 'perfil no accesible')
+                        continue
+                    # Los anuncios heredan la prioridad de su cuenta (por debajo de los perfiles)
+                    nuevas = cola.encolar_anuncios(tarea['cuenta'], ad_urls, fecha_iso,
+                                                   tarea['prioridad'] - PRIORIDAD_CUENTA)
+                    cola.completar(tarea, nombre, {'anuncios': len(ad_urls), 'nuevos': nuevas})
+                    stats['cuentas'] += 1
+                    continue
                 
-            if alertas:
-                print(f"\n⚠️  ALERTAS DE CALIDAD:")
-                for alerta in alertas:
-                    print(f"   • {alerta}")
-            else:
-                print(f"\n✅ CALIDAD EXCELENTE: Todos los indicadores están bien")
-            
+                # ✅ DELAY ALEATORIO ENTRE ANUNCIOS (pausa de la cuenta, 1.5-3s por defecto) - CRÍTICO
+                time.sleep(random.uniform(*registro.pista(tarea['cuenta'])['pausa']))
+                ad_data = extraer_anuncio(driver, tarea['url'], tarea['cuenta'], selectores)
+                if ad_data is None:
+                    stats['fallos'] += 1
+                    cola.fallar(tarea, nombre, 'navegacion lenta o fallida')
+                    slow_requests += 1
+                    if slow_requests >= 3:
+                        print(f"\n🚨 [ALERTA] Wallapop ralentizando. Pausa de 30 segundos...")
+                        time.sleep(30)
+                        slow_requests = 0
+                    continue
+                
+                slow_requests = 0
+                if cola.completar(tarea, nombre, ad_data):
+                    stats['anuncios'] += 1
+                    if stats['anuncios'] % 50 == 0:
+                        print(f"[PROGRESO] {nombre}: {stats['anuncios']} anuncios")
+                
+            except Exception as e:
+                stats['fallos'] += 1
+                cola.fallar(tarea, nombre, str(e))
+        
+        print(f"[RESUMEN] Trabajador {nombre}: {stats['cuentas']} perfiles, {stats['anuncios']} anuncios, "
+              f"{stats['fallos']} fallos")
+        return True
+    
+    finally:
+        # Cada trabajador suma sus aciertos a los del disco (aunque termine con error)
+        selectores.informe()
+        selectores.guardar()
+        if driver is not None:
+            try:
+                driver.quit()
+            except:
+                pass
+
+def recoger_cola(cola, fecha_iso):
+    """
+    DataFrame del dia con los anuncios terminados de la cola (None si no hay ninguno)
+    Las medidas de cada cuenta (enlaces, anuncios, fallos) pasan al registro de cuentas
+    """
+    registro = RegistroCuentasMotick()
+    for cuenta, medidas in cola.resumen_cuentas(fecha_iso).items():
+        registro.registrar_scrape(cuenta, medidas['enlaces'], medidas['anuncios'], medidas['fallos'], None)
+    registro.guardar()
+    
+    resumen = cola.resumen(fecha_iso)
+    print(f"[INFO] Cola {fecha_iso}: " + ", ".join(f"{tipo} {estado}: {total}" for (tipo, estado), total in sorted(resumen.items())))
+    if cola.activas(fecha_iso):
+        print(f"[WARNING] Quedan {cola.activas(fecha_iso)} tareas sin terminar, se recoge lo ya extraido")
+    
+    anuncios = cola.resultados(fecha_iso)
+    if not anuncios:
+        print("[ERROR] La cola no tiene anuncios extraidos")
+        return None
+    return preparar_anuncios(anuncios).sort_values(['Likes', 'Visitas'], ascending=[False, False])
+
+def main():
+    """Funcion principal - VERSION DEFINITIVA ANTI-BLOQUEO"""
+    parser = argparse.ArgumentParser(description="Scraper MOTICK")
+    parser.add_argument('--shard', metavar='i/N',
+                        help="Scrapea solo la parte i de N de las cuentas y la guarda en local (sin subir)")
+    parser.add_argument('--merge', action='store_true',
+                        help="Une los shards del dia, quita URLs duplicadas y sube la SCR")
+    parser.add_argument('--fecha', metavar='dd/mm/yyyy',
+                        help="Dia de los shards/cola que usan --merge y los modos de cola (por defecto hoy)")
+    parser.add_argument('--parcial', action='store_true',
+                        help="Con --merge, sube aunque falte algun shard")
+    parser.add_argument('--encolar', action='store_true',
+                        help="Encola las cuentas del dia en la cola de tareas (MOTICK_COLA_DB)")
+    parser.add_argument('--trabajador', nargs='?', const='', metavar='NOMBRE',
+                        help="Procesa tareas de la cola hasta vaciarla (se pueden lanzar varios)")
+    parser.add_argument('--recoger', action='store_true',
+                        help="Une los anuncios extraidos por los trabajadores y sube la SCR")
+    parser.add_argument('--todas', action='store_true',
+                        help="Scrapea/encola todas las cuentas activas aunque su ttl_horas no haya pasado")
+    args = parser.parse_args()
+    
+    print("="*80)
+    print("    MOTICK SCRAPER - VERSION 2.0 DEFINITIVA ANTI-BLOQUEO")
+    print("="*80)
+    print(" ✅ Delays aleatorios 1.5-3s entre anuncios")
+    print(" ✅ Detección automática de ralentización")
+    print(" ✅ Pausa de 30s si detecta bloqueo")
+    print(" ✅ Timeouts cortos (3s)")
+    print(" ✅ User-Agent rotatorio")
+    print(" ✅ Fast-fail si >10s")
+    print(" ⚡ Tiempo estimado: 1.5-2 horas")
+    print()
+    
+    try:
+        if args.shard:
+            return ejecutar_shard(args.shard, args.todas)
+        
+        fecha_dia = args.fecha or datetime.now().strftime("%d/%m/%Y")
+        fecha_cola = datetime.strptime(fecha_dia, "%d/%m/%Y").strftime("%Y-%m-%d")
+        if args.encolar:
+            return encolar_dia(ColaTareasMotick(), fecha_cola, args.todas)
+        if args.trabajador is not None:
+            return ejecutar_trabajador(ColaTareasMotick(), fecha_cola, args.trabajador or None)
+        
+        print(f"[INFO] Inicializando almacenamiento ({TIPO_ALMACENAMIENTO})...")
+        try:
+            almacenamiento = crear_almacenamiento()
+        except Exception as e:
+            print(f"[ERROR] {str(e)}")
+            return False
+        
+        if TIPO_ALMACENAMIENTO == 'sheets' and not almacenamiento.sheet_id:
+            print("[ERROR] ID de Google Sheet no encontrado")
+            return False
+        
+        if not almacenamiento.test_connection():
+            print("[ERROR] No se pudo conectar al almacenamiento")
+            return False
+        
+        if args.merge:
+            fecha_extraccion = fecha_dia
+            df = unir_shards(fecha_extraccion, parcial=args.parcial)
+            incorporar_medidas_shards(fecha_extraccion)
+        elif args.recoger:
+            fecha_extraccion = fecha_dia
+            df = recoger_cola(ColaTareasMotick(), fecha_cola)
+        else:
+            df = ejecutar_scraper(todas=args.todas)
             fecha_extraccion = datetime.now().strftime("%d/%m/%Y")
-            print(f"\n[INFO] Subiendo datos a Google Sheets...")
-            
-            success, sheet_name = gs_handler.subir_datos_scraper(df, fecha_extraccion)
-            
-            if success:
-                print(f"✅ EXITO: Datos subidos correctamente a {sheet_name}")
-                print(f"🔗 URL: https://docs.google.com/spreadsheets/d/{sheet_id}")
-                return True
-            else:
-                print("[ERROR] Fallo al subir datos a Google Sheets")
-                return False
-            
+        if df is None:
+            return False
+        
+        print(f"\n[INFO] Guardando datos ({TIPO_ALMACENAMIENTO})...")
+        
+        success, sheet_name = almacenamiento.subir_datos_scraper(df, fecha_extraccion)
+        
+        if success:
+            print(f"✅ EXITO: Datos guardados correctamente en {sheet_name}")
+            if getattr(almacenamiento, 'sheet_id', None):
+                print(f"🔗 URL: https://docs.google.com/spreadsheets/d/{almacenamiento.sheet_id}")
+            return True
         else:
-            print("[ERROR] No se procesaron anuncios")
+            print("[ERROR] Fallo al guardar datos del scraper")
             return False
     
     except Exception as e:
@@ -924,13 +1207,7 @@ def main():
         return False
     
     finally:
-        try:
-            driver.quit()
-        except:
-            pass
-        
         print(f"\n✅ Scraper MOTICK completado!")
-        return True
 
 if __name__ == "__main__":
     success = main()
@@ -0,0 +1,151 @@
+"""
+Selectores Motick - Orden de los selectores de los extractores aprendido entre ejecuciones
+Cada extractor (titulo, precio, likes, descripcion, visitas) prueba una lista de
+selectores CSS y, si ninguno sirve, sus fallbacks (meta, XPath o regex sobre el HTML).
+Wallapop cambia el marcado y el selector que funciona acaba al final de la lista:
+aqui se anota que selector dio cada campo y se acumulan sus aciertos en
+<ESTADISTICAS_SELECTORES> (por defecto data/selectores_motick.json):
+    {"campos": {"likes": {"button[aria-label*='favorite'] span": {"intentos": 812, "aciertos": 790}}}}
+- ordenar: selectores por tasa de acierto suavizada (aciertos + 1) / (intentos + 2);
+  uno sin datos (0.5) va por delante de los que fallan siempre. Los fallbacks no se
+  reordenan: van siempre detras de los selectores
+  Los campos de ORDEN_FIJO no se reordenan (solo se anotan para el informe): sus
+  selectores dan valores distintos y la lista es de precedencia (precio al contado
+  antes que el financiado)
+- guardar: suma lo de esta ejecucion a lo que haya en disco (varios shards/trabajadores)
+  y reduce a la mitad los contadores que pasan de MAX_INTENTOS, para que el orden siga
+  los cambios del marcado
+- informe: de donde salio cada campo en esta ejecucion y selectores muertos (a podar)
+"""
+
+import os
+import json
+from collections import Counter
+
+from config import ESTADISTICAS_SELECTORES, ADAPTAR_SELECTORES
+
+NINGUNO = 'ninguno'
+# Campos cuya lista de selectores es un orden de precedencia, no alternativas equivalentes
+ORDEN_FIJO = {'precio'}
+# Intentos sin ningun acierto para dar un selector por muerto
+MIN_INTENTOS_MUERTO = 50
+# Por encima se reducen los contadores a la mitad (pesan mas las ejecuciones recientes)
+MAX_INTENTOS = 1000
+
+class EstadisticasSelectoresMotick:
+    def __init__(self, ruta=ESTADISTICAS_SELECTORES, adaptar=ADAPTAR_SELECTORES):
+        self.ruta = ruta
+        self.adaptar = adaptar
+        # Acumulado (disco + esta ejecucion): decide el orden
+        self.campos = self.cargar()
+        # Solo esta ejecucion: lo que guardar suma al disco
+        self.ejecucion = {}
+        # {campo: Counter(fuente)} de esta ejecucion para el informe
+        self.fuentes = {}
+
+    def cargar(self):
+        """{campo: {selector: {'intentos', 'aciertos'}}} del disco ({} si no existe o esta corrupto)"""
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                return json.load(f).get('campos', {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"AVISO: Estadisticas de selectores no validas ({str(e)}), se empieza de cero")
+            return {}
+
+    def tasa(self, campo, selector):
+        """Tasa de acierto suavizada del selector en el campo"""
+        contador = self.campos.get(campo, {}).get(selector, {})
+        return (contador.get('aciertos', 0) + 1) / (contador.get('intentos', 0) + 2)
+
+    def ordenar(self, campo, selectores):
+        """Selectores del campo, los de mayor tasa primero (empates: orden original)"""
+        if not self.adaptar or campo in ORDEN_FIJO:
+            return list(selectores)
+        return sorted(selectores, key=lambda selector: -self.tasa(campo, selector))
+
+    def anotar(self, campo, probados, fuente=None):
+        """
+        probados: selectores intentados, en orden; fuente: el selector o fallback que dio
+        el valor (None si el campo quedo sin valor)
+        """
+        nombres = list(probados)
+        if fuente is not None and fuente not in nombres:
+            nombres.append(fuente)
+        for destino in (self.campos, self.ejecucion):
+            contadores = destino.setdefault(campo, {})
+            for nombre in nombres:
+                contador = contadores.setdefault(nombre, {'intentos': 0, 'aciertos': 0})
+                contador['intentos'] += 1
+                if nombre == fuente:
+                    contador['aciertos'] += 1
+        self.fuentes.setdefault(campo, Counter())[fuente or NINGUNO] += 1
+
+    def sumar(self, campos):
+        """Suma a esta ejecucion los contadores de otra (p.ej. los de un shard, ver --merge)"""
+        for campo, contadores in campos.items():
+            for destino in (self.campos, self.ejecucion):
+                for nombre, contador in contadores.items():
+                    total = destino.setdefault(campo, {}).setdefault(nombre, {'intentos': 0, 'aciertos': 0})
+                    total['intentos'] += contador['intentos']
+                    total['aciertos'] += contador['aciertos']
+
+    def muertos(self, campo, min_intentos=MIN_INTENTOS_MUERTO):
+        """Selectores del campo con min_intentos o mas y ningun acierto"""
+        return [
+            selector for selector, contador in self.campos.get(campo, {}).items()
+            if contador['aciertos'] == 0 and contador['intentos'] >= min_intentos
+        ]
+
+    def guardar(self):
+        """Suma esta ejecucion a lo que haya en disco y escribe (tmp + replace). Devuelve bool"""
+        try:
+            campos = self.cargar()
+            for campo, contadores in self.ejecucion.items():
+                for nombre, contador in contadores.items():
+                    total = campos.setdefault(campo, {}).setdefault(nombre, {'intentos': 0, 'aciertos': 0})
+                    total['intentos'] += contador['intentos']
+                    total['aciertos'] += contador['aciertos']
+                    if total['intentos'] > MAX_INTENTOS:
+                        total['intentos'] //= 2
+                        total['aciertos'] //= 2
+
+            directorio = os.path.dirname(self.ruta)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            with open(self.ruta + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'campos': campos}, f, ensure_ascii=False, indent=2)
+            os.replace(self.ruta + '.tmp', self.ruta)
+
+            self.campos = campos
+            self.ejecucion = {}
+            return True
+        except Exception as e:
+            print(f"AVISO: No se pudieron guardar las estadisticas de selectores: {str(e)}")
+            return False
+
+    def informe(self, min_intentos=MIN_INTENTOS_MUERTO):
+        """Imprime y devuelve {campo: {'fuentes': Counter, 'muertos': [...]}} de esta ejecucion"""
+        resultado = {}
+        for campo in sorted(self.fuentes):
+            fuentes = self.fuentes[campo]
+            muertos = self.muertos(campo, min_intentos)
+            resultado[campo] = {'fuentes': fuentes, 'muertos': muertos}
+
+            total = sum(fuentes.values())
+            detalle = ", ".join(f"{fuente} {veces}" for fuente, veces in fuentes.most_common())
+            print(f"SELECTORES: {campo} ({total} anuncios): {detalle}")
+            if muertos:
+                print(f"SELECTORES: {campo} sin aciertos en {min_intentos}+ intentos (candidatos a quitar): "
+                      f"{' | '.join(muertos)}")
+        return resultado
+
+def ordenar_selectores(estadisticas, campo, selectores):
+    """Orden de prueba de los selectores (el original si no hay estadisticas)"""
+    return selectores if estadisticas is None else estadisticas.ordenar(campo, selectores)
+
+def anotar_selector(estadisticas, campo, probados, fuente=None):
+    """Anota el resultado de un extractor (nada si no hay estadisticas)"""
+    if estadisticas is not None:
+        estadisticas.anotar(campo, probados, fuente)
@@ -0,0 +1,171 @@
+"""
+Series temporales Motick - Observaciones diarias en formato largo
+Una fila compacta por (URL_ID, Fecha) con Visitas y Likes en lugar de dos
+columnas nuevas por dia en Data_Historico. Las columnas Visitas_dd/mm/yyyy y
+Likes_dd/mm/yyyy pasan a ser una vista pivotada con ventana (ultimos N dias)
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+from ids_motick import crear_url_id
+
+COLUMNAS_OBSERVACIONES = ['URL_ID', 'Fecha', 'Visitas', 'Likes']
+
+def fecha_display_a_iso(fecha_display):
+    """'05/09/2025' -> '2025-09-05' (ordenable como texto)"""
+    return datetime.strptime(fecha_display, "%d/%m/%Y").strftime("%Y-%m-%d")
+
+def fecha_iso_a_display(fecha_iso):
+    """'2025-09-05' -> '05/09/2025'"""
+    return datetime.strptime(fecha_iso, "%Y-%m-%d").strftime("%d/%m/%Y")
+
+def columnas_por_fecha(df):
+    """
+    Devuelve {datetime: (col_visitas, col_likes)} para las columnas diarias del historico
+    Ignora Visitas_Totales/Likes_Totales y cualquier sufijo que no sea fecha
+    """
+    columnas = {}
+    for col in df.columns:
+        if not col.startswith('Visitas_'):
+            continue
+        try:
+            fecha = datetime.strptime(col[len('Visitas_'):], "%d/%m/%Y")
+        except ValueError:
+            continue
+        col_likes = f"Likes_{col[len('Visitas_'):]}"
+        columnas[fecha] = (col, col_likes if col_likes in df.columns else None)
+    return columnas
+
+def observaciones_del_dia(df_nuevo, fecha_display):
+    """Observaciones largas del scrape del dia (una fila por URL)"""
+    return pd.DataFrame({
+        'URL_ID': crear_url_id(df_nuevo['URL']).to_numpy(),
+        'Fecha': fecha_display_a_iso(fecha_display),
+        'Visitas': pd.to_numeric(df_nuevo['Visitas'], errors='coerce').fillna(0).astype('int64').to_numpy(),
+        'Likes': pd.to_numeric(df_nuevo['Likes'], errors='coerce').fillna(0).astype('int64').to_numpy(),
+    }).drop_duplicates(['URL_ID', 'Fecha'], keep='last')
+
+def unir_observaciones(partes):
+    """Une lotes de observaciones (ignora None); si se repite (URL_ID, Fecha) gana el ultimo"""
+    partes = [df for df in partes if df is not None and not df.empty]
+    if not partes:
+        return pd.DataFrame(columns=COLUMNAS_OBSERVACIONES)
+    return pd.concat(partes, ignore_index=True).drop_duplicates(['URL_ID', 'Fecha'], keep='last')
+
+def ultima_fecha_procesada(df_historico, df_observaciones):
+    """
+    Fecha mas reciente ya incorporada (dd/mm/yyyy): maximo entre la serie larga
+    y las columnas por fecha del historico. None si no hay nada procesado
+    """
+    fechas = []
+    if df_observaciones is not None and not df_observaciones.empty:
+        fechas.append(datetime.strptime(df_observaciones['Fecha'].max(), "%Y-%m-%d"))
+    if df_historico is not None:
+        fechas.extend(columnas_por_fecha(df_historico))
+    if not fechas:
+        return None
+    return max(fechas).strftime("%d/%m/%Y")
+
+def wide_a_largo(df_historico):
+    """
+    MIGRACION: convierte las columnas diarias del historico a observaciones largas
+    Como el historico rellena con 0 los dias sin dato, solo se conservan los dias
+    entre Primera_Deteccion (incluida) y Fecha_Venta (excluida)
+    """
+    columnas = columnas_por_fecha(df_historico)
+    if not columnas:
+        return pd.DataFrame(columns=COLUMNAS_OBSERVACIONES)
+
+    fechas = sorted(columnas)
+    n_motos = len(df_historico)
+
+    def matriz(indice):
+        bloque = np.full((n_motos, len(fechas)), np.nan)
+        for j, fecha in enumerate(fechas):
+            col = columnas[fecha][indice]
+            if col is not None:
+                bloque[:, j] = pd.to_numeric(df_historico[col], errors='coerce').to_numpy(dtype=float)
+        return bloque
+
+    visitas = matriz(0)
+    likes = matriz(1)
+
+    fechas_np = np.array(fechas, dtype='datetime64[ns]')
+    primera = pd.to_datetime(df_historico.get('Primera_Deteccion'), format="%d/%m/%Y", errors='coerce')
+    venta = pd.to_datetime(df_historico.get('Fecha_Venta'), format="%d/%m/%Y", errors='coerce')
+    primera = np.asarray(primera, dtype='datetime64[ns]') if primera is not None else np.full(n_motos, np.datetime64('NaT'))
+    venta = np.asarray(venta, dtype='datetime64[ns]') if venta is not None else np.full(n_motos, np.datetime64('NaT'))
+
+    mascara = ~(np.isnan(visitas) & np.isnan(likes))
+    mascara &= np.isnat(primera)[:, None] | (fechas_np[None, :] >= primera[:, None])
+    mascara &= np.isnat(venta)[:, None] | (fechas_np[None, :] < venta[:, None])
+
+    filas, dias = np.nonzero(mascara)
+    url_ids = crear_url_id(df_historico['URL']).to_numpy()
+    fechas_iso = np.array([fecha.strftime("%Y-%m-%d") for fecha in fechas])
+
+    return pd.DataFrame({
+        'URL_ID': url_ids[filas],
+        'Fecha': fechas_iso[dias],
+        'Visitas': np.nan_to_num(visitas[filas, dias]).astype('int64'),
+        'Likes': np.nan_to_num(likes[filas, dias]).astype('int64'),
+    })
+
+def pivotar_fechas(df_observaciones, urls, fechas_display):
+    """
+    Vista wide: columnas Visitas_/Likes_ de las fechas pedidas, alineadas con urls
+    Las URLs sin observacion ese dia quedan en 0 (igual que limpiar_columnas_numericas)
+    """
+    url_ids = crear_url_id(urls)
+    fechas_iso = {fecha_display_a_iso(fecha): fecha for fecha in fechas_display}
+    obs = df_observaciones[df_observaciones['Fecha'].isin(fechas_iso)]
+
+    columnas = {}
+    for fecha_iso, fecha_display in fechas_iso.items():
+        obs_dia = obs[obs['Fecha'] == fecha_iso].drop_duplicates('URL_ID', keep='last').set_index('URL_ID')
+        columnas[f"Visitas_{fecha_display}"] = url_ids.map(obs_dia['Visitas']).fillna(0).astype('int64').to_numpy()
+        columnas[f"Likes_{fecha_display}"] = url_ids.map(obs_dia['Likes']).fillna(0).astype('int64').to_numpy()
+    return pd.DataFrame(columnas, index=urls.index)
+
+def completar_fecha_anterior(df_historico, df_observaciones, fecha_display_hoy):
+    """
+    Garantiza que el historico tiene las columnas del ultimo dia observado antes de hoy
+    (necesarias para Variacion_Likes) aunque hayan salido de la ventana publicada
+    """
+    if df_observaciones is None or df_observaciones.empty:
+        return df_historico
+
+    fecha_iso_hoy = fecha_display_a_iso(fecha_display_hoy)
+    anteriores = df_observaciones.loc[df_observaciones['Fecha'] < fecha_iso_hoy, 'Fecha']
+    if anteriores.empty:
+        return df_historico
+
+    fecha_anterior = fecha_iso_a_display(anteriores.max())
+    if f"Likes_{fecha_anterior}" in df_historico.columns:
+        return df_historico
+
+    print(f"SERIES: Recuperando {fecha_anterior} desde observaciones (fuera de la ventana)")
+    vista = pivotar_fechas(df_observaciones, df_historico['URL'], [fecha_anterior])
+    return pd.concat([df_historico, vista], axis=1)
+
+def aplicar_ventana(df_historico, ventana_dias, fecha_display_hoy):
+    """
+    Quita las columnas diarias fuera de los ultimos ventana_dias (hoy incluido)
+    ventana_dias=None publica todas las columnas (comportamiento anterior)
+    """
+    if ventana_dias is None:
+        return df_historico
+
+    limite = datetime.strptime(fecha_display_hoy, "%d/%m/%Y") - timedelta(days=ventana_dias - 1)
+    fuera = []
+    for fecha, (col_visitas, col_likes) in columnas_por_fecha(df_historico).items():
+        if fecha < limite:
+            fuera.append(col_visitas)
+            if col_likes is not None:
+                fuera.append(col_likes)
+
+    if fuera:
+        print(f"VENTANA: {len(fuera) // 2} dias fuera de los ultimos {ventana_dias}, no se publican")
+    return df_historico.drop(columns=fuera)
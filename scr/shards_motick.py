@@ -0,0 +1,124 @@
+"""
+Shards Motick - Scrape repartido por cuentas entre varias maquinas/runners
+- scraper_motick.py --shard i/N: scrapea solo su parte de las cuentas y guarda el
+  resultado parcial en <SHARDS_DIR>/yyyy-mm-dd/shard_i_de_N.parquet (sin subir nada)
+- scraper_motick.py --merge: une los N shards del dia, quita URLs duplicadas y hace
+  la unica subida subir_datos_scraper
+Cada shard lleva en su json las medidas de sus cuentas (registro de cuentas) y los
+aciertos de selectores de su ejecucion; el merge los pasa a los ficheros de data/
+El reparto es determinista (cuentas ordenadas por nombre, una de cada N) y no
+depende del orden del diccionario ni de la maquina
+"""
+
+import os
+import re
+import json
+import pandas as pd
+from datetime import datetime
+
+from config import SHARDS_DIR
+
+PATRON_SHARD = re.compile(r'^shard_(\d+)_de_(\d+)\.parquet$')
+
+def parsear_shard(texto):
+    """'i/N' (1 <= i <= N) -> (i, N). ValueError si no es valido"""
+    partes = str(texto).split('/')
+    if len(partes) != 2 or not all(parte.strip().isdigit() for parte in partes):
+        raise ValueError(f"Shard no valido: '{texto}' (formato i/N, p.ej. 1/3)")
+    indice, total = int(partes[0]), int(partes[1])
+    if not 1 <= indice <= total:
+        raise ValueError(f"Shard no valido: '{texto}' (i debe estar entre 1 y N)")
+    return indice, total
+
+def cuentas_del_shard(cuentas, indice, total):
+    """Parte indice/total de {cuenta: url}: cuentas ordenadas por nombre, una de cada total"""
+    nombres = sorted(cuentas)[indice - 1::total]
+    return {nombre: cuentas[nombre] for nombre in nombres}
+
+def directorio_fecha(fecha_display, directorio=SHARDS_DIR):
+    """Carpeta de los shards de un dia (dd/mm/yyyy)"""
+    fecha_iso = datetime.strptime(fecha_display, "%d/%m/%Y").strftime("%Y-%m-%d")
+    return os.path.join(directorio, fecha_iso)
+
+def guardar_shard(df, indice, total, cuentas, fecha_display, directorio=SHARDS_DIR, medidas=None):
+    """
+    Guarda el resultado parcial de un shard (Parquet + json con sus cuentas y medidas)
+    medidas: {'registro': {cuenta: entrada}, 'selectores': contadores de la ejecucion}
+    Escritura atomica: tmp + replace. Devuelve la ruta o None si falla
+    """
+    try:
+        carpeta = directorio_fecha(fecha_display, directorio)
+        os.makedirs(carpeta, exist_ok=True)
+        ruta = os.path.join(carpeta, f"shard_{indice}_de_{total}.parquet")
+
+        df.to_parquet(ruta + '.tmp', index=False)
+        os.replace(ruta + '.tmp', ruta)
+        with open(ruta.replace('.parquet', '.json'), 'w', encoding='utf-8') as f:
+            json.dump({'shard': f"{indice}/{total}", 'fecha': fecha_display, 'filas': len(df),
+                       'cuentas': sorted(cuentas), 'medidas': medidas or {}}, f, ensure_ascii=False, indent=2)
+
+        print(f"GUARDADO LOCAL: Shard {indice}/{total} ({len(df)} filas, {len(cuentas)} cuentas) en {ruta}")
+        return ruta
+
+    except Exception as e:
+        print(f"ERROR guardando shard {indice}/{total}: {str(e)}")
+        return None
+
+def leer_medidas_shards(fecha_display, directorio=SHARDS_DIR):
+    """Medidas guardadas por cada shard del dia (lista, en orden de shard)"""
+    carpeta = directorio_fecha(fecha_display, directorio)
+    medidas = []
+    if os.path.isdir(carpeta):
+        for nombre in sorted(os.listdir(carpeta)):
+            if nombre.endswith('.json') and PATRON_SHARD.match(nombre[:-len('.json')] + '.parquet'):
+                try:
+                    with open(os.path.join(carpeta, nombre), 'r', encoding='utf-8') as f:
+                        medidas.append(json.load(f).get('medidas') or {})
+                except (OSError, ValueError) as e:
+                    print(f"AVISO: No se pudieron leer las medidas de {nombre}: {str(e)}")
+    return medidas
+
+def unir_shards(fecha_display, directorio=SHARDS_DIR, parcial=False):
+    """
+    Une los shards de un dia y quita URLs duplicadas (gana la fila con mas likes/visitas)
+    Sin parcial exige los N shards; devuelve el DataFrame o None
+    """
+    carpeta = directorio_fecha(fecha_display, directorio)
+    encontrados = {}
+    if os.path.isdir(carpeta):
+        for nombre in sorted(os.listdir(carpeta)):
+            coincidencia = PATRON_SHARD.match(nombre)
+            if coincidencia:
+                indice, total = int(coincidencia.group(1)), int(coincidencia.group(2))
+                encontrados[(indice, total)] = os.path.join(carpeta, nombre)
+
+    if not encontrados:
+        print(f"ERROR: No hay shards para {fecha_display} en {carpeta}")
+        return None
+
+    totales = {total for _, total in encontrados}
+    if len(totales) > 1:
+        print(f"ERROR: Shards de repartos distintos para {fecha_display}: N = {sorted(totales)}")
+        return None
+
+    total = totales.pop()
+    faltan = [indice for indice in range(1, total + 1) if (indice, total) not in encontrados]
+    if faltan:
+        print(f"AVISO: Faltan shards {', '.join(f'{i}/{total}' for i in faltan)} de {fecha_display}")
+        if not parcial:
+            print("ERROR: Merge cancelado (usa --parcial para subir igualmente)")
+            return None
+
+    partes = [pd.read_parquet(ruta) for _, ruta in sorted(encontrados.items())]
+    partes = [parte for parte in partes if not parte.empty]
+    if not partes:
+        print(f"ERROR: Los shards de {fecha_display} no tienen anuncios")
+        return None
+    df = pd.concat(partes, ignore_index=True)
+    filas = len(df)
+    df = df.sort_values(['Likes', 'Visitas'], ascending=[False, False], kind='stable')
+    df = df.drop_duplicates('URL', keep='first').reset_index(drop=True)
+
+    print(f"LEIDO: {len(encontrados)}/{total} shards de {fecha_display}: {len(df)} anuncios "
+          f"({filas - len(df)} URLs duplicadas descartadas)")
+    return df
@@ -0,0 +1,273 @@
+"""
+Stream Motick - Salida NDJSON del scraper registro a registro
+Con MOTICK_STREAM el scraper emite cada anuncio en cuanto lo extrae (una linea JSON
+por registro, con flush) ademas de devolver el DataFrame final:
+    {"tipo": "inicio", "Inicio": "2025-09-01T08:00:00"}                  (al abrir el destino)
+    {"tipo": "anuncio", "Cuenta": ..., "Titulo": ..., "URL": ..., ...}   (campos de ad_data)
+    {"tipo": "cuenta", "Cuenta": ..., "Anuncios": n, "Fallos": n, ...}   (al terminar cada cuenta)
+    {"tipo": "fin", "Cuentas": n, "Anuncios": n}                         (al terminar el scrape)
+Destinos:
+- ruta a un archivo .ndjson o a un FIFO (mkfifo) para leerlo por tuberia
+- unix:/ruta/socket o tcp:host:puerto (el consumidor escucha, el scraper se conecta)
+Los consumidores (leer_stream / leer_stream_scraper, analisis_motick --stream)
+reciben cada cuenta completa en cuanto se cierra, mientras se scrapean las siguientes
+Un archivo que no empieza por el 'inicio' de esta ejecucion (de hoy o posterior al
+arranque del lector) es de una ejecucion anterior: se espera a que el scraper lo reescriba
+Un fallo del stream nunca detiene el scraper: se avisa y se deja de emitir
+"""
+
+import os
+import json
+import time
+import socket
+import pandas as pd
+from datetime import datetime
+
+from ids_motick import crear_ids_motos
+from catalogo_motick import asegurar_etiquetas
+
+# Sin datos nuevos en un archivo durante este tiempo se da el stream por cortado
+ESPERA_MAXIMA_ARCHIVO = 600
+INTERVALO_SONDEO = 0.5
+
+def direccion_socket(destino):
+    """(familia, direccion) para 'unix:/ruta' o 'tcp:host:puerto'; None si es una ruta de archivo"""
+    if destino.startswith('unix:'):
+        return socket.AF_UNIX, destino[len('unix:'):]
+    if destino.startswith('tcp:'):
+        host, puerto = destino[len('tcp:'):].rsplit(':', 1)
+        return socket.AF_INET, (host or '127.0.0.1', int(puerto))
+    return None
+
+class SalidaStreamMotick:
+    def __init__(self, destino):
+        """Abre el destino (archivo, FIFO o socket local) en modo texto linea a linea"""
+        self.destino = destino
+        self.conexion = None
+        self.anuncios = 0
+        self.cuentas = 0
+
+        socket_destino = direccion_socket(destino)
+        if socket_destino is not None:
+            familia, direccion = socket_destino
+            self.conexion = socket.socket(familia, socket.SOCK_STREAM)
+            self.conexion.connect(direccion)
+            self.salida = self.conexion.makefile('w', encoding='utf-8')
+        else:
+            directorio = os.path.dirname(destino)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            self.salida = open(destino, 'w', encoding='utf-8')
+
+        print(f"STREAM: Emitiendo anuncios en {destino}")
+        # Primer registro: distingue esta ejecucion de un archivo que quedo de la anterior
+        self.emitir({'tipo': 'inicio', 'Inicio': datetime.now().isoformat(timespec='seconds')})
+
+    def emitir(self, registro):
+        """Escribe un registro como una linea JSON. Devuelve False si el destino ya no acepta datos"""
+        if self.salida is None:
+            return False
+        try:
+            self.salida.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+            self.salida.flush()
+            return True
+        except (OSError, ValueError) as e:
+            print(f"AVISO: Stream {self.destino} cortado ({str(e)}), se deja de emitir")
+            self.cerrar()
+            return False
+
+    def emitir_anuncio(self, ad_data):
+        """Un anuncio tal cual lo extrae get_user_ads"""
+        if self.emitir({'tipo': 'anuncio', **ad_data}):
+            self.anuncios += 1
+
+    def emitir_resumen_cuenta(self, cuenta, anuncios, fallos, precios_ok, km_ok, segundos):
+        """Resumen de una cuenta: los anuncios de esa cuenta ya estan todos emitidos"""
+        self.cuentas += 1
+        self.emitir({
+            'tipo': 'cuenta',
+            'Cuenta': cuenta,
+            'Anuncios': anuncios,
+            'Fallos': fallos,
+            'Precios_OK': precios_ok,
+            'Km_OK': km_ok,
+            'Segundos': round(segundos, 1),
+        })
+
+    def finalizar(self):
+        """Registro de fin (el consumidor deja de esperar) y cierre del destino"""
+        self.emitir({'tipo': 'fin', 'Cuentas': self.cuentas, 'Anuncios': self.anuncios})
+        self.cerrar()
+
+    def cerrar(self):
+        """Cierra el destino (idempotente)"""
+        for recurso in (self.salida, self.conexion):
+            try:
+                if recurso is not None:
+                    recurso.close()
+            except OSError:
+                pass
+        self.salida = None
+        self.conexion = None
+
+def crear_salida_stream(destino):
+    """SalidaStreamMotick para el destino configurado (None si no hay destino o no se puede abrir)"""
+    if not destino:
+        return None
+    try:
+        return SalidaStreamMotick(destino)
+    except Exception as e:
+        print(f"AVISO: No se pudo abrir el stream {destino} ({str(e)}), el scraper sigue sin stream")
+        return None
+
+def es_inicio_actual(linea, inicio_lector):
+    """La linea es el registro 'inicio' de esta ejecucion: de hoy o posterior al arranque del lector"""
+    try:
+        registro = json.loads(linea)
+        inicio = datetime.fromisoformat(registro['Inicio'])
+    except (ValueError, TypeError, KeyError):
+        return False
+    if registro.get('tipo') != 'inicio':
+        return False
+    return inicio.date() == inicio_lector.date() or inicio >= inicio_lector
+
+def seguir_archivo(f, es_fifo, espera_maxima):
+    """
+    Lineas completas de un archivo abierto a medida que se escriben
+    En un archivo normal el final no significa fin del stream: se sigue sondeando
+    hasta el registro 'fin' (lo corta leer_stream) o espera_maxima segundos sin datos
+    """
+    pendiente = ''
+    ultimo_dato = time.time()
+    while True:
+        linea = f.readline()
+        if linea:
+            pendiente += linea
+            ultimo_dato = time.time()
+            if pendiente.endswith('\n'):
+                yield pendiente
+                pendiente = ''
+            continue
+        if es_fifo or time.time() - ultimo_dato > espera_maxima:
+            return
+        time.sleep(INTERVALO_SONDEO)
+
+def leer_lineas_archivo(ruta, espera_maxima=ESPERA_MAXIMA_ARCHIVO):
+    """
+    Lineas de un archivo o FIFO a medida que se escriben
+    Un archivo que no empieza por el 'inicio' de esta ejecucion es el de la ejecucion
+    anterior: se espera a que el scraper lo reescriba en vez de devolver anuncios de ayer
+    """
+    # El consumidor puede arrancar antes que el scraper
+    inicio_lector = datetime.now()
+    inicio = time.time()
+    while not os.path.exists(ruta):
+        if time.time() - inicio > espera_maxima:
+            raise FileNotFoundError(f"El stream {ruta} no aparecio en {espera_maxima}s")
+        time.sleep(INTERVALO_SONDEO)
+
+    if not os.path.isfile(ruta):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            yield from seguir_archivo(f, True, espera_maxima)
+        return
+
+    while True:
+        modificado = os.stat(ruta).st_mtime_ns
+        with open(ruta, 'r', encoding='utf-8') as f:
+            lineas = seguir_archivo(f, False, espera_maxima)
+            primera = next(lineas, None)
+            if primera is None:
+                return
+            if es_inicio_actual(primera, inicio_lector):
+                yield primera
+                yield from lineas
+                return
+
+        print(f"AVISO: El stream {ruta} es de una ejecucion anterior, esperando al scraper")
+        inicio = time.time()
+        while not os.path.exists(ruta) or os.stat(ruta).st_mtime_ns == modificado:
+            if time.time() - inicio > espera_maxima:
+                raise TimeoutError(f"El stream {ruta} sigue siendo de una ejecucion anterior tras {espera_maxima}s")
+            time.sleep(INTERVALO_SONDEO)
+
+def leer_lineas_socket(origen):
+    """Escucha en el socket local del origen y lee las lineas de la primera conexion"""
+    familia, direccion = direccion_socket(origen)
+    if familia == socket.AF_UNIX and os.path.exists(direccion):
+        os.remove(direccion)
+
+    with socket.socket(familia, socket.SOCK_STREAM) as servidor:
+        servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        servidor.bind(direccion)
+        servidor.listen(1)
+        print(f"STREAM: Esperando al scraper en {origen}")
+        conexion, _ = servidor.accept()
+        with conexion, conexion.makefile('r', encoding='utf-8') as entrada:
+            for linea in entrada:
+                yield linea
+
+def leer_stream(origen, espera_maxima=ESPERA_MAXIMA_ARCHIVO):
+    """Registros (dict) del stream hasta el registro 'fin' o el cierre del productor"""
+    if direccion_socket(origen) is not None:
+        lineas = leer_lineas_socket(origen)
+    else:
+        lineas = leer_lineas_archivo(origen, espera_maxima)
+
+    for linea in lineas:
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            registro = json.loads(linea)
+        except json.JSONDecodeError:
+            print(f"AVISO: Linea del stream no valida, se ignora: {linea[:80]}")
+            continue
+        yield registro
+        if registro.get('tipo') == 'fin':
+            return
+
+def preparar_anuncios(anuncios):
+    """
+    DataFrame de anuncios con ID_Unico_Real y etiquetas del catalogo (como el
+    DataFrame final del scraper). Sirve para un lote (una cuenta) o para el dia completo
+    """
+    df = pd.DataFrame(anuncios)
+    df.insert(0, 'ID_Unico_Real', crear_ids_motos(df))
+    return asegurar_etiquetas(df)
+
+def cuentas_del_stream(registros):
+    """
+    Agrupa los anuncios por cuenta: devuelve (cuenta, DataFrame preparado, resumen)
+    en cuanto llega el resumen de cada cuenta, sin esperar al resto del scrape
+    """
+    anuncios_cuenta = {}
+    for registro in registros:
+        tipo = registro.pop('tipo', None)
+        if tipo == 'anuncio':
+            anuncios_cuenta.setdefault(registro.get('Cuenta'), []).append(registro)
+        elif tipo == 'cuenta':
+            anuncios = anuncios_cuenta.pop(registro['Cuenta'], [])
+            yield registro['Cuenta'], preparar_anuncios(anuncios) if anuncios else None, registro
+
+    # Stream cortado sin resumen: las cuentas a medias tambien se devuelven
+    for cuenta, anuncios in anuncios_cuenta.items():
+        print(f"AVISO: Cuenta {cuenta} sin resumen en el stream (scrape interrumpido)")
+        yield cuenta, preparar_anuncios(anuncios), None
+
+def leer_stream_scraper(origen, espera_maxima=ESPERA_MAXIMA_ARCHIVO):
+    """
+    DataFrame del dia a partir del stream (equivalente al que devuelve ejecutar_scraper)
+    Cada cuenta se prepara al llegar su resumen; None si el stream no trae anuncios
+    """
+    lotes = []
+    for cuenta, df_cuenta, resumen in cuentas_del_stream(leer_stream(origen, espera_maxima)):
+        if df_cuenta is None:
+            print(f"LEIDO: {cuenta} sin anuncios")
+            continue
+        lotes.append(df_cuenta)
+        print(f"LEIDO: {cuenta} ({len(df_cuenta)} anuncios) desde el stream")
+
+    if not lotes:
+        return None
+    df = pd.concat(lotes, ignore_index=True)
+    return df.sort_values(['Likes', 'Visitas'], ascending=[False, False], kind='stable').reset_index(drop=True)
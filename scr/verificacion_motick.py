@@ -0,0 +1,117 @@
+"""
+Verificacion Motick - Confirma las ventas antes de marcarlas
+Una URL activa del historico que no aparece en el scrape del dia solo es una
+posible venta: si el scraper fallo en ese anuncio o una cuenta se corto a medias,
+marcarla vendida la vuelve a meter como nueva al dia siguiente
+Aqui se comprueba cada candidata con una peticion HTTP ligera (sin navegador)
+en un pool acotado, con el mismo ritmo que el scraper:
+- pausa aleatoria 1.5-3s antes de cada peticion de cada hilo
+- timeout corto y User-Agent rotatorio
+- 3 respuestas lentas/limitadas seguidas -> pausa comun de 30s
+Resultado por URL: 'retirada' (404/410, redireccion fuera del anuncio o marcada
+vendida), 'activa' (el anuncio sigue publicado) o 'desconocido' (no se pudo comprobar)
+"""
+
+import re
+import time
+import random
+import threading
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+from config import USER_AGENTS, HILOS_VERIFICACION
+
+RETIRADA = 'retirada'
+ACTIVA = 'activa'
+DESCONOCIDO = 'desconocido'
+
+# La pagina de un anuncio vendido sigue respondiendo 200 pero lo indica en sus datos
+PATRON_VENDIDO = re.compile(r'"(?:is_?sold|sold)"\s*:\s*true', re.IGNORECASE)
+BYTES_LEIDOS = 256 * 1024
+
+class VerificadorVentasMotick:
+    def __init__(self, hilos=HILOS_VERIFICACION, pausa=(1.5, 3.0), timeout=10, lenta=5.0,
+                 pausa_bloqueo=30, obtener=None):
+        """
+        obtener(url, timeout) -> (codigo_http, url_final, texto) permite sustituir la
+        peticion HTTP (tests); por defecto urllib con User-Agent rotatorio
+        """
+        self.hilos = max(1, hilos)
+        self.pausa = pausa
+        self.timeout = timeout
+        self.lenta = lenta
+        self.pausa_bloqueo = pausa_bloqueo
+        self.obtener = obtener or self.obtener_http
+
+        # Deteccion de bloqueo compartida entre hilos (como slow_requests del scraper)
+        self.bloqueo = threading.Lock()
+        self.lentas_seguidas = 0
+        self.pausado_hasta = 0.0
+
+        # Una URL se comprueba una vez por ejecucion (backfill procesa varios dias)
+        self.resultados = {}
+
+    def obtener_http(self, url, timeout):
+        """GET ligero: codigo, URL final tras redirecciones y el principio del HTML"""
+        peticion = urllib.request.Request(url, headers={'User-Agent': random.choice(USER_AGENTS)})
+        try:
+            with urllib.request.urlopen(peticion, timeout=timeout) as respuesta:
+                texto = respuesta.read(BYTES_LEIDOS).decode('utf-8', errors='ignore')
+                return respuesta.status, respuesta.geturl(), texto
+        except urllib.error.HTTPError as e:
+            return e.code, url, ''
+
+    def registrar_respuesta(self, lenta):
+        """Cuenta respuestas lentas seguidas; a la tercera todos los hilos esperan pausa_bloqueo"""
+        with self.bloqueo:
+            if not lenta:
+                self.lentas_seguidas = 0
+                return
+            self.lentas_seguidas += 1
+            if self.lentas_seguidas >= 3:
+                print(f"\nALERTA: Wallapop ralentizando la verificacion. Pausa de {self.pausa_bloqueo} segundos...")
+                self.pausado_hasta = time.time() + self.pausa_bloqueo
+                self.lentas_seguidas = 0
+
+    def esperar_turno(self):
+        """Pausa aleatoria del hilo y, si hay bloqueo detectado, la pausa comun"""
+        time.sleep(random.uniform(*self.pausa))
+        restante = self.pausado_hasta - time.time()
+        if restante > 0:
+            time.sleep(restante)
+
+    def verificar_url(self, url):
+        """Estado de una URL candidata a vendida"""
+        if not isinstance(url, str) or not url.startswith(('http://', 'https://')):
+            return DESCONOCIDO
+
+        self.esperar_turno()
+        inicio = time.time()
+        try:
+            codigo, url_final, texto = self.obtener(url, self.timeout)
+        except Exception:
+            self.registrar_respuesta(lenta=True)
+            return DESCONOCIDO
+
+        self.registrar_respuesta(lenta=codigo == 429 or time.time() - inicio > self.lenta)
+
+        if codigo in (404, 410):
+            return RETIRADA
+        if codigo != 200:
+            return DESCONOCIDO
+        # Un anuncio retirado redirige al buscador o al perfil
+        if '/item/' not in url_final:
+            return RETIRADA
+        if PATRON_VENDIDO.search(texto):
+            return RETIRADA
+        return ACTIVA
+
+    def verificar(self, urls):
+        """{url: estado} de las candidatas (en paralelo, como mucho self.hilos peticiones a la vez)"""
+        pendientes = [url for url in dict.fromkeys(urls) if url not in self.resultados]
+        if pendientes:
+            print(f"VERIFICANDO: {len(pendientes)} posibles ventas ({self.hilos} hilos)")
+            with ThreadPoolExecutor(max_workers=min(self.hilos, len(pendientes))) as pool:
+                self.resultados.update(zip(pendientes, pool.map(self.verificar_url, pendientes)))
+        return {url: self.resultados[url] for url in urls}
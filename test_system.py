@@ -10,9 +10,9 @@ import time
 import traceback
 from datetime import datetime
 
-# Agregar src al path ANTES de cualquier import
+# Agregar scr al path ANTES de cualquier import
 script_dir = os.path.dirname(os.path.abspath(__file__))
-src_path = os.path.join(script_dir, 'src')
+src_path = os.path.join(script_dir, 'scr')
 if src_path not in sys.path:
     sys.path.append(src_path)
 
@@ -267,17 +267,54 @@ def test_data_processing():
         tests.append(("DataFrame creation", True, "Datos de prueba creados"))
         
         # Test normalizacion de columnas
-        analizador = AnalizadorHistoricoMotick()
+        analizador = AnalizadorHistoricoMotick(estado=False, verificador=False)
         df_normalized = analizador.normalizar_nombres_columnas(df.copy())
         tests.append(("Column normalization", True, "Columnas normalizadas"))
         
-        # Test creación de ID único
-        df_normalized['ID_Unico_Real'] = df_normalized.apply(analizador.crear_id_unico_real, axis=1)
-        if len(df_normalized['ID_Unico_Real'].iloc[0]) == 12:
+        # Test creación de ID único (vectorizado, determinista, reutiliza IDs existentes)
+        from ids_motick import crear_ids_motos, asegurar_ids
+        df_normalized['ID_Unico_Real'] = crear_ids_motos(df_normalized)
+        id_generado = df_normalized['ID_Unico_Real'].iloc[0]
+        df_reusado = df_normalized.assign(ID_Unico_Real=['scraper00001'])
+        if (len(id_generado) == 12 and crear_ids_motos(df_normalized).iloc[0] == id_generado
+                and asegurar_ids(df_reusado).iloc[0] == 'scraper00001'):
             tests.append(("ID generation", True, "ID único generado correctamente"))
         else:
             tests.append(("ID generation", False, "Error en generación de ID"))
         
+        # Test serializacion para Google Sheets
+        from google_sheets_motick import serializar_dataframe_para_sheets
+        df_sheets = df_normalized.copy()
+        df_sheets['Fecha_Venta'] = pd.NA
+        df_sheets['Visitas_Hoy'] = pd.Series([float('nan')])
+        filas = serializar_dataframe_para_sheets(df_sheets)
+        fila = dict(zip(filas[0], filas[1]))
+        if fila['Visitas'] == 100 and isinstance(fila['Visitas'], int) and fila['Fecha_Venta'] == '' and fila['Visitas_Hoy'] == '':
+            tests.append(("Sheets serialization", True, "Enteros como numeros, NA como vacio"))
+        else:
+            tests.append(("Sheets serialization", False, f"Fila serializada inesperada: {fila}"))
+        
+        # Test lectura CSV tipada (export de hoja)
+        from google_sheets_motick import leer_csv_tipado
+        df_csv = leer_csv_tipado(b"URL,Fecha_Venta,Visitas_01/09/2025,Likes_01/09/2025\nhttps://test.com/item/1,,120,\n")
+        if df_csv['Visitas_01/09/2025'].iloc[0] == 120 and df_csv['Likes_01/09/2025'].iloc[0] == 0 and df_csv['Fecha_Venta'].iloc[0] == '':
+            tests.append(("Typed CSV read", True, "Columnas Visitas_/Likes_ tipadas como enteros"))
+        else:
+            tests.append(("Typed CSV read", False, f"Lectura inesperada: {df_csv.to_dict('records')}"))
+        
+        # Celdas editadas a mano no tiran el parseo: se coercen a 0 / se truncan
+        df_csv = leer_csv_tipado(b"URL,Visitas_01/09/2025,Likes_01/09/2025\nhttps://test.com/item/1,1.2k,3.0\nhttps://test.com/item/2,7,\n")
+        if df_csv['Visitas_01/09/2025'].tolist() == [0, 7] and df_csv['Likes_01/09/2025'].tolist() == [3, 0] and str(df_csv['Visitas_01/09/2025'].dtype) == 'int64':
+            tests.append(("Typed CSV coerce", True, "Celdas no enteras coercidas sin fallback"))
+        else:
+            tests.append(("Typed CSV coerce", False, f"Lectura inesperada: {df_csv.to_dict('records')}"))
+        
+        df_csv = leer_csv_tipado(b"URL_ID,Fecha,Precio_Anterior,Precio_Nuevo\nabc,2025-09-01,3500,3200\n")
+        if df_csv['Precio_Anterior'].iloc[0] == 3500 and str(df_csv['Precio_Nuevo'].dtype) == 'int64' and df_csv['Fecha'].iloc[0] == '2025-09-01':
+            tests.append(("Typed CSV precios", True, "Precios de Cambios_Precio tipados como enteros"))
+        else:
+            tests.append(("Typed CSV precios", False, f"Lectura inesperada: {df_csv.dtypes.to_dict()}"))
+
     except Exception as e:
         tests.append(("Data processing", False, f"Error: {str(e)}"))
     
@@ -290,6 +327,1737 @@ def test_data_processing():
     
     return all_passed
 
+class StubRespuesta:
+    """Respuesta HTTP minima (solo .content) para el endpoint de export"""
+    def __init__(self, content):
+        self.content = content
+
+class StubWorksheet:
+    def __init__(self, title, sheet_id, csv):
+        self.title = title
+        self.id = sheet_id
+        self.csv = csv
+
+class StubSpreadsheet:
+    def __init__(self, worksheets):
+        self._worksheets = worksheets
+
+    def worksheets(self):
+        return list(self._worksheets.values())
+
+    def worksheet(self, title):
+        import gspread
+        if title not in self._worksheets:
+            raise gspread.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def del_worksheet(self, worksheet):
+        del self._worksheets[worksheet.title]
+
+class StubHttpClient:
+    def __init__(self, cliente):
+        self.cliente = cliente
+
+    def request(self, method, url, params=None):
+        self.cliente.llamadas['export'] += 1
+        for worksheet in self.cliente.spreadsheet.worksheets():
+            if worksheet.id == params['gid']:
+                return StubRespuesta(worksheet.csv)
+        raise Exception("gid no encontrado")
+
+class StubClienteSheets:
+    """
+    Cliente gspread falso: metadatos de Drive (modifiedTime) controlables
+    y contador de llamadas para comprobar aciertos de cache sin red
+    """
+    def __init__(self, worksheets, revision):
+        self.spreadsheet = StubSpreadsheet(worksheets)
+        self.revision = revision
+        self.llamadas = {'metadata': 0, 'open': 0, 'export': 0}
+        self.http_client = StubHttpClient(self)
+
+    def get_file_drive_metadata(self, file_id):
+        self.llamadas['metadata'] += 1
+        return {'id': file_id, 'modifiedTime': self.revision}
+
+    def open_by_key(self, key):
+        self.llamadas['open'] += 1
+        return self.spreadsheet
+
+def test_cache_hojas_sheets():
+    """Test 7: Cache local por revision con endpoint de metadatos simulado"""
+    print_test_header("Cache Local de Hojas")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        from google_sheets_motick import GoogleSheetsMotick
+        from cache_hojas_motick import CacheHojasMotick
+        
+        worksheets = {
+            'Data_Historico': StubWorksheet('Data_Historico', 1, b"URL,Estado,Visitas_01/09/2025\nhttps://test.com/item/1,activa,10\n"),
+            'SCR 01/09/25': StubWorksheet('SCR 01/09/25', 2, b"URL,Titulo,Visitas,Likes\nhttps://test.com/item/1,Honda,10,2\n"),
+        }
+        cliente = StubClienteSheets(worksheets, revision='2025-09-01T06:00:00.000Z')
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            gs_handler = GoogleSheetsMotick(sheet_id='stub', client=cliente, cache=CacheHojasMotick(directorio))
+            
+            gs_handler.leer_datos_historico()
+            gs_handler.leer_datos_scraper_reciente()
+            exports_iniciales = cliente.llamadas['export']
+            
+            # Misma revision: todo desde disco
+            df_historico = gs_handler.leer_datos_historico()
+            df_scr, fecha = gs_handler.leer_datos_scraper_reciente()
+            if cliente.llamadas['export'] == exports_iniciales and df_historico['Visitas_01/09/2025'].iloc[0] == 10 and df_scr is not None:
+                tests.append(("Cache hit", True, "Revision sin cambios: 0 descargas"))
+            else:
+                tests.append(("Cache hit", False, f"Descargas inesperadas: {cliente.llamadas}"))
+            
+            # Revision nueva: se vuelve a descargar
+            cliente.revision = '2025-09-02T06:00:00.000Z'
+            gs_handler.leer_datos_historico()
+            if cliente.llamadas['export'] == exports_iniciales + 1:
+                tests.append(("Cache invalidation", True, "Revision cambiada: hoja re-descargada"))
+            else:
+                tests.append(("Cache invalidation", False, f"Llamadas: {cliente.llamadas}"))
+        
+    except Exception as e:
+        tests.append(("Cache hojas", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def crear_scrape_prueba(fecha, urls_likes):
+    """DataFrame con el formato que produce scraper_motick.main para una fecha dd/mm/yyyy"""
+    import pandas as pd
+    return pd.DataFrame([
+        {
+            'ID_Moto': f"id{i}",
+            'Cuenta': 'MOTICK.TEST',
+            'Titulo': f"Honda CBR {i}",
+            'Precio': '5.000 €',
+            'Ano': '2020',
+            'Kilometraje': f"{i}.000 km",
+            'Visitas': likes * 10,
+            'Likes': likes,
+            'URL': url,
+            'Fecha_Extraccion': f"{fecha} 08:00"
+        }
+        for i, (url, likes) in enumerate(urls_likes)
+    ])
+
+def test_almacen_local_offline():
+    """Test 8: Scraper + analizador contra el almacen local (SQLite + Parquet, sin red)"""
+    print_test_header("Almacen Local Offline")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        from almacenamiento_motick import AlmacenamientoLocalMotick
+        from analisis_motick import AnalizadorHistoricoMotick
+        from compactacion_motick import buscar_vendidas_archivadas
+        from estado_motick import EstadoAnalisisMotick
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            almacen = AlmacenamientoLocalMotick(directorio)
+            estado = EstadoAnalisisMotick(os.path.join(directorio, 'estado'))
+            
+            # Dia 1: primera ejecucion
+            almacen.subir_datos_scraper(crear_scrape_prueba('01/09/2025', [('u1', 5), ('u2', 1)]), '01/09/2025')
+            exito_1 = AnalizadorHistoricoMotick(almacenamiento=almacen, estado=estado, verificador=False).ejecutar()
+            
+            # Dia 2: u1 sube likes, u2 vendida, u3 nueva
+            almacen.subir_datos_scraper(crear_scrape_prueba('02/09/2025', [('u1', 9), ('u3', 2)]), '02/09/2025')
+            analizador_2 = AnalizadorHistoricoMotick(almacenamiento=almacen, estado=estado, verificador=False)
+            analizador_2.ventana_dias = 1
+            exito_2 = analizador_2.ejecutar()
+            
+            df = almacen.leer_datos_historico().set_index('URL')
+            if exito_1 and exito_2 and len(df) == 3:
+                tests.append(("Analisis offline", True, "2 dias procesados sin Google Sheets"))
+            else:
+                tests.append(("Analisis offline", False, f"Ejecuciones: {exito_1}, {exito_2}, filas: {len(df)}"))
+            
+            if (df.loc['u1', 'Variacion_Likes'] == 4 and df.loc['u2', 'Estado'] == 'vendida'
+                    and df.loc['u3', 'Likes_02/09/2025'] == 2):
+                tests.append(("Historico local", True, "Variacion, ventas y nuevas correctas"))
+            else:
+                tests.append(("Historico local", False, f"Historico inesperado: {df.to_dict('index')}"))
+            
+            # Serie larga completa, Data_Historico solo con la ventana (1 dia)
+            observaciones = almacen.leer_observaciones()
+            if len(observaciones) == 4 and 'Likes_01/09/2025' not in df.columns:
+                tests.append(("Serie larga", True, f"{len(observaciones)} observaciones, ventana de 1 dia publicada"))
+            else:
+                tests.append(("Serie larga", False, f"Observaciones: {observaciones}, columnas: {list(df.columns)}"))
+            
+            pendientes = almacen.publicaciones_pendientes()
+            # Metricas y resumen se escriben en paralelo: su orden entre si no esta fijado
+            tipos = [tipo for _, tipo, _ in pendientes]
+            if ([tipos[:3], sorted(tipos[3:5]), tipos[5:8], sorted(tipos[8:])]
+                    == [['scr', 'observaciones', 'historico'], ['metricas', 'resumen']] * 2):
+                tests.append(("Cola de publicacion", True, f"{len(pendientes)} publicaciones pendientes para Sheets"))
+            else:
+                tests.append(("Cola de publicacion", False, f"Pendientes: {pendientes}"))
+            
+            # Dia 3 (semanas despues): u2 lleva vendida mas de 30 dias -> archivo frio
+            almacen.subir_datos_scraper(crear_scrape_prueba('15/10/2025', [('u1', 9), ('u3', 2)]), '15/10/2025')
+            AnalizadorHistoricoMotick(almacenamiento=almacen, estado=estado, verificador=False).ejecutar()
+            df = almacen.leer_datos_historico()
+            archivadas = buscar_vendidas_archivadas(almacen, ['u2'])
+            if 'u2' not in set(df['URL']) and len(archivadas) == 1 and archivadas['Dias_En_Venta'].iloc[0] == 1:
+                tests.append(("Compactacion vendidas", True, "u2 fuera del historico y consultable en el archivo"))
+            else:
+                tests.append(("Compactacion vendidas", False, f"Historico: {list(df['URL'])}, archivo: {archivadas}"))
+            
+            # Error leyendo Observaciones (False, no None): se aborta en vez de migrar
+            # las columnas por fecha y volver a anadir toda la serie
+            antes = len(almacen.leer_observaciones())
+            leer_original = almacen.leer_observaciones
+            almacen.leer_observaciones = lambda: False
+            exito_error = AnalizadorHistoricoMotick(almacenamiento=almacen, estado=False, verificador=False).ejecutar()
+            almacen.leer_observaciones = leer_original
+            despues = len(almacen.leer_observaciones())
+            if not exito_error and antes == despues:
+                tests.append(("Error de lectura", True, "Observaciones ilegibles -> ejecucion cancelada sin migrar"))
+            else:
+                tests.append(("Error de lectura", False, f"Exito: {exito_error}, observaciones {antes} -> {despues}"))
+
+        # Un backend al que le falta un metodo de la interfaz falla al crearlo
+        from almacenamiento_motick import AlmacenamientoMotick
+
+        class AlmacenIncompleto(AlmacenamientoMotick):
+            def test_connection(self):
+                return True
+
+        try:
+            AlmacenIncompleto()
+            tests.append(("Interfaz abstracta", False, "Backend incompleto creado sin error"))
+        except TypeError:
+            tests.append(("Interfaz abstracta", True, "Backend incompleto rechazado al crearlo"))
+
+    except Exception as e:
+        tests.append(("Almacen local", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_backfill_local():
+    """Test 10: Backfill de varios dias sin procesar = mismo historico que dia a dia"""
+    print_test_header("Backfill Multi-dia")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        import pandas as pd
+        from almacenamiento_motick import AlmacenamientoLocalMotick
+        from analisis_motick import AnalizadorHistoricoMotick
+        
+        dias = [
+            ('01/09/2025', [('u1', 5), ('u2', 1)]),
+            ('02/09/2025', [('u1', 9), ('u3', 2)]),
+            ('03/09/2025', [('u1', 10), ('u3', 6), ('u4', 0)]),
+        ]
+        
+        with tempfile.TemporaryDirectory() as dir_diario, tempfile.TemporaryDirectory() as dir_backfill:
+            diario = AlmacenamientoLocalMotick(dir_diario)
+            backfill = AlmacenamientoLocalMotick(dir_backfill)
+            
+            for fecha, urls_likes in dias:
+                diario.subir_datos_scraper(crear_scrape_prueba(fecha, urls_likes), fecha)
+                AnalizadorHistoricoMotick(almacenamiento=diario, estado=False, verificador=False).ejecutar()
+                backfill.subir_datos_scraper(crear_scrape_prueba(fecha, urls_likes), fecha)
+            
+            # En el almacen de backfill el analizador no ha corrido ningun dia
+            exito = AnalizadorHistoricoMotick(almacenamiento=backfill, estado=False, verificador=False).ejecutar_backfill()
+            
+            df_diario = diario.leer_datos_historico().sort_values('URL').reset_index(drop=True)
+            df_backfill = backfill.leer_datos_historico().sort_values('URL').reset_index(drop=True)
+            historicos = [tipo for _, tipo, _ in backfill.publicaciones_pendientes() if tipo == 'historico']
+            
+            if exito and df_diario.equals(df_backfill):
+                tests.append(("Backfill = dia a dia", True, f"{len(dias)} dias aplicados en orden, mismo historico"))
+            else:
+                tests.append(("Backfill = dia a dia", False, f"Diario:\n{df_diario}\nBackfill:\n{df_backfill}"))
+            
+            if len(historicos) == 1 and len(backfill.leer_observaciones()) == len(diario.leer_observaciones()):
+                tests.append(("Una sola escritura", True, "Historico guardado una vez, observaciones completas"))
+            else:
+                tests.append(("Una sola escritura", False, f"Escrituras de historico: {len(historicos)}"))
+
+        # Con verificacion: una sola ronda, contra el ultimo dia (u3 vuelve y no se comprueba)
+        from verificacion_motick import VerificadorVentasMotick
+        item = lambda nombre: f"https://es.wallapop.com/item/{nombre}"
+        pedidas = []
+        def obtener(url, timeout):
+            pedidas.append(url)
+            return (404, url, '')
+
+        with tempfile.TemporaryDirectory() as directorio:
+            almacen = AlmacenamientoLocalMotick(directorio)
+            for fecha, nombres in [('01/09/2025', ['u1', 'u2', 'u3']), ('02/09/2025', ['u1']),
+                                   ('03/09/2025', ['u1', 'u3'])]:
+                almacen.subir_datos_scraper(crear_scrape_prueba(fecha, [(item(n), 1) for n in nombres]), fecha)
+            verificador = VerificadorVentasMotick(pausa=(0, 0), obtener=obtener)
+            AnalizadorHistoricoMotick(almacenamiento=almacen, estado=False, verificador=verificador).ejecutar_backfill()
+
+            df = almacen.leer_datos_historico().set_index('URL')
+            if (pedidas == [item('u2')] and df.loc[item('u2'), 'Estado'] == 'vendida'
+                    and df.loc[item('u2'), 'Fecha_Venta'] == pd.Timestamp('2025-09-02')
+                    and df.loc[item('u3'), 'Estado'] == 'activa'):
+                tests.append(("Verificacion una vez", True, "Solo u2 comprobada, vendida desde el primer dia que falto"))
+            else:
+                tests.append(("Verificacion una vez", False, f"Peticiones: {pedidas}, historico:\n{df[['Estado', 'Fecha_Venta']]}"))
+
+    except Exception as e:
+        tests.append(("Backfill", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_estado_incremental():
+    """Test 11: Estado local incremental = mismo historico que la lectura completa"""
+    print_test_header("Estado Incremental")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        from almacenamiento_motick import AlmacenamientoLocalMotick
+        from analisis_motick import AnalizadorHistoricoMotick
+        from estado_motick import EstadoAnalisisMotick
+        
+        dias = [
+            ('01/09/2025', [('u1', 5), ('u2', 1)]),
+            ('02/09/2025', [('u1', 9), ('u3', 2)]),
+            ('03/09/2025', [('u1', 10), ('u3', 6), ('u4', 0)]),
+            ('04/09/2025', [('u1', 12), ('u4', 3)]),
+        ]
+        
+        with tempfile.TemporaryDirectory() as dir_completo, tempfile.TemporaryDirectory() as dir_estado:
+            completo = AlmacenamientoLocalMotick(dir_completo)
+            incremental = AlmacenamientoLocalMotick(dir_estado)
+            estado = EstadoAnalisisMotick(os.path.join(dir_estado, 'estado'))
+            
+            usos_estado = []
+            for fecha, urls_likes in dias:
+                completo.subir_datos_scraper(crear_scrape_prueba(fecha, urls_likes), fecha)
+                incremental.subir_datos_scraper(crear_scrape_prueba(fecha, urls_likes), fecha)
+                
+                analizador_completo = AnalizadorHistoricoMotick(almacenamiento=completo, estado=False, verificador=False)
+                analizador_completo.ventana_dias = 2
+                analizador_completo.ejecutar()
+                
+                analizador = AnalizadorHistoricoMotick(almacenamiento=incremental, estado=estado, verificador=False)
+                analizador.ventana_dias = 2
+                if fecha == '03/09/2025':
+                    # Otra escritura del historico (otra maquina): el estado deja de valer
+                    incremental.guardar_marca_analisis('escritura externa')
+                analizador.ejecutar()
+                usos_estado.append(analizador.usando_estado)
+            
+            if usos_estado == [False, True, False, True]:
+                tests.append(("Uso del estado", True, "Estado usado salvo en la primera ejecucion y tras cambio de marca"))
+            else:
+                tests.append(("Uso del estado", False, f"Uso por dia: {usos_estado}"))
+            
+            df_completo = completo.leer_datos_historico().sort_values('URL').reset_index(drop=True)
+            df_incremental = incremental.leer_datos_historico().sort_values('URL').reset_index(drop=True)
+            if df_completo.equals(df_incremental):
+                tests.append(("Estado = lectura completa", True, f"{len(dias)} dias, mismo historico"))
+            else:
+                tests.append(("Estado = lectura completa", False, f"Completo:\n{df_completo}\nEstado:\n{df_incremental}"))
+        
+    except Exception as e:
+        tests.append(("Estado incremental", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_matriz_series():
+    """Test 12: Matriz memory-mapped de visitas/likes (crecimiento, reapertura, saturacion)"""
+    print_test_header("Matriz Series")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        import numpy as np
+        import pandas as pd
+        from matriz_motick import MatrizSeriesMotick
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            matriz = MatrizSeriesMotick(directorio)
+            
+            # 70 dias x 1100 motos: supera la capacidad inicial en las dos dimensiones
+            fechas = pd.date_range('2025-01-01', periods=70).strftime('%Y-%m-%d')
+            url_ids = [f"url{i:04d}" for i in range(1100)]
+            for dia, fecha in enumerate(fechas):
+                matriz.actualizar(pd.DataFrame({
+                    'URL_ID': url_ids, 'Fecha': fecha,
+                    'Visitas': np.arange(1100) + dia, 'Likes': np.full(1100, dia)
+                }))
+            matriz.actualizar(pd.DataFrame({'URL_ID': ['url0000'], 'Fecha': [fechas[-1]], 'Visitas': [1], 'Likes': [100000]}))
+            
+            reabierta = MatrizSeriesMotick(directorio)
+            if reabierta.forma == (70, 1100) and reabierta.series['likes'].dtype == np.uint16:
+                tests.append(("Reapertura", True, f"Matriz {reabierta.forma} desde disco (uint32/uint16)"))
+            else:
+                tests.append(("Reapertura", False, f"Forma: {reabierta.forma}"))
+            
+            ultimo_dia = reabierta.a_observaciones([fechas[-1]]).set_index('URL_ID')
+            if ultimo_dia.loc['url0000', 'Likes'] == 65535 and ultimo_dia.loc['url0001', 'Likes'] == 69:
+                tests.append(("Saturacion uint16", True, "Likes por encima de 65.535 se saturan al leer observaciones"))
+            else:
+                tests.append(("Saturacion uint16", False, f"Observaciones: {ultimo_dia.head(2).to_dict()}"))
+            
+            vista = reabierta.vista_wide(['url0002', 'nueva'], ['10/03/2025', '01/01/2020'])
+            if list(vista['Likes_10/03/2025']) == [68, 0] and list(vista['Visitas_01/01/2020']) == [0, 0]:
+                tests.append(("Vista wide", True, "Columnas por fecha con 0 en huecos"))
+            else:
+                tests.append(("Vista wide", False, f"Vista: {vista.to_dict()}"))
+        
+    except Exception as e:
+        tests.append(("Matriz series", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_esquema_tipado():
+    """Test 13: Esquema tipado (precio/km/ano/fechas) y ordenacion sobre tipos nativos"""
+    print_test_header("Esquema Tipado")
+    
+    tests = []
+    
+    try:
+        import pandas as pd
+        from esquema_motick import tipar_dataframe, formatear_para_publicar
+        from google_sheets_motick import GoogleSheetsMotick
+        
+        df = pd.DataFrame({
+            'Titulo': ['A', 'B', 'C', 'D'],
+            'Precio': ['5.000 €', '850 €', 'No especificado', '12.300 €'],
+            'Kilometraje': ['9.000 km', '12.500 km', 'No especificado', '0 km'],
+            'Ano': ['2020', 'No especificado', '2018', '2022'],
+            'Estado': ['activa', 'activa', 'vendida', 'vendida'],
+            'Primera_Deteccion': ['01/09/2025'] * 4,
+            'Fecha_Venta': ['', '', '15/09/2025', '02/10/2025'],
+        })
+        tipado = tipar_dataframe(df)
+        
+        if (list(tipado['Kilometraje'].fillna(-1)) == [9000, 12500, -1, 0]
+                and list(tipado['Precio'].fillna(-1)) == [5000, 850, -1, 12300]
+                and str(tipado['Ano'].dtype) == 'Int64' and tipado['Fecha_Venta'].isna().sum() == 2):
+            tests.append(("Parseo", True, "'12.500 km' -> 12500, 'No especificado' -> NA, fechas datetime64"))
+        else:
+            tests.append(("Parseo", False, f"Tipado: {tipado.to_dict('list')}"))
+        
+        if formatear_para_publicar(tipado).equals(formatear_para_publicar(tipar_dataframe(tipado))) and \
+                list(formatear_para_publicar(tipado)['Kilometraje']) == list(df['Kilometraje']):
+            tests.append(("Idempotente y formato", True, "Tipar dos veces no cambia nada; textos al publicar"))
+        else:
+            tests.append(("Idempotente y formato", False, f"{formatear_para_publicar(tipado).to_dict('list')}"))
+        
+        gs_handler = GoogleSheetsMotick(sheet_id='stub', client=StubClienteSheets({}, revision='r'), cache=False)
+        ordenado = gs_handler.ordenar_historico_completo(tipado)
+        if list(ordenado['Titulo']) == ['B', 'A', 'D', 'C']:
+            tests.append(("Ordenacion nativa", True, "KM 12.500 > 9.000 y ventas de octubre antes que septiembre"))
+        else:
+            tests.append(("Ordenacion nativa", False, f"Orden: {list(ordenado['Titulo'])}"))
+        
+    except Exception as e:
+        tests.append(("Esquema tipado", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_metricas():
+    """Test 14: Metricas de engagement (deltas, velocidad, dias en mercado, ranking top-K)"""
+    print_test_header("Metricas Engagement")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        import pandas as pd
+        from metricas_motick import calcular_metricas, top_crecimiento
+        from ids_motick import crear_url_id
+        from almacenamiento_motick import AlmacenamientoLocalMotick
+        from analisis_motick import AnalizadorHistoricoMotick
+        from estado_motick import EstadoAnalisisMotick
+        
+        df_historico = pd.DataFrame({
+            'URL': ['u1', 'u2', 'u3'],
+            'Titulo': ['Honda', 'Yamaha', 'Vendida'],
+            'Estado': ['activa', 'activa', 'vendida'],
+            'Primera_Deteccion': pd.to_datetime(['2025-09-01', '2025-09-11', '2025-09-01']),
+            'Fecha_Venta': pd.to_datetime([None, None, '2025-09-21']),
+        })
+        url_ids = dict(zip(df_historico['URL'], crear_url_id(df_historico['URL'])))
+        df_obs = pd.DataFrame([
+            (url_ids['u1'], '2025-09-01', 10, 1), (url_ids['u1'], '2025-09-24', 70, 7),
+            (url_ids['u1'], '2025-09-30', 90, 10), (url_ids['u1'], '2025-10-01', 100, 14),
+            (url_ids['u2'], '2025-09-24', 10, 2), (url_ids['u2'], '2025-10-01', 50, 16),
+            (url_ids['u3'], '2025-09-20', 30, 3),
+        ], columns=['URL_ID', 'Fecha', 'Visitas', 'Likes'])
+        
+        metricas = calcular_metricas(df_historico, df_obs, '01/10/2025').set_index('URL')
+        if (list(metricas['Likes_Delta_1d'].fillna(-1)) == [4, -1, -1]
+                and list(metricas['Likes_Delta_7d'].fillna(-1)) == [7, 14, -1]
+                and list(metricas['Visitas_Delta_30d'].fillna(-1)) == [90, 40, -1]):
+            tests.append(("Deltas 1/7/30", True, "Hoy - primera observacion del periodo, NA sin dato"))
+        else:
+            tests.append(("Deltas 1/7/30", False, f"Metricas: {metricas.to_dict('list')}"))
+        
+        if (list(metricas['Velocidad_Likes_7d'].fillna(-1)) == [1.0, 2.0, -1]
+                and list(metricas['Dias_En_Mercado']) == [30, 20, 20]
+                and list(metricas['Dias_Hasta_Venta'].fillna(-1)) == [-1, -1, 20]):
+            tests.append(("Velocidad y dias", True, "Likes/dia en 7 dias, dias en mercado y hasta venta"))
+        else:
+            tests.append(("Velocidad y dias", False, f"Metricas: {metricas.to_dict('list')}"))
+        
+        # Mismas metricas con los valores anteriores leidos de las filas de la matriz
+        from matriz_motick import MatrizSeriesMotick
+        with tempfile.TemporaryDirectory() as directorio:
+            matriz = MatrizSeriesMotick(directorio)
+            matriz.actualizar(df_obs[df_obs['Fecha'] < '2025-10-01'])
+            desde_matriz = calcular_metricas(df_historico, df_obs[df_obs['Fecha'] == '2025-10-01'], '01/10/2025',
+                                             matriz=matriz).set_index('URL')
+        if desde_matriz.equals(metricas):
+            tests.append(("Deltas desde la matriz", True, "Filas de la matriz + observaciones de hoy = serie larga"))
+        else:
+            tests.append(("Deltas desde la matriz", False, f"Matriz: {desde_matriz.to_dict('list')}"))
+        
+        top = top_crecimiento(metricas.reset_index(), k=5)
+        if list(top['URL']) == ['u2', 'u1'] and list(top['Rank_Crecimiento']) == [1, 2]:
+            tests.append(("Ranking top-K", True, "u2 (+14) por delante de u1 (+7), vendida fuera"))
+        else:
+            tests.append(("Ranking top-K", False, f"Top: {top[['URL', 'Rank_Crecimiento']].to_dict('list')}"))
+        
+        # Ejecucion con estado local y ventana de 1 dia: los dias de referencia salen de la matriz
+        with tempfile.TemporaryDirectory() as directorio:
+            almacen = AlmacenamientoLocalMotick(directorio)
+            estado = EstadoAnalisisMotick(os.path.join(directorio, 'estado'))
+            for fecha, urls_likes in [('01/09/2025', [('u1', 5), ('u2', 1)]),
+                                      ('02/09/2025', [('u1', 9), ('u2', 1)]),
+                                      ('03/09/2025', [('u1', 10), ('u2', 4)])]:
+                almacen.subir_datos_scraper(crear_scrape_prueba(fecha, urls_likes), fecha)
+                analizador = AnalizadorHistoricoMotick(almacenamiento=almacen, estado=estado, verificador=False)
+                analizador.ventana_dias = 1
+                analizador.ejecutar()
+            
+            guardadas = almacen.leer_metricas().set_index('URL')
+            if (analizador.usando_estado and list(guardadas['Likes_Delta_7d']) == [5, 3]
+                    and list(guardadas['Rank_Crecimiento']) == [1, 2]):
+                tests.append(("Metricas en el analizador", True, "Guardadas cada ejecucion, deltas desde la matriz"))
+            else:
+                tests.append(("Metricas en el analizador", False, f"Guardadas: {guardadas.to_dict('list')}"))
+        
+    except Exception as e:
+        tests.append(("Metricas", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_resumen_cuentas():
+    """Test 15: Cubo cuenta x marca x estado x semana en el analizador"""
+    print_test_header("Resumen por Cuenta")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        import pandas as pd
+        from resumen_motick import calcular_resumen
+        from almacenamiento_motick import AlmacenamientoLocalMotick
+        from analisis_motick import AnalizadorHistoricoMotick
+        
+        df_historico = pd.DataFrame({
+            'Cuenta': ['MOTICK.MA', 'MOTICK.MA', 'MOTICK.MA', 'MOTICK.SE'],
+            'Titulo': ['Honda CBR 600', 'honda PCX', 'Yamaha MT-07', 'Honda CB 500'],
+            'Precio': ['5.000 €', '3.000 €', '6.000 €', 'No especificado'],
+            'Kilometraje': ['10.000 km', '20.000 km', '5.000 km', '1.000 km'],
+            'Estado': ['vendida', 'vendida', 'activa', 'activa'],
+            'Primera_Deteccion': ['01/09/2025', '03/09/2025', '01/09/2025', '02/09/2025'],
+            'Fecha_Venta': ['11/09/2025', '13/09/2025', '', ''],
+            'Visitas_Totales': [100, 300, 50, 10],
+            'Likes_Totales': [10, 30, 5, 1],
+            'URL': ['u1', 'u2', 'u3', 'u4'],
+        })
+        resumen = calcular_resumen(df_historico).set_index(['Cuenta', 'Marca', 'Estado'])
+        
+        vendidas = resumen.loc[('MOTICK.MA', 'HONDA', 'vendida')]
+        if (len(resumen) == 3 and vendidas['Motos'] == 2 and vendidas['Precio_Medio'] == 4000
+                and vendidas['Dias_Hasta_Venta_Medio'] == 10 and vendidas['Semana'] == pd.Timestamp('2025-09-08')):
+            tests.append(("Agregados", True, "2 Honda vendidas en la semana del 08/09: 4.000 € y 10 dias de media"))
+        else:
+            tests.append(("Agregados", False, f"Resumen:\n{resumen}"))
+        
+        activa = resumen.loc[('MOTICK.SE', 'HONDA', 'activa')]
+        if pd.isna(activa['Precio_Medio']) and pd.isna(activa['Dias_Hasta_Venta_Medio']) and activa['Motos'] == 1:
+            tests.append(("Valores no especificados", True, "Precio NA no cuenta como 0 en la media"))
+        else:
+            tests.append(("Valores no especificados", False, f"Fila: {activa.to_dict()}"))
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            almacen = AlmacenamientoLocalMotick(directorio)
+            almacen.subir_datos_scraper(crear_scrape_prueba('01/09/2025', [('u1', 5), ('u2', 1)]), '01/09/2025')
+            AnalizadorHistoricoMotick(almacenamiento=almacen, estado=False, verificador=False).ejecutar()
+            almacen.subir_datos_scraper(crear_scrape_prueba('02/09/2025', [('u1', 9)]), '02/09/2025')
+            AnalizadorHistoricoMotick(almacenamiento=almacen, estado=False, verificador=False).ejecutar()
+            
+            guardado = almacen.leer_resumen()
+            if guardado is not None and sorted(guardado['Estado']) == ['activa', 'vendida'] \
+                    and guardado['Likes_Delta_7d'].sum() == 4:
+                tests.append(("Resumen en el analizador", True, f"{len(guardado)} filas guardadas con likes ganados"))
+            else:
+                tests.append(("Resumen en el analizador", False, f"Guardado: {guardado}"))
+        
+    except Exception as e:
+        tests.append(("Resumen", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_catalogo_marcas():
+    """Test 16: Catalogo de marcas/modelos (marca, modelo y cilindrada desde el titulo)"""
+    print_test_header("Catalogo Marcas")
+    
+    tests = []
+    
+    try:
+        import pandas as pd
+        from catalogo_motick import etiquetar_titulos, asegurar_etiquetas, tiene_marca
+        
+        titulos = pd.Series([
+            'Honda CBR 600 RR', 'YAMAHA MT07 ABS', 'MT-07 2019 como nueva', 'BMW R 1250 GS Adventure',
+            'Harley Davidson Iron 883', 'Scooter 125cc', 'Honda MT-07', 'Moto de segunda mano'
+        ])
+        etiquetas = etiquetar_titulos(titulos)
+        esperado = [
+            ('HONDA', 'CBR', 600), ('YAMAHA', 'MT-07', 689), ('YAMAHA', 'MT-07', 689), ('BMW', 'R 1250 GS', 1254),
+            ('HARLEY-DAVIDSON', 'IRON', 883), ('', '', 125), ('HONDA', '', None), ('', '', None)
+        ]
+        obtenido = [(m, mo, None if pd.isna(c) else int(c)) for m, mo, c in etiquetas.itertuples(index=False)]
+        if obtenido == esperado:
+            tests.append(("Etiquetado", True, "Alias, separadores, ano != cilindrada y modelo de otra marca descartado"))
+        else:
+            tests.append(("Etiquetado", False, f"Obtenido: {obtenido}"))
+        
+        # Formas pegadas y con sufijo: separador opcional entre letras y numeros,
+        # letras detras de la cilindrada y nombres habituales (R1 -> YZF-R1)
+        pegados = etiquetar_titulos(pd.Series(['honda cbr600rr', 'Yamaha R1', 'Honda CB 500X', 'Yamaha R 125']))
+        esperado = [('HONDA', 'CBR', 600), ('YAMAHA', 'YZF-R1', 998), ('HONDA', 'CB500X', 471), ('YAMAHA', 'YZF-R125', 125)]
+        obtenido = [(m, mo, None if pd.isna(c) else int(c)) for m, mo, c in pegados.itertuples(index=False)]
+        if obtenido == esperado:
+            tests.append(("Formas pegadas", True, "cbr600rr, R1, CB 500X y R 125 con su modelo"))
+        else:
+            tests.append(("Formas pegadas", False, f"Obtenido: {obtenido}"))
+        
+        # Cilindrada suelta antes del modelo o tras la marca; anos y km no cuentan
+        sueltos = etiquetar_titulos(pd.Series(['KTM 390 Duke', 'KTM 390', 'KTM 2019 Duke', 'Honda PCX 2019 1500 km']))
+        esperado = [('KTM', 'DUKE', 390), ('KTM', '', 390), ('KTM', 'DUKE', None), ('HONDA', 'PCX', None)]
+        obtenido = [(m, mo, None if pd.isna(c) else int(c)) for m, mo, c in sueltos.itertuples(index=False)]
+        if obtenido == esperado:
+            tests.append(("Cilindrada suelta", True, "KTM 390 Duke -> 390, sin tomar anos ni km"))
+        else:
+            tests.append(("Cilindrada suelta", False, f"Obtenido: {obtenido}"))
+
+        if tiene_marca('Vendo KAWASAKI Z900') and not tiene_marca('Hondarribia centro'):
+            tests.append(("Validacion de titulo", True, "Marca como palabra completa en una busqueda"))
+        else:
+            tests.append(("Validacion de titulo", False, "tiene_marca no distingue palabras completas"))
+        
+        df = pd.DataFrame({'Titulo': ['Suzuki GSX-R 750', 'Piaggio MP3 500'], 'Marca': ['SUZUKI', ''],
+                           'Modelo': ['GSX-R', ''], 'Cilindrada': [750, None]})
+        df = asegurar_etiquetas(df)
+        if list(df['Marca']) == ['SUZUKI', 'PIAGGIO'] and list(df.columns[:4]) == ['Titulo', 'Marca', 'Modelo', 'Cilindrada']:
+            tests.append(("Historicos existentes", True, "Solo se etiquetan las filas sin marca"))
+        else:
+            tests.append(("Historicos existentes", False, f"Resultado: {df.to_dict('list')}"))
+        
+    except Exception as e:
+        tests.append(("Catalogo", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_cambios_precio():
+    """Test 17: Registro de cambios de precio y dias desde la ultima bajada"""
+    print_test_header("Cambios de Precio")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        import pandas as pd
+        from precios_motick import detectar_cambios_precio, metricas_precio
+        from ids_motick import crear_url_id
+        from almacenamiento_motick import AlmacenamientoLocalMotick
+        from analisis_motick import AnalizadorHistoricoMotick
+        
+        urls = pd.Series(['u1', 'u2', 'u3', 'u4'])
+        anterior = pd.Series([5000, 3000, None, 1000], dtype='Int64')
+        hoy = pd.Series([4500, 3000, 2000, None], dtype='Int64')
+        mascara, cambios = detectar_cambios_precio(urls, anterior, hoy, '02/09/2025')
+        if list(mascara) == [True, False, False, False] and cambios.iloc[0].tolist() == [crear_url_id(urls)[0], '2025-09-02', 5000, 4500]:
+            tests.append(("Deteccion vectorizada", True, "Solo cambia u1; precios no especificados no son cambios"))
+        else:
+            tests.append(("Deteccion vectorizada", False, f"Mascara: {list(mascara)}, cambios: {cambios}"))
+        
+        def scrape(fecha, precios):
+            df = crear_scrape_prueba(fecha, [('u1', 5), ('u2', 3)])
+            df['Precio'] = precios
+            return df
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            almacen = AlmacenamientoLocalMotick(directorio)
+            for fecha, precios in [('01/09/2025', ['5.000 €', '3.000 €']),
+                                   ('02/09/2025', ['4.500 €', '3.000 €']),
+                                   ('05/09/2025', ['4.000 €', '3.200 €'])]:
+                almacen.subir_datos_scraper(scrape(fecha, precios), fecha)
+                AnalizadorHistoricoMotick(almacenamiento=almacen, estado=False, verificador=False).ejecutar()
+            
+            registro = almacen.leer_cambios_precio()
+            df = almacen.leer_datos_historico().set_index('URL')
+            if len(registro) == 3 and list(df.loc[['u1', 'u2'], 'Precio']) == [4000, 3200]:
+                tests.append(("Registro de cambios", True, "3 cambios en 3 dias; el historico guarda el precio actual"))
+            else:
+                tests.append(("Registro de cambios", False, f"Registro:\n{registro}\nPrecios: {df['Precio'].to_dict()}"))
+            
+            metricas = metricas_precio(crear_url_id(pd.Series(['u1', 'u2'])), registro, '08/09/2025')
+            if (list(metricas['Bajadas_Precio']) == [2, 0] and list(metricas['Bajada_Acumulada']) == [1000, 0]
+                    and metricas['Dias_Desde_Bajada'].iloc[0] == 3 and pd.isna(metricas['Dias_Desde_Bajada'].iloc[1])):
+                tests.append(("Dias desde bajada", True, "u1: 2 bajadas (1.000 €), la ultima hace 3 dias; u2 solo subio"))
+            else:
+                tests.append(("Dias desde bajada", False, f"Metricas: {metricas.to_dict('list')}"))
+        
+    except Exception as e:
+        tests.append(("Cambios de precio", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_archivo_scr():
+    """Test 9: Archivo de hojas SCR antiguas a Parquet particionado por fecha"""
+    print_test_header("Archivo SCR")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        from google_sheets_motick import GoogleSheetsMotick
+        from archivo_scr_motick import ArchivoSCRMotick, archivar_hojas_scr
+        
+        csv_scr = b"URL,Titulo,Visitas,Likes\nhttps://test.com/item/1,Honda,10,2\n"
+        worksheets = {
+            'Data_Historico': StubWorksheet('Data_Historico', 1, b"URL,Estado\nhttps://test.com/item/1,activa\n"),
+            'SCR 01/08/25': StubWorksheet('SCR 01/08/25', 2, csv_scr),
+            'SCR 02/08/25': StubWorksheet('SCR 02/08/25', 3, csv_scr),
+            'SCR 30/08/25': StubWorksheet('SCR 30/08/25', 4, csv_scr),
+        }
+        cliente = StubClienteSheets(worksheets, revision='2025-09-01T06:00:00.000Z')
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            gs_handler = GoogleSheetsMotick(sheet_id='stub', client=cliente, cache=False)
+            archivo = ArchivoSCRMotick(directorio)
+            
+            archivadas = archivar_hojas_scr(gs_handler, archivo, dias_retencion=14, hoy=datetime(2025, 9, 1))
+            titulos = [ws.title for ws in cliente.spreadsheet.worksheets()]
+            if archivadas == 2 and titulos == ['Data_Historico', 'SCR 30/08/25']:
+                tests.append(("Rotacion", True, "2 hojas antiguas movidas a Parquet y eliminadas del Sheet"))
+            else:
+                tests.append(("Rotacion", False, f"Archivadas: {archivadas}, hojas restantes: {titulos}"))
+            
+            df_scr, fecha = gs_handler.leer_datos_scraper_reciente()
+            if fecha == '30/08/2025' and archivo.ultima_fecha() == '2025-08-02':
+                tests.append(("Snapshot reciente", True, "Sheet: 30/08/2025, ultima archivada: 2025-08-02"))
+            else:
+                tests.append(("Snapshot reciente", False, f"Sheet: {fecha}, archivo: {archivo.ultima_fecha()}"))
+            
+            df_archivo = archivo.consultar(desde='01/08/2025', hasta='31/08/2025')
+            if len(df_archivo) == 2 and archivo.leer('01/08/2025')['Likes'].iloc[0] == 2:
+                tests.append(("Consulta local", True, f"{len(df_archivo)} filas consultables en local"))
+            else:
+                tests.append(("Consulta local", False, f"Consulta: {df_archivo}"))
+        
+    except Exception as e:
+        tests.append(("Archivo SCR", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_pipeline():
+    """Test 18: Pipeline en un proceso (scraper -> analizador sin releer la SCR)"""
+    print_test_header("Pipeline")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        from almacenamiento_motick import AlmacenamientoLocalMotick
+        from analisis_motick import AnalizadorHistoricoMotick
+        
+        dias = [('01/09/2025', [('u1', 5), ('u2', 1)]),
+                ('02/09/2025', [('u1', 9), ('u3', 2)])]
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            # Referencia: scraper y analizador en dos procesos (sube y relee la SCR)
+            almacen_ref = AlmacenamientoLocalMotick(os.path.join(directorio, 'ref'))
+            for fecha, urls_likes in dias:
+                almacen_ref.subir_datos_scraper(crear_scrape_prueba(fecha, urls_likes), fecha)
+                AnalizadorHistoricoMotick(almacenamiento=almacen_ref, estado=False, verificador=False).ejecutar()
+            
+            # Pipeline: el DataFrame del scraper va directo al analizador
+            almacen = AlmacenamientoLocalMotick(os.path.join(directorio, 'pipeline'))
+            leidas = []
+            leer_original = almacen.leer_datos_scraper_reciente
+            almacen.leer_datos_scraper_reciente = lambda: leidas.append(1) or leer_original()
+            exitos = []
+            for fecha, urls_likes in dias:
+                analizador = AnalizadorHistoricoMotick(almacenamiento=almacen, estado=False, verificador=False)
+                exitos.append(analizador.ejecutar(df_scraper=crear_scrape_prueba(fecha, urls_likes),
+                                                  fecha_extraccion=fecha))
+            
+            if all(exitos) and not leidas:
+                tests.append(("Sin releer la SCR", True, "2 dias analizados desde memoria"))
+            else:
+                tests.append(("Sin releer la SCR", False, f"Exitos: {exitos}, lecturas SCR: {len(leidas)}"))
+            
+            snapshot = almacen.leer_snapshot('02/09/2025')
+            if snapshot is not None and sorted(snapshot['URL']) == ['u1', 'u3'] and analizador.snapshot_pendiente is None:
+                tests.append(("Snapshot guardado al final", True, "SCR 02/09/25 guardada junto al resto de escrituras"))
+            else:
+                tests.append(("Snapshot guardado al final", False, f"Snapshot: {snapshot}"))
+            
+            ref = almacen_ref.leer_datos_historico().set_index('URL').sort_index()
+            df = almacen.leer_datos_historico().set_index('URL').sort_index()
+            iguales = ref.drop(columns=['Fecha_Procesamiento'], errors='ignore').equals(
+                df.drop(columns=['Fecha_Procesamiento'], errors='ignore'))
+            if iguales and almacen.leer_metricas() is not None and almacen.leer_resumen() is not None:
+                tests.append(("Mismo resultado", True, "Historico identico al de dos procesos; metricas y resumen guardados"))
+            else:
+                tests.append(("Mismo resultado", False, f"Referencia:\n{ref}\nPipeline:\n{df}"))
+        
+    except Exception as e:
+        tests.append(("Pipeline", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_stream_scraper():
+    """Test 19: Stream NDJSON del scraper (archivo y socket local, lectura por cuentas)"""
+    print_test_header("Stream Scraper")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        import threading
+        import pandas as pd
+        from stream_motick import (SalidaStreamMotick, leer_stream, leer_stream_scraper,
+                                   cuentas_del_stream, preparar_anuncios)
+        
+        anuncios = crear_scrape_prueba('01/09/2025', [('u1', 5), ('u2', 1), ('u3', 7)])
+        anuncios['Cuenta'] = ['MOTICK.A', 'MOTICK.A', 'MOTICK.B']
+        registros = anuncios.to_dict('records')
+        
+        def emitir(destino):
+            stream = SalidaStreamMotick(destino)
+            for cuenta in ['MOTICK.A', 'MOTICK.B']:
+                propios = [r for r in registros if r['Cuenta'] == cuenta]
+                for registro in propios:
+                    stream.emitir_anuncio(registro)
+                stream.emitir_resumen_cuenta(cuenta, len(propios), 0, len(propios), len(propios), 1.0)
+            stream.finalizar()
+        
+        esperado = preparar_anuncios(registros).sort_values(['Likes', 'Visitas'], ascending=[False, False])
+        esperado = esperado.reset_index(drop=True)
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'scrape.ndjson')
+            emitir(ruta)
+            tipos = [r['tipo'] for r in leer_stream(ruta, espera_maxima=1)]
+            df = leer_stream_scraper(ruta, espera_maxima=1)
+            if tipos == ['inicio', 'anuncio', 'anuncio', 'cuenta', 'anuncio', 'cuenta', 'fin'] and df.equals(esperado):
+                tests.append(("Archivo NDJSON", True, "inicio + 3 anuncios + resumen por cuenta + fin; mismo DataFrame que el scraper"))
+            else:
+                tests.append(("Archivo NDJSON", False, f"Tipos: {tipos}\n{df}"))
+            
+            # Archivo de la ejecucion de ayer: el lector arranca antes y espera al scraper
+            import json
+            from datetime import timedelta
+            ayer = (datetime.now() - timedelta(days=1)).isoformat(timespec='seconds')
+            with open(ruta, 'w', encoding='utf-8') as f:
+                for registro in [{'tipo': 'inicio', 'Inicio': ayer}, {'tipo': 'anuncio', **registros[0], 'URL': 'u-ayer'},
+                                 {'tipo': 'cuenta', 'Cuenta': 'MOTICK.A'}, {'tipo': 'fin'}]:
+                    f.write(json.dumps(registro, default=str) + '\n')
+            resultado = {}
+            lector = threading.Thread(target=lambda: resultado.update(df=leer_stream_scraper(ruta, espera_maxima=5)))
+            lector.start()
+            time.sleep(0.3)
+            emitir(ruta)
+            lector.join(timeout=10)
+            if resultado.get('df') is not None and resultado['df'].equals(esperado):
+                tests.append(("Archivo anterior", True, "El stream de ayer se ignora hasta que el scraper lo reescribe"))
+            else:
+                tests.append(("Archivo anterior", False, f"Recibido: {resultado}"))
+            
+            # Socket local: el consumidor escucha y el scraper se conecta
+            origen = f"unix:{os.path.join(directorio, 'scrape.sock')}"
+            resultado = {}
+            lector = threading.Thread(target=lambda: resultado.update(df=leer_stream_scraper(origen)))
+            lector.start()
+            for _ in range(100):
+                if os.path.exists(origen[len('unix:'):]):
+                    break
+                time.sleep(0.02)
+            emitir(origen)
+            lector.join(timeout=10)
+            if resultado.get('df') is not None and resultado['df'].equals(esperado):
+                tests.append(("Socket local", True, f"{len(resultado['df'])} anuncios recibidos por {origen[:5]}"))
+            else:
+                tests.append(("Socket local", False, f"Recibido: {resultado}"))
+        
+        # Cada cuenta se entrega al llegar su resumen, sin esperar al resto del stream
+        leidos = []
+        def registros_stream():
+            for registro in [{'tipo': 'anuncio', **r} for r in registros[:2]] + [{'tipo': 'cuenta', 'Cuenta': 'MOTICK.A'}]:
+                leidos.append(registro)
+                yield registro
+            raise AssertionError("No deberia leer mas alla de la primera cuenta")
+        
+        cuenta, df_cuenta, resumen = next(cuentas_del_stream(registros_stream()))
+        if cuenta == 'MOTICK.A' and len(df_cuenta) == 2 and len(leidos) == 3 and 'Marca' in df_cuenta.columns:
+            tests.append(("Entrega por cuenta", True, "MOTICK.A lista (IDs y etiquetas) antes de leer MOTICK.B"))
+        else:
+            tests.append(("Entrega por cuenta", False, f"{cuenta}: {df_cuenta}"))
+        
+    except Exception as e:
+        tests.append(("Stream Scraper", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_verificacion_ventas():
+    """Test 20: Verificacion HTTP de posibles ventas (pool acotado, solo confirmadas)"""
+    print_test_header("Verificacion Ventas")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        import threading
+        from verificacion_motick import VerificadorVentasMotick, RETIRADA, ACTIVA, DESCONOCIDO
+        from almacenamiento_motick import AlmacenamientoLocalMotick
+        from analisis_motick import AnalizadorHistoricoMotick
+        
+        item = lambda nombre: f"https://es.wallapop.com/item/{nombre}"
+        respuestas = {
+            item('borrada'): (404, item('borrada'), ''),
+            item('publicada'): (200, item('publicada'), '<html>{"title": "Honda"}</html>'),
+            item('redirigida'): (200, 'https://es.wallapop.com/app/search', ''),
+            item('vendida'): (200, item('vendida'), '{"flags": {"sold": true}}'),
+            item('error'): (500, item('error'), ''),
+        }
+        en_curso = {'ahora': 0, 'maximo': 0}
+        cerrojo = threading.Lock()
+        
+        def obtener(url, timeout):
+            with cerrojo:
+                en_curso['ahora'] += 1
+                en_curso['maximo'] = max(en_curso['maximo'], en_curso['ahora'])
+            time.sleep(0.05)
+            with cerrojo:
+                en_curso['ahora'] -= 1
+            if url not in respuestas:
+                raise OSError("sin conexion")
+            return respuestas[url]
+        
+        verificador = VerificadorVentasMotick(hilos=2, pausa=(0, 0), obtener=obtener)
+        estados = verificador.verificar(list(respuestas) + [item('caida'), 'u-sin-http'])
+        esperado = [RETIRADA, ACTIVA, RETIRADA, RETIRADA, DESCONOCIDO, DESCONOCIDO, DESCONOCIDO]
+        if list(estados.values()) == esperado and en_curso['maximo'] == 2:
+            tests.append(("Estados y pool", True, "404/redireccion/vendida confirmadas; como mucho 2 peticiones a la vez"))
+        else:
+            tests.append(("Estados y pool", False, f"Estados: {estados}, maximo en paralelo: {en_curso['maximo']}"))
+        
+        limitado = VerificadorVentasMotick(hilos=1, pausa=(0, 0), pausa_bloqueo=0.1,
+                                           obtener=lambda url, timeout: (429, url, ''))
+        limitado.verificar([item(f"l{i}") for i in range(3)])
+        if limitado.pausado_hasta > 0:
+            tests.append(("Pausa por bloqueo", True, "3 respuestas 429 seguidas activan la pausa comun"))
+        else:
+            tests.append(("Pausa por bloqueo", False, "No se activo la pausa"))
+        
+        # Dia 2: faltan u2 (borrada) y u3 (fallo del scraper, sigue publicada)
+        with tempfile.TemporaryDirectory() as directorio:
+            almacen = AlmacenamientoLocalMotick(directorio)
+            respuestas.update({item('u2'): (404, item('u2'), ''), item('u3'): (200, item('u3'), '')})
+            dias = [('01/09/2025', [(item('u1'), 5), (item('u2'), 1), (item('u3'), 2)]),
+                    ('02/09/2025', [(item('u1'), 6)]),
+                    ('03/09/2025', [(item('u1'), 7), (item('u3'), 3)])]
+            analizadores = []
+            for fecha, urls_likes in dias:
+                almacen.subir_datos_scraper(crear_scrape_prueba(fecha, urls_likes), fecha)
+                verificador = VerificadorVentasMotick(pausa=(0, 0), obtener=obtener)
+                analizadores.append(AnalizadorHistoricoMotick(almacenamiento=almacen, estado=False, verificador=verificador))
+                analizadores[-1].ejecutar()
+            
+            df = almacen.leer_datos_historico().set_index('URL')
+            estados_hist = df['Estado'].to_dict()
+            if (estados_hist == {item('u1'): 'activa', item('u2'): 'vendida', item('u3'): 'activa'}
+                    and analizadores[1].stats['ventas_no_confirmadas'] == 1 and analizadores[2].stats['motos_nuevas'] == 0):
+                tests.append(("Solo ventas confirmadas", True, "u2 vendida; u3 sigue activa y no vuelve como nueva"))
+            else:
+                tests.append(("Solo ventas confirmadas", False, f"Estados: {estados_hist}"))
+
+        # Sin red: ninguna posible venta se puede comprobar -> siguen todas activas
+        with tempfile.TemporaryDirectory() as directorio:
+            almacen = AlmacenamientoLocalMotick(directorio)
+            def sin_red(url, timeout):
+                raise OSError("sin conexion")
+            for fecha, urls_likes in [('01/09/2025', [(item('r1'), 5), (item('r2'), 1)]),
+                                      ('02/09/2025', [(item('r1'), 6)])]:
+                almacen.subir_datos_scraper(crear_scrape_prueba(fecha, urls_likes), fecha)
+                analizador = AnalizadorHistoricoMotick(almacenamiento=almacen, estado=False,
+                                                       verificador=VerificadorVentasMotick(pausa=(0, 0), obtener=sin_red))
+                analizador.ejecutar()
+
+            estados_hist = almacen.leer_datos_historico().set_index('URL')['Estado'].to_dict()
+            if set(estados_hist.values()) == {'activa'} and analizador.stats['ventas_no_confirmadas'] == 1:
+                tests.append(("Sin red", True, "Ninguna venta verificable: r2 sigue activa y se cuenta"))
+            else:
+                tests.append(("Sin red", False, f"Estados: {estados_hist}, stats: {analizador.stats}"))
+
+    except Exception as e:
+        tests.append(("Verificacion Ventas", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_shards():
+    """Test 21: Reparto de cuentas por shards y merge de resultados parciales"""
+    print_test_header("Shards")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        import pandas as pd
+        from config import MOTICK_ACCOUNTS_FULL
+        from shards_motick import parsear_shard, cuentas_del_shard, guardar_shard, unir_shards
+        from stream_motick import preparar_anuncios
+        
+        invalidos = []
+        for texto in ['0/3', '4/3', '1-3', 'a/b']:
+            try:
+                parsear_shard(texto)
+            except ValueError:
+                invalidos.append(texto)
+        partes = [cuentas_del_shard(MOTICK_ACCOUNTS_FULL, i, 3) for i in range(1, 4)]
+        repartidas = sorted(cuenta for parte in partes for cuenta in parte)
+        invertidas = dict(reversed(list(MOTICK_ACCOUNTS_FULL.items())))
+        if (parsear_shard('2/3') == (2, 3) and len(invalidos) == 4 and repartidas == sorted(MOTICK_ACCOUNTS_FULL)
+                and cuentas_del_shard(invertidas, 2, 3) == partes[1] and max(map(len, partes)) - min(map(len, partes)) <= 1):
+            tests.append(("Reparto determinista", True, f"{len(MOTICK_ACCOUNTS_FULL)} cuentas en 3 shards de {[len(p) for p in partes]}"))
+        else:
+            tests.append(("Reparto determinista", False, f"Invalidos: {invalidos}, partes: {partes}"))
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            shard_1 = preparar_anuncios(crear_scrape_prueba('01/09/2025', [('u1', 5), ('u2', 1)]).to_dict('records'))
+            shard_2 = preparar_anuncios(crear_scrape_prueba('01/09/2025', [('u2', 4), ('u3', 2)]).to_dict('records'))
+            guardar_shard(shard_1, 1, 3, ['MOTICK.A'], '01/09/2025', directorio)
+            guardar_shard(shard_2, 2, 3, ['MOTICK.B'], '01/09/2025', directorio)
+            
+            incompleto = unir_shards('01/09/2025', directorio)
+            parcial = unir_shards('01/09/2025', directorio, parcial=True)
+            if incompleto is None and parcial is not None and len(parcial) == 3:
+                tests.append(("Shard perdido", True, "Sin --parcial el merge no sube un dia incompleto"))
+            else:
+                tests.append(("Shard perdido", False, f"Incompleto: {incompleto}, parcial: {parcial}"))
+            
+            guardar_shard(pd.DataFrame(), 3, 3, [], '01/09/2025', directorio)
+            df = unir_shards('01/09/2025', directorio)
+            if df is not None and sorted(df['URL']) == ['u1', 'u2', 'u3'] and df.set_index('URL').loc['u2', 'Likes'] == 4:
+                tests.append(("Merge sin duplicados", True, "u2 una vez (la fila con mas likes); shard vacio aceptado"))
+            else:
+                tests.append(("Merge sin duplicados", False, f"Merge: {df}"))
+            
+            # Medidas de los shards (registro y selectores) se suman a las de data/ en el merge
+            from registro_cuentas_motick import RegistroCuentasMotick
+            from selectores_motick import EstadisticasSelectoresMotick
+            from scraper_motick import incorporar_medidas_shards
+            medidas = {
+                'registro': {'MOTICK.MA M.': {'enlaces_ultimo': 40, 'latencia_anuncio': 6.0, 'prioridad': 9,
+                                              'ultimo_scrape': '2025-09-01T08:00:00'}},
+                'selectores': {'likes': {"[class*='heart']": {'intentos': 2, 'aciertos': 2}}},
+            }
+            guardar_shard(shard_1, 1, 3, ['MOTICK.MA M.'], '01/09/2025', directorio, medidas=medidas)
+            registro = RegistroCuentasMotick(os.path.join(directorio, 'cuentas.json'))
+            selectores = EstadisticasSelectoresMotick(os.path.join(directorio, 'selectores.json'))
+            selectores.sumar({'likes': {"[class*='heart']": {'intentos': 1, 'aciertos': 1}}})
+            selectores.guardar()
+            incorporado = incorporar_medidas_shards('01/09/2025', registro, selectores, directorio)
+            cuenta = RegistroCuentasMotick(os.path.join(directorio, 'cuentas.json')).cuenta('MOTICK.MA M.')
+            contador = EstadisticasSelectoresMotick(os.path.join(directorio, 'selectores.json')).campos['likes']["[class*='heart']"]
+            if (incorporado and cuenta['enlaces_ultimo'] == 40 and cuenta['prioridad'] == 0
+                    and contador == {'intentos': 3, 'aciertos': 3}):
+                tests.append(("Medidas de shards", True, "Registro (solo medidas) y aciertos de selectores incorporados"))
+            else:
+                tests.append(("Medidas de shards", False, f"Cuenta: {cuenta}, contador: {contador}"))
+        
+    except Exception as e:
+        tests.append(("Shards", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_cola_tareas():
+    """Test 22: Cola de tareas SQLite (prioridades, leases, reintentos, varios trabajadores)"""
+    print_test_header("Cola de Tareas")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        import threading
+        from cola_motick import ColaTareasMotick
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            cola = ColaTareasMotick(os.path.join(directorio, 'cola.sqlite'), max_intentos=2)
+            fecha = '2025-09-01'
+            
+            nuevas = cola.encolar_cuentas({'MOTICK.A': 'perfil-a', 'MOTICK.B': 'perfil-b'}, fecha)
+            repetidas = cola.encolar_cuentas({'MOTICK.A': 'perfil-a'}, fecha)
+            cola.encolar_anuncios('MOTICK.A', [f"anuncio-{i}" for i in range(20)], fecha)
+            primera = cola.reclamar('w0', fecha)
+            if nuevas == 2 and repetidas == 0 and primera['tipo'] == 'cuenta':
+                tests.append(("Encolado y prioridad", True, "Sin duplicados; los perfiles se reclaman antes que los anuncios"))
+            else:
+                tests.append(("Encolado y prioridad", False, f"Nuevas: {nuevas}, repetidas: {repetidas}, primera: {primera}"))
+            cola.completar(primera, 'w0', {'anuncios': 0})
+            
+            # 4 trabajadores a la vez: ninguna tarea se reclama dos veces
+            reclamadas = []
+            cerrojo = threading.Lock()
+            def trabajador(nombre):
+                while True:
+                    tarea = cola.reclamar(nombre, fecha)
+                    if tarea is None:
+                        return
+                    with cerrojo:
+                        reclamadas.append(tarea['url'])
+                    cola.completar(tarea, nombre, {'URL': tarea['url'], 'Likes': 1})
+            hilos = [threading.Thread(target=trabajador, args=(f"w{i}",)) for i in range(1, 5)]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+            if len(reclamadas) == 21 and len(set(reclamadas)) == 21 and len(cola.resultados(fecha)) == 20:
+                tests.append(("Trabajadores concurrentes", True, "21 tareas, cada una reclamada una sola vez"))
+            else:
+                tests.append(("Trabajadores concurrentes", False, f"{len(reclamadas)} reclamadas, {len(set(reclamadas))} distintas"))
+            
+            # Trabajador caido con una tarea en curso: vuelve a la cola al caducar el lease
+            cola.encolar_anuncios('MOTICK.A', ['caido'], fecha)
+            tarea_a = cola.reclamar('wa', fecha, lease_segundos=0.05)
+            time.sleep(0.1)
+            tarea_b = cola.reclamar('wb', fecha, lease_segundos=60)
+            ok_a = cola.completar(tarea_a, 'wa', {'URL': 'caido'})
+            ok_b = cola.completar(tarea_b, 'wb', {'URL': 'caido'})
+            if tarea_a['url'] == tarea_b['url'] == 'caido' and not ok_a and ok_b and tarea_b['intentos'] == 2:
+                tests.append(("Lease caducado", True, "Otro trabajador la reclama; el caido ya no puede cerrarla"))
+            else:
+                tests.append(("Lease caducado", False, f"A: {tarea_a}, B: {tarea_b}, ok: {ok_a}/{ok_b}"))
+            
+            # Reintentos: vuelve a pendiente tras el primer fallo y queda fallida en el segundo
+            cola.encolar_anuncios('MOTICK.B', ['reintento'], fecha)
+            estados = []
+            for _ in range(3):
+                tarea = cola.reclamar('wc', fecha)
+                if tarea is None:
+                    break
+                cola.fallar(tarea, 'wc', 'navegacion lenta o fallida')
+                estados.append(cola.resumen(fecha))
+            resumen = cola.resumen(fecha)
+            if (len(estados) == 2 and estados[0].get(('anuncio', 'pendiente')) == 1
+                    and resumen.get(('anuncio', 'fallida')) == 1 and cola.activas(fecha) == 0):
+                tests.append(("Reintentos", True, f"Fallida tras {len(estados)} intentos; la cola queda vacia"))
+            else:
+                tests.append(("Reintentos", False, f"Estados: {estados}, resumen: {resumen}"))
+            
+            # DB bloqueada por otro proceso: reclamar propaga el error real del BEGIN
+            import sqlite3
+            bloqueo = sqlite3.connect(cola.ruta_db, isolation_level=None)
+            bloqueo.execute("BEGIN EXCLUSIVE")
+            conectar_original = cola.conectar
+            cola.conectar = lambda: sqlite3.connect(cola.ruta_db, timeout=0.1, isolation_level=None)
+            try:
+                cola.reclamar('wd', fecha)
+                error = None
+            except sqlite3.OperationalError as e:
+                error = str(e)
+            finally:
+                cola.conectar = conectar_original
+                bloqueo.execute("ROLLBACK")
+                bloqueo.close()
+            if error and 'locked' in error:
+                tests.append(("DB bloqueada", True, f"Error original propagado: {error}"))
+            else:
+                tests.append(("DB bloqueada", False, f"Error: {error}"))
+        
+    except Exception as e:
+        tests.append(("Cola de Tareas", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_registro_cuentas():
+    """Test 23: Registro de cuentas (prioridad, ttl, pistas por cuenta y medidas del scraper)"""
+    print_test_header("Registro de Cuentas")
+    
+    tests = []
+    
+    try:
+        import json
+        import tempfile
+        from datetime import timedelta
+        from config import MOTICK_ACCOUNTS_FULL, MOTICK_ACCOUNTS_TEST
+        from registro_cuentas_motick import RegistroCuentasMotick
+        from almacenamiento_motick import AlmacenamientoLocalMotick
+        from analisis_motick import AnalizadorHistoricoMotick
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'cuentas.json')
+            registro = RegistroCuentasMotick(ruta)
+            if (set(registro.cuentas_a_scrapear()) == set(MOTICK_ACCOUNTS_FULL)
+                    and set(registro.cuentas_a_scrapear(test_mode=True)) == set(MOTICK_ACCOUNTS_TEST)
+                    and registro.pista('MOTICK.MA M.')['expected_count'] == 300):
+                tests.append(("Registro inicial", True, f"{len(MOTICK_ACCOUNTS_FULL)} cuentas de config.py con pistas por defecto"))
+            else:
+                tests.append(("Registro inicial", False, f"Cuentas: {registro.cuentas_a_scrapear()}"))
+            
+            # Medidas tras un scrape: objetivo de carga, latencia (media movil) y presupuesto
+            ahora = datetime(2025, 9, 1, 8, 0)
+            registro.registrar_scrape('MOTICK.MA M.', 100, 95, 5, 600, ahora)
+            registro.registrar_scrape('MOTICK.MA M.', 100, 100, 0, 400, ahora)
+            registro.registrar_scrape('MOTICK.BA B.', 10, 10, 0, 50, ahora)
+            pista = registro.pista('MOTICK.MA M.')
+            if pista['expected_count'] == 130 and pista['max_clicks'] == 8 and pista['presupuesto'] == 500:
+                tests.append(("Pistas por cuenta", True, "100 enlaces -> objetivo 130 en 8 clics, 500s estimados"))
+            else:
+                tests.append(("Pistas por cuenta", False, f"Pista: {pista}"))
+            
+            # Prioridad manda; a igual prioridad, primero las que mas tiempo necesitan
+            registro.registro['cuentas']['MOTICK.NO N.']['prioridad'] = 5
+            orden = list(registro.cuentas_a_scrapear(ahora=ahora))
+            registro.registro['cuentas']['MOTICK.BA B.']['ttl_horas'] = 24
+            con_ttl = registro.cuentas_a_scrapear(ahora=ahora + timedelta(hours=12))
+            if (orden[:3] == ['MOTICK.NO N.', 'MOTICK.MA M.', 'MOTICK.BA B.'] and 'MOTICK.BA B.' not in con_ttl
+                    and 'MOTICK.BA B.' in registro.cuentas_a_scrapear(todas=True, ahora=ahora + timedelta(hours=12))
+                    and 'MOTICK.BA B.' in registro.cuentas_a_scrapear(ahora=ahora + timedelta(hours=25))):
+                tests.append(("Prioridad y ttl", True, "Orden por prioridad/presupuesto; ttl_horas salta la cuenta"))
+            else:
+                tests.append(("Prioridad y ttl", False, f"Orden: {orden[:3]}, con ttl: {list(con_ttl)}"))
+            
+            # Persistencia: una cuenta anadida a mano recibe los valores por defecto
+            registro.guardar()
+            with open(ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            datos['cuentas']['MOTICK.NUEVA'] = {'url': 'https://es.wallapop.com/user/nueva'}
+            with open(ruta, 'w', encoding='utf-8') as f:
+                json.dump(datos, f)
+            recargado = RegistroCuentasMotick(ruta)
+            if (recargado.cuenta('MOTICK.MA M.')['latencia_anuncio'] == 5.0
+                    and 'MOTICK.NUEVA' in recargado.cuentas_a_scrapear(ahora=ahora)):
+                tests.append(("Registro editable", True, "Medidas guardadas; cuentas nuevas a mano sin mas campos"))
+            else:
+                tests.append(("Registro editable", False, f"Recargado: {recargado.registro}"))
+            
+            # Registro restaurado de la cache sin una cuenta anadida despues a config.py:
+            # se incorpora al cargar; las desactivadas a mano siguen desactivadas
+            del datos['cuentas']['MOTICK.BA B.']
+            datos['cuentas']['MOTICK.SE S.']['activa'] = False
+            with open(ruta, 'w', encoding='utf-8') as f:
+                json.dump(datos, f)
+            restaurado = RegistroCuentasMotick(ruta)
+            a_scrapear = restaurado.cuentas_a_scrapear(ahora=ahora)
+            if (a_scrapear.get('MOTICK.BA B.') == MOTICK_ACCOUNTS_FULL['MOTICK.BA B.']
+                    and 'MOTICK.SE S.' not in a_scrapear):
+                tests.append(("Cuentas nuevas de config", True, "Cuenta de config.py ausente del registro -> se anade"))
+            else:
+                tests.append(("Cuentas nuevas de config", False, f"A scrapear: {list(a_scrapear)}"))
+            
+            # Cuenta no scrapeada hoy (ttl): sus motos no se marcan vendidas
+            almacen = AlmacenamientoLocalMotick(os.path.join(directorio, 'almacen'))
+            dia_1 = crear_scrape_prueba('01/09/2025', [('u1', 5), ('u2', 1)])
+            dia_1['Cuenta'] = ['MOTICK.A', 'MOTICK.B']
+            dia_2 = crear_scrape_prueba('02/09/2025', [('u1', 6)])
+            dia_2['Cuenta'] = ['MOTICK.A']
+            for fecha, df_dia in [('01/09/2025', dia_1), ('02/09/2025', dia_2)]:
+                almacen.subir_datos_scraper(df_dia, fecha)
+                AnalizadorHistoricoMotick(almacenamiento=almacen, estado=False, verificador=False).ejecutar()
+            estados = almacen.leer_datos_historico().set_index('URL')['Estado'].to_dict()
+            if estados == {'u1': 'activa', 'u2': 'activa'}:
+                tests.append(("Cuenta sin scrape", True, "u2 (MOTICK.B no scrapeada) sigue activa"))
+            else:
+                tests.append(("Cuenta sin scrape", False, f"Estados: {estados}"))
+        
+    except Exception as e:
+        tests.append(("Registro de Cuentas", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_selectores_adaptativos():
+    """Test 24: Orden de selectores aprendido de sus aciertos (persistido entre ejecuciones)"""
+    print_test_header("Selectores Adaptativos")
+    
+    tests = []
+    
+    try:
+        import json
+        import tempfile
+        from selenium.common.exceptions import NoSuchElementException
+        from scraper_motick import extract_likes_robust, extract_year_and_km_robust, extract_price_robust
+        from selectores_motick import EstadisticasSelectoresMotick, MAX_INTENTOS
+        
+        class ElementoFalso:
+            def __init__(self, texto):
+                self.text = texto
+            
+            def get_attribute(self, nombre):
+                return None
+        
+        class DriverFalso:
+            """Solo responden los selectores de 'elementos'; anota los selectores consultados"""
+            def __init__(self, elementos, page_source=''):
+                self.elementos = elementos
+                self.page_source = page_source
+                self.consultados = []
+            
+            def find_elements(self, by, selector):
+                self.consultados.append(selector)
+                return [ElementoFalso(texto) for texto in self.elementos.get(selector, [])]
+            
+            def find_element(self, by, selector):
+                elementos = self.find_elements(by, selector)
+                if not elementos:
+                    raise NoSuchElementException(selector)
+                return elementos[0]
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'selectores.json')
+            
+            # El selector que funciona es el ultimo de la lista de likes
+            estadisticas = EstadisticasSelectoresMotick(ruta, adaptar=True)
+            driver = DriverFalso({"[class*='heart']": ['7']})
+            primera = extract_likes_robust(driver, estadisticas)
+            consultas_primera = len(driver.consultados)
+            driver.consultados = []
+            segunda = extract_likes_robust(driver, estadisticas)
+            if primera == segunda == 7 and consultas_primera == 8 and driver.consultados == ["[class*='heart']"]:
+                tests.append(("Orden aprendido", True, "2a extraccion: 1 selector probado en vez de 8"))
+            else:
+                tests.append(("Orden aprendido", False, f"Likes {primera}/{segunda}, consultados: {driver.consultados}"))
+            
+            # Fallback regex y campo sin valor quedan en el informe de la ejecucion
+            extract_likes_robust(DriverFalso({}, page_source='favorites: 12'), estadisticas)
+            extract_year_and_km_robust(DriverFalso({}), estadisticas)
+            informe = estadisticas.informe(min_intentos=1)
+            if (informe['likes']['fuentes'] == {"[class*='heart']": 2, 'regex html': 1}
+                    and informe['descripcion']['fuentes'] == {'ninguno': 1}
+                    and len(informe['likes']['muertos']) == 7):
+                tests.append(("Informe por ejecucion", True, "Fuentes por campo y 7 selectores de likes muertos"))
+            else:
+                tests.append(("Informe por ejecucion", False, f"Informe: {informe}"))
+            
+            # Dos trabajadores guardan: se suman sus aciertos y el orden sigue en la ejecucion siguiente
+            otro = EstadisticasSelectoresMotick(ruta, adaptar=True)
+            extract_likes_robust(DriverFalso({"[class*='heart']": ['3']}), otro)
+            guardados = estadisticas.guardar() and otro.guardar()
+            with open(ruta, 'r', encoding='utf-8') as f:
+                contador = json.load(f)['campos']['likes']["[class*='heart']"]
+            siguiente = EstadisticasSelectoresMotick(ruta, adaptar=True)
+            driver = DriverFalso({"[class*='heart']": ['5']})
+            extract_likes_robust(driver, siguiente)
+            if guardados and contador == {'intentos': 4, 'aciertos': 3} and driver.consultados == ["[class*='heart']"]:
+                tests.append(("Estadisticas persistidas", True, "Aciertos de 2 procesos sumados en disco"))
+            else:
+                tests.append(("Estadisticas persistidas", False, f"Contador: {contador}, consultados: {driver.consultados}"))
+            
+            # Precio: aunque los selectores de financiado acierten mas, un anuncio financiado
+            # sigue dando el precio al contado (la lista es de precedencia)
+            precio = EstadisticasSelectoresMotick(ruta, adaptar=True)
+            financiado = "span.item-detail-price_ItemDetailPrice--financed__LgMRH"
+            contado = "span.item-detail-price_ItemDetailPrice--standardFinanced__f9ceG"
+            for _ in range(10):
+                precio.anotar('precio', [contado, financiado], financiado)
+            driver = DriverFalso({
+                "//*[contains(text(), '€')]": ['3.500 €'],
+                contado: ['3.500 €'],
+                financiado: ['2.999 €'],
+            })
+            valor = extract_price_robust(driver, precio)
+            if valor == '3.500 €' and precio.ordenar('precio', [contado, financiado]) == [contado, financiado]:
+                tests.append(("Precio con precedencia", True, "Financiado con estadisticas aprendidas -> precio al contado"))
+            else:
+                tests.append(("Precio con precedencia", False, f"Precio: {valor}, consultados: {driver.consultados}"))
+            
+            # Sin adaptar: orden fijo (pero se siguen anotando aciertos)
+            fijo = EstadisticasSelectoresMotick(ruta, adaptar=False)
+            driver = DriverFalso({"[class*='heart']": ['5']})
+            extract_likes_robust(driver, fijo)
+            if len(driver.consultados) == 8 and fijo.fuentes['likes'] == {"[class*='heart']": 1}:
+                tests.append(("Orden fijo", True, "MOTICK_ADAPTAR_SELECTORES=false prueba la lista original"))
+            else:
+                tests.append(("Orden fijo", False, f"Consultados: {driver.consultados}"))
+            
+            # Contadores grandes se reducen a la mitad: el orden sigue los cambios del marcado
+            fijo.ejecucion = {'likes': {'viejo': {'intentos': MAX_INTENTOS + 1, 'aciertos': MAX_INTENTOS}}}
+            fijo.guardar()
+            viejo = fijo.campos['likes']['viejo']
+            if viejo == {'intentos': (MAX_INTENTOS + 1) // 2, 'aciertos': MAX_INTENTOS // 2}:
+                tests.append(("Decaimiento", True, f"Mas de {MAX_INTENTOS} intentos -> contadores a la mitad"))
+            else:
+                tests.append(("Decaimiento", False, f"Contador: {viejo}"))
+        
+    except Exception as e:
+        tests.append(("Selectores Adaptativos", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_fusion_historico():
+    """Test 25: Fusion vectorizada historico + scrape (nuevas, existentes, vendidas, totales y destacados)"""
+    print_test_header("Fusion Historico")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        import pandas as pd
+        from almacenamiento_motick import AlmacenamientoLocalMotick
+        from analisis_motick import AnalizadorHistoricoMotick
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            almacen = AlmacenamientoLocalMotick(directorio)
+            almacen.subir_datos_scraper(crear_scrape_prueba('01/09/2025', [('a', 2), ('b', 5), ('c', 1)]), '01/09/2025')
+            AnalizadorHistoricoMotick(almacenamiento=almacen, estado=False, verificador=False).ejecutar()
+            
+            # Historico conocido: 'a' duplicada (dos filas con la misma URL) y 'c' ya vendida
+            historico = almacen.leer_datos_historico()
+            historico = pd.concat([historico, historico[historico['URL'] == 'a']], ignore_index=True)
+            historico.loc[historico['URL'] == 'c', ['Estado', 'Fecha_Venta']] = ['vendida', pd.Timestamp('2025-08-20')]
+            
+            analizador = AnalizadorHistoricoMotick(almacenamiento=almacen, estado=False, verificador=False)
+            df_nuevo = analizador.recibir_datos_scraper(
+                crear_scrape_prueba('02/09/2025', [('a', 9), ('d', 1)]), guardar_snapshot=False
+            )
+            df = analizador.procesar_motos_nuevas_y_existentes(df_nuevo, historico)
+            
+            esperado = [
+                # URL, Estado, Likes hoy (0 sin dato tras la limpieza), Likes_Totales, Visitas_Totales,
+                # Variacion_Likes, Fecha_Venta
+                ('a', 'activa', 9, 9, 90, 7, None),
+                ('a', 'activa', 9, 9, 90, 7, None),
+                ('d', 'activa', 1, 1, 10, 0, None),
+                ('b', 'vendida', 0, 5, 50, 0, '2025-09-02'),
+                ('c', 'vendida', 0, 1, 10, 0, '2025-08-20'),
+            ]
+            obtenido = [
+                (fila['URL'], fila['Estado'],
+                 None if pd.isna(fila['Likes_02/09/2025']) else int(fila['Likes_02/09/2025']),
+                 int(fila['Likes_Totales']), int(fila['Visitas_Totales']), int(fila['Variacion_Likes']),
+                 None if pd.isna(fila['Fecha_Venta']) else pd.Timestamp(fila['Fecha_Venta']).strftime('%Y-%m-%d'))
+                for _, fila in df.iterrows()
+            ]
+            if obtenido == esperado:
+                tests.append(("Clasificacion y totales", True, "Nuevas/existentes/vendidas, totales, variacion y Fecha_Venta"))
+            else:
+                tests.append(("Clasificacion y totales", False, f"Obtenido: {obtenido}"))
+            
+            stats = analizador.stats
+            destacadas = analizador.top_likes_crecimiento
+            vendidas = analizador.motos_vendidas_lista
+            if ((stats['motos_nuevas'], stats['motos_actualizadas'], stats['motos_vendidas']) == (1, 1, 1)
+                    and len(destacadas) == 1 and destacadas[0]['Variacion'] == 7 and destacadas[0]['Likes_Anteriores'] == 2
+                    and len(vendidas) == 1 and vendidas[0]['Likes'] == 5 and vendidas[0]['Visitas'] == 50):
+                tests.append(("URLs duplicadas", True, "'a' duplicada: ambas filas actualizadas, un solo destacado"))
+            else:
+                tests.append(("URLs duplicadas", False, f"Stats: {stats}, destacadas: {destacadas}, vendidas: {vendidas}"))
+            
+            # Filas nuevas: esquema fijo, 'No especificado' por defecto y un solo concat con
+            # un historico antiguo (sin Marca/Modelo/Cilindrada)
+            df_scrape = crear_scrape_prueba('02/09/2025', [('e', 3), ('f', 2)])
+            df_scrape.loc[1, 'Cuenta'] = None
+            nuevo_por_url = analizador.recibir_datos_scraper(df_scrape, guardar_snapshot=False).set_index('URL')
+            df_nuevas = analizador.construir_filas_nuevas(nuevo_por_url, 'Visitas_02/09/2025', 'Likes_02/09/2025')
+            esquema = ['ID_Unico_Real', 'Cuenta', 'Titulo', 'Marca', 'Modelo', 'Cilindrada', 'Precio', 'Kilometraje',
+                       'Primera_Deteccion', 'Estado', 'URL', 'Variacion_Likes', 'Visitas_Totales', 'Likes_Totales',
+                       'Visitas_02/09/2025', 'Likes_02/09/2025']
+            antiguo = historico.drop(columns=['Marca', 'Modelo', 'Cilindrada']).drop_duplicates('URL')
+            antiguo['Visitas_02/09/2025'] = pd.NA
+            antiguo['Likes_02/09/2025'] = pd.NA
+            unido = analizador.unir_filas_nuevas(antiguo, df_nuevas)
+            filas_nuevas = unido[unido['URL'].isin(['e', 'f'])]
+            if (list(df_nuevas.columns) == esquema
+                    and list(unido.columns) == list(antiguo.columns) + ['Marca', 'Modelo', 'Cilindrada']
+                    and len(unido) == len(antiguo) + 2
+                    and filas_nuevas['Likes_01/09/2025'].isna().all()
+                    and list(filas_nuevas['Likes_02/09/2025']) == [3, 2]
+                    and list(filas_nuevas['Cuenta']) == ['MOTICK.TEST', 'No especificado']
+                    and (filas_nuevas['Estado'] == 'activa').all()):
+                tests.append(("Filas nuevas", True, "Esquema y orden de columnas; fechas anteriores vacias; 'No especificado'"))
+            else:
+                tests.append(("Filas nuevas", False, f"Columnas: {list(unido.columns)}\n{filas_nuevas.to_dict('records')}"))
+        
+    except Exception as e:
+        tests.append(("Fusion Historico", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
+def test_publicador_sheets():
+    """Test 26: Publicador almacen local -> Sheets (pendientes fallidos y una subida por tipo)"""
+    print_test_header("Publicador Sheets")
+    
+    tests = []
+    
+    try:
+        import tempfile
+        from almacenamiento_motick import AlmacenamientoLocalMotick
+        from publicador_motick import PublicadorSheetsMotick
+        
+        class SheetsFalso:
+            """gs_handler de prueba: anota las subidas y falla las fechas de fallar"""
+            def __init__(self, fallar=()):
+                self.fallar = set(fallar)
+                self.llamadas = []
+            
+            def subir_datos_scraper(self, df, fecha):
+                self.llamadas.append(('scr', fecha))
+                return (fecha not in self.fallar, f"SCR {fecha}")
+            
+            def guardar_historico_con_hojas_originales(self, df, fecha):
+                self.llamadas.append(('historico', fecha))
+                return fecha not in self.fallar
+            
+            def guardar_metricas(self, df):
+                self.llamadas.append(('metricas', None))
+                return True
+            
+            def guardar_resumen(self, df):
+                self.llamadas.append(('resumen', None))
+                return True
+            
+            def anadir(self, tipo, df):
+                self.llamadas.append((tipo, len(df)))
+                return tipo not in self.fallar
+            
+            def guardar_observaciones(self, df):
+                return self.anadir('observaciones', df)
+            
+            def guardar_cambios_precio(self, df):
+                return self.anadir('cambios_precio', df)
+            
+            def archivar_vendidas(self, df):
+                return self.anadir('vendidas', df)
+        
+        with tempfile.TemporaryDirectory() as directorio:
+            almacen = AlmacenamientoLocalMotick(directorio)
+            for fecha, urls_likes in [('01/09/2025', [('u1', 5)]), ('02/09/2025', [('u1', 6)])]:
+                df = crear_scrape_prueba(fecha, urls_likes)
+                almacen.subir_datos_scraper(df, fecha)
+                almacen.guardar_historico_con_hojas_originales(df, fecha)
+            
+            sheets = SheetsFalso(fallar={'01/09/2025'})
+            exito = PublicadorSheetsMotick(almacen, sheets).publicar_pendientes()
+            pendientes = almacen.publicaciones_pendientes()
+            if not exito and [(tipo, fecha) for _, tipo, fecha in pendientes] == [('scr', '01/09/2025')]:
+                tests.append(("Subida fallida pendiente", True, "La SCR que fallo sigue en la cola, el resto publicado"))
+            else:
+                tests.append(("Subida fallida pendiente", False, f"Exito: {exito}, pendientes: {pendientes}"))
+            
+            historicos = [fecha for tipo, fecha in sheets.llamadas if tipo == 'historico']
+            if historicos == ['02/09/2025']:
+                tests.append(("Una subida del historico", True, "2 versiones pendientes publicadas con una sola subida"))
+            else:
+                tests.append(("Una subida del historico", False, f"Subidas del historico: {historicos}"))
+            
+            sheets = SheetsFalso()
+            exito = PublicadorSheetsMotick(almacen, sheets).publicar_pendientes()
+            if exito and sheets.llamadas == [('scr', '01/09/2025')] and not almacen.publicaciones_pendientes():
+                tests.append(("Reintento", True, "La siguiente ejecucion publica solo lo que fallo"))
+            else:
+                tests.append(("Reintento", False, f"Llamadas: {sheets.llamadas}"))
+        
+        # Modo local completo: observaciones, cambios de precio y vendidas archivadas
+        # tambien llegan a Sheets, y antes que el historico que ya no las tiene
+        from analisis_motick import AnalizadorHistoricoMotick
+        with tempfile.TemporaryDirectory() as directorio:
+            almacen = AlmacenamientoLocalMotick(directorio)
+            for fecha, urls_likes, precio in [('01/09/2025', [('u1', 5), ('u2', 1)], '5.000 €'),
+                                              ('02/09/2025', [('u1', 6)], '4.500 €'),
+                                              ('15/10/2025', [('u1', 7)], '4.500 €')]:
+                df = crear_scrape_prueba(fecha, urls_likes).assign(Precio=precio)
+                almacen.subir_datos_scraper(df, fecha)
+                AnalizadorHistoricoMotick(almacenamiento=almacen, estado=False, verificador=False).ejecutar()
+            
+            sheets = SheetsFalso(fallar={'observaciones'})
+            PublicadorSheetsMotick(almacen, sheets).publicar_pendientes()
+            tipos_pendientes = {tipo for _, tipo, _ in almacen.publicaciones_pendientes()}
+            subidas = dict(sheets.llamadas)
+            if (tipos_pendientes == {'observaciones', 'historico'} and 'historico' not in subidas
+                    and subidas.get('cambios_precio') == 1 and subidas.get('vendidas') == 1):
+                tests.append(("Historico tras anadidos", True, "Cambio de precio y vendida publicados; sin observaciones "
+                                                               "el historico queda pendiente"))
+            else:
+                tests.append(("Historico tras anadidos", False, f"Pendientes: {tipos_pendientes}, llamadas: {sheets.llamadas}"))
+            
+            sheets = SheetsFalso()
+            exito = PublicadorSheetsMotick(almacen, sheets).publicar_pendientes()
+            subidas = dict(sheets.llamadas)
+            if (exito and subidas.get('observaciones') == len(almacen.leer_observaciones())
+                    and [t for t, _ in sheets.llamadas] == ['observaciones', 'historico']
+                    and not almacen.publicaciones_pendientes()):
+                tests.append(("Anadidos publicados", True, f"{subidas['observaciones']} observaciones en una subida, "
+                                                           f"despues el historico"))
+            else:
+                tests.append(("Anadidos publicados", False, f"Llamadas: {sheets.llamadas}"))
+        
+    except Exception as e:
+        tests.append(("Publicador Sheets", False, f"Error: {str(e)}"))
+    
+    # Mostrar resultados
+    all_passed = True
+    for test_name, success, message in tests:
+        print_test_result(test_name, success, message)
+        if not success:
+            all_passed = False
+    
+    return all_passed
+
 def main():
     """Función principal de testing"""
     print("="*60)
@@ -312,7 +2080,27 @@ def main():
         ("Configuración", test_configuration),
         ("Google Sheets", test_google_sheets_connection),
         ("Navegador", test_browser_setup),
-        ("Procesamiento de Datos", test_data_processing)
+        ("Procesamiento de Datos", test_data_processing),
+        ("Cache Hojas", test_cache_hojas_sheets),
+        ("Almacen Local", test_almacen_local_offline),
+        ("Archivo SCR", test_archivo_scr),
+        ("Backfill", test_backfill_local),
+        ("Estado Incremental", test_estado_incremental),
+        ("Matriz Series", test_matriz_series),
+        ("Esquema Tipado", test_esquema_tipado),
+        ("Metricas", test_metricas),
+        ("Resumen Cuentas", test_resumen_cuentas),
+        ("Catalogo Marcas", test_catalogo_marcas),
+        ("Cambios de Precio", test_cambios_precio),
+        ("Pipeline", test_pipeline),
+        ("Stream Scraper", test_stream_scraper),
+        ("Verificacion Ventas", test_verificacion_ventas),
+        ("Shards", test_shards),
+        ("Cola de Tareas", test_cola_tareas),
+        ("Registro de Cuentas", test_registro_cuentas),
+        ("Selectores Adaptativos", test_selectores_adaptativos),
+        ("Fusion Historico", test_fusion_historico),
+        ("Publicador Sheets", test_publicador_sheets)
     ]
     
     results = []